@@ -0,0 +1,30 @@
+-- ===============================================
+-- CREATE DECISION FEEDBACK TABLE
+-- ===============================================
+
+-- Learning feedback for autonomous decisions, replayed on startup to
+-- rebuild per-decision-type confidence calibration
+CREATE TABLE IF NOT EXISTS public.decision_feedback (
+  decision_id TEXT PRIMARY KEY,
+  decision_type TEXT NOT NULL,
+  campaign_id TEXT NOT NULL,
+  platform TEXT,
+  accuracy_score DOUBLE PRECISION NOT NULL,
+  decision_quality TEXT NOT NULL CHECK (decision_quality IN ('excellent', 'good', 'fair', 'poor')),
+  actual_performance JSONB,
+  predicted_performance JSONB,
+  lessons_learned JSONB,
+  model_adjustments JSONB,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Create indexes
+CREATE INDEX IF NOT EXISTS idx_decision_feedback_decision_type ON public.decision_feedback(decision_type);
+CREATE INDEX IF NOT EXISTS idx_decision_feedback_campaign_id ON public.decision_feedback(campaign_id);
+CREATE INDEX IF NOT EXISTS idx_decision_feedback_created_at ON public.decision_feedback(created_at);
+
+-- Enable RLS (backend writes with the service role key)
+ALTER TABLE public.decision_feedback ENABLE ROW LEVEL SECURITY;
+
+-- Refresh schema cache
+NOTIFY pgrst, 'reload schema';
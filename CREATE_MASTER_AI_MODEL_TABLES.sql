@@ -0,0 +1,54 @@
+-- ===============================================
+-- CREATE MASTER AI MODEL TRAINING TABLES
+-- ===============================================
+
+-- One row per campaign per master optimization cycle. The model trainer
+-- pairs each row with the same campaign's next cycle to build training data.
+CREATE TABLE IF NOT EXISTS public.master_ai_training_samples (
+  id BIGSERIAL PRIMARY KEY,
+  cycle_id UUID NOT NULL,
+  recorded_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  platform TEXT NOT NULL,
+  campaign_id TEXT NOT NULL,
+  roas DOUBLE PRECISION,
+  cpa DOUBLE PRECISION,
+  conversion_rate DOUBLE PRECISION,
+  ctr DOUBLE PRECISION,
+  quality_score DOUBLE PRECISION,
+  confidence_score DOUBLE PRECISION,
+  performance_trend TEXT,
+  roi_improvement DOUBLE PRECISION
+);
+
+CREATE INDEX IF NOT EXISTS idx_master_ai_training_samples_recorded
+  ON public.master_ai_training_samples (recorded_at DESC);
+
+-- Registry of trained model generations. A training run inserts a row to
+-- reserve its version (allocated by the identity column, so concurrent workers
+-- never share one) and marks it ready once the artifact is in storage.
+-- The backend loads the highest ready version.
+CREATE TABLE IF NOT EXISTS public.master_ai_model_versions (
+  version INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  status TEXT NOT NULL DEFAULT 'training' CHECK (status IN ('training', 'ready', 'failed')),
+  host TEXT,
+  artifact_path TEXT,  -- Object key in the master-ai-models storage bucket
+  trained_at TIMESTAMPTZ,
+  sample_count INTEGER,
+  metrics JSONB DEFAULT '{}'::jsonb,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_master_ai_model_versions_ready
+  ON public.master_ai_model_versions (version DESC) WHERE status = 'ready';
+
+-- Shared artifact storage, so every host and redeployed container can load the models
+INSERT INTO storage.buckets (id, name, public)
+VALUES ('master-ai-models', 'master-ai-models', false)
+ON CONFLICT (id) DO NOTHING;
+
+-- Enable RLS (backend writes with the service role key)
+ALTER TABLE public.master_ai_training_samples ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.master_ai_model_versions ENABLE ROW LEVEL SECURITY;
+
+-- Refresh schema cache
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,27 @@
+-- ===============================================
+-- CREATE OPTIMIZATION EXECUTION LOG TABLE
+-- ===============================================
+
+-- Executed optimizations, flushed in batches from the optimization
+-- executor's in-memory log
+CREATE TABLE IF NOT EXISTS public.optimization_execution_log (
+  execution_id TEXT PRIMARY KEY,
+  campaign_id TEXT NOT NULL,
+  optimization_type TEXT NOT NULL,
+  status TEXT NOT NULL CHECK (status IN ('success', 'failed')),
+  timestamp TIMESTAMPTZ NOT NULL,
+  result JSONB,
+  platform TEXT,
+  account_id TEXT,
+  batch_job_id TEXT
+);
+
+-- Create indexes
+CREATE INDEX IF NOT EXISTS idx_optimization_execution_log_campaign_time ON public.optimization_execution_log(campaign_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_optimization_execution_log_batch_job ON public.optimization_execution_log(batch_job_id);
+
+-- Enable RLS (backend writes with the service role key)
+ALTER TABLE public.optimization_execution_log ENABLE ROW LEVEL SECURITY;
+
+-- Refresh schema cache
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,25 @@
+-- ===============================================
+-- CREATE OPTIMIZATION RULE CONFIGS TABLE
+-- ===============================================
+
+-- Per-tenant overrides for the optimization engine's thresholds, rule
+-- parameters, safety limits and score ladders. Keys left out fall back to
+-- the engine defaults. Bump version on every change; the backend re-reads
+-- each tenant's row periodically and recompiles when the version increases.
+-- The backend's own updates bump it with a compare-and-set on the old value.
+CREATE TABLE IF NOT EXISTS public.optimization_rule_configs (
+  tenant_id TEXT PRIMARY KEY,
+  performance_thresholds JSONB DEFAULT '{}'::jsonb,
+  optimization_rules JSONB DEFAULT '{}'::jsonb,
+  safety_limits JSONB DEFAULT '{}'::jsonb,
+  -- e.g. {"base_score": 50, "tables": {"roas": {"edges": [1, 2, 3, 4], "scores": [0, 10, 20, 30, 40]}}}
+  score_tables JSONB DEFAULT '{}'::jsonb,
+  version INTEGER NOT NULL DEFAULT 1,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Enable RLS (backend writes with the service role key)
+ALTER TABLE public.optimization_rule_configs ENABLE ROW LEVEL SECURITY;
+
+-- Refresh schema cache
+NOTIFY pgrst, 'reload schema';
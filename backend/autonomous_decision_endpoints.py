@@ -16,11 +16,14 @@ from autonomous_decision_framework import (
     AutonomousDecisionFramework, 
     AutonomousDecision,
     DecisionContext,
+    DecisionContextBatch,
     DecisionType,
     RiskLevel,
+    SafetyGuardrail,
     ApprovalStatus,
     ExecutionResult,
-    LearningFeedback
+    LearningFeedback,
+    COMPARISON_OPERATORS
 )
 from decision_execution_engine import DecisionExecutionEngine
 
@@ -47,6 +50,18 @@ class DecisionContextRequest(BaseModel):
     competitor_analysis: Optional[Dict[str, Any]] = {}
     seasonal_factors: Optional[Dict[str, float]] = {}
 
+class DecisionBatchRequest(BaseModel):
+    """Columnar decision contexts: one entry per campaign in every list"""
+    campaign_ids: List[str]
+    platforms: List[str]
+    spend: List[float]
+    revenue: List[float]
+    clicks: List[float]
+    conversions: List[float]
+    daily_budget: List[float]
+    max_daily_budget: Optional[List[float]] = None
+    historical_roas: Optional[List[List[float]]] = None
+
 class OptimizationGoals(BaseModel):
     target_roas: Optional[float] = 3.0
     max_cpa: Optional[float] = None
@@ -70,6 +85,16 @@ class LearningFeedbackRequest(BaseModel):
     actual_performance: Dict[str, float]
     timeframe_days: Optional[int] = 7
 
+class GuardrailRequest(BaseModel):
+    name: str
+    description: str
+    expression: str  # e.g. "new_budget / max(daily_budget, 1)"
+    threshold_value: float
+    comparison_operator: str  # >, <, >=, <=, ==
+    risk_level: str  # low, medium, high, critical
+    block_execution: bool = False
+    alert_required: bool = True
+
 class AutonomySettings(BaseModel):
     auto_execution_enabled: bool
     risk_tolerance: str  # low, medium, high
@@ -132,24 +157,7 @@ async def analyze_decision_opportunities(
         # Format response
         return {
             "total_opportunities": len(decisions),
-            "decisions": [
-                {
-                    "decision_id": d.decision_id,
-                    "decision_type": d.decision_type.value,
-                    "campaign_id": d.campaign_id,
-                    "platform": d.platform,
-                    "proposed_action": d.proposed_action,
-                    "reasoning": d.reasoning,
-                    "confidence_score": d.confidence_score,
-                    "risk_level": d.risk_level.value,
-                    "expected_impact": d.expected_impact,
-                    "requires_human_approval": d.requires_human_approval,
-                    "auto_execute_allowed": d.auto_execute_allowed,
-                    "safety_checks": d.safety_checks,
-                    "expires_at": d.expires_at.isoformat()
-                }
-                for d in decisions
-            ],
+            "decisions": [_serialize_decision(d) for d in decisions],
             "analysis_timestamp": datetime.now().isoformat(),
             "autonomy_settings": current_autonomy_settings.dict()
         }
@@ -158,6 +166,74 @@ async def analyze_decision_opportunities(
         logger.error(f"Error analyzing decision opportunities: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@router.post("/analyze/batch")
+async def analyze_decision_opportunities_batch(
+    batch: DecisionBatchRequest,
+    goals: OptimizationGoals
+) -> Dict[str, Any]:
+    """Analyze a full account of campaigns in one vectorized pass"""
+    try:
+        # Ragged historical series are NaN-padded into a rectangular array
+        historical_roas = None
+        if batch.historical_roas:
+            days = max(len(series) for series in batch.historical_roas)
+            historical_roas = [
+                series + [float('nan')] * (days - len(series))
+                for series in batch.historical_roas
+            ]
+        
+        context_batch = DecisionContextBatch(
+            campaign_ids=batch.campaign_ids,
+            platforms=batch.platforms,
+            spend=batch.spend,
+            revenue=batch.revenue,
+            clicks=batch.clicks,
+            conversions=batch.conversions,
+            daily_budget=batch.daily_budget,
+            max_daily_budget=batch.max_daily_budget,
+            historical_roas=historical_roas
+        )
+        
+        decisions_by_campaign = await decision_framework.analyze_decision_opportunities_batch(
+            context_batch,
+            goals.dict()
+        )
+        
+        return {
+            "total_campaigns": len(context_batch),
+            "total_opportunities": sum(len(d) for d in decisions_by_campaign.values()),
+            "decisions_by_campaign": {
+                campaign_id: [_serialize_decision(d) for d in decisions]
+                for campaign_id, decisions in decisions_by_campaign.items()
+            },
+            "analysis_timestamp": datetime.now().isoformat(),
+            "autonomy_settings": current_autonomy_settings.dict()
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error analyzing batch decision opportunities: {e}")
+        raise HTTPException(status_code=500, detail=f"Batch analysis failed: {str(e)}")
+
+def _serialize_decision(d: AutonomousDecision) -> Dict[str, Any]:
+    """Format an analyzed decision for API responses"""
+    return {
+        "decision_id": d.decision_id,
+        "decision_type": d.decision_type.value,
+        "campaign_id": d.campaign_id,
+        "platform": d.platform,
+        "proposed_action": d.proposed_action,
+        "reasoning": d.reasoning,
+        "confidence_score": d.confidence_score,
+        "risk_level": d.risk_level.value,
+        "expected_impact": d.expected_impact,
+        "requires_human_approval": d.requires_human_approval,
+        "auto_execute_allowed": d.auto_execute_allowed,
+        "safety_checks": d.safety_checks,
+        "expires_at": d.expires_at.isoformat()
+    }
+
 @router.get("/decisions/pending")
 async def get_pending_decisions():
     """Get all pending decisions awaiting approval or execution"""
@@ -362,6 +438,91 @@ async def submit_learning_feedback(feedback_request: LearningFeedbackRequest):
         logger.error(f"Error submitting learning feedback: {e}")
         raise HTTPException(status_code=500, detail=f"Feedback submission failed: {str(e)}")
 
+@router.get("/guardrails")
+async def get_safety_guardrails():
+    """List the active safety guardrails and their expressions"""
+    return {
+        "guardrails": [
+            {
+                "name": g.name,
+                "description": g.description,
+                "expression": g.expression,
+                "threshold_value": g.threshold_value,
+                "comparison_operator": g.comparison_operator,
+                "risk_level": g.risk_level.value,
+                "block_execution": g.block_execution,
+                "alert_required": g.alert_required
+            }
+            for g in decision_framework.safety_guardrails
+        ],
+        "total_guardrails": len(decision_framework.safety_guardrails)
+    }
+
+@router.post("/guardrails")
+async def upsert_safety_guardrail(guardrail: GuardrailRequest):
+    """Add or replace a safety guardrail; its expression is compiled before it takes effect"""
+    if guardrail.comparison_operator not in COMPARISON_OPERATORS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"comparison_operator must be one of {', '.join(COMPARISON_OPERATORS)}"
+        )
+    try:
+        decision_framework.add_safety_guardrail(SafetyGuardrail(
+            name=guardrail.name,
+            description=guardrail.description,
+            threshold_value=guardrail.threshold_value,
+            comparison_operator=guardrail.comparison_operator,
+            risk_level=RiskLevel(guardrail.risk_level),
+            block_execution=guardrail.block_execution,
+            alert_required=guardrail.alert_required,
+            expression=guardrail.expression
+        ))
+        
+        return {
+            "status": "guardrail_saved",
+            "guardrail_name": guardrail.name,
+            "total_guardrails": len(decision_framework.safety_guardrails),
+            "updated_timestamp": datetime.now().isoformat()
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error saving guardrail {guardrail.name}: {e}")
+        raise HTTPException(status_code=500, detail=f"Guardrail update failed: {str(e)}")
+
+@router.get("/learning/feedback")
+async def get_learning_feedback(
+    decision_id: Optional[str] = None,
+    decision_type: Optional[str] = None,
+    campaign_id: Optional[str] = None
+):
+    """Look up recorded learning feedback by decision, decision type or campaign"""
+    store = decision_framework.feedback_store
+    if decision_id:
+        feedback = store.get(decision_id)
+        records = [feedback] if feedback else []
+    elif decision_type:
+        records = store.by_decision_type(decision_type)
+    elif campaign_id:
+        records = store.by_campaign(campaign_id)
+    else:
+        raise HTTPException(status_code=400, detail="Provide decision_id, decision_type or campaign_id")
+    
+    return {
+        "total_records": len(records),
+        "feedback": [
+            {
+                "decision_id": f.decision_id,
+                "accuracy_score": f.accuracy_score,
+                "decision_quality": f.decision_quality,
+                "lessons_learned": f.lessons_learned,
+                "model_adjustments": f.model_adjustments
+            }
+            for f in records
+        ]
+    }
+
 @router.get("/settings")
 async def get_autonomy_settings():
     """Get current autonomy settings"""
@@ -426,9 +587,8 @@ async def get_autonomous_performance_summary():
             if d.approval_status == ApprovalStatus.EXECUTED
         ])
         
-        # Calculate learning metrics
-        total_feedback = len(decision_framework.learning_data)
-        avg_accuracy = sum(f.accuracy_score for f in decision_framework.learning_data) / max(total_feedback, 1)
+        # Learning metrics are maintained incrementally by the feedback store
+        learning_summary = decision_framework.feedback_store.summary()
         
         # Calculate execution metrics
         queue_status = execution_engine.get_queue_status()
@@ -444,8 +604,7 @@ async def get_autonomous_performance_summary():
                 ])
             },
             "learning_metrics": {
-                "total_feedback_received": total_feedback,
-                "average_accuracy_score": avg_accuracy,
+                **learning_summary,
                 "improvement_rate": 0.15  # Would be calculated from historical data
             },
             "execution_metrics": queue_status,
@@ -3,19 +3,32 @@ Autonomous Decision Framework for PulseBridge.ai
 Provides intelligent decision-making system with safety guardrails and autonomous campaign management
 """
 
+import ast
 import asyncio
 import json
 import logging
+import operator
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Union, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
 import uuid
 
+import numpy as np
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Guardrail comparison operators; these work elementwise on NumPy arrays too
+COMPARISON_OPERATORS = {
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+    '==': operator.eq
+}
+
 class DecisionType(Enum):
     """Types of autonomous decisions"""
     BUDGET_ADJUSTMENT = "budget_adjustment"
@@ -52,6 +65,7 @@ class SafetyGuardrail:
     risk_level: RiskLevel
     block_execution: bool
     alert_required: bool
+    expression: str = "1.0"  # Evaluated over decision/context fields, see GuardrailEngine
 
 @dataclass
 class DecisionContext:
@@ -66,6 +80,77 @@ class DecisionContext:
     competitor_analysis: Dict[str, Any]
     seasonal_factors: Dict[str, float]
 
+@dataclass
+class DecisionContextBatch:
+    """Columnar decision context for analyzing many campaigns in one pass"""
+    campaign_ids: List[str]
+    platforms: List[str]
+    spend: np.ndarray
+    revenue: np.ndarray
+    clicks: np.ndarray
+    conversions: np.ndarray
+    daily_budget: np.ndarray
+    max_daily_budget: Optional[np.ndarray] = None
+    historical_roas: Optional[np.ndarray] = None  # (campaigns, days), NaN-padded
+
+    def __post_init__(self):
+        self.spend = np.asarray(self.spend, dtype=float)
+        self.revenue = np.asarray(self.revenue, dtype=float)
+        self.clicks = np.asarray(self.clicks, dtype=float)
+        self.conversions = np.asarray(self.conversions, dtype=float)
+        self.daily_budget = np.asarray(self.daily_budget, dtype=float)
+
+        # Missing caps default to twice the current budget, as in the per-campaign analyzer
+        if self.max_daily_budget is None:
+            self.max_daily_budget = self.daily_budget * 2
+        else:
+            self.max_daily_budget = np.asarray(self.max_daily_budget, dtype=float)
+            self.max_daily_budget = np.where(
+                np.isnan(self.max_daily_budget), self.daily_budget * 2, self.max_daily_budget
+            )
+
+        if self.historical_roas is None:
+            self.historical_roas = np.empty((len(self.campaign_ids), 0))
+        else:
+            self.historical_roas = np.asarray(self.historical_roas, dtype=float).reshape(len(self.campaign_ids), -1)
+
+        n = len(self.campaign_ids)
+        for name in ('spend', 'revenue', 'clicks', 'conversions', 'daily_budget', 'max_daily_budget'):
+            if getattr(self, name).shape != (n,):
+                raise ValueError(f"Column '{name}' must have one value per campaign ({n})")
+        if len(self.platforms) != n:
+            raise ValueError(f"Column 'platforms' must have one value per campaign ({n})")
+
+    def __len__(self) -> int:
+        return len(self.campaign_ids)
+
+    @classmethod
+    def from_contexts(cls, contexts: List[DecisionContext]) -> 'DecisionContextBatch':
+        """Build a columnar batch from individual decision contexts"""
+        history = [
+            [
+                row['roas'] if 'roas' in row else row.get('revenue', 0) / max(row.get('spend', 1), 1)
+                for row in ctx.historical_performance
+            ]
+            for ctx in contexts
+        ]
+        days = max((len(h) for h in history), default=0)
+        historical_roas = np.full((len(contexts), days), np.nan)
+        for i, h in enumerate(history):
+            historical_roas[i, :len(h)] = h
+
+        return cls(
+            campaign_ids=[ctx.campaign_id for ctx in contexts],
+            platforms=[ctx.platform for ctx in contexts],
+            spend=[ctx.current_performance.get('spend', 0) for ctx in contexts],
+            revenue=[ctx.current_performance.get('revenue', 0) for ctx in contexts],
+            clicks=[ctx.current_performance.get('clicks', 0) for ctx in contexts],
+            conversions=[ctx.current_performance.get('conversions', 0) for ctx in contexts],
+            daily_budget=[ctx.budget_constraints.get('daily_budget', 0) for ctx in contexts],
+            max_daily_budget=[ctx.budget_constraints.get('max_daily_budget', np.nan) for ctx in contexts],
+            historical_roas=historical_roas
+        )
+
 @dataclass
 class AutonomousDecision:
     """Autonomous decision with full context and reasoning"""
@@ -109,6 +194,365 @@ class LearningFeedback:
     lessons_learned: List[str]
     model_adjustments: Dict[str, Any]
 
+@dataclass
+class ConfidenceCalibration:
+    """Running outcome statistics and confidence offset for one decision type"""
+    decision_type: str
+    feedback_count: int = 0
+    mean_accuracy: float = 0.0
+    confidence_offset: float = 0.0
+    risk_sensitivity: float = 0.0
+
+class OnlineConfidenceCalibrator:
+    """
+    Per-decision-type confidence calibration updated incrementally from learning feedback.
+    Each feedback applies its model_adjustments in O(1); no retraining over history is needed.
+    """
+    
+    MIN_OFFSET = -0.5
+    MAX_OFFSET = 0.1
+    
+    def __init__(self):
+        self.calibrations: Dict[str, ConfidenceCalibration] = {}
+    
+    def update(self, decision_type: str, feedback: LearningFeedback) -> ConfidenceCalibration:
+        """Fold one feedback record into the calibration for its decision type"""
+        calibration = self.calibrations.setdefault(decision_type, ConfidenceCalibration(decision_type))
+        calibration.feedback_count += 1
+        calibration.mean_accuracy += (feedback.accuracy_score - calibration.mean_accuracy) / calibration.feedback_count
+        calibration.confidence_offset = min(
+            self.MAX_OFFSET,
+            max(self.MIN_OFFSET, calibration.confidence_offset + feedback.model_adjustments.get('confidence_adjustment', 0))
+        )
+        calibration.risk_sensitivity += feedback.model_adjustments.get('risk_sensitivity_adjustment', 0)
+        return calibration
+    
+    def replace(self, decision_type: str, previous: LearningFeedback, feedback: LearningFeedback) -> ConfidenceCalibration:
+        """Swap an already-counted feedback record for its resubmission without counting the decision twice"""
+        calibration = self.calibrations.setdefault(decision_type, ConfidenceCalibration(decision_type))
+        if calibration.feedback_count == 0:
+            return self.update(decision_type, feedback)
+        calibration.mean_accuracy += (feedback.accuracy_score - previous.accuracy_score) / calibration.feedback_count
+        offset_delta = (
+            feedback.model_adjustments.get('confidence_adjustment', 0)
+            - previous.model_adjustments.get('confidence_adjustment', 0)
+        )
+        calibration.confidence_offset = min(self.MAX_OFFSET, max(self.MIN_OFFSET, calibration.confidence_offset + offset_delta))
+        calibration.risk_sensitivity += (
+            feedback.model_adjustments.get('risk_sensitivity_adjustment', 0)
+            - previous.model_adjustments.get('risk_sensitivity_adjustment', 0)
+        )
+        return calibration
+    
+    def calibrate(self, decision_type: str, confidence_score: float) -> float:
+        """Apply the learned offset for a decision type to a raw confidence score"""
+        calibration = self.calibrations.get(decision_type)
+        if calibration is None:
+            return confidence_score
+        return min(1.0, max(0.0, confidence_score + calibration.confidence_offset))
+
+class DecisionFeedbackStore:
+    """
+    Learning feedback indexed by decision id, decision type and campaign, with running aggregates.
+    Persists to the decision_feedback table once a Supabase client is attached.
+    """
+    
+    TABLE_NAME = 'decision_feedback'
+    PAGE_SIZE = 1000
+    
+    def __init__(self, supabase_client=None):
+        self.supabase = supabase_client
+        self.calibrator = OnlineConfidenceCalibrator()
+        self._by_decision: Dict[str, LearningFeedback] = {}
+        self._by_decision_type: Dict[str, List[str]] = {}
+        self._by_campaign: Dict[str, List[str]] = {}
+        self.total_feedback = 0
+        self.accuracy_total = 0.0
+        self.quality_counts: Dict[str, int] = {}
+    
+    async def attach(self, supabase_client) -> int:
+        """Attach persistent storage and replay stored feedback into the indexes and calibrator"""
+        self.supabase = supabase_client
+        try:
+            # PostgREST caps a response at 1000 rows, so page through the full history
+            rows: List[Dict[str, Any]] = []
+            offset = 0
+            while True:
+                page = await asyncio.to_thread(
+                    lambda: self.supabase.table(self.TABLE_NAME)
+                    .select('*')
+                    .order('created_at')
+                    .range(offset, offset + self.PAGE_SIZE - 1)
+                    .execute()
+                )
+                rows.extend(page.data or [])
+                if len(page.data or []) < self.PAGE_SIZE:
+                    break
+                offset += self.PAGE_SIZE
+            for row in rows:
+                feedback = LearningFeedback(
+                    decision_id=row['decision_id'],
+                    actual_performance=row.get('actual_performance') or {},
+                    predicted_performance=row.get('predicted_performance') or {},
+                    accuracy_score=row['accuracy_score'],
+                    decision_quality=row['decision_quality'],
+                    lessons_learned=row.get('lessons_learned') or [],
+                    model_adjustments=row.get('model_adjustments') or {}
+                )
+                self._index(feedback, row['decision_type'], row['campaign_id'])
+            logger.info(f"Loaded {len(rows)} decision feedback records")
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error loading decision feedback: {e}")
+            return 0
+    
+    async def record(self, feedback: LearningFeedback, decision: AutonomousDecision) -> None:
+        """Index a feedback record, update aggregates and calibration, and persist it"""
+        self._index(feedback, decision.decision_type.value, decision.campaign_id)
+        
+        if self.supabase is None:
+            return
+        try:
+            record = {
+                'decision_id': feedback.decision_id,
+                'decision_type': decision.decision_type.value,
+                'campaign_id': decision.campaign_id,
+                'platform': decision.platform,
+                'accuracy_score': feedback.accuracy_score,
+                'decision_quality': feedback.decision_quality,
+                'actual_performance': feedback.actual_performance,
+                'predicted_performance': feedback.predicted_performance,
+                'lessons_learned': feedback.lessons_learned,
+                'model_adjustments': feedback.model_adjustments,
+                'created_at': datetime.now().isoformat()
+            }
+            await asyncio.to_thread(lambda: self.supabase.table(self.TABLE_NAME).upsert(record).execute())
+        except Exception as e:
+            logger.error(f"Error persisting decision feedback {feedback.decision_id}: {e}")
+    
+    def _index(self, feedback: LearningFeedback, decision_type: str, campaign_id: str) -> None:
+        """Add feedback to the indexes and running aggregates"""
+        previous = self._by_decision.get(feedback.decision_id)
+        if previous is not None:
+            # Re-submitted feedback replaces the earlier record in the aggregates
+            self.accuracy_total -= previous.accuracy_score
+            self.quality_counts[previous.decision_quality] -= 1
+        else:
+            self.total_feedback += 1
+            self._by_decision_type.setdefault(decision_type, []).append(feedback.decision_id)
+            self._by_campaign.setdefault(campaign_id, []).append(feedback.decision_id)
+        
+        self._by_decision[feedback.decision_id] = feedback
+        self.accuracy_total += feedback.accuracy_score
+        self.quality_counts[feedback.decision_quality] = self.quality_counts.get(feedback.decision_quality, 0) + 1
+        if previous is not None:
+            self.calibrator.replace(decision_type, previous, feedback)
+        else:
+            self.calibrator.update(decision_type, feedback)
+    
+    def get(self, decision_id: str) -> Optional[LearningFeedback]:
+        return self._by_decision.get(decision_id)
+    
+    def by_decision_type(self, decision_type: str) -> List[LearningFeedback]:
+        return [self._by_decision[d] for d in self._by_decision_type.get(decision_type, [])]
+    
+    def by_campaign(self, campaign_id: str) -> List[LearningFeedback]:
+        return [self._by_decision[d] for d in self._by_campaign.get(campaign_id, [])]
+    
+    def summary(self) -> Dict[str, Any]:
+        """Precomputed learning aggregates"""
+        return {
+            'total_feedback_received': self.total_feedback,
+            'average_accuracy_score': self.accuracy_total / max(self.total_feedback, 1),
+            'quality_distribution': dict(self.quality_counts),
+            'confidence_calibration': {
+                decision_type: asdict(calibration)
+                for decision_type, calibration in self.calibrator.calibrations.items()
+            }
+        }
+
+def _ratio(numerator, denominator):
+    """Elementwise numerator / denominator; 1.0 (no change) where the denominator is missing or not positive"""
+    numerator, denominator = np.broadcast_arrays(np.asarray(numerator, dtype=float), np.asarray(denominator, dtype=float))
+    result = np.ones(numerator.shape)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+def _historical_mean(series: np.ndarray) -> np.ndarray:
+    """Row-wise mean of a NaN-padded history; NaN for campaigns without history"""
+    observed = ~np.isnan(series)
+    counts = observed.sum(axis=1)
+    totals = np.where(observed, series, 0.0).sum(axis=1)
+    return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+# Functions available inside guardrail expressions
+GUARDRAIL_FUNCTIONS = {
+    'max': np.maximum,
+    'min': np.minimum,
+    'abs': np.abs,
+    'ratio': _ratio
+}
+
+# Context fields, computed column-wise from a DecisionContextBatch
+GUARDRAIL_CONTEXT_FIELDS = {
+    'spend': lambda batch: batch.spend,
+    'revenue': lambda batch: batch.revenue,
+    'clicks': lambda batch: batch.clicks,
+    'conversions': lambda batch: batch.conversions,
+    'daily_budget': lambda batch: batch.daily_budget,
+    'max_daily_budget': lambda batch: batch.max_daily_budget,
+    'roas': lambda batch: batch.revenue / np.maximum(batch.spend, 1),
+    'historical_roas': lambda batch: _historical_mean(batch.historical_roas)
+}
+
+# Decision fields, read from each AutonomousDecision (NaN new_budget falls back to daily_budget)
+GUARDRAIL_DECISION_FIELDS = {
+    'new_budget': lambda decision: decision.proposed_action.get('new_budget', np.nan),
+    'spend_multiplier': lambda decision: decision.expected_impact.get('spend_multiplier', 1.0),
+    'revenue_impact': lambda decision: decision.expected_impact.get('revenue_impact', 0),
+    'confidence_score': lambda decision: decision.confidence_score
+}
+
+_GUARDRAIL_EXPRESSION_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.USub, ast.UAdd
+)
+
+class GuardrailEngine:
+    """
+    Safety guardrails compiled once into a vectorized evaluator.
+    Each guardrail's expression is evaluated over whole decision columns, so adding a
+    guardrail only means declaring a new SafetyGuardrail.
+    """
+    
+    def __init__(self, guardrails: List[SafetyGuardrail]):
+        self.guardrails = list(guardrails)
+        self._expressions = []
+        self.fields = set()
+        for guardrail in self.guardrails:
+            code, names = self.compile_expression(guardrail.expression)
+            self._expressions.append(code)
+            self.fields |= names
+        
+        self._thresholds = np.array([g.threshold_value for g in self.guardrails], dtype=float)[:, None]
+        self._blocking = np.array([g.block_execution for g in self.guardrails], dtype=bool)
+        
+        # Guardrails sharing an operator are compared in a single array operation
+        self._operator_groups = {}
+        for index, guardrail in enumerate(self.guardrails):
+            compare = COMPARISON_OPERATORS.get(guardrail.comparison_operator)
+            if compare is None:
+                raise ValueError(
+                    f"Unknown comparison operator '{guardrail.comparison_operator}' in guardrail '{guardrail.name}'; "
+                    f"expected one of {', '.join(COMPARISON_OPERATORS)}"
+                )
+            self._operator_groups.setdefault(compare, []).append(index)
+    
+    @staticmethod
+    def compile_expression(expression: str) -> Tuple[Any, set]:
+        """Validate and compile a guardrail expression, returning the code and the fields it reads"""
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"Invalid guardrail expression '{expression}': {e.msg}")
+        
+        names = set()
+        for node in ast.walk(tree):
+            if not isinstance(node, _GUARDRAIL_EXPRESSION_NODES):
+                raise ValueError(f"Unsupported syntax in guardrail expression '{expression}': {type(node).__name__}")
+            if isinstance(node, ast.Constant):
+                # Only numbers: 'x' * 10**10 would build a huge string
+                if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                    raise ValueError(f"Unsupported constant {node.value!r} in guardrail expression '{expression}'")
+            elif isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in GUARDRAIL_FUNCTIONS or node.keywords:
+                    raise ValueError(f"Unsupported function call in guardrail expression '{expression}'")
+            elif isinstance(node, ast.Name) and node.id not in GUARDRAIL_FUNCTIONS:
+                if node.id not in GUARDRAIL_CONTEXT_FIELDS and node.id not in GUARDRAIL_DECISION_FIELDS:
+                    raise ValueError(f"Unknown field '{node.id}' in guardrail expression '{expression}'")
+                names.add(node.id)
+        
+        return compile(tree, f"<guardrail: {expression}>", 'eval'), names
+    
+    def evaluate(
+        self,
+        decisions: List['AutonomousDecision'],
+        rows: np.ndarray,
+        batch: DecisionContextBatch
+    ) -> Tuple[List[List[Dict[str, Any]]], np.ndarray]:
+        """Check all guardrails against a batch of decisions; returns per-decision safety checks and a blocked mask"""
+        count = len(decisions)
+        if count == 0 or not self.guardrails:
+            return [[] for _ in decisions], np.zeros(count, dtype=bool)
+        
+        # Only materialize the columns the compiled expressions actually read
+        namespace = {}
+        for name in self.fields & GUARDRAIL_CONTEXT_FIELDS.keys():
+            namespace[name] = GUARDRAIL_CONTEXT_FIELDS[name](batch)[rows]
+        for name in self.fields & GUARDRAIL_DECISION_FIELDS.keys():
+            namespace[name] = np.array([GUARDRAIL_DECISION_FIELDS[name](d) for d in decisions], dtype=float)
+        if 'new_budget' in namespace:
+            daily_budget = batch.daily_budget[rows]
+            namespace['new_budget'] = np.where(np.isnan(namespace['new_budget']), daily_budget, namespace['new_budget'])
+        
+        values = np.empty((len(self.guardrails), count))
+        errors = {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for index, code in enumerate(self._expressions):
+                try:
+                    values[index] = np.broadcast_to(
+                        eval(code, {'__builtins__': {}, **GUARDRAIL_FUNCTIONS}, namespace), (count,)
+                    )
+                except Exception as e:
+                    logger.error(f"Error evaluating guardrail {self.guardrails[index].name}: {e}")
+                    values[index] = np.nan
+                    errors[index] = str(e)
+        
+        passed = np.empty(values.shape, dtype=bool)
+        for compare, indices in self._operator_groups.items():
+            passed[indices] = compare(values[indices], self._thresholds[indices])
+        
+        # Block execution if any blocking guardrail fails
+        blocked = (~passed & self._blocking[:, None]).any(axis=0)
+        
+        value_rows = values.tolist()
+        passed_rows = passed.tolist()
+        checks = [
+            [
+                self._error_result(guardrail, errors[g]) if g in errors
+                else self._check_result(guardrail, value_rows[g][i], passed_rows[g][i])
+                for g, guardrail in enumerate(self.guardrails)
+            ]
+            for i in range(count)
+        ]
+        return checks, blocked
+    
+    @staticmethod
+    def _check_result(guardrail: SafetyGuardrail, test_value: float, passed: bool) -> Dict[str, Any]:
+        """Format a guardrail evaluation for a decision's safety_checks"""
+        return {
+            'guardrail_name': guardrail.name,
+            'description': guardrail.description,
+            'test_value': test_value,
+            'threshold': guardrail.threshold_value,
+            'operator': guardrail.comparison_operator,
+            'passed': passed,
+            'failed': not passed,
+            'risk_level': guardrail.risk_level.value,
+            'blocks_execution': guardrail.block_execution,
+            'alert_required': guardrail.alert_required
+        }
+    
+    @staticmethod
+    def _error_result(guardrail: SafetyGuardrail, error: str) -> Dict[str, Any]:
+        """Format a guardrail whose expression could not be evaluated"""
+        return {
+            'guardrail_name': guardrail.name,
+            'error': error,
+            'passed': False,
+            'failed': True
+        }
+
 class AutonomousDecisionFramework:
     """
     Comprehensive Autonomous Decision Framework with safety guardrails
@@ -117,11 +561,13 @@ class AutonomousDecisionFramework:
     def __init__(self):
         self.safety_guardrails = []
         self.decision_history = []
+        self.decision_index: Dict[str, AutonomousDecision] = {}
         self.active_decisions = {}
-        self.learning_data = []
+        self.feedback_store = DecisionFeedbackStore()
         self.approval_workflows = {}
         self.emergency_protocols = {}
         self._initialize_default_guardrails()
+        self.guardrail_engine = GuardrailEngine(self.safety_guardrails)
         
     def _initialize_default_guardrails(self):
         """Initialize default safety guardrails"""
@@ -133,7 +579,8 @@ class AutonomousDecisionFramework:
                 comparison_operator="<",
                 risk_level=RiskLevel.HIGH,
                 block_execution=True,
-                alert_required=True
+                alert_required=True,
+                expression="new_budget / max(daily_budget, 1)"
             ),
             SafetyGuardrail(
                 name="minimum_roas_threshold",
@@ -142,7 +589,8 @@ class AutonomousDecisionFramework:
                 comparison_operator=">=",
                 risk_level=RiskLevel.CRITICAL,
                 block_execution=True,
-                alert_required=True
+                alert_required=True,
+                expression="roas"
             ),
             SafetyGuardrail(
                 name="maximum_spend_increase",
@@ -151,7 +599,8 @@ class AutonomousDecisionFramework:
                 comparison_operator="<",
                 risk_level=RiskLevel.MEDIUM,
                 block_execution=False,
-                alert_required=True
+                alert_required=True,
+                expression="spend * spend_multiplier / max(spend, 1)"
             ),
             SafetyGuardrail(
                 name="performance_decline_threshold",
@@ -160,7 +609,8 @@ class AutonomousDecisionFramework:
                 comparison_operator=">=",
                 risk_level=RiskLevel.HIGH,
                 block_execution=False,
-                alert_required=True
+                alert_required=True,
+                expression="ratio(roas, historical_roas)"
             ),
             SafetyGuardrail(
                 name="conversion_rate_floor",
@@ -169,10 +619,18 @@ class AutonomousDecisionFramework:
                 comparison_operator=">=",
                 risk_level=RiskLevel.HIGH,
                 block_execution=True,
-                alert_required=True
+                alert_required=True,
+                expression="conversions / max(clicks, 1)"
             )
         ]
     
+    def add_safety_guardrail(self, guardrail: SafetyGuardrail) -> None:
+        """Register a guardrail and recompile the guardrail engine"""
+        guardrails = [g for g in self.safety_guardrails if g.name != guardrail.name] + [guardrail]
+        # Compile before swapping so an invalid expression leaves the current guardrails in place
+        self.guardrail_engine = GuardrailEngine(guardrails)
+        self.safety_guardrails = guardrails
+    
     async def analyze_decision_opportunity(
         self, 
         context: DecisionContext,
@@ -198,9 +656,15 @@ class AutonomousDecisionFramework:
             emergency_decisions = await self._analyze_emergency_situations(context)
             decisions.extend(emergency_decisions)
             
+            self._calibrate_confidence(decisions)
+            
             # Apply safety checks to all decisions
+            self._perform_safety_checks(
+                decisions,
+                np.zeros(len(decisions), dtype=int),
+                DecisionContextBatch.from_contexts([context])
+            )
             for decision in decisions:
-                decision.safety_checks = await self._perform_safety_checks(decision, context)
                 decision.requires_human_approval = self._requires_human_approval(decision)
                 decision.auto_execute_allowed = self._auto_execution_allowed(decision)
             
@@ -213,6 +677,45 @@ class AutonomousDecisionFramework:
             logger.error(f"Error analyzing decision opportunities: {e}")
             return []
     
+    async def analyze_decision_opportunities_batch(
+        self,
+        batch: DecisionContextBatch,
+        optimization_goals: Dict[str, float]
+    ) -> Dict[str, List[AutonomousDecision]]:
+        """Analyze many campaigns in one vectorized pass and return decisions per campaign"""
+        try:
+            decisions = []
+            rows = []
+            
+            # Same analyzer order as analyze_decision_opportunity so tie-breaks match
+            for analyzer_decisions, analyzer_rows in (
+                self._analyze_budget_opportunities_batch(batch, optimization_goals),
+                self._analyze_performance_opportunities_batch(batch),
+                self._analyze_platform_opportunities_batch(batch),
+                self._analyze_emergency_situations_batch(batch)
+            ):
+                decisions.extend(analyzer_decisions)
+                rows.extend(analyzer_rows)
+            
+            self._calibrate_confidence(decisions)
+            self._perform_safety_checks(decisions, np.asarray(rows, dtype=int), batch)
+            
+            decisions_by_campaign = {campaign_id: [] for campaign_id in batch.campaign_ids}
+            for decision in decisions:
+                decision.requires_human_approval = self._requires_human_approval(decision)
+                decision.auto_execute_allowed = self._auto_execution_allowed(decision)
+                decisions_by_campaign[decision.campaign_id].append(decision)
+            
+            # Sort by impact and confidence
+            for campaign_decisions in decisions_by_campaign.values():
+                campaign_decisions.sort(key=lambda d: (d.confidence_score * d.expected_impact.get('revenue_impact', 0)), reverse=True)
+            
+            return decisions_by_campaign
+            
+        except Exception as e:
+            logger.error(f"Error analyzing batch decision opportunities: {e}")
+            return {}
+    
     async def _analyze_budget_opportunities(
         self, 
         context: DecisionContext, 
@@ -235,66 +738,16 @@ class AutonomousDecisionFramework:
                 proposed_increase = min(current_budget * 0.3, budget_constraints.get('max_daily_budget', current_budget * 2))
                 
                 if proposed_increase > current_budget:
-                    decision = AutonomousDecision(
-                        decision_id=str(uuid.uuid4()),
-                        decision_type=DecisionType.BUDGET_ADJUSTMENT,
-                        campaign_id=context.campaign_id,
-                        platform=context.platform,
-                        proposed_action={
-                            'action': 'increase_budget',
-                            'current_budget': current_budget,
-                            'new_budget': current_budget + proposed_increase,
-                            'increase_percentage': (proposed_increase / current_budget) * 100
-                        },
-                        reasoning=f"High ROAS ({current_roas:.2f}x) indicates opportunity to scale. Proposing {(proposed_increase/current_budget)*100:.1f}% budget increase.",
-                        confidence_score=0.8,
-                        risk_level=RiskLevel.MEDIUM,
-                        expected_impact={
-                            'revenue_impact': proposed_increase * current_roas,
-                            'spend_increase': proposed_increase,
-                            'roi_improvement': 15.0
-                        },
-                        safety_checks=[],
-                        approval_status=ApprovalStatus.PENDING,
-                        requires_human_approval=False,
-                        auto_execute_allowed=True,
-                        created_at=datetime.now(),
-                        expires_at=datetime.now() + timedelta(hours=2)
-                    )
-                    decisions.append(decision)
+                    decisions.append(self._build_budget_increase_decision(
+                        context.campaign_id, context.platform, current_budget, proposed_increase, current_roas
+                    ))
             
             # Budget decrease opportunity
             elif current_roas < target_roas * 0.7:  # 30% below target
                 current_budget = budget_constraints.get('daily_budget', 0)
-                proposed_decrease = current_budget * 0.2  # 20% decrease
-                
-                decision = AutonomousDecision(
-                    decision_id=str(uuid.uuid4()),
-                    decision_type=DecisionType.BUDGET_ADJUSTMENT,
-                    campaign_id=context.campaign_id,
-                    platform=context.platform,
-                    proposed_action={
-                        'action': 'decrease_budget',
-                        'current_budget': current_budget,
-                        'new_budget': current_budget - proposed_decrease,
-                        'decrease_percentage': 20.0
-                    },
-                    reasoning=f"Low ROAS ({current_roas:.2f}x) indicates inefficient spending. Proposing 20% budget reduction to improve efficiency.",
-                    confidence_score=0.7,
-                    risk_level=RiskLevel.LOW,
-                    expected_impact={
-                        'cost_reduction': proposed_decrease,
-                        'efficiency_gain': 25.0,
-                        'roas_improvement': 0.5
-                    },
-                    safety_checks=[],
-                    approval_status=ApprovalStatus.PENDING,
-                    requires_human_approval=False,
-                    auto_execute_allowed=True,
-                    created_at=datetime.now(),
-                    expires_at=datetime.now() + timedelta(hours=1)
-                )
-                decisions.append(decision)
+                decisions.append(self._build_budget_decrease_decision(
+                    context.campaign_id, context.platform, current_budget, current_roas
+                ))
             
             return decisions
             
@@ -302,6 +755,109 @@ class AutonomousDecisionFramework:
             logger.error(f"Error analyzing budget opportunities: {e}")
             return []
     
+    def _analyze_budget_opportunities_batch(
+        self,
+        batch: DecisionContextBatch,
+        goals: Dict[str, float]
+    ) -> Tuple[List[AutonomousDecision], List[int]]:
+        """Vectorized budget opportunity analysis across a batch"""
+        current_roas = batch.revenue / np.maximum(batch.spend, 1)
+        target_roas = goals.get('target_roas', 3.0)
+        proposed_increase = np.minimum(batch.daily_budget * 0.3, batch.max_daily_budget)
+        
+        above_target = current_roas > target_roas * 1.2
+        increase_rows = np.flatnonzero(above_target & (proposed_increase > batch.daily_budget))
+        decrease_rows = np.flatnonzero(~above_target & (current_roas < target_roas * 0.7))
+        
+        decisions = []
+        rows = []
+        for i in increase_rows:
+            decisions.append(self._build_budget_increase_decision(
+                batch.campaign_ids[i], batch.platforms[i],
+                float(batch.daily_budget[i]), float(proposed_increase[i]), float(current_roas[i])
+            ))
+            rows.append(i)
+        for i in decrease_rows:
+            decisions.append(self._build_budget_decrease_decision(
+                batch.campaign_ids[i], batch.platforms[i], float(batch.daily_budget[i]), float(current_roas[i])
+            ))
+            rows.append(i)
+        return decisions, rows
+    
+    def _build_budget_increase_decision(
+        self,
+        campaign_id: str,
+        platform: str,
+        current_budget: float,
+        proposed_increase: float,
+        current_roas: float
+    ) -> AutonomousDecision:
+        """Build a budget increase decision"""
+        now = datetime.now()
+        return AutonomousDecision(
+            decision_id=str(uuid.uuid4()),
+            decision_type=DecisionType.BUDGET_ADJUSTMENT,
+            campaign_id=campaign_id,
+            platform=platform,
+            proposed_action={
+                'action': 'increase_budget',
+                'current_budget': current_budget,
+                'new_budget': current_budget + proposed_increase,
+                'increase_percentage': (proposed_increase / current_budget) * 100
+            },
+            reasoning=f"High ROAS ({current_roas:.2f}x) indicates opportunity to scale. Proposing {(proposed_increase/current_budget)*100:.1f}% budget increase.",
+            confidence_score=0.8,
+            risk_level=RiskLevel.MEDIUM,
+            expected_impact={
+                'revenue_impact': proposed_increase * current_roas,
+                'spend_increase': proposed_increase,
+                'roi_improvement': 15.0
+            },
+            safety_checks=[],
+            approval_status=ApprovalStatus.PENDING,
+            requires_human_approval=False,
+            auto_execute_allowed=True,
+            created_at=now,
+            expires_at=now + timedelta(hours=2)
+        )
+    
+    def _build_budget_decrease_decision(
+        self,
+        campaign_id: str,
+        platform: str,
+        current_budget: float,
+        current_roas: float
+    ) -> AutonomousDecision:
+        """Build a 20% budget decrease decision"""
+        proposed_decrease = current_budget * 0.2  # 20% decrease
+        now = datetime.now()
+        return AutonomousDecision(
+            decision_id=str(uuid.uuid4()),
+            decision_type=DecisionType.BUDGET_ADJUSTMENT,
+            campaign_id=campaign_id,
+            platform=platform,
+            proposed_action={
+                'action': 'decrease_budget',
+                'current_budget': current_budget,
+                'new_budget': current_budget - proposed_decrease,
+                'decrease_percentage': 20.0
+            },
+            reasoning=f"Low ROAS ({current_roas:.2f}x) indicates inefficient spending. Proposing 20% budget reduction to improve efficiency.",
+            confidence_score=0.7,
+            risk_level=RiskLevel.LOW,
+            expected_impact={
+                'cost_reduction': proposed_decrease,
+                'efficiency_gain': 25.0,
+                'roas_improvement': 0.5
+            },
+            safety_checks=[],
+            approval_status=ApprovalStatus.PENDING,
+            requires_human_approval=False,
+            auto_execute_allowed=True,
+            created_at=now,
+            expires_at=now + timedelta(hours=1)
+        )
+    
     async def _analyze_performance_opportunities(
         self, 
         context: DecisionContext, 
@@ -318,65 +874,16 @@ class AutonomousDecisionFramework:
             conversion_rate = current_perf.get('conversions', 0) / max(current_perf.get('clicks', 1), 1)
             
             if conversion_rate > 0.1:  # High conversion rate
-                decision = AutonomousDecision(
-                    decision_id=str(uuid.uuid4()),
-                    decision_type=DecisionType.BID_OPTIMIZATION,
-                    campaign_id=context.campaign_id,
-                    platform=context.platform,
-                    proposed_action={
-                        'action': 'increase_bids',
-                        'current_cpc': cpc,
-                        'bid_adjustment': 15.0,  # 15% increase
-                        'target_positions': [1, 2, 3]
-                    },
-                    reasoning=f"High conversion rate ({conversion_rate:.1%}) suggests opportunity for more aggressive bidding to capture additional traffic.",
-                    confidence_score=0.75,
-                    risk_level=RiskLevel.MEDIUM,
-                    expected_impact={
-                        'traffic_increase': 25.0,
-                        'conversion_increase': 20.0,
-                        'revenue_impact': current_perf.get('revenue', 0) * 0.2
-                    },
-                    safety_checks=[],
-                    approval_status=ApprovalStatus.PENDING,
-                    requires_human_approval=False,
-                    auto_execute_allowed=True,
-                    created_at=datetime.now(),
-                    expires_at=datetime.now() + timedelta(hours=6)
-                )
-                decisions.append(decision)
+                decisions.append(self._build_bid_increase_decision(
+                    context.campaign_id, context.platform, cpc, conversion_rate, current_perf.get('revenue', 0)
+                ))
             
             # Campaign pause recommendation
             elif conversion_rate < 0.01 and current_perf.get('spend', 0) > 100:  # Very low conversion rate with significant spend
-                decision = AutonomousDecision(
-                    decision_id=str(uuid.uuid4()),
-                    decision_type=DecisionType.CAMPAIGN_PAUSE,
-                    campaign_id=context.campaign_id,
-                    platform=context.platform,
-                    proposed_action={
-                        'action': 'pause_campaign',
-                        'reason': 'poor_performance',
-                        'review_required': True,
-                        'auto_resume_conditions': {
-                            'min_conversion_rate': 0.02,
-                            'max_cpa': current_perf.get('spend', 0) / max(current_perf.get('conversions', 1), 1) * 0.8
-                        }
-                    },
-                    reasoning=f"Very low conversion rate ({conversion_rate:.1%}) with high spend indicates poor performance. Pausing to prevent further losses.",
-                    confidence_score=0.9,
-                    risk_level=RiskLevel.HIGH,
-                    expected_impact={
-                        'cost_savings': current_perf.get('spend', 0),
-                        'loss_prevention': current_perf.get('spend', 0) * 0.8
-                    },
-                    safety_checks=[],
-                    approval_status=ApprovalStatus.PENDING,
-                    requires_human_approval=True,
-                    auto_execute_allowed=False,
-                    created_at=datetime.now(),
-                    expires_at=datetime.now() + timedelta(minutes=30)
-                )
-                decisions.append(decision)
+                decisions.append(self._build_campaign_pause_decision(
+                    context.campaign_id, context.platform, conversion_rate,
+                    current_perf.get('spend', 0), current_perf.get('conversions', 1)
+                ))
             
             return decisions
             
@@ -384,6 +891,111 @@ class AutonomousDecisionFramework:
             logger.error(f"Error analyzing performance opportunities: {e}")
             return []
     
+    def _analyze_performance_opportunities_batch(
+        self,
+        batch: DecisionContextBatch
+    ) -> Tuple[List[AutonomousDecision], List[int]]:
+        """Vectorized bid and pause opportunity analysis across a batch"""
+        clicks = np.maximum(batch.clicks, 1)
+        cpc = batch.spend / clicks
+        conversion_rate = batch.conversions / clicks
+        
+        high_conversion = conversion_rate > 0.1
+        bid_rows = np.flatnonzero(high_conversion)
+        pause_rows = np.flatnonzero(~high_conversion & (conversion_rate < 0.01) & (batch.spend > 100))
+        
+        decisions = []
+        rows = []
+        for i in bid_rows:
+            decisions.append(self._build_bid_increase_decision(
+                batch.campaign_ids[i], batch.platforms[i],
+                float(cpc[i]), float(conversion_rate[i]), float(batch.revenue[i])
+            ))
+            rows.append(i)
+        for i in pause_rows:
+            decisions.append(self._build_campaign_pause_decision(
+                batch.campaign_ids[i], batch.platforms[i],
+                float(conversion_rate[i]), float(batch.spend[i]), float(batch.conversions[i])
+            ))
+            rows.append(i)
+        return decisions, rows
+    
+    def _build_bid_increase_decision(
+        self,
+        campaign_id: str,
+        platform: str,
+        cpc: float,
+        conversion_rate: float,
+        revenue: float
+    ) -> AutonomousDecision:
+        """Build a bid increase decision for high-converting campaigns"""
+        now = datetime.now()
+        return AutonomousDecision(
+            decision_id=str(uuid.uuid4()),
+            decision_type=DecisionType.BID_OPTIMIZATION,
+            campaign_id=campaign_id,
+            platform=platform,
+            proposed_action={
+                'action': 'increase_bids',
+                'current_cpc': cpc,
+                'bid_adjustment': 15.0,  # 15% increase
+                'target_positions': [1, 2, 3]
+            },
+            reasoning=f"High conversion rate ({conversion_rate:.1%}) suggests opportunity for more aggressive bidding to capture additional traffic.",
+            confidence_score=0.75,
+            risk_level=RiskLevel.MEDIUM,
+            expected_impact={
+                'traffic_increase': 25.0,
+                'conversion_increase': 20.0,
+                'revenue_impact': revenue * 0.2
+            },
+            safety_checks=[],
+            approval_status=ApprovalStatus.PENDING,
+            requires_human_approval=False,
+            auto_execute_allowed=True,
+            created_at=now,
+            expires_at=now + timedelta(hours=6)
+        )
+    
+    def _build_campaign_pause_decision(
+        self,
+        campaign_id: str,
+        platform: str,
+        conversion_rate: float,
+        spend: float,
+        conversions: float
+    ) -> AutonomousDecision:
+        """Build a pause decision for campaigns spending without converting"""
+        now = datetime.now()
+        return AutonomousDecision(
+            decision_id=str(uuid.uuid4()),
+            decision_type=DecisionType.CAMPAIGN_PAUSE,
+            campaign_id=campaign_id,
+            platform=platform,
+            proposed_action={
+                'action': 'pause_campaign',
+                'reason': 'poor_performance',
+                'review_required': True,
+                'auto_resume_conditions': {
+                    'min_conversion_rate': 0.02,
+                    'max_cpa': spend / max(conversions, 1) * 0.8
+                }
+            },
+            reasoning=f"Very low conversion rate ({conversion_rate:.1%}) with high spend indicates poor performance. Pausing to prevent further losses.",
+            confidence_score=0.9,
+            risk_level=RiskLevel.HIGH,
+            expected_impact={
+                'cost_savings': spend,
+                'loss_prevention': spend * 0.8
+            },
+            safety_checks=[],
+            approval_status=ApprovalStatus.PENDING,
+            requires_human_approval=True,
+            auto_execute_allowed=False,
+            created_at=now,
+            expires_at=now + timedelta(minutes=30)
+        )
+    
     async def _analyze_platform_opportunities(
         self, 
         context: DecisionContext, 
@@ -399,32 +1011,7 @@ class AutonomousDecisionFramework:
             current_roas = context.current_performance.get('revenue', 0) / max(context.current_performance.get('spend', 1), 1)
             
             if current_roas < 2.0:  # Below average performance
-                decision = AutonomousDecision(
-                    decision_id=str(uuid.uuid4()),
-                    decision_type=DecisionType.PLATFORM_REALLOCATION,
-                    campaign_id=context.campaign_id,
-                    platform=context.platform,
-                    proposed_action={
-                        'action': 'reallocate_budget',
-                        'from_platform': context.platform,
-                        'to_platform': 'auto_detect_best_performer',
-                        'reallocation_percentage': 25.0
-                    },
-                    reasoning=f"Platform performance below target. Consider reallocating 25% budget to better-performing platforms.",
-                    confidence_score=0.6,
-                    risk_level=RiskLevel.MEDIUM,
-                    expected_impact={
-                        'efficiency_gain': 20.0,
-                        'cross_platform_optimization': True
-                    },
-                    safety_checks=[],
-                    approval_status=ApprovalStatus.PENDING,
-                    requires_human_approval=True,
-                    auto_execute_allowed=False,
-                    created_at=datetime.now(),
-                    expires_at=datetime.now() + timedelta(hours=4)
-                )
-                decisions.append(decision)
+                decisions.append(self._build_platform_reallocation_decision(context.campaign_id, context.platform))
             
             return decisions
             
@@ -432,6 +1019,48 @@ class AutonomousDecisionFramework:
             logger.error(f"Error analyzing platform opportunities: {e}")
             return []
     
+    def _analyze_platform_opportunities_batch(
+        self,
+        batch: DecisionContextBatch
+    ) -> Tuple[List[AutonomousDecision], List[int]]:
+        """Vectorized cross-platform reallocation analysis across a batch"""
+        current_roas = batch.revenue / np.maximum(batch.spend, 1)
+        rows = np.flatnonzero(current_roas < 2.0).tolist()
+        decisions = [
+            self._build_platform_reallocation_decision(batch.campaign_ids[i], batch.platforms[i])
+            for i in rows
+        ]
+        return decisions, rows
+    
+    def _build_platform_reallocation_decision(self, campaign_id: str, platform: str) -> AutonomousDecision:
+        """Build a cross-platform budget reallocation decision"""
+        now = datetime.now()
+        return AutonomousDecision(
+            decision_id=str(uuid.uuid4()),
+            decision_type=DecisionType.PLATFORM_REALLOCATION,
+            campaign_id=campaign_id,
+            platform=platform,
+            proposed_action={
+                'action': 'reallocate_budget',
+                'from_platform': platform,
+                'to_platform': 'auto_detect_best_performer',
+                'reallocation_percentage': 25.0
+            },
+            reasoning=f"Platform performance below target. Consider reallocating 25% budget to better-performing platforms.",
+            confidence_score=0.6,
+            risk_level=RiskLevel.MEDIUM,
+            expected_impact={
+                'efficiency_gain': 20.0,
+                'cross_platform_optimization': True
+            },
+            safety_checks=[],
+            approval_status=ApprovalStatus.PENDING,
+            requires_human_approval=True,
+            auto_execute_allowed=False,
+            created_at=now,
+            expires_at=now + timedelta(hours=4)
+        )
+    
     async def _analyze_emergency_situations(self, context: DecisionContext) -> List[AutonomousDecision]:
         """Analyze emergency situations requiring immediate intervention"""
         decisions = []
@@ -446,32 +1075,9 @@ class AutonomousDecisionFramework:
             
             # Emergency stop if ROAS is critically low and spend is high
             if daily_roas < 0.5 and daily_spend > 500:
-                decision = AutonomousDecision(
-                    decision_id=str(uuid.uuid4()),
-                    decision_type=DecisionType.EMERGENCY_STOP,
-                    campaign_id=context.campaign_id,
-                    platform=context.platform,
-                    proposed_action={
-                        'action': 'emergency_stop',
-                        'stop_all_campaigns': True,
-                        'immediate_execution': True,
-                        'alert_stakeholders': True
-                    },
-                    reasoning=f"CRITICAL: ROAS at {daily_roas:.2f}x with ${daily_spend:.2f} daily spend. Immediate intervention required to prevent significant losses.",
-                    confidence_score=0.95,
-                    risk_level=RiskLevel.CRITICAL,
-                    expected_impact={
-                        'loss_prevention': daily_spend * 5,  # Prevent 5 days of losses
-                        'immediate_action': True
-                    },
-                    safety_checks=[],
-                    approval_status=ApprovalStatus.AUTO_APPROVED,
-                    requires_human_approval=False,
-                    auto_execute_allowed=True,
-                    created_at=datetime.now(),
-                    expires_at=datetime.now() + timedelta(minutes=5)
-                )
-                decisions.append(decision)
+                decisions.append(self._build_emergency_stop_decision(
+                    context.campaign_id, context.platform, daily_roas, daily_spend
+                ))
             
             return decisions
             
@@ -479,89 +1085,83 @@ class AutonomousDecisionFramework:
             logger.error(f"Error analyzing emergency situations: {e}")
             return []
     
-    async def _perform_safety_checks(
-        self, 
-        decision: AutonomousDecision, 
-        context: DecisionContext
-    ) -> List[Dict[str, Any]]:
-        """Perform safety checks against guardrails"""
-        safety_results = []
-        
+    def _analyze_emergency_situations_batch(
+        self,
+        batch: DecisionContextBatch
+    ) -> Tuple[List[AutonomousDecision], List[int]]:
+        """Vectorized emergency stop analysis across a batch"""
+        daily_roas = batch.revenue / np.maximum(batch.spend, 1)
+        rows = np.flatnonzero((daily_roas < 0.5) & (batch.spend > 500)).tolist()
+        decisions = [
+            self._build_emergency_stop_decision(
+                batch.campaign_ids[i], batch.platforms[i], float(daily_roas[i]), float(batch.spend[i])
+            )
+            for i in rows
+        ]
+        return decisions, rows
+    
+    def _build_emergency_stop_decision(
+        self,
+        campaign_id: str,
+        platform: str,
+        daily_roas: float,
+        daily_spend: float
+    ) -> AutonomousDecision:
+        """Build an emergency stop decision"""
+        now = datetime.now()
+        return AutonomousDecision(
+            decision_id=str(uuid.uuid4()),
+            decision_type=DecisionType.EMERGENCY_STOP,
+            campaign_id=campaign_id,
+            platform=platform,
+            proposed_action={
+                'action': 'emergency_stop',
+                'stop_all_campaigns': True,
+                'immediate_execution': True,
+                'alert_stakeholders': True
+            },
+            reasoning=f"CRITICAL: ROAS at {daily_roas:.2f}x with ${daily_spend:.2f} daily spend. Immediate intervention required to prevent significant losses.",
+            confidence_score=0.95,
+            risk_level=RiskLevel.CRITICAL,
+            expected_impact={
+                'loss_prevention': daily_spend * 5,  # Prevent 5 days of losses
+                'immediate_action': True
+            },
+            safety_checks=[],
+            approval_status=ApprovalStatus.AUTO_APPROVED,
+            requires_human_approval=False,
+            auto_execute_allowed=True,
+            created_at=now,
+            expires_at=now + timedelta(minutes=5)
+        )
+    
+    def _calibrate_confidence(self, decisions: List[AutonomousDecision]) -> None:
+        """Adjust confidence scores using what has been learned from past outcomes"""
+        calibrator = self.feedback_store.calibrator
+        for decision in decisions:
+            decision.confidence_score = calibrator.calibrate(decision.decision_type.value, decision.confidence_score)
+    
+    def _perform_safety_checks(
+        self,
+        decisions: List[AutonomousDecision],
+        rows: np.ndarray,
+        batch: DecisionContextBatch
+    ) -> None:
+        """Perform safety checks against guardrails for decisions drawn from batch rows"""
         try:
-            for guardrail in self.safety_guardrails:
-                check_result = await self._evaluate_guardrail(guardrail, decision, context)
-                safety_results.append(check_result)
+            checks, blocked = self.guardrail_engine.evaluate(decisions, rows, batch)
+            
+            for decision, safety_checks, is_blocked in zip(decisions, checks, blocked.tolist()):
+                decision.safety_checks = safety_checks
                 
                 # Block execution if any critical guardrail fails
-                if check_result['failed'] and guardrail.block_execution:
+                if is_blocked:
                     decision.auto_execute_allowed = False
                     decision.requires_human_approval = True
                     decision.risk_level = RiskLevel.CRITICAL
             
-            return safety_results
-            
         except Exception as e:
             logger.error(f"Error performing safety checks: {e}")
-            return []
-    
-    async def _evaluate_guardrail(
-        self, 
-        guardrail: SafetyGuardrail, 
-        decision: AutonomousDecision, 
-        context: DecisionContext
-    ) -> Dict[str, Any]:
-        """Evaluate a specific guardrail against a decision"""
-        try:
-            # Extract relevant value based on guardrail name
-            if guardrail.name == "daily_budget_limit":
-                current_budget = context.budget_constraints.get('daily_budget', 0)
-                proposed_budget = decision.proposed_action.get('new_budget', current_budget)
-                test_value = proposed_budget / max(current_budget, 1)
-            
-            elif guardrail.name == "minimum_roas_threshold":
-                test_value = context.current_performance.get('revenue', 0) / max(context.current_performance.get('spend', 1), 1)
-            
-            elif guardrail.name == "maximum_spend_increase":
-                current_spend = context.current_performance.get('spend', 0)
-                projected_spend = current_spend * decision.expected_impact.get('spend_multiplier', 1.0)
-                test_value = projected_spend / max(current_spend, 1)
-            
-            else:
-                test_value = 1.0  # Default safe value
-            
-            # Evaluate condition
-            if guardrail.comparison_operator == ">":
-                passed = test_value > guardrail.threshold_value
-            elif guardrail.comparison_operator == "<":
-                passed = test_value < guardrail.threshold_value
-            elif guardrail.comparison_operator == ">=":
-                passed = test_value >= guardrail.threshold_value
-            elif guardrail.comparison_operator == "<=":
-                passed = test_value <= guardrail.threshold_value
-            else:
-                passed = test_value == guardrail.threshold_value
-            
-            return {
-                'guardrail_name': guardrail.name,
-                'description': guardrail.description,
-                'test_value': test_value,
-                'threshold': guardrail.threshold_value,
-                'operator': guardrail.comparison_operator,
-                'passed': passed,
-                'failed': not passed,
-                'risk_level': guardrail.risk_level.value,
-                'blocks_execution': guardrail.block_execution,
-                'alert_required': guardrail.alert_required
-            }
-            
-        except Exception as e:
-            logger.error(f"Error evaluating guardrail {guardrail.name}: {e}")
-            return {
-                'guardrail_name': guardrail.name,
-                'error': str(e),
-                'passed': False,
-                'failed': True
-            }
     
     def _requires_human_approval(self, decision: AutonomousDecision) -> bool:
         """Determine if decision requires human approval"""
@@ -647,6 +1247,7 @@ class AutonomousDecisionFramework:
             
             # Store in decision history
             self.decision_history.append(decision)
+            self.decision_index[decision.decision_id] = decision
             
             logger.info(f"Decision {decision.decision_id} executed successfully")
             return execution_result
@@ -731,7 +1332,7 @@ class AutonomousDecisionFramework:
         """Learn from decision outcomes to improve future decisions"""
         try:
             # Find the decision in history
-            decision = next((d for d in self.decision_history if d.decision_id == decision_id), None)
+            decision = self.decision_index.get(decision_id)
             
             if not decision:
                 raise ValueError(f"Decision {decision_id} not found in history")
@@ -781,7 +1382,8 @@ class AutonomousDecisionFramework:
                 }
             )
             
-            self.learning_data.append(learning_feedback)
+            # Persist and fold into the per-type confidence calibration
+            await self.feedback_store.record(learning_feedback, decision)
             
             logger.info(f"Learning feedback recorded for decision {decision_id}: {quality} quality, {overall_accuracy:.2f} accuracy")
             return learning_feedback
@@ -795,8 +1397,13 @@ __all__ = [
     'AutonomousDecisionFramework', 
     'AutonomousDecision', 
     'DecisionContext', 
+    'DecisionContextBatch',
+    'SafetyGuardrail',
+    'GuardrailEngine',
     'ExecutionResult', 
     'LearningFeedback',
+    'DecisionFeedbackStore',
+    'OnlineConfidenceCalibrator',
     'DecisionType',
     'RiskLevel',
     'ApprovalStatus'
@@ -0,0 +1,91 @@
+"""
+Batch Insert Helpers for PulseBridge.ai
+Failure classification and poison-row isolation for batched Supabase writes
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Tuple
+
+import httpx
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Postgres SQLSTATE classes worth retrying: connection exceptions, transaction
+# rollbacks (serialization failures, deadlocks), insufficient resources, operator intervention
+TRANSIENT_SQLSTATE_CLASSES = frozenset({'08', '40', '53', '57'})
+
+def is_transient_db_error(error: BaseException) -> bool:
+    """
+    Whether a failed write may succeed if sent again unchanged: connection errors,
+    HTTP 5xx and 429 responses, and transient Postgres errors. Anything else
+    (constraint violations, bad columns, other 4xx responses) is rejected for good.
+    """
+    if isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status_code is None:
+        status_code = getattr(error, 'status_code', None)
+    if isinstance(status_code, int):
+        return status_code == 429 or status_code >= 500
+    code = getattr(error, 'code', None)
+    if isinstance(code, str) and len(code) == 5:
+        return code[:2] in TRANSIENT_SQLSTATE_CLASSES
+    return False
+
+@dataclass
+class InsertOutcome:
+    """What happened to each row of a batch passed to insert_isolating_rejects"""
+    written: int = 0
+    rejected: List[Tuple[Dict[str, Any], BaseException]] = field(default_factory=list)
+    # Rows not yet written when a transient error stopped the insert, in original order
+    unwritten: List[Dict[str, Any]] = field(default_factory=list)
+    transient_error: Optional[BaseException] = None
+
+async def insert_isolating_rejects(
+    insert: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+    rows: List[Dict[str, Any]]
+) -> InsertOutcome:
+    """
+    Insert rows in one call; when the database rejects the batch for good, bisect
+    it until the rows it refuses are isolated, so one bad row costs O(log n) extra
+    round trips instead of blocking the rest. A transient error stops early and
+    reports the rows still unwritten.
+    """
+    outcome = InsertOutcome()
+    segments = [rows]
+    while segments:
+        segment = segments.pop()
+        try:
+            await insert(segment)
+            outcome.written += len(segment)
+        except Exception as e:
+            if is_transient_db_error(e):
+                outcome.transient_error = e
+                outcome.unwritten = segment + [row for pending in reversed(segments) for row in pending]
+                return outcome
+            if len(segment) == 1:
+                outcome.rejected.append((segment[0], e))
+            else:
+                middle = len(segment) // 2
+                segments.append(segment[middle:])
+                segments.append(segment[:middle])
+    return outcome
+
+def write_dead_letters(path: str, rejected: List[Tuple[Dict[str, Any], BaseException]]):
+    """Append rows the database rejected for good, with the error, to a JSONL file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as dead_letters:
+        for row, error in rejected:
+            dead_letters.write(json.dumps({'record': row, 'error': str(error)}, default=str) + '\n')
+
+__all__ = [
+    'InsertOutcome',
+    'insert_isolating_rejects',
+    'is_transient_db_error',
+    'write_dead_letters'
+]
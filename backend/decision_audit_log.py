@@ -0,0 +1,218 @@
+"""
+Decision Audit Log for PulseBridge.ai
+Non-blocking, batched audit trail writer for master AI decisions
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+from collections import deque
+from typing import Dict, List, Optional, Any, Deque, Tuple
+
+from batch_insert import insert_isolating_rejects, write_dead_letters
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPILL_PATH = os.getenv(
+    'DECISION_AUDIT_SPILL_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'decision_audit_spill.jsonl')
+)
+
+DEFAULT_DEAD_LETTER_PATH = os.getenv(
+    'DECISION_AUDIT_DEAD_LETTER_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'decision_audit_dead_letter.jsonl')
+)
+
+class DecisionAuditLog:
+    """
+    Queues decision audit records in memory and writes them to ai_insights in
+    multi-row inserts, flushing when a batch fills or the interval elapses.
+    Transient failures (connection errors, 5xx, 429) are retried with
+    exponential backoff; rows that still cannot be written are appended to a
+    local JSONL spill file and replayed once the database accepts writes again.
+    A batch the database rejects for good is bisected to isolate the rejected
+    rows, which go to a separate dead-letter file instead of the spill file.
+    """
+
+    TABLE_NAME = 'ai_insights'
+
+    def __init__(self, supabase_client=None, batch_size: int = 250, flush_interval_seconds: float = 2.0,
+                 max_retries: int = 3, retry_base_seconds: float = 0.5, max_pending: int = 20000,
+                 spill_path: str = DEFAULT_SPILL_PATH, dead_letter_path: str = DEFAULT_DEAD_LETTER_PATH):
+        self.supabase = supabase_client
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.max_pending = max_pending
+        self.spill_path = spill_path
+        self.dead_letter_path = dead_letter_path
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.total_submitted = 0
+        self.total_written = 0
+        self.total_spilled = 0
+        self.total_replayed = 0
+        self.total_dead_lettered = 0
+        self.round_trips = 0
+
+    def attach(self, supabase_client):
+        self.supabase = supabase_client
+
+    def submit(self, record: Dict[str, Any]):
+        """Queue a record; never waits on I/O"""
+        self._pending.append(record)
+        self.total_submitted += 1
+        self._ensure_started()
+        if len(self._pending) >= self.batch_size:
+            self._batch_ready.set()
+
+    def _ensure_started(self):
+        if self._flush_task is None or self._flush_task.done():
+            # Created lazily so the writer can be constructed outside an event loop
+            self._batch_ready = self._batch_ready or asyncio.Event()
+            self._flush_lock = self._flush_lock or asyncio.Lock()
+            self._closing = False
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"❌ Decision audit flush failed: {str(e)}")
+
+    async def close(self):
+        """Stop the background flusher and write out everything still queued"""
+        if self._flush_task is not None:
+            # Let an in-flight insert finish: cancelling cannot stop the worker
+            # thread, and flushing its batch again would insert duplicates
+            self._closing = True
+            self._batch_ready.set()
+            try:
+                await self._flush_task
+            except Exception as e:
+                logger.error(f"❌ Decision audit flusher stopped with an error: {str(e)}")
+            self._flush_task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Write queued records in batches; returns the number written to the database"""
+        if not self._pending or self._flush_lock is None:
+            return 0
+        written = 0
+        async with self._flush_lock:
+            if self.supabase is None:
+                # Nothing to write to: keep the newest records only
+                while len(self._pending) > self.max_pending:
+                    self._pending.popleft()
+                return 0
+
+            if len(self._pending) > self.max_pending:
+                overflow = [self._pending.popleft() for _ in range(len(self._pending) - self.max_pending)]
+                await asyncio.to_thread(self._spill, overflow)
+
+            while self._pending:
+                # Records leave the queue only once written, so a cancelled flush loses nothing
+                count = min(self.batch_size, len(self._pending))
+                batch = list(itertools.islice(self._pending, count))
+                batch_written, unwritten = await self._insert_with_retry(batch)
+                for _ in range(count):
+                    self._pending.popleft()
+                written += batch_written
+                self.total_written += batch_written
+                if unwritten:
+                    # Database unreachable: park the whole queue on disk
+                    remaining = unwritten + list(self._pending)
+                    self._pending.clear()
+                    await asyncio.to_thread(self._spill, remaining)
+                    break
+                if os.path.exists(self.spill_path):
+                    await self._replay_spill()
+        return written
+
+    async def _insert(self, rows: List[Dict[str, Any]]):
+        self.round_trips += 1
+        await asyncio.to_thread(lambda: self.supabase.table(self.TABLE_NAME).insert(rows).execute())
+
+    async def _insert_with_retry(self, batch: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Write a batch, retrying transient failures with backoff and dead-lettering
+        rows the database rejects for good. Returns (rows written, rows still unwritten).
+        """
+        written = 0
+        rows = batch
+        for attempt in range(self.max_retries + 1):
+            outcome = await insert_isolating_rejects(self._insert, rows)
+            written += outcome.written
+            if outcome.rejected:
+                self.total_dead_lettered += len(outcome.rejected)
+                logger.error(f"❌ Dead-lettering {len(outcome.rejected)} decision audit records: {outcome.rejected[0][1]}")
+                await asyncio.to_thread(write_dead_letters, self.dead_letter_path, outcome.rejected)
+            if outcome.transient_error is None:
+                return written, []
+            rows = outcome.unwritten
+            if attempt == self.max_retries:
+                logger.error(f"❌ Failed to write {len(rows)} decision audit records: {str(outcome.transient_error)}")
+                break
+            await asyncio.sleep(self.retry_base_seconds * (2 ** attempt))
+        return written, rows
+
+    def _spill(self, records: List[Dict[str, Any]]):
+        os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+        with open(self.spill_path, 'a', encoding='utf-8') as spill:
+            for record in records:
+                spill.write(json.dumps(record, default=str) + '\n')
+        self.total_spilled += len(records)
+        logger.warning(f"⚠️ Spilled {len(records)} decision audit records to {self.spill_path}")
+
+    async def _replay_spill(self):
+        """Move spilled records back into the queue for the next flush"""
+        replaying = f"{self.spill_path}.replay"
+        try:
+            os.replace(self.spill_path, replaying)
+        except FileNotFoundError:
+            return
+
+        def read() -> List[Dict[str, Any]]:
+            with open(replaying, encoding='utf-8') as spill:
+                return [json.loads(line) for line in spill if line.strip()]
+
+        records = await asyncio.to_thread(read)
+        self._pending.extend(records)
+        os.remove(replaying)
+        self.total_replayed += len(records)
+        logger.info(f"📝 Replaying {len(records)} spilled decision audit records")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'pending': len(self._pending),
+            'total_submitted': self.total_submitted,
+            'total_written': self.total_written,
+            'total_spilled': self.total_spilled,
+            'total_replayed': self.total_replayed,
+            'total_dead_lettered': self.total_dead_lettered,
+            'round_trips': self.round_trips,
+            'spill_file_present': os.path.exists(self.spill_path),
+            'persistent': self.supabase is not None
+        }
+
+# Process-wide audit writer shared by the master controller instances
+decision_audit_log = DecisionAuditLog()
+
+__all__ = [
+    'DecisionAuditLog',
+    'decision_audit_log'
+]
@@ -8,7 +8,7 @@ import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field, replace
 from enum import Enum
 import uuid
 
@@ -16,6 +16,7 @@ from autonomous_decision_framework import (
     AutonomousDecision, DecisionType, RiskLevel, ApprovalStatus,
     ExecutionResult, AutonomousDecisionFramework
 )
+from platform_rate_limiter import rate_limiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -35,6 +36,7 @@ class ExecutionStatus(Enum):
     COMPLETED = "completed"
     FAILED = "failed"
     ROLLED_BACK = "rolled_back"
+    SUPERSEDED = "superseded"
 
 @dataclass
 class PlatformAction:
@@ -62,6 +64,7 @@ class ExecutionQueue:
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     error_details: Optional[Dict[str, Any]] = None
+    source_decision_ids: List[str] = field(default_factory=list)  # Every decision coalesced into this execution
 
 @dataclass
 class ExecutionMonitor:
@@ -80,13 +83,24 @@ class DecisionExecutionEngine:
     Advanced Decision Execution Engine with platform integrations
     """
     
+    # Stop-type decisions conflict with any other pending change on the same campaign
+    STOP_DECISION_TYPES = {DecisionType.EMERGENCY_STOP, DecisionType.CAMPAIGN_PAUSE}
+    DECISION_PRECEDENCE = {
+        DecisionType.EMERGENCY_STOP: 3,
+        DecisionType.CAMPAIGN_PAUSE: 2
+    }
+    
     def __init__(self):
         self.execution_queue: List[ExecutionQueue] = []
         self.active_executions: Dict[str, ExecutionMonitor] = {}
         self.execution_history: List[ExecutionQueue] = []
+        self.pending_by_campaign: Dict[tuple, List[ExecutionQueue]] = {}
         self.platform_connectors = {}
         self.approval_workflows = {}
         self.rollback_strategies = {}
+        # Looks up a campaign's ad account (e.g. MultiPlatformSyncEngine.account_for_campaign)
+        # so each account is paced by its own rate-limit bucket
+        self.account_resolver: Optional[Callable[[str], Optional[str]]] = None
         self._initialize_platform_connectors()
         self._initialize_rollback_strategies()
         
@@ -114,9 +128,50 @@ class DecisionExecutionEngine:
         priority: int = 3,
         scheduled_time: Optional[datetime] = None
     ) -> str:
-        """Queue a decision for execution"""
+        """Queue a decision for execution, coalescing it with pending work on the same campaign"""
         try:
             execution_id = str(uuid.uuid4())
+            scheduled_time = scheduled_time or datetime.now()
+            key = (decision.platform, decision.campaign_id)
+            pending = [item for item in self.pending_by_campaign.get(key, []) if item.status == ExecutionStatus.QUEUED]
+            
+            # Resolve conflicts (pause vs. budget increase) by queue priority, then decision precedence
+            conflicting = [item for item in pending if self._decisions_conflict(item.decision.decision_type, decision.decision_type)]
+            if conflicting:
+                incoming_rank = self._coalescing_rank(priority, decision.decision_type)
+                winner = min(conflicting, key=lambda item: self._coalescing_rank(item.priority, item.decision.decision_type))
+                if self._coalescing_rank(winner.priority, winner.decision.decision_type) < incoming_rank:
+                    self._record_superseded(ExecutionQueue(
+                        execution_id=execution_id,
+                        decision=decision,
+                        platform_actions=[],
+                        status=ExecutionStatus.QUEUED,
+                        priority=priority,
+                        scheduled_time=scheduled_time,
+                        created_at=datetime.now(),
+                        source_decision_ids=[decision.decision_id]
+                    ), winner.execution_id)
+                    return execution_id
+                
+                for item in conflicting:
+                    self._remove_pending(item)
+                    self.execution_queue.remove(item)
+                    self._record_superseded(item, execution_id)
+                pending = [item for item in pending if item not in conflicting]
+            
+            # Same action type on the same campaign merges into one net action
+            mergeable = next((item for item in pending if item.decision.decision_type == decision.decision_type), None)
+            if mergeable:
+                merged_decision = self._merge_decisions(mergeable.decision, decision)
+                mergeable.decision = merged_decision
+                mergeable.platform_actions = await self._convert_decision_to_actions(merged_decision)
+                mergeable.source_decision_ids.append(decision.decision_id)
+                mergeable.priority = min(mergeable.priority, priority)
+                mergeable.scheduled_time = min(mergeable.scheduled_time, scheduled_time)
+                self.execution_queue.sort(key=lambda x: (x.priority, x.scheduled_time))
+                
+                logger.info(f"Decision {decision.decision_id} coalesced into execution {mergeable.execution_id}")
+                return mergeable.execution_id
             
             # Convert decision to platform actions
             platform_actions = await self._convert_decision_to_actions(decision)
@@ -128,13 +183,15 @@ class DecisionExecutionEngine:
                 platform_actions=platform_actions,
                 status=ExecutionStatus.QUEUED,
                 priority=priority,
-                scheduled_time=scheduled_time or datetime.now(),
-                created_at=datetime.now()
+                scheduled_time=scheduled_time,
+                created_at=datetime.now(),
+                source_decision_ids=[decision.decision_id]
             )
             
             # Add to queue (sort by priority and scheduled time)
             self.execution_queue.append(queue_item)
             self.execution_queue.sort(key=lambda x: (x.priority, x.scheduled_time))
+            self.pending_by_campaign.setdefault(key, []).append(queue_item)
             
             logger.info(f"Decision {decision.decision_id} queued for execution with ID {execution_id}")
             return execution_id
@@ -143,12 +200,77 @@ class DecisionExecutionEngine:
             logger.error(f"Error queuing decision execution: {e}")
             raise
     
+    def _decisions_conflict(self, pending_type: DecisionType, incoming_type: DecisionType) -> bool:
+        """Stop-type decisions conflict with any different change on the same campaign"""
+        if pending_type == incoming_type:
+            return False
+        return pending_type in self.STOP_DECISION_TYPES or incoming_type in self.STOP_DECISION_TYPES
+    
+    def _coalescing_rank(self, priority: int, decision_type: DecisionType) -> tuple:
+        """Lower ranks win conflicts: best queue priority first, then stronger decision types"""
+        return (priority, -self.DECISION_PRECEDENCE.get(decision_type, 1))
+    
+    def _merge_decisions(self, pending: AutonomousDecision, incoming: AutonomousDecision) -> AutonomousDecision:
+        """Combine two same-type decisions into the net action"""
+        proposed_action = {**pending.proposed_action, **incoming.proposed_action}
+        
+        if incoming.decision_type == DecisionType.BUDGET_ADJUSTMENT:
+            # Final budget wins; keep the original budget so rollback restores the pre-queue state
+            if 'current_budget' in pending.proposed_action:
+                proposed_action['current_budget'] = pending.proposed_action['current_budget']
+            # Direction and percentage describe the net change, not either input decision
+            current_budget = proposed_action.get('current_budget')
+            new_budget = proposed_action.get('new_budget')
+            if current_budget and new_budget is not None:
+                proposed_action.pop('increase_percentage', None)
+                proposed_action.pop('decrease_percentage', None)
+                change_percentage = (new_budget - current_budget) / current_budget * 100
+                if change_percentage < 0:
+                    proposed_action['action'] = 'decrease_budget'
+                    proposed_action['decrease_percentage'] = -change_percentage
+                else:
+                    proposed_action['action'] = 'increase_budget'
+                    proposed_action['increase_percentage'] = change_percentage
+        
+        elif incoming.decision_type == DecisionType.BID_OPTIMIZATION:
+            # Percentage adjustments compound
+            first = pending.proposed_action.get('bid_adjustment') or 0
+            second = incoming.proposed_action.get('bid_adjustment') or 0
+            proposed_action['bid_adjustment'] = round(((1 + first / 100) * (1 + second / 100) - 1) * 100, 2)
+        
+        return replace(incoming, proposed_action=proposed_action)
+    
+    def _remove_pending(self, queue_item: ExecutionQueue):
+        """Drop a queue item from the per-campaign pending index"""
+        key = (queue_item.decision.platform, queue_item.decision.campaign_id)
+        items = self.pending_by_campaign.get(key, [])
+        if queue_item in items:
+            items.remove(queue_item)
+        if not items:
+            self.pending_by_campaign.pop(key, None)
+    
+    def _record_superseded(self, queue_item: ExecutionQueue, superseded_by: str):
+        """Move a superseded execution into the history so the audit trail keeps its decisions"""
+        queue_item.status = ExecutionStatus.SUPERSEDED
+        queue_item.completed_at = datetime.now()
+        queue_item.error_details = {'superseded_by': superseded_by}
+        self.execution_history.append(queue_item)
+        logger.info(f"Execution {queue_item.execution_id} superseded by execution {superseded_by}")
+    
+    def _resolve_account_id(self, decision: AutonomousDecision) -> Optional[str]:
+        """Ad account for a decision's campaign, taken from the campaign record when the decision has none"""
+        account_id = decision.proposed_action.get('account_id')
+        if account_id is None and self.account_resolver is not None:
+            account_id = self.account_resolver(decision.campaign_id)
+        return account_id
+    
     async def _convert_decision_to_actions(self, decision: AutonomousDecision) -> List[PlatformAction]:
         """Convert a decision into platform-specific actions"""
         actions = []
         
         try:
             platform_type = PlatformType(decision.platform)
+            account_id = self._resolve_account_id(decision)
             
             if decision.decision_type == DecisionType.BUDGET_ADJUSTMENT:
                 action = PlatformAction(
@@ -156,6 +278,7 @@ class DecisionExecutionEngine:
                     action_type="update_budget",
                     parameters={
                         'campaign_id': decision.campaign_id,
+                        'account_id': account_id,
                         'new_budget': decision.proposed_action.get('new_budget'),
                         'budget_type': 'daily'
                     },
@@ -175,6 +298,7 @@ class DecisionExecutionEngine:
                     action_type="update_bids",
                     parameters={
                         'campaign_id': decision.campaign_id,
+                        'account_id': account_id,
                         'bid_adjustment': decision.proposed_action.get('bid_adjustment'),
                         'target_positions': decision.proposed_action.get('target_positions', [])
                     },
@@ -194,6 +318,7 @@ class DecisionExecutionEngine:
                     action_type="pause_campaign",
                     parameters={
                         'campaign_id': decision.campaign_id,
+                        'account_id': account_id,
                         'pause_reason': decision.proposed_action.get('reason')
                     },
                     api_endpoint=f"/campaigns/{decision.campaign_id}/status",
@@ -212,6 +337,7 @@ class DecisionExecutionEngine:
                     platform=platform_type,
                     action_type="emergency_stop",
                     parameters={
+                        'account_id': account_id,
                         'stop_all': True,
                         'immediate': True
                     },
@@ -250,6 +376,7 @@ class DecisionExecutionEngine:
             
             # Remove from queue and mark as in progress
             self.execution_queue.remove(queue_item)
+            self._remove_pending(queue_item)
             queue_item.status = ExecutionStatus.IN_PROGRESS
             queue_item.started_at = datetime.now()
             
@@ -380,10 +507,16 @@ class DecisionExecutionEngine:
                     'action_type': action.action_type
                 }
             
-            # Execute the action with retry logic
+            platform = action.platform.value
+            account_id = action.parameters.get('account_id')
+            
+            # Execute the action with retry logic, pacing every attempt through the shared rate limiter.
+            # Connectors backed by platform_http report throttles and usage headers to the limiter themselves.
             for attempt in range(action.retry_count):
+                await rate_limiter.acquire(platform, account_id)
                 try:
                     result = await connector(action)
+                    
                     if result.get('success', False):
                         return result
                     
@@ -655,7 +788,8 @@ class DecisionExecutionEngine:
                 'created_at': execution.created_at.isoformat(),
                 'started_at': execution.started_at.isoformat() if execution.started_at else None,
                 'completed_at': execution.completed_at.isoformat() if execution.completed_at else None,
-                'error_details': execution.error_details
+                'error_details': execution.error_details,
+                'source_decision_ids': execution.source_decision_ids
             }
         
         return None
@@ -667,12 +801,14 @@ class DecisionExecutionEngine:
             'active_executions': len(self.active_executions),
             'completed_executions': len([ex for ex in self.execution_history if ex.status == ExecutionStatus.COMPLETED]),
             'failed_executions': len([ex for ex in self.execution_history if ex.status == ExecutionStatus.FAILED]),
+            'superseded_decisions': len([ex for ex in self.execution_history if ex.status == ExecutionStatus.SUPERSEDED]),
             'queue_items': [
                 {
                     'execution_id': item.execution_id,
                     'decision_type': item.decision.decision_type.value,
                     'priority': item.priority,
-                    'scheduled_time': item.scheduled_time.isoformat()
+                    'scheduled_time': item.scheduled_time.isoformat(),
+                    'source_decision_ids': item.source_decision_ids
                 }
                 for item in self.execution_queue
             ]
@@ -17,66 +17,337 @@ Environment Variables Required:
     GOOGLE_ADS_CUSTOMER_ID
 """
 
+import asyncio
+import hashlib
+import json
 import os
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, List, Dict, Optional, Iterable, Tuple
+
+import numpy as np
 from google.ads.googleads.client import GoogleAdsClient
 from google.ads.googleads.errors import GoogleAdsException
 
+from platform_executor import platform_executor
+from platform_rate_limiter import rate_limiter
+
 logger = logging.getLogger(__name__)
 
+MICROS_PER_UNIT = 1_000_000
+
+# Access tokens last an hour; refresh them this long before expiry
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+TOKEN_REFRESH_CHECK_SECONDS = 60
+
+# One stream per customer covers every campaign x day in the range
+PERFORMANCE_REPORT_QUERY = '''
+    SELECT
+        segments.date,
+        campaign.id,
+        metrics.cost_micros,
+        metrics.impressions,
+        metrics.clicks,
+        metrics.conversions,
+        metrics.conversions_value
+    FROM campaign
+    WHERE segments.date BETWEEN '{start_date}' AND '{end_date}'{campaign_filter}
+'''
+
+CLIENT_CUSTOMERS_QUERY = '''
+    SELECT customer_client.id
+    FROM customer_client
+    WHERE customer_client.manager = FALSE
+        AND customer_client.status = 'ENABLED'
+'''
+
+@dataclass
+class CampaignPerformanceReport:
+    """
+    Daily campaign performance as parallel columns, one entry per
+    customer x campaign x day. Costs stay in int64 micros until output.
+    """
+    customer_id: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    campaign_id: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    date: np.ndarray = field(default_factory=lambda: np.empty(0, dtype='datetime64[D]'))
+    cost_micros: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    impressions: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    clicks: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    conversions: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    conversions_value: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    COLUMNS = ('customer_id', 'campaign_id', 'date', 'cost_micros', 'impressions',
+               'clicks', 'conversions', 'conversions_value')
+
+    def __len__(self) -> int:
+        return len(self.campaign_id)
+
+    @classmethod
+    def concat(cls, reports: Iterable['CampaignPerformanceReport']) -> 'CampaignPerformanceReport':
+        reports = list(reports)
+        combined = cls()
+        for column in cls.COLUMNS:
+            parts = [getattr(report, column) for report in reports]
+            if parts:
+                setattr(combined, column, np.concatenate(parts))
+        for report in reports:
+            combined.errors.update(report.errors)
+        return combined
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Row dicts in currency units, in the shape fetch_campaign_performance returns"""
+        spend = self.cost_micros / MICROS_PER_UNIT
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ctr = np.where(self.impressions > 0, self.clicks / self.impressions, 0.0)
+            cpc = np.where(self.clicks > 0, spend / self.clicks, 0.0)
+            cpa = np.where(self.conversions > 0, spend / self.conversions, 0.0)
+            roas = np.where(self.cost_micros > 0, self.conversions_value / spend, np.nan)
+        dates = self.date.astype(str).tolist()
+        return [
+            {
+                'customer_id': str(self.customer_id[i]),
+                'campaign_id': str(self.campaign_id[i]),
+                'date': dates[i],
+                'spend': float(spend[i]),
+                'impressions': int(self.impressions[i]),
+                'clicks': int(self.clicks[i]),
+                'conversions': float(self.conversions[i]),
+                'ctr': float(ctr[i]),
+                'cpc': float(cpc[i]),
+                'cpa': float(cpa[i]),
+                'roas': None if np.isnan(roas[i]) else float(roas[i])
+            }
+            for i in range(len(self))
+        ]
+
+    def totals_by_campaign(self) -> List[Dict[str, Any]]:
+        """Per customer x campaign totals over the report's date range"""
+        if not len(self):
+            return []
+        keys = np.stack([self.customer_id, self.campaign_id], axis=1)
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        count = len(unique_keys)
+
+        def group_sum(column: np.ndarray) -> np.ndarray:
+            # np.bincount weights are float64, which rounds int64 micros above 2**53
+            sums = np.zeros(count, dtype=column.dtype)
+            np.add.at(sums, inverse, column)
+            return sums
+
+        cost_micros = group_sum(self.cost_micros)
+        impressions = group_sum(self.impressions)
+        clicks = group_sum(self.clicks)
+        conversions = group_sum(self.conversions)
+        value = group_sum(self.conversions_value)
+        totals = []
+        for i, (customer_id, campaign_id) in enumerate(unique_keys):
+            spend = cost_micros[i] / MICROS_PER_UNIT
+            totals.append({
+                'customer_id': str(customer_id),
+                'campaign_id': str(campaign_id),
+                'spend': float(spend),
+                'impressions': int(impressions[i]),
+                'clicks': int(clicks[i]),
+                'conversions': float(conversions[i]),
+                'conversion_value': float(value[i]),
+                'roas': float(value[i] / spend) if spend > 0 else None
+            })
+        return totals
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'rows': len(self),
+            'customers': int(len(np.unique(self.customer_id))),
+            'campaigns': int(len(np.unique(self.campaign_id))),
+            'spend': float(self.cost_micros.sum() / MICROS_PER_UNIT),
+            'impressions': int(self.impressions.sum()),
+            'clicks': int(self.clicks.sum()),
+            'conversions': float(self.conversions.sum()),
+            'failed_customers': dict(self.errors)
+        }
+
+class GoogleAdsClientRegistry:
+    """
+    Process-wide GoogleAdsClient instances keyed by (login customer id,
+    credentials hash). A client is built on first use and shared by every
+    caller with the same credentials. A background task refreshes OAuth
+    access tokens shortly before they expire, so requests do not pay for
+    the refresh.
+    """
+
+    def __init__(self, refresh_margin_seconds: float = TOKEN_REFRESH_MARGIN_SECONDS,
+                 check_interval_seconds: float = TOKEN_REFRESH_CHECK_SECONDS):
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._clients: Dict[Tuple[str, str], GoogleAdsClient] = {}
+        self._lock = threading.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.created = 0
+        self.hits = 0
+        self.token_refreshes = 0
+
+    @staticmethod
+    def credentials_key(credentials: Dict[str, Any]) -> Tuple[str, str]:
+        login_customer_id = str(credentials.get('login_customer_id') or '').replace('-', '')
+        digest = hashlib.sha256(json.dumps(credentials, sort_keys=True, default=str).encode()).hexdigest()
+        return login_customer_id, digest
+
+    def get(self, credentials: Dict[str, Any]) -> GoogleAdsClient:
+        """Shared client for these credentials, built on first use"""
+        key = self.credentials_key(credentials)
+        client = self._clients.get(key)
+        if client is not None:
+            self.hits += 1
+            return client
+        # Called from worker threads; build each client once
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = GoogleAdsClient.load_from_dict({'use_proto_plus': True, **credentials})
+                self._clients[key] = client
+                self.created += 1
+                logger.info(f"Google Ads client created for login customer {key[0] or 'default'}")
+            return client
+
+    def invalidate(self, credentials: Dict[str, Any]):
+        """Drop a client, e.g. after its refresh token was revoked"""
+        with self._lock:
+            self._clients.pop(self.credentials_key(credentials), None)
+
+    def start(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                if self._clients:
+                    self.token_refreshes += await platform_executor.run('google_ads', self.refresh_expiring_tokens)
+            except Exception as e:
+                logger.error(f"Google Ads token refresh failed: {e}")
+            await asyncio.sleep(self.check_interval_seconds)
+
+    def refresh_expiring_tokens(self) -> int:
+        """Refresh access tokens that expire within the margin; blocking"""
+        from google.auth.transport.requests import Request
+
+        refreshed = 0
+        # google-auth keeps expiry as naive UTC
+        cutoff = datetime.utcnow() + timedelta(seconds=self.refresh_margin_seconds)
+        for client in list(self._clients.values()):
+            credentials = getattr(client, 'credentials', None)
+            if credentials is None or not getattr(credentials, 'refresh_token', None):
+                continue
+            if credentials.expiry is not None and credentials.expiry > cutoff:
+                continue
+            try:
+                credentials.refresh(Request())
+                refreshed += 1
+            except Exception as e:
+                logger.warning(f"Could not refresh Google Ads access token: {e}")
+        return refreshed
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'clients': len(self._clients),
+            'created': self.created,
+            'hits': self.hits,
+            'token_refreshes': self.token_refreshes,
+            'refresh_running': self._refresh_task is not None and not self._refresh_task.done()
+        }
+
+# Process-wide client registry shared by every Google Ads entry point
+google_ads_clients = GoogleAdsClientRegistry()
+
+def load_env_credentials() -> Tuple[Optional[Dict[str, str]], str]:
+    """Google Ads credentials and customer id from the environment; credentials are None if any are missing"""
+    # Get environment variables and strip any whitespace/newlines
+    developer_token = os.getenv('GOOGLE_ADS_DEVELOPER_TOKEN', '').strip()
+    client_id = os.getenv('GOOGLE_ADS_CLIENT_ID', '').strip()
+    client_secret = os.getenv('GOOGLE_ADS_CLIENT_SECRET', '').strip()
+    refresh_token = os.getenv('GOOGLE_ADS_REFRESH_TOKEN', '').strip()
+    customer_id = os.getenv('GOOGLE_ADS_CUSTOMER_ID', '').strip()
+    login_customer_id = os.getenv('GOOGLE_ADS_LOGIN_CUSTOMER_ID', '').strip()
+    
+    # Validate all required credentials
+    missing_vars = []
+    if not developer_token:
+        missing_vars.append('GOOGLE_ADS_DEVELOPER_TOKEN')
+    if not client_id:
+        missing_vars.append('GOOGLE_ADS_CLIENT_ID')
+    if not client_secret:
+        missing_vars.append('GOOGLE_ADS_CLIENT_SECRET')
+    if not refresh_token:
+        missing_vars.append('GOOGLE_ADS_REFRESH_TOKEN')
+    if not customer_id:
+        missing_vars.append('GOOGLE_ADS_CUSTOMER_ID')
+    
+    if missing_vars:
+        logger.error(f"Missing Google Ads environment variables: {missing_vars}")
+        return None, customer_id
+    
+    credentials = {
+        "developer_token": developer_token,
+        "refresh_token": refresh_token,
+        "client_id": client_id,
+        "client_secret": client_secret
+    }
+    if login_customer_id:
+        # Manager (MCC) account the client accounts are accessed through
+        credentials["login_customer_id"] = login_customer_id.replace('-', '')
+    return credentials, customer_id
+
 class GoogleAdsIntegration:
     """Google Ads API integration class"""
     
-    def __init__(self):
-        self.client = None
-        self.customer_id = None
-        self._initialize_client()
+    def __init__(self, credentials: Optional[Dict[str, str]] = None, customer_id: Optional[str] = None):
+        if credentials is None:
+            credentials, env_customer_id = load_env_credentials()
+            customer_id = customer_id or env_customer_id
+        self.credentials = credentials
+        self.customer_id = customer_id
+        self._client: Optional[GoogleAdsClient] = None
+        self._client_resolved = False
+    
+    @property
+    def client(self) -> Optional[GoogleAdsClient]:
+        """Shared registry client, resolved on first use"""
+        if not self._client_resolved:
+            self._initialize_client()
+        return self._client
+    
+    @client.setter
+    def client(self, client: Optional[GoogleAdsClient]):
+        self._client = client
+        self._client_resolved = True
     
     def _initialize_client(self):
-        """Initialize Google Ads client with environment variables"""
+        """Resolve the Google Ads client for these credentials from the registry"""
+        if not self.credentials:
+            self._client_resolved = True
+            return
         try:
-            # Get environment variables and strip any whitespace/newlines
-            developer_token = os.getenv('GOOGLE_ADS_DEVELOPER_TOKEN', '').strip()
-            client_id = os.getenv('GOOGLE_ADS_CLIENT_ID', '').strip()
-            client_secret = os.getenv('GOOGLE_ADS_CLIENT_SECRET', '').strip()
-            refresh_token = os.getenv('GOOGLE_ADS_REFRESH_TOKEN', '').strip()
-            self.customer_id = os.getenv('GOOGLE_ADS_CUSTOMER_ID', '').strip()
-            
-            # Validate all required credentials
-            missing_vars = []
-            if not developer_token:
-                missing_vars.append('GOOGLE_ADS_DEVELOPER_TOKEN')
-            if not client_id:
-                missing_vars.append('GOOGLE_ADS_CLIENT_ID')
-            if not client_secret:
-                missing_vars.append('GOOGLE_ADS_CLIENT_SECRET')
-            if not refresh_token:
-                missing_vars.append('GOOGLE_ADS_REFRESH_TOKEN')
-            if not self.customer_id:
-                missing_vars.append('GOOGLE_ADS_CUSTOMER_ID')
-            
-            if missing_vars:
-                logger.error(f"Missing Google Ads environment variables: {missing_vars}")
-                return
-            
-            # Create client configuration
-            credentials = {
-                "developer_token": developer_token,
-                "refresh_token": refresh_token,
-                "client_id": client_id,
-                "client_secret": client_secret,
-                "use_proto_plus": True,
-            }
-            
-            # Initialize Google Ads client
-            self.client = GoogleAdsClient.load_from_dict(credentials)
+            self._client = google_ads_clients.get(self.credentials)
             logger.info("Google Ads client initialized successfully")
             
         except Exception as e:
             logger.error(f"Failed to initialize Google Ads client: {e}")
-            self.client = None
+            self._client = None
+        # Marked only once _client is set, so concurrent callers never see a half-resolved client
+        self._client_resolved = True
     
     def is_connected(self) -> bool:
         """Check if Google Ads client is properly connected"""
@@ -170,11 +441,8 @@ class GoogleAdsIntegration:
                 ORDER BY campaign.name
             '''
             
-            search_request = self.client.get_type("SearchGoogleAdsRequest")
-            search_request.customer_id = self.customer_id
-            search_request.query = query
-            
-            results = ga_service.search(request=search_request)
+            stream = ga_service.search_stream(customer_id=self.customer_id, query=query)
+            results = (row for batch in stream for row in batch.results)
             
             campaigns = []
             for row in results:
@@ -224,56 +492,13 @@ class GoogleAdsIntegration:
             return []
         
         try:
-            ga_service = self.client.get_service("GoogleAdsService")
-            
-            # Calculate date range
             end_date = datetime.now().date()
             start_date = end_date - timedelta(days=days)
+            report = self.stream_performance_report(self.customer_id, start_date, end_date, campaign_ids=[campaign_id])
             
-            query = f'''
-                SELECT
-                    segments.date,
-                    campaign.id,
-                    campaign.name,
-                    metrics.cost_micros,
-                    metrics.impressions,
-                    metrics.clicks,
-                    metrics.conversions,
-                    metrics.ctr,
-                    metrics.average_cpc,
-                    metrics.cost_per_conversion
-                FROM campaign
-                WHERE campaign.id = {campaign_id}
-                    AND segments.date >= '{start_date}'
-                    AND segments.date <= '{end_date}'
-                ORDER BY segments.date
-            '''
-            
-            search_request = self.client.get_type("SearchGoogleAdsRequest")
-            search_request.customer_id = self.customer_id
-            search_request.query = query
-            
-            results = ga_service.search(request=search_request)
-            
-            performance_data = []
-            for row in results:
-                cost_micros = getattr(row.metrics, 'cost_micros', 0) or 0
-                average_cpc = getattr(row.metrics, 'average_cpc', 0) or 0
-                cost_per_conversion = getattr(row.metrics, 'cost_per_conversion', 0) or 0
-                
-                data = {
-                    'campaign_id': campaign_id,
-                    'date': str(row.segments.date),
-                    'spend': cost_micros / 1_000_000,
-                    'impressions': getattr(row.metrics, 'impressions', 0) or 0,
-                    'clicks': getattr(row.metrics, 'clicks', 0) or 0,
-                    'conversions': getattr(row.metrics, 'conversions', 0) or 0,
-                    'ctr': getattr(row.metrics, 'ctr', 0) or 0,
-                    'cpc': average_cpc / 1_000_000,
-                    'cpa': cost_per_conversion / 1_000_000,
-                    'roas': None  # Calculate if revenue data is available
-                }
-                performance_data.append(data)
+            performance_data = report.to_records()
+            for record in performance_data:
+                del record['customer_id']
             
             logger.info(f"Successfully fetched {len(performance_data)} performance records for campaign {campaign_id}")
             return performance_data
@@ -284,14 +509,110 @@ class GoogleAdsIntegration:
         except Exception as e:
             logger.error(f"Error fetching campaign performance: {e}")
             return []
+    
+    def stream_performance_report(self, customer_id: str, start_date: date, end_date: date,
+                                  campaign_ids: Optional[List[str]] = None) -> CampaignPerformanceReport:
+        """
+        Daily performance for every campaign of one customer from a single
+        SearchStream query, collected straight into columns. Blocking; run it
+        through fetch_performance_report or the platform executor.
+        """
+        customer_id = str(customer_id).replace('-', '')
+        campaign_filter = ''
+        if campaign_ids:
+            campaign_filter = f"\n        AND campaign.id IN ({', '.join(str(int(c)) for c in campaign_ids)})"
+        query = PERFORMANCE_REPORT_QUERY.format(
+            start_date=start_date.isoformat(), end_date=end_date.isoformat(), campaign_filter=campaign_filter
+        )
+        
+        campaign_ids_col: List[int] = []
+        dates: List[str] = []
+        cost_micros: List[int] = []
+        impressions: List[int] = []
+        clicks: List[int] = []
+        conversions: List[float] = []
+        conversions_value: List[float] = []
+        
+        ga_service = self.client.get_service("GoogleAdsService")
+        stream = ga_service.search_stream(customer_id=customer_id, query=query)
+        for batch in stream:
+            # Read the raw protobuf; proto-plus wrapping costs several times more per field access
+            for row in type(batch).pb(batch).results:
+                campaign_ids_col.append(row.campaign.id)
+                dates.append(row.segments.date)
+                metrics = row.metrics
+                cost_micros.append(metrics.cost_micros)
+                impressions.append(metrics.impressions)
+                clicks.append(metrics.clicks)
+                conversions.append(metrics.conversions)
+                conversions_value.append(metrics.conversions_value)
+        
+        count = len(campaign_ids_col)
+        return CampaignPerformanceReport(
+            customer_id=np.full(count, int(customer_id), dtype=np.int64),
+            campaign_id=np.array(campaign_ids_col, dtype=np.int64),
+            date=np.array(dates, dtype='datetime64[D]'),
+            cost_micros=np.array(cost_micros, dtype=np.int64),
+            impressions=np.array(impressions, dtype=np.int64),
+            clicks=np.array(clicks, dtype=np.int64),
+            conversions=np.array(conversions, dtype=np.float64),
+            conversions_value=np.array(conversions_value, dtype=np.float64)
+        )
+    
+    def list_client_customers(self, manager_id: str) -> List[str]:
+        """Enabled, non-manager client accounts under a manager (MCC) account"""
+        ga_service = self.client.get_service("GoogleAdsService")
+        stream = ga_service.search_stream(customer_id=str(manager_id).replace('-', ''), query=CLIENT_CUSTOMERS_QUERY)
+        return [str(row.customer_client.id) for batch in stream for row in batch.results]
+    
+    async def fetch_performance_report(self, customer_ids: Optional[List[str]] = None, days: int = 30,
+                                       manager_id: Optional[str] = None) -> CampaignPerformanceReport:
+        """
+        Daily campaign performance across customers, one SearchStream per
+        customer. Streams run concurrently on the Google Ads worker pool and
+        are paced per customer by the shared rate limiter. With manager_id,
+        every enabled client account under that MCC is included. Customers
+        whose stream fails are listed in the report's errors.
+        """
+        if not self.client:
+            raise RuntimeError("Google Ads client not initialized - check environment variables")
+        
+        if manager_id:
+            customer_ids = await platform_executor.run('google_ads', self.list_client_customers, manager_id)
+        elif not customer_ids:
+            customer_ids = [self.customer_id]
+        
+        # Yesterday is the last complete day
+        end_date = datetime.now().date() - timedelta(days=1)
+        start_date = end_date - timedelta(days=days - 1)
+        
+        async def fetch(customer_id: str) -> CampaignPerformanceReport:
+            try:
+                await rate_limiter.acquire('google_ads', customer_id)
+                return await platform_executor.run(
+                    'google_ads', self.stream_performance_report, customer_id, start_date, end_date
+                )
+            except Exception as e:
+                logger.error(f"Performance report stream failed for customer {customer_id}: {e}")
+                return CampaignPerformanceReport(errors={str(customer_id): str(e)})
+        
+        report = CampaignPerformanceReport.concat(await asyncio.gather(*(fetch(c) for c in customer_ids)))
+        logger.info(f"Fetched {len(report)} campaign-days for {len(customer_ids)} Google Ads customers")
+        return report
 
-# Global instance
+# Global instance; the API client itself is created on first use
 google_ads = GoogleAdsIntegration()
 
 def get_google_ads_client():
     """Get the global Google Ads integration instance"""
     return google_ads
 
+def create_google_ads_client(credentials: Dict[str, str]) -> GoogleAdsIntegration:
+    """Integration for explicit credentials (with customer_id), backed by the shared client registry"""
+    credentials = dict(credentials)
+    customer_id = str(credentials.pop('customer_id', '') or '').replace('-', '')
+    return GoogleAdsIntegration(credentials=credentials, customer_id=customer_id)
+
 # Convenience functions for backward compatibility
 def fetch_campaigns_from_google_ads():
     """Fetch campaigns using the global instance"""
@@ -299,4 +620,9 @@ def fetch_campaigns_from_google_ads():
 
 def fetch_performance_from_google_ads(campaign_id: str, days: int = 30):
     """Fetch performance data using the global instance"""
-    return google_ads.fetch_campaign_performance(campaign_id, days)
\ No newline at end of file
+    return google_ads.fetch_campaign_performance(campaign_id, days)
+
+async def fetch_performance_report_from_google_ads(customer_ids: Optional[List[str]] = None, days: int = 30,
+                                                   manager_id: Optional[str] = None) -> CampaignPerformanceReport:
+    """Fetch a multi-customer performance report using the global instance"""
+    return await google_ads.fetch_performance_report(customer_ids, days, manager_id)
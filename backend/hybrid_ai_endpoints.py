@@ -12,6 +12,7 @@ import json
 
 # Import hybrid AI components
 from meta_ai_hybrid_integration import PulseBridgeAIMasterController, CrossPlatformMetrics, AIDecisionLog, AIDecisionType, OverrideReason
+from master_model_training import master_model_trainer
 from smart_risk_management import SmartRiskManager, ClientReportingManager, RiskLevel, ClientVisibilityMode, RISK_MANAGEMENT_TEMPLATES, CLIENT_REPORTING_TEMPLATES
 
 logger = logging.getLogger(__name__)
@@ -33,6 +34,34 @@ class OptimizationRequest(BaseModel):
     campaign_ids: Optional[List[str]] = None
     custom_risk_config: Optional[Dict[str, Any]] = None
 
+class BatchRiskAssessmentRequest(BaseModel):
+    """Decision fields as parallel arrays, one entry per decision"""
+    budget_change_percent: Optional[List[float]] = None
+    current_daily_spend: Optional[List[float]] = None
+    confidence_score: Optional[List[float]] = None
+    current_roas: Optional[List[float]] = None
+    current_conversion_rate: Optional[List[float]] = None
+    overrides_meta_ai: Optional[List[bool]] = None
+    meta_ai_confidence: Optional[List[float]] = None
+    platform_count: Optional[List[int]] = None
+    hours_since_last_change: Optional[List[float]] = None
+    client_tier: Optional[List[str]] = None
+    monthly_budget: Optional[List[float]] = None
+    account_id: Optional[List[str]] = None
+    market_volatility: Optional[float] = None
+    include_results: bool = True
+
+class PerformanceSnapshot(BaseModel):
+    account_id: str
+    spend: Optional[float] = None
+    roas: Optional[float] = None
+    budget_changed: bool = False
+
+class BulkReportRequest(BaseModel):
+    """Decisions to report on, grouped by client id"""
+    clients: Dict[str, List[Dict[str, Any]]]
+    concurrency: int = Field(default=8, ge=1, le=64)
+
 class DecisionApprovalRequest(BaseModel):
     decision_id: str
     approved: bool
@@ -53,7 +82,9 @@ def get_hybrid_ai_dependencies():
             'testing_mode': True,
             'cycle_interval': 6,
             'risk_level': 'conservative',
-            'optimization_level': 'balanced'
+            'optimization_level': 'balanced',
+            'platform_timeout_seconds': 30,
+            'trend_lookback_days': 14
         }
         
         # These would be properly injected in production
@@ -146,6 +177,32 @@ async def run_master_optimization_cycle(request: OptimizationRequest):
         logger.error(f"Master optimization cycle failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/models")
+async def get_master_model_status():
+    """Get the master controller's current model version and training state"""
+    try:
+        return {
+            'success': True,
+            'models': master_model_trainer.get_status()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get model status: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/models/retrain")
+async def retrain_master_models():
+    """Start a background retrain of the master models"""
+    try:
+        started = master_model_trainer.trigger()
+        return {
+            'success': True,
+            'started': started,
+            'current_version': master_model_trainer.current.version if master_model_trainer.current else None
+        }
+    except Exception as e:
+        logger.error(f"Failed to start model training: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/decisions")
 async def get_recent_ai_decisions(
     limit: int = 20,
@@ -305,6 +362,63 @@ async def assess_decision_risk(decision_data: Dict[str, Any]):
         logger.error(f"Risk assessment failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/risk-assessment/batch")
+async def assess_decision_risk_batch(request: BatchRiskAssessmentRequest):
+    """Assess risk for many potential AI decisions in one vectorized pass"""
+    try:
+        controller, risk_mgr, reporting_mgr = get_hybrid_ai_dependencies()
+        
+        columns = request.dict(exclude={'market_volatility', 'include_results'}, exclude_none=True)
+        batch = risk_mgr.assess_decision_risk_batch(columns, market_volatility=request.market_volatility)
+        
+        return {
+            'success': True,
+            'summary': batch.summary(),
+            'results': batch.to_list() if request.include_results else None,
+            'assessed_by': 'PulseBridge AI Risk Management System'
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch risk assessment failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/risk-baseline/snapshots")
+async def record_risk_baseline_snapshots(snapshots: List[PerformanceSnapshot]):
+    """Feed account performance snapshots into the rolling risk baselines"""
+    try:
+        controller, risk_mgr, reporting_mgr = get_hybrid_ai_dependencies()
+        
+        for snapshot in snapshots:
+            risk_mgr.record_performance_snapshot(snapshot.account_id, snapshot.dict(exclude={'account_id'}))
+        
+        return {
+            'success': True,
+            'snapshots_recorded': len(snapshots),
+            'accounts_tracked': len(risk_mgr.dynamic_adjustments)
+        }
+        
+    except Exception as e:
+        logger.error(f"Recording risk baseline snapshots failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/risk-baseline/{account_id}")
+async def get_risk_baseline(account_id: str):
+    """Get an account's rolling spend and ROAS baseline"""
+    controller, risk_mgr, reporting_mgr = get_hybrid_ai_dependencies()
+    
+    baseline = risk_mgr.get_account_baseline(account_id)
+    if baseline is None:
+        raise HTTPException(status_code=404, detail=f"No baseline for account {account_id}")
+    
+    return {
+        'success': True,
+        'account_id': account_id,
+        'baseline': baseline.to_dict(),
+        'ready': baseline.ready
+    }
+
 @router.post("/approve-decision")
 async def approve_ai_decision(request: DecisionApprovalRequest):
     """Approve or reject an AI decision (for testing mode)"""
@@ -327,6 +441,34 @@ async def approve_ai_decision(request: DecisionApprovalRequest):
         logger.error(f"Decision approval failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/reports/bulk")
+async def start_bulk_client_reports(request: BulkReportRequest):
+    """Start generating client reports for many clients in the background"""
+    try:
+        controller, risk_mgr, reporting_mgr = get_hybrid_ai_dependencies()
+        
+        job = reporting_mgr.start_bulk_report_job(request.clients, concurrency=request.concurrency)
+        return {
+            'success': True,
+            'job_id': job.job_id,
+            'total_clients': job.total_clients,
+            'status_url': f"/api/v1/hybrid-ai/reports/bulk/{job.job_id}"
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to start bulk report job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/reports/bulk/{job_id}")
+async def get_bulk_client_report_status(job_id: str):
+    """Get progress of a bulk client report job"""
+    controller, risk_mgr, reporting_mgr = get_hybrid_ai_dependencies()
+    
+    job = reporting_mgr.get_report_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Report job {job_id} not found")
+    return job.get_status()
+
 @router.get("/configuration")
 async def get_hybrid_ai_configuration():
     """Get current hybrid AI system configuration"""
@@ -4,14 +4,18 @@ Provides backend endpoints for LinkedIn Ads integration
 """
 
 import os
+from contextlib import aclosing
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-import requests
+from typing import AsyncIterator, List, Dict, Any, Optional
+import httpx
 from fastapi import HTTPException
 
+from platform_http import platform_http, paginate
+
 # LinkedIn Ads API Configuration
 LINKEDIN_API_BASE = "https://api.linkedin.com/rest"
 LINKEDIN_API_VERSION = "202310"
+LINKEDIN_PAGE_SIZE = 1000  # adCampaigns search maximum count
 
 class LinkedInAdsClient:
     def __init__(self, access_token: str, ad_account_id: str):
@@ -19,7 +23,7 @@ class LinkedInAdsClient:
         self.ad_account_id = ad_account_id
         self.base_url = LINKEDIN_API_BASE
         
-    def _make_request(self, endpoint: str, method: str = "GET", params: dict = None, data: dict = None) -> dict:
+    async def _make_request(self, endpoint: str, method: str = "GET", params: dict = None, data: dict = None) -> dict:
         """Make authenticated request to LinkedIn Ads API"""
         url = f"{self.base_url}/{endpoint}"
         
@@ -30,32 +34,27 @@ class LinkedInAdsClient:
             'LinkedIn-Version': LINKEDIN_API_VERSION
         }
         
+        if method not in ("GET", "POST", "PUT", "DELETE"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
         try:
-            if method == "GET":
-                response = requests.get(url, params=params, headers=headers, timeout=30)
-            elif method == "POST":
-                response = requests.post(url, params=params, json=data, headers=headers, timeout=30)
-            elif method == "PUT":
-                response = requests.put(url, params=params, json=data, headers=headers, timeout=30)
-            elif method == "DELETE":
-                response = requests.delete(url, params=params, headers=headers, timeout=30)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-                
-            response.raise_for_status()
+            response = await platform_http.request(
+                method, url, params=params, json=data if method in ("POST", "PUT") else None, headers=headers,
+                platform='linkedin_ads', account_id=self.ad_account_id
+            )
             return response.json()
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             raise HTTPException(status_code=500, detail=f"LinkedIn API request failed: {str(e)}")
     
-    def test_connection(self) -> dict:
+    async def test_connection(self) -> dict:
         """Test LinkedIn Ads API connection"""
         try:
             # Test with user info endpoint
-            response = self._make_request("people/~:(id,firstName,lastName)")
+            response = await self._make_request("people/~:(id,firstName,lastName)")
             
             # Test ad account access
-            ad_account_response = self._make_request(
+            ad_account_response = await self._make_request(
                 f"adAccounts/{self.ad_account_id}",
                 params={'fields': 'id,name,status,type,currency'}
             )
@@ -71,23 +70,44 @@ class LinkedInAdsClient:
                 'error': str(e)
             }
     
-    def get_campaigns(self, limit: int = 25) -> List[Dict[str, Any]]:
-        """Retrieve LinkedIn Ad campaigns"""
+    async def iter_campaigns(self, page_size: int = LINKEDIN_PAGE_SIZE) -> AsyncIterator[Dict[str, Any]]:
+        """Stream every campaign in the ad account, paging with start/count"""
+        params = {
+            'q': 'search',
+            'search': f'(account:(values:List({self.ad_account_id})))',
+            'fields': 'id,name,status,type,costType,dailyBudget,totalBudget,runSchedule,createdAt,lastModifiedAt',
+            'count': page_size
+        }
+
+        async def fetch_page(start):
+            start = start or 0
+            response = await self._make_request("adCampaigns", params=dict(params, start=start))
+            elements = response.get('elements', [])
+            total = response.get('paging', {}).get('total')
+            next_start = start + len(elements)
+            if len(elements) < page_size or (total is not None and next_start >= total):
+                next_start = None
+            return elements, next_start
+
+        async for page in paginate(fetch_page):
+            for campaign in page:
+                yield campaign
+
+    async def get_campaigns(self, limit: int = 25) -> List[Dict[str, Any]]:
+        """Retrieve up to `limit` LinkedIn Ad campaigns"""
         try:
-            params = {
-                'q': 'search',
-                'search': f'(account:(values:List({self.ad_account_id})))',
-                'fields': 'id,name,status,type,costType,dailyBudget,totalBudget,runSchedule,createdAt,lastModifiedAt',
-                'count': limit
-            }
-            
-            response = self._make_request("adCampaigns", params=params)
-            return response.get('elements', [])
+            campaigns = []
+            async with aclosing(self.iter_campaigns(page_size=min(limit, LINKEDIN_PAGE_SIZE))) as stream:
+                async for campaign in stream:
+                    campaigns.append(campaign)
+                    if len(campaigns) >= limit:
+                        break
+            return campaigns
             
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to get LinkedIn campaigns: {str(e)}")
     
-    def get_campaign_analytics(self, campaign_id: str, start_date: str, end_date: str) -> Dict[str, Any]:
+    async def get_campaign_analytics(self, campaign_id: str, start_date: str, end_date: str) -> Dict[str, Any]:
         """Get campaign performance analytics"""
         try:
             params = {
@@ -99,7 +119,7 @@ class LinkedInAdsClient:
                 'dateRange': f'(start:(year:{start_date[:4]},month:{start_date[5:7]},day:{start_date[8:10]}),end:(year:{end_date[:4]},month:{end_date[5:7]},day:{end_date[8:10]}))'
             }
             
-            response = self._make_request("adAnalytics", params=params)
+            response = await self._make_request("adAnalytics", params=params)
             
             if response.get('elements'):
                 return response['elements'][0]
@@ -109,7 +129,7 @@ class LinkedInAdsClient:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to get LinkedIn campaign analytics: {str(e)}")
     
-    def get_account_analytics(self, start_date: str, end_date: str) -> Dict[str, Any]:
+    async def get_account_analytics(self, start_date: str, end_date: str) -> Dict[str, Any]:
         """Get account-level performance analytics"""
         try:
             params = {
@@ -121,7 +141,7 @@ class LinkedInAdsClient:
                 'dateRange': f'(start:(year:{start_date[:4]},month:{start_date[5:7]},day:{start_date[8:10]}),end:(year:{end_date[:4]},month:{end_date[5:7]},day:{end_date[8:10]}))'
             }
             
-            response = self._make_request("adAnalytics", params=params)
+            response = await self._make_request("adAnalytics", params=params)
             
             if response.get('elements'):
                 return response['elements'][0]
@@ -152,7 +172,7 @@ async def get_linkedin_ads_status() -> Dict[str, Any]:
             'error': 'LinkedIn Ads credentials not configured'
         }
     
-    return client.test_connection()
+    return await client.test_connection()
 
 async def get_linkedin_ads_campaigns(limit: int = 25) -> List[Dict[str, Any]]:
     """Get LinkedIn Ads campaigns"""
@@ -160,7 +180,7 @@ async def get_linkedin_ads_campaigns(limit: int = 25) -> List[Dict[str, Any]]:
     if not client:
         raise HTTPException(status_code=400, detail="LinkedIn Ads not configured")
     
-    return client.get_campaigns(limit)
+    return await client.get_campaigns(limit)
 
 async def get_linkedin_ads_performance(
     campaign_id: Optional[str] = None,
@@ -180,7 +200,7 @@ async def get_linkedin_ads_performance(
     
     if campaign_id:
         # Get specific campaign performance
-        return client.get_campaign_analytics(campaign_id, start_date_str, end_date_str)
+        return await client.get_campaign_analytics(campaign_id, start_date_str, end_date_str)
     else:
         # Get account-level performance
-        return client.get_account_analytics(start_date_str, end_date_str)
\ No newline at end of file
+        return await client.get_account_analytics(start_date_str, end_date_str)
\ No newline at end of file
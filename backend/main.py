@@ -52,20 +52,29 @@ from ai_endpoints import ai_router
 from ai_chat_service import ai_service, ChatRequest
 
 # Import Optimization Engine
-from optimization_endpoints import router as optimization_router
+from optimization_endpoints import router as optimization_router, optimization_executor
+from optimization_engine import campaign_state_cache, SyncStoreStateLoader
+from optimization_rules import rule_repository
+from performance_trends import trend_tracker
 
 # Import Multi-Platform Sync Engine
-from sync_endpoints import router as sync_router
+from sync_endpoints import router as sync_router, sync_engine
 
 # Import Advanced Analytics Engine
 from analytics_endpoints import router as analytics_router
 
 # Import Autonomous Decision Framework
-from autonomous_decision_endpoints import router as autonomous_router
+from autonomous_decision_endpoints import router as autonomous_router, decision_framework, execution_engine
 
 # Import Google Ads Integration
 try:
-    from google_ads_integration import get_google_ads_client, fetch_campaigns_from_google_ads, fetch_performance_from_google_ads
+    from google_ads_integration import (
+        get_google_ads_client,
+        fetch_campaigns_from_google_ads,
+        fetch_performance_from_google_ads,
+        fetch_performance_report_from_google_ads,
+        google_ads_clients
+    )
     GOOGLE_ADS_AVAILABLE = True
 except ImportError as e:
     logger.warning(f"Google Ads integration not available: {e}")
@@ -74,6 +83,8 @@ except ImportError as e:
     def get_google_ads_client(): return None
     def fetch_campaigns_from_google_ads(): return []
     def fetch_performance_from_google_ads(campaign_id: str, days: int = 30): return []
+    async def fetch_performance_report_from_google_ads(customer_ids=None, days: int = 30, manager_id=None): return None
+    google_ads_clients = None
 
 # Import Meta Business API Integration - ✅ VALIDATED CREDENTIALS
 from meta_business_api import meta_api
@@ -96,6 +107,10 @@ from pinterest_ads_integration import (
 from meta_ai_hybrid_integration import PulseBridgeAIMasterController, CrossPlatformMetrics, AIDecisionLog
 from smart_risk_management import SmartRiskManager, ClientReportingManager, RISK_MANAGEMENT_TEMPLATES, CLIENT_REPORTING_TEMPLATES
 from hybrid_ai_endpoints import hybrid_ai_router
+from master_model_training import master_model_trainer
+from decision_audit_log import decision_audit_log
+from platform_http import platform_http
+from platform_executor import platform_executor
 
 # Security
 security = HTTPBearer(auto_error=False)
@@ -107,8 +122,31 @@ async def lifespan(app: FastAPI):
     logger.info(f"AI Provider: {os.getenv('AI_PROVIDER', 'openai')}")
     logger.info(f"Claude API Key: {'✅ Configured' if os.getenv('ANTHROPIC_API_KEY') else '❌ Missing'}")
     logger.info(f"OpenAI API Key: {'✅ Configured' if os.getenv('OPENAI_API_KEY') else '❌ Missing'}")
+    campaign_state_cache.loader = SyncStoreStateLoader(sync_engine)
+    execution_engine.account_resolver = sync_engine.account_for_campaign
+    if SUPABASE_AVAILABLE and supabase:
+        await decision_framework.feedback_store.attach(supabase)
+        optimization_executor.execution_log.attach(supabase)
+        rule_repository.attach(supabase)
+        trend_tracker.attach(supabase)
+        master_model_trainer.attach(supabase)
+        decision_audit_log.attach(supabase)
+    rule_repository.start()
+    trend_tracker.start()
+    master_model_trainer.start()
+    if google_ads_clients is not None:
+        google_ads_clients.start()
     yield
     logger.info("🔄 PulseBridge.ai Backend Shutting Down...")
+    await optimization_executor.execution_log.close()
+    await rule_repository.close()
+    await trend_tracker.close()
+    await master_model_trainer.close()
+    await decision_audit_log.close()
+    await platform_http.close()
+    if google_ads_clients is not None:
+        await google_ads_clients.close()
+    platform_executor.shutdown()
 
 # Create FastAPI application
 app = FastAPI(
@@ -157,11 +195,11 @@ app.include_router(hybrid_ai_router)
 # ================================
 
 @app.get("/google-ads/status")
-def google_ads_status():
+async def google_ads_status():
     """Check Google Ads API connection status"""
     try:
         google_ads_client = get_google_ads_client()
-        status = google_ads_client.get_connection_status()
+        status = await platform_executor.run('google_ads', google_ads_client.get_connection_status)
         
         return {
             "status": "connected" if status["connected"] else "error",
@@ -182,18 +220,18 @@ def google_ads_status():
         }
 
 @app.get("/google-ads/campaigns")
-def get_google_ads_campaigns():
+async def get_google_ads_campaigns():
     """Fetch campaigns from Google Ads API"""
     try:
         google_ads_client = get_google_ads_client()
         
-        if not google_ads_client.is_connected():
+        if not await platform_executor.run('google_ads', google_ads_client.is_connected):
             raise HTTPException(
                 status_code=503, 
                 detail="Google Ads API not connected. Check your credentials."
             )
         
-        campaigns = fetch_campaigns_from_google_ads()
+        campaigns = await platform_executor.run('google_ads', fetch_campaigns_from_google_ads)
         
         return {
             "campaigns": campaigns,
@@ -212,18 +250,18 @@ def get_google_ads_campaigns():
         )
 
 @app.get("/google-ads/campaigns/{campaign_id}/performance")
-def get_google_ads_campaign_performance(campaign_id: str, days: int = 30):
+async def get_google_ads_campaign_performance(campaign_id: str, days: int = 30):
     """Get performance data for a specific campaign from Google Ads"""
     try:
         google_ads_client = get_google_ads_client()
         
-        if not google_ads_client.is_connected():
+        if not await platform_executor.run('google_ads', google_ads_client.is_connected):
             raise HTTPException(
                 status_code=503,
                 detail="Google Ads API not connected. Check your credentials."
             )
         
-        performance_data = fetch_performance_from_google_ads(campaign_id, days)
+        performance_data = await platform_executor.run('google_ads', fetch_performance_from_google_ads, campaign_id, days)
         
         return {
             "campaign_id": campaign_id,
@@ -243,13 +281,46 @@ def get_google_ads_campaign_performance(campaign_id: str, days: int = 30):
             detail=f"Failed to fetch performance data from Google Ads: {str(e)}"
         )
 
+@app.get("/google-ads/performance-report")
+async def get_google_ads_performance_report(days: int = 30, customer_ids: Optional[str] = None,
+                                            manager_id: Optional[str] = None, include_rows: bool = False):
+    """Daily campaign performance across one or many customers (all clients of an MCC with manager_id)"""
+    try:
+        if not GOOGLE_ADS_AVAILABLE:
+            raise HTTPException(status_code=503, detail="Google Ads integration not available")
+        if days < 1 or days > 365:
+            raise HTTPException(status_code=400, detail="days must be between 1 and 365")
+        
+        requested_ids = [c.strip() for c in (customer_ids or '').split(',') if c.strip()]
+        report = await fetch_performance_report_from_google_ads(requested_ids or None, days, manager_id)
+        
+        response = {
+            "summary": report.summary(),
+            "campaigns": report.totals_by_campaign(),
+            "days": days,
+            "source": "google_ads_api",
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        if include_rows:
+            response["rows"] = report.to_records()
+        return response
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building Google Ads performance report: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to build performance report from Google Ads: {str(e)}"
+        )
+
 # ===== META ADS ENDPOINTS - ✅ VALIDATED INTEGRATION =====
 
 @app.get("/meta-ads/status")
 async def get_meta_ads_status_endpoint():
     """Check Meta Ads API connection status - ✅ WORKING"""
     try:
-        account_info = meta_api.get_account_info()
+        account_info = await meta_api.get_account_info()
         
         if 'error' in account_info:
             return {
@@ -281,7 +352,7 @@ async def get_meta_ads_status_endpoint():
 async def get_meta_ads_campaigns_endpoint(limit: int = 25):
     """Get campaigns from Meta Ads - ✅ VALIDATED"""
     try:
-        campaigns = meta_api.get_campaigns(limit)
+        campaigns = await meta_api.get_campaigns(limit)
         return {
             "campaigns": campaigns,
             "count": len(campaigns),
@@ -296,24 +367,25 @@ async def get_meta_ads_campaigns_endpoint(limit: int = 25):
             detail=f"Failed to fetch campaigns from Meta Ads: {str(e)}"
         )
 
+def meta_date_preset(days: int) -> str:
+    """Map a day count to Meta's date preset"""
+    if days <= 1:
+        return 'yesterday'
+    elif days <= 7:
+        return 'last_7_days'
+    elif days <= 14:
+        return 'last_14_days'
+    elif days <= 30:
+        return 'last_30_days'
+    return 'last_90_days'
+
 @app.get("/meta-ads/campaigns/{campaign_id}/performance")
 async def get_meta_ads_campaign_performance(campaign_id: str, days: int = 7):
     """Get performance data for a specific campaign from Meta Ads"""
     try:
-        # Map days to Meta's date preset
-        date_preset = 'last_7_days'
-        if days <= 1:
-            date_preset = 'yesterday'
-        elif days <= 7:
-            date_preset = 'last_7_days'
-        elif days <= 14:
-            date_preset = 'last_14_days'
-        elif days <= 30:
-            date_preset = 'last_30_days'
-        else:
-            date_preset = 'last_90_days'
+        date_preset = meta_date_preset(days)
         
-        performance_data = meta_api.get_campaign_insights(campaign_id, date_preset)
+        performance_data = await meta_api.get_campaign_insights(campaign_id, date_preset)
         
         return {
             "campaign_id": campaign_id,
@@ -330,11 +402,37 @@ async def get_meta_ads_campaign_performance(campaign_id: str, days: int = 7):
             detail=f"Failed to fetch performance data from Meta Ads: {str(e)}"
         )
 
+class MetaBulkPerformanceRequest(BaseModel):
+    campaign_ids: List[str]
+    days: int = 7
+
+@app.post("/meta-ads/campaigns/performance")
+async def get_meta_ads_campaigns_performance(request: MetaBulkPerformanceRequest):
+    """Get performance data for many campaigns using Graph API batch requests"""
+    try:
+        date_preset = meta_date_preset(request.days)
+        performance_data = await meta_api.get_campaign_insights_bulk(request.campaign_ids, date_preset)
+        
+        return {
+            "performance": performance_data,
+            "count": len(performance_data),
+            "days": request.days,
+            "date_preset": date_preset,
+            "source": "meta_business_api",
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error fetching Meta Ads bulk performance: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch performance data from Meta Ads: {str(e)}"
+        )
+
 @app.get("/meta-ads/performance")
 async def get_meta_ads_account_performance():
     """Get account-level summary from Meta Ads - ✅ VALIDATED"""
     try:
-        summary = meta_api.get_account_summary()
+        summary = await meta_api.get_account_summary()
         return {
             "account_summary": summary,
             "source": "meta_business_api",
@@ -351,7 +449,7 @@ async def get_meta_ads_account_performance():
 async def create_meta_campaign(campaign_data: Dict[str, Any]):
     """Create a new Meta campaign - ✅ API READY"""
     try:
-        result = meta_api.create_campaign(campaign_data)
+        result = await meta_api.create_campaign(campaign_data)
         
         if 'error' in result:
             raise HTTPException(
@@ -561,7 +659,7 @@ async def get_meta_connection_status(user_id: str):
         if not SUPABASE_AVAILABLE or not supabase:
             # Fallback: Check if we have general Meta API access
             try:
-                account_info = meta_api.get_account_info()
+                account_info = await meta_api.get_account_info()
                 return {
                     "connected": not ('error' in account_info),
                     "user_id": user_id,
@@ -1219,7 +1317,6 @@ def google_ads_oauth_diagnostic():
 def test_google_ads_api():
     """Test Google Ads API with comprehensive error handling"""
     import requests
-    from google.oauth2.credentials import Credentials
     
     try:
         # Step 1: Get OAuth token
@@ -1245,26 +1342,19 @@ def test_google_ads_api():
                 "status_code": token_response.status_code
             }
         
-        token_data = token_response.json()
-        access_token = token_data.get('access_token')
-        
-        # Step 2: Try to create Google Ads client
+        # Step 2: Get the shared Google Ads client
         try:
-            from google.ads.googleads.client import GoogleAdsClient
-            
-            credentials = Credentials(
-                token=access_token,
-                refresh_token=refresh_token,
-                id_token=None,
-                token_uri="https://oauth2.googleapis.com/token",
-                client_id=client_id,
-                client_secret=client_secret
-            )
+            if not GOOGLE_ADS_AVAILABLE:
+                raise ImportError("google-ads not installed")
             
-            client = GoogleAdsClient(
-                credentials=credentials,
-                developer_token=os.getenv('GOOGLE_ADS_DEVELOPER_TOKEN')
-            )
+            client = get_google_ads_client().client
+            if client is None:
+                return {
+                    "success": False,
+                    "step": "client_init",
+                    "error": "Google Ads client could not be initialized - check environment variables",
+                    "token_obtained": True
+                }
             
             # Step 3: Try a simple API call
             customer_id = os.getenv('GOOGLE_ADS_CUSTOMER_ID', '').replace('-', '')
@@ -0,0 +1,491 @@
+"""
+Master Model Training for PulseBridge.ai
+Background training, versioning and hot-swapping of the master controller's ML models
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FEATURE_NAMES = ('roas', 'cpa', 'conversion_rate', 'ctr', 'quality_score', 'confidence_score', 'trend', 'is_meta')
+TREND_CODES = {'declining': -1.0, 'stable': 0.0, 'improving': 1.0}
+
+# Each model predicts a campaign's next-cycle value from its current cycle's metrics
+MASTER_MODEL_SPECS = {
+    'cross_platform_optimizer': {'n_estimators': 200, 'max_depth': 15, 'target': 'roas'},
+    'meta_ai_analyzer': {'n_estimators': 150, 'max_depth': 12, 'target': 'confidence_score', 'meta_only': True},
+    'budget_allocator': {'n_estimators': 175, 'max_depth': 14, 'target': 'roas_change'},
+    'attribution_model': {'n_estimators': 100, 'max_depth': 10, 'target': 'conversion_rate'}
+}
+
+MIN_MODEL_SAMPLES = 50
+DEFAULT_MODEL_DIR = os.getenv('MASTER_AI_MODEL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'master_ai'))
+# Supabase Storage bucket holding artifacts for every host; model_dir is a local cache of it
+DEFAULT_MODEL_BUCKET = os.getenv('MASTER_AI_MODEL_BUCKET', 'master-ai-models')
+
+@dataclass
+class MasterModelBundle:
+    """One trained, immutable generation of the master controller's models"""
+    version: int
+    models: Dict[str, Any]
+    scaler: Any
+    feature_names: Tuple[str, ...]
+    trained_at: datetime
+    sample_count: int
+    metrics: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def predict(self, model_name: str, features: np.ndarray) -> Optional[np.ndarray]:
+        model = self.models.get(model_name)
+        if model is None:
+            return None
+        return model.predict(self.scaler.transform(np.atleast_2d(features)))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'models': sorted(self.models),
+            'trained_at': self.trained_at.isoformat(),
+            'sample_count': self.sample_count,
+            'metrics': self.metrics
+        }
+
+def build_training_set(samples: List[Dict[str, Any]]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Pair each campaign's cycle sample with its next cycle: features come from
+    cycle t, targets from cycle t+1
+    """
+    if not samples:
+        return np.empty((0, len(FEATURE_NAMES))), {}
+
+    keys = np.array([f"{row.get('platform')}:{row.get('campaign_id')}" for row in samples])
+    recorded = np.array([str(row.get('recorded_at', '')) for row in samples])
+    order = np.lexsort((recorded, keys))
+
+    columns = {}
+    for name in FEATURE_NAMES:
+        if name == 'trend':
+            values = [TREND_CODES.get(row.get('performance_trend'), 0.0) for row in samples]
+        elif name == 'is_meta':
+            values = [1.0 if row.get('platform') == 'meta' else 0.0 for row in samples]
+        else:
+            values = [float(row.get(name) or 0.0) for row in samples]
+        columns[name] = np.asarray(values, dtype=float)[order]
+
+    keys = keys[order]
+    has_next = keys[:-1] == keys[1:]
+    current = np.flatnonzero(has_next)
+    following = current + 1
+
+    features = np.column_stack([columns[name][current] for name in FEATURE_NAMES])
+    targets = {
+        'roas': columns['roas'][following],
+        'confidence_score': columns['confidence_score'][following],
+        'conversion_rate': columns['conversion_rate'][following],
+        'roas_change': columns['roas'][following] - columns['roas'][current],
+        'is_meta': columns['is_meta'][current] > 0
+    }
+    return features, targets
+
+def train_master_models(samples: List[Dict[str, Any]], version: int, model_dir: str) -> Dict[str, Any]:
+    """
+    Fit every master model and persist the bundle; runs in a worker process.
+    Returns the artifact metadata rather than the models, so the forests are
+    not pickled back through the pool.
+    """
+    features, targets = build_training_set(samples)
+    if len(features) < MIN_MODEL_SAMPLES:
+        raise ValueError(f"Need at least {MIN_MODEL_SAMPLES} paired cycle samples, have {len(features)}")
+
+    scaler = StandardScaler().fit(features)
+    scaled = scaler.transform(features)
+
+    models = {}
+    metrics = {}
+    for name, spec in MASTER_MODEL_SPECS.items():
+        mask = targets['is_meta'] if spec.get('meta_only') else np.ones(len(scaled), dtype=bool)
+        X, y = scaled[mask], targets[spec['target']][mask]
+        if len(X) < MIN_MODEL_SAMPLES:
+            logger.info(f"Skipping {name}: {len(X)} samples")
+            continue
+
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        model = RandomForestRegressor(
+            n_estimators=spec['n_estimators'],
+            max_depth=spec['max_depth'],
+            random_state=42
+        )
+        model.fit(X_train, y_train)
+        predictions = model.predict(X_test)
+        metrics[name] = {
+            'mae': float(mean_absolute_error(y_test, predictions)),
+            'r2_score': float(r2_score(y_test, predictions)),
+            'samples': int(len(X))
+        }
+        # Refit on everything now that the holdout score is recorded
+        models[name] = model.fit(X, y)
+
+    trained_at = datetime.utcnow()
+    os.makedirs(model_dir, exist_ok=True)
+    path = os.path.join(model_dir, f"master_models_v{version}.joblib")
+    temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+    joblib.dump({
+        'version': version,
+        'models': models,
+        'scaler': scaler,
+        'feature_names': FEATURE_NAMES,
+        'trained_at': trained_at.isoformat(),
+        'sample_count': int(len(features)),
+        'metrics': metrics
+    }, temporary)
+    os.replace(temporary, path)
+
+    return {
+        'version': version,
+        'artifact_path': path,
+        'trained_at': trained_at.isoformat(),
+        'sample_count': int(len(features)),
+        'metrics': metrics
+    }
+
+def load_model_bundle(path: str) -> MasterModelBundle:
+    payload = joblib.load(path)
+    return MasterModelBundle(
+        version=payload['version'],
+        models=payload['models'],
+        scaler=payload['scaler'],
+        feature_names=tuple(payload['feature_names']),
+        trained_at=datetime.fromisoformat(payload['trained_at']),
+        sample_count=payload['sample_count'],
+        metrics=payload.get('metrics', {})
+    )
+
+class MasterModelTrainer:
+    """
+    Collects per-cycle campaign samples and retrains the master models on a
+    process pool, off the request path. With Supabase attached, the database
+    allocates each generation's version, the artifact is uploaded to a shared
+    Storage bucket so every host can load it, and the registry row is marked
+    ready. Each generation is published by swapping `current` in a single assignment.
+    Every process polls the registry, so generations trained elsewhere are
+    picked up without a restart.
+    """
+
+    SAMPLES_TABLE = 'master_ai_training_samples'
+    VERSIONS_TABLE = 'master_ai_model_versions'
+    PAGE_SIZE = 1000
+
+    def __init__(self, model_dir: str = DEFAULT_MODEL_DIR, min_new_samples: int = 500,
+                 retrain_interval_seconds: float = 6 * 3600, max_samples: int = 50000,
+                 model_bucket: str = DEFAULT_MODEL_BUCKET, poll_seconds: float = 300.0):
+        self.model_dir = model_dir
+        self.model_bucket = model_bucket
+        self.min_new_samples = min_new_samples
+        self.retrain_interval_seconds = retrain_interval_seconds
+        self.max_samples = max_samples
+        self.poll_seconds = poll_seconds
+        self.supabase = None
+        self.current: Optional[MasterModelBundle] = None
+        self.last_error: Optional[str] = None
+        self._samples: deque = deque(maxlen=max_samples)
+        self._new_samples = 0
+        self._trained_at = 0.0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._train_lock = asyncio.Lock()
+
+    def attach(self, supabase_client):
+        self.supabase = supabase_client
+
+    def start(self):
+        """Load the latest persisted models now, then poll for newer generations in the background"""
+        if self._poll_task is None or self._poll_task.done():
+            self._poll_task = asyncio.create_task(self._poll_loop())
+
+    async def close(self):
+        for task in (self._poll_task, self._task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._poll_task = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def record_cycle(self, platform_data: Dict[str, List[Any]], execution_results: Dict[str, Any]) -> int:
+        """Store one optimization cycle's campaign metrics as training samples"""
+        cycle_id = str(uuid.uuid4())
+        recorded_at = datetime.utcnow().isoformat()
+        rows = [
+            {
+                'cycle_id': cycle_id,
+                'recorded_at': recorded_at,
+                'platform': metric.platform,
+                'campaign_id': metric.campaign_id,
+                'roas': metric.roas,
+                'cpa': metric.cpa,
+                'conversion_rate': metric.conversion_rate,
+                'ctr': metric.ctr,
+                'quality_score': metric.quality_score,
+                'confidence_score': metric.confidence_score,
+                'performance_trend': metric.performance_trend,
+                'roi_improvement': execution_results.get('total_roi_improvement', 0)
+            }
+            for metrics in platform_data.values()
+            for metric in metrics
+        ]
+        if not rows:
+            return 0
+
+        if self.supabase is not None:
+            try:
+                await asyncio.to_thread(lambda: self.supabase.table(self.SAMPLES_TABLE).insert(rows).execute())
+            except Exception as e:
+                logger.error(f"❌ Failed to store training samples for cycle {cycle_id}: {str(e)}")
+                return 0
+        else:
+            self._samples.extend(rows)
+
+        self._new_samples += len(rows)
+        self.schedule_if_due()
+        return len(rows)
+
+    def schedule_if_due(self) -> bool:
+        """Start a background retrain when enough new samples have arrived"""
+        if self._new_samples < self.min_new_samples:
+            return False
+        if time.monotonic() - self._trained_at < self.retrain_interval_seconds and self.current is not None:
+            return False
+        return self.trigger()
+
+    def trigger(self) -> bool:
+        """Start a background retrain unless one is already running"""
+        if self._train_lock.locked() or (self._task is not None and not self._task.done()):
+            return False
+        self._task = asyncio.create_task(self.train())
+        return True
+
+    async def train(self) -> Optional[MasterModelBundle]:
+        """Fit a new model generation on the worker pool and hot-swap it in"""
+        async with self._train_lock:
+            self._trained_at = time.monotonic()
+            pending = self._new_samples
+            version = None
+            try:
+                samples = await self._load_samples()
+                version = await self._reserve_version()
+                loop = asyncio.get_running_loop()
+                artifact = await loop.run_in_executor(self._get_pool(), train_master_models, samples, version, self.model_dir)
+                bundle = await asyncio.to_thread(load_model_bundle, artifact['artifact_path'])
+                await self._register_version(artifact)
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    # A crashed worker poisons the pool; start a fresh one next time
+                    self._pool = None
+                if version is not None:
+                    await self._mark_version_failed(version)
+                self.last_error = str(e)
+                logger.error(f"❌ Master model training failed: {str(e)}")
+                return None
+
+            self._new_samples = max(0, self._new_samples - pending)
+            self.current = bundle
+            self.last_error = None
+            logger.info(f"🧠 Master models v{bundle.version} trained on {bundle.sample_count} samples")
+            return bundle
+
+    async def _poll_loop(self):
+        while True:
+            await self.load_latest()
+            await asyncio.sleep(self.poll_seconds)
+
+    async def load_latest(self) -> Optional[MasterModelBundle]:
+        """Publish the newest persisted model generation if it is newer than the current one"""
+        try:
+            latest = await self._latest_version()
+            if latest is None:
+                if self.current is None:
+                    logger.info("No persisted master models found; waiting for first training run")
+                return self.current
+            version, artifact = latest
+            if self.current is not None and version <= self.current.version:
+                return self.current
+            path = await self._artifact_path(artifact)
+            bundle = await asyncio.to_thread(load_model_bundle, path)
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"❌ Failed to load persisted master models: {str(e)}")
+            return None
+
+        if self.current is None or bundle.version > self.current.version:
+            self.current = bundle
+            logger.info(f"🧠 Loaded master models v{bundle.version}")
+        return self.current
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned workers do not inherit the event loop or client threads
+            self._pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    async def _load_samples(self) -> List[Dict[str, Any]]:
+        if self.supabase is None:
+            return list(self._samples)
+
+        def fetch() -> List[Dict[str, Any]]:
+            rows: List[Dict[str, Any]] = []
+            while len(rows) < self.max_samples:
+                page = (
+                    self.supabase.table(self.SAMPLES_TABLE)
+                    .select('platform,campaign_id,recorded_at,roas,cpa,conversion_rate,ctr,quality_score,confidence_score,performance_trend')
+                    # Every sample from one cycle shares recorded_at; id makes the offset pages stable
+                    .order('recorded_at', desc=True)
+                    .order('id', desc=True)
+                    .range(len(rows), len(rows) + self.PAGE_SIZE - 1)
+                    .execute()
+                ).data or []
+                rows.extend(page)
+                if len(page) < self.PAGE_SIZE:
+                    break
+            return rows
+
+        return await asyncio.to_thread(fetch)
+
+    async def _reserve_version(self) -> int:
+        """Allocate the next version; the registry's identity column hands each worker a distinct one"""
+        if self.supabase is None:
+            latest = max(self.current.version if self.current else 0, max(self._local_versions(), default=(0, ''))[0])
+            return latest + 1
+        result = await asyncio.to_thread(
+            lambda: self.supabase.table(self.VERSIONS_TABLE)
+            .insert({'status': 'training', 'host': socket.gethostname()})
+            .execute()
+        )
+        return int(result.data[0]['version'])
+
+    async def _register_version(self, artifact: Dict[str, Any]):
+        """Upload the artifact to shared storage, then mark its registry row ready"""
+        if self.supabase is None:
+            return
+        object_key = os.path.basename(artifact['artifact_path'])
+
+        def upload():
+            with open(artifact['artifact_path'], 'rb') as file:
+                self.supabase.storage.from_(self.model_bucket).upload(
+                    object_key, file.read(), {'content-type': 'application/octet-stream', 'upsert': 'true'}
+                )
+
+        await asyncio.to_thread(upload)
+        row = {
+            'artifact_path': object_key,
+            'trained_at': artifact['trained_at'],
+            'sample_count': artifact['sample_count'],
+            'metrics': artifact['metrics'],
+            'status': 'ready'
+        }
+        await asyncio.to_thread(
+            lambda: self.supabase.table(self.VERSIONS_TABLE).update(row).eq('version', artifact['version']).execute()
+        )
+
+    async def _mark_version_failed(self, version: int):
+        if self.supabase is None:
+            return
+        try:
+            await asyncio.to_thread(
+                lambda: self.supabase.table(self.VERSIONS_TABLE).update({'status': 'failed'}).eq('version', version).execute()
+            )
+        except Exception as e:
+            logger.error(f"❌ Failed to mark master models v{version} as failed: {str(e)}")
+
+    async def _latest_version(self) -> Optional[Tuple[int, str]]:
+        """(version, artifact) of the newest ready generation: a storage key, or a local file name without Supabase"""
+        if self.supabase is None:
+            versions = self._local_versions()
+            return max(versions) if versions else None
+
+        result = await asyncio.to_thread(
+            lambda: self.supabase.table(self.VERSIONS_TABLE)
+            .select('version,artifact_path')
+            .eq('status', 'ready')
+            .order('version', desc=True)
+            .limit(1)
+            .execute()
+        )
+        if not result.data:
+            return None
+        return int(result.data[0]['version']), result.data[0]['artifact_path']
+
+    async def _artifact_path(self, object_key: str) -> str:
+        """Local path of an artifact, downloading it from shared storage if this host lacks it"""
+        path = os.path.join(self.model_dir, os.path.basename(object_key))
+        if self.supabase is None or os.path.exists(path):
+            return path
+
+        def download():
+            # Raises if the registered artifact is missing, so a bad registry row is reported, not skipped
+            content = self.supabase.storage.from_(self.model_bucket).download(object_key)
+            os.makedirs(self.model_dir, exist_ok=True)
+            temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temporary, 'wb') as file:
+                file.write(content)
+            os.replace(temporary, path)
+
+        await asyncio.to_thread(download)
+        logger.info(f"📥 Downloaded master models artifact {object_key} from storage")
+        return path
+
+    def _local_versions(self) -> List[Tuple[int, str]]:
+        if not os.path.isdir(self.model_dir):
+            return []
+        versions = []
+        for name in os.listdir(self.model_dir):
+            if name.startswith('master_models_v') and name.endswith('.joblib'):
+                try:
+                    versions.append((int(name[len('master_models_v'):-len('.joblib')]), name))
+                except ValueError:
+                    continue
+        return versions
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'current': self.current.summary() if self.current else None,
+            'training': self._train_lock.locked(),
+            'pending_samples': self._new_samples,
+            'last_error': self.last_error,
+            'persistent': self.supabase is not None
+        }
+
+# Process-wide trainer shared by the master controller instances
+master_model_trainer = MasterModelTrainer()
+
+__all__ = [
+    'MasterModelTrainer',
+    'MasterModelBundle',
+    'MASTER_MODEL_SPECS',
+    'FEATURE_NAMES',
+    'master_model_trainer'
+]
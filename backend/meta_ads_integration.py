@@ -4,14 +4,18 @@ Provides backend endpoints for Meta (Facebook) Ads integration
 """
 
 import os
+from contextlib import aclosing
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-import requests
+from typing import AsyncIterator, List, Dict, Any, Optional
+import httpx
 from fastapi import HTTPException
 
+from platform_http import platform_http, paginate
+
 # Meta Ads API Configuration
 META_API_BASE = "https://graph.facebook.com/v18.0"
 META_API_VERSION = "v18.0"
+META_PAGE_SIZE = 500  # Campaigns requested per Graph API page
 
 class MetaAdsClient:
     def __init__(self, access_token: str, ad_account_id: str):
@@ -19,7 +23,7 @@ class MetaAdsClient:
         self.ad_account_id = ad_account_id
         self.base_url = META_API_BASE
         
-    def _make_request(self, endpoint: str, method: str = "GET", params: dict = None, data: dict = None) -> dict:
+    async def _make_request(self, endpoint: str, method: str = "GET", params: dict = None, data: dict = None) -> dict:
         """Make authenticated request to Meta Ads API"""
         url = f"{self.base_url}/{endpoint}"
         
@@ -32,32 +36,27 @@ class MetaAdsClient:
             'Content-Type': 'application/json',
         }
         
+        if method not in ("GET", "POST", "PUT", "DELETE"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
         try:
-            if method == "GET":
-                response = requests.get(url, params=params, headers=headers, timeout=30)
-            elif method == "POST":
-                response = requests.post(url, params=params, json=data, headers=headers, timeout=30)
-            elif method == "PUT":
-                response = requests.put(url, params=params, json=data, headers=headers, timeout=30)
-            elif method == "DELETE":
-                response = requests.delete(url, params=params, headers=headers, timeout=30)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-                
-            response.raise_for_status()
+            response = await platform_http.request(
+                method, url, params=params, json=data if method in ("POST", "PUT") else None, headers=headers,
+                platform='meta_ads', account_id=self.ad_account_id
+            )
             return response.json()
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             raise HTTPException(status_code=500, detail=f"Meta API request failed: {str(e)}")
     
-    def test_connection(self) -> dict:
+    async def test_connection(self) -> dict:
         """Test Meta Ads API connection"""
         try:
             # Test with user info endpoint
-            response = self._make_request("me", params={'fields': 'id,name'})
+            response = await self._make_request("me", params={'fields': 'id,name'})
             
             # Test ad account access
-            ad_account_response = self._make_request(
+            ad_account_response = await self._make_request(
                 f"act_{self.ad_account_id}",
                 params={'fields': 'id,name,account_status'}
             )
@@ -73,21 +72,40 @@ class MetaAdsClient:
                 'error': str(e)
             }
     
-    def get_campaigns(self, limit: int = 25) -> List[Dict[str, Any]]:
-        """Retrieve Meta Ad campaigns"""
+    async def iter_campaigns(self, page_size: int = META_PAGE_SIZE) -> AsyncIterator[Dict[str, Any]]:
+        """Stream every campaign in the ad account, following the paging cursors"""
+        params = {
+            'fields': 'id,name,status,objective,daily_budget,lifetime_budget,start_time,stop_time,created_time,updated_time',
+            'limit': page_size
+        }
+
+        async def fetch_page(after):
+            page_params = dict(params, after=after) if after else dict(params)
+            response = await self._make_request(f"act_{self.ad_account_id}/campaigns", params=page_params)
+            paging = response.get('paging', {})
+            # Graph API omits paging.next on the last page
+            after = paging.get('cursors', {}).get('after') if paging.get('next') else None
+            return response.get('data', []), after
+
+        async for page in paginate(fetch_page):
+            for campaign in page:
+                yield campaign
+
+    async def get_campaigns(self, limit: int = 25) -> List[Dict[str, Any]]:
+        """Retrieve up to `limit` Meta Ad campaigns"""
         try:
-            params = {
-                'fields': 'id,name,status,objective,daily_budget,lifetime_budget,start_time,stop_time,created_time,updated_time',
-                'limit': limit
-            }
-            
-            response = self._make_request(f"act_{self.ad_account_id}/campaigns", params=params)
-            return response.get('data', [])
+            campaigns = []
+            async with aclosing(self.iter_campaigns(page_size=min(limit, META_PAGE_SIZE))) as stream:
+                async for campaign in stream:
+                    campaigns.append(campaign)
+                    if len(campaigns) >= limit:
+                        break
+            return campaigns
             
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to get Meta campaigns: {str(e)}")
     
-    def get_campaign_insights(self, campaign_id: str, start_date: str, end_date: str) -> Dict[str, Any]:
+    async def get_campaign_insights(self, campaign_id: str, start_date: str, end_date: str) -> Dict[str, Any]:
         """Get campaign performance insights"""
         try:
             params = {
@@ -96,7 +114,7 @@ class MetaAdsClient:
                 'level': 'campaign'
             }
             
-            response = self._make_request(f"{campaign_id}/insights", params=params)
+            response = await self._make_request(f"{campaign_id}/insights", params=params)
             
             if response.get('data'):
                 return response['data'][0]  # Return first (should be only) result
@@ -106,7 +124,7 @@ class MetaAdsClient:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to get Meta campaign insights: {str(e)}")
     
-    def get_account_insights(self, start_date: str, end_date: str) -> Dict[str, Any]:
+    async def get_account_insights(self, start_date: str, end_date: str) -> Dict[str, Any]:
         """Get account-level performance insights"""
         try:
             params = {
@@ -115,7 +133,7 @@ class MetaAdsClient:
                 'level': 'account'
             }
             
-            response = self._make_request(f"act_{self.ad_account_id}/insights", params=params)
+            response = await self._make_request(f"act_{self.ad_account_id}/insights", params=params)
             
             if response.get('data'):
                 return response['data'][0]
@@ -146,7 +164,7 @@ async def get_meta_ads_status() -> Dict[str, Any]:
             'error': 'Meta Ads credentials not configured'
         }
     
-    return client.test_connection()
+    return await client.test_connection()
 
 async def get_meta_ads_campaigns(limit: int = 25) -> List[Dict[str, Any]]:
     """Get Meta Ads campaigns"""
@@ -154,7 +172,7 @@ async def get_meta_ads_campaigns(limit: int = 25) -> List[Dict[str, Any]]:
     if not client:
         raise HTTPException(status_code=400, detail="Meta Ads not configured")
     
-    return client.get_campaigns(limit)
+    return await client.get_campaigns(limit)
 
 async def get_meta_ads_performance(
     campaign_id: Optional[str] = None,
@@ -174,7 +192,7 @@ async def get_meta_ads_performance(
     
     if campaign_id:
         # Get specific campaign performance
-        return client.get_campaign_insights(campaign_id, start_date_str, end_date_str)
+        return await client.get_campaign_insights(campaign_id, start_date_str, end_date_str)
     else:
         # Get account-level performance
-        return client.get_account_insights(start_date_str, end_date_str)
\ No newline at end of file
+        return await client.get_account_insights(start_date_str, end_date_str)
\ No newline at end of file
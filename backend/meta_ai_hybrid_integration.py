@@ -3,14 +3,16 @@
 # Enhanced symbiotic intelligence system
 
 import asyncio
+import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
+
+from decision_audit_log import DecisionAuditLog, decision_audit_log
+from master_model_training import MasterModelTrainer, MasterModelBundle, master_model_trainer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -62,48 +64,36 @@ class PulseBridgeAIMasterController:
     Coordinates all platform AIs including Meta AI as specialized tool
     """
     
-    def __init__(self, supabase_client, meta_integration, config: Dict[str, Any]):
+    def __init__(self, supabase_client, meta_integration, config: Dict[str, Any],
+                 model_trainer: Optional[MasterModelTrainer] = None,
+                 audit_log: Optional[DecisionAuditLog] = None):
         self.supabase = supabase_client
         self.meta_integration = meta_integration
         self.config = config
-        self.ml_models = {}
+        self.model_trainer = model_trainer or master_model_trainer
+        self.audit_log = audit_log or decision_audit_log
+        if supabase_client is not None and self.audit_log.supabase is None:
+            self.audit_log.attach(supabase_client)
         self.decision_history = []
         self.platform_performances = {}
         self.initialize_master_ai()
     
     def initialize_master_ai(self):
         """Initialize master AI with cross-platform intelligence"""
-        # Cross-platform performance predictor
-        self.ml_models['cross_platform_optimizer'] = RandomForestRegressor(
-            n_estimators=200,
-            max_depth=15,
-            random_state=42
-        )
-        
-        # Meta AI integration analyzer
-        self.ml_models['meta_ai_analyzer'] = RandomForestRegressor(
-            n_estimators=150,
-            max_depth=12,
-            random_state=42
-        )
-        
-        # Budget allocation optimizer
-        self.ml_models['budget_allocator'] = RandomForestRegressor(
-            n_estimators=175,
-            max_depth=14,
-            random_state=42
-        )
-        
-        # Performance attribution model
-        self.ml_models['attribution_model'] = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42
-        )
-        
-        self.scaler = StandardScaler()
+        # Models are trained and loaded in the background by the model trainer;
+        # nothing is built here so the first cycle does not pay for it
         logger.info("🧠 PulseBridge AI Master Controller initialized")
     
+    @property
+    def model_bundle(self) -> Optional[MasterModelBundle]:
+        """Current model generation; read once per use so a hot swap cannot split a prediction"""
+        return self.model_trainer.current
+    
+    @property
+    def ml_models(self) -> Dict[str, Any]:
+        bundle = self.model_bundle
+        return bundle.models if bundle else {}
+    
     async def master_optimization_cycle(self) -> Dict[str, Any]:
         """
         Master AI optimization cycle
@@ -157,26 +147,32 @@ class PulseBridgeAIMasterController:
             }
     
     async def gather_cross_platform_data(self) -> Dict[str, List[CrossPlatformMetrics]]:
-        """Gather performance data from all advertising platforms"""
-        platform_data = {}
-        
-        # Meta platform data (processed through Meta AI)
-        meta_data = await self.get_meta_platform_data()
-        platform_data['meta'] = meta_data
-        
-        # Google Ads data
-        google_data = await self.get_google_ads_data()
-        platform_data['google_ads'] = google_data
-        
-        # LinkedIn data
-        linkedin_data = await self.get_linkedin_data()
-        platform_data['linkedin'] = linkedin_data
-        
-        # Pinterest data
-        pinterest_data = await self.get_pinterest_data()
-        platform_data['pinterest'] = pinterest_data
+        """Gather performance data from all advertising platforms concurrently"""
+        fetchers = {
+            'meta': self.get_meta_platform_data,  # Processed through Meta AI
+            'google_ads': self.get_google_ads_data,
+            'linkedin': self.get_linkedin_data,
+            'pinterest': self.get_pinterest_data
+        }
         
-        return platform_data
+        results = await asyncio.gather(*(
+            self._fetch_platform_with_timeout(platform, fetch) for platform, fetch in fetchers.items()
+        ))
+        return dict(zip(fetchers.keys(), results))
+    
+    async def _fetch_platform_with_timeout(self, platform: str, fetch) -> List[CrossPlatformMetrics]:
+        """Run one platform fetch under its timeout; a slow or failing platform yields no data"""
+        timeout = self.config.get('platform_timeouts', {}).get(
+            platform, self.config.get('platform_timeout_seconds', 30)
+        )
+        try:
+            return await asyncio.wait_for(fetch(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ {platform} data fetch timed out after {timeout}s")
+            return []
+        except Exception as e:
+            logger.error(f"❌ Failed to get {platform} data: {str(e)}")
+            return []
     
     async def get_meta_platform_data(self) -> List[CrossPlatformMetrics]:
         """Get Meta platform data enhanced by Meta AI insights"""
@@ -187,36 +183,30 @@ class PulseBridgeAIMasterController:
                 level='campaign'
             )
             
-            processed_metrics = []
-            for insight in meta_insights.get('insights', []):
-                # Calculate key metrics
-                roas = float(insight.get('roas', 0))
-                cpa = self.calculate_cpa(insight)
-                ctr = float(insight.get('ctr', 0))
-                conversion_rate = self.calculate_conversion_rate(insight)
-                
+            insights = meta_insights.get('insights', [])
+            
+            # Performance trends for every campaign from one bulk snapshot query
+            trends = await self.calculate_performance_trends(
+                [insight.get('campaign_id') for insight in insights], 'meta'
+            )
+            
+            async def enrich(insight: Dict) -> CrossPlatformMetrics:
                 # Get Meta AI confidence score for this campaign
                 confidence_score = await self.get_meta_ai_confidence(insight)
                 
-                # Determine performance trend
-                performance_trend = await self.calculate_performance_trend(
-                    insight.get('campaign_id'), 'meta'
-                )
-                
-                metrics = CrossPlatformMetrics(
+                return CrossPlatformMetrics(
                     platform='meta',
                     campaign_id=insight.get('campaign_id'),
-                    roas=roas,
-                    cpa=cpa,
-                    conversion_rate=conversion_rate,
-                    ctr=ctr,
+                    roas=float(insight.get('roas', 0)),
+                    cpa=self.calculate_cpa(insight),
+                    conversion_rate=self.calculate_conversion_rate(insight),
+                    ctr=float(insight.get('ctr', 0)),
                     quality_score=insight.get('relevance_score', 5.0),
                     confidence_score=confidence_score,
-                    performance_trend=performance_trend
+                    performance_trend=trends.get(insight.get('campaign_id'), 'unknown')
                 )
-                processed_metrics.append(metrics)
             
-            return processed_metrics
+            return list(await asyncio.gather(*(enrich(insight) for insight in insights)))
             
         except Exception as e:
             logger.error(f"❌ Failed to get Meta platform data: {str(e)}")
@@ -399,7 +389,7 @@ class PulseBridgeAIMasterController:
                     execution_results['executed_decisions'].append(execution_result)
                     execution_results['total_roi_improvement'] += decision.estimated_roi_improvement
                     
-                    # Log to database
+                    # Queue for the audit trail; written in batches in the background
                     await self.log_decision_to_database(decision, execution_result)
                     
                 except Exception as e:
@@ -443,29 +433,43 @@ class PulseBridgeAIMasterController:
             return {'success': False, 'error': str(e)}
     
     async def log_decision_to_database(self, decision: AIDecisionLog, execution_result: Dict) -> None:
-        """Log AI decision to database for audit trail and learning"""
+        """Queue AI decision for the database audit trail; does not wait on the write"""
         try:
+            implemented = bool(execution_result.get('success'))
+            # One ai_insights row; platform campaign ids are not campaigns.id UUIDs,
+            # so the full decision goes in results rather than the campaign_id column
             decision_record = {
-                'decision_id': decision.decision_id,
-                'timestamp': decision.timestamp.isoformat(),
-                'decision_type': decision.decision_type.value,
-                'platform_affected': decision.platform_affected,
-                'campaign_id': decision.campaign_id,
-                'override_reason': decision.override_reason.value if decision.override_reason else None,
-                'confidence_score': decision.confidence_score,
-                'expected_impact': decision.expected_impact,
-                'meta_ai_input': decision.meta_ai_input,
-                'action_taken': decision.action_taken,
-                'execution_result': execution_result,
-                'estimated_roi_improvement': decision.estimated_roi_improvement
+                'insight_type': 'ai_decision',
+                'priority': 'high' if decision.override_reason else 'medium',
+                'title': f"{decision.decision_type.value.replace('_', ' ').title()} on {decision.platform_affected}",
+                'description': decision.override_reason.value if decision.override_reason else None,
+                'recommendation': decision.action_taken,
+                'confidence_score': round(min(1.0, max(0.0, decision.confidence_score)), 2),
+                'expected_impact': json.dumps(decision.expected_impact, default=str),
+                'ai_model_used': 'pulsebridge_master_ai',
+                'implemented': implemented,
+                'implemented_at': decision.timestamp.isoformat() if implemented else None,
+                'results': {
+                    'decision_id': decision.decision_id,
+                    'timestamp': decision.timestamp.isoformat(),
+                    'decision_type': decision.decision_type.value,
+                    'platform_affected': decision.platform_affected,
+                    'campaign_id': decision.campaign_id,
+                    'override_reason': decision.override_reason.value if decision.override_reason else None,
+                    'expected_impact': decision.expected_impact,
+                    'meta_ai_input': decision.meta_ai_input,
+                    'execution_result': execution_result,
+                    'estimated_roi_improvement': decision.estimated_roi_improvement
+                },
+                'created_at': decision.timestamp.isoformat()
             }
             
-            # Insert into ai_insights table with enhanced data
-            result = self.supabase.table('ai_insights').insert(decision_record).execute()
-            logger.info(f"📝 Logged decision {decision.decision_id} to database")
+            # Written to the ai_insights table in multi-row batches
+            self.audit_log.submit(decision_record)
+            logger.info(f"📝 Queued decision {decision.decision_id} for audit log")
             
         except Exception as e:
-            logger.error(f"❌ Failed to log decision to database: {str(e)}")
+            logger.error(f"❌ Failed to queue decision for audit log: {str(e)}")
     
     # Utility methods for calculations and analysis
     def calculate_cpa(self, insight: Dict) -> float:
@@ -493,30 +497,80 @@ class PulseBridgeAIMasterController:
     
     async def calculate_performance_trend(self, campaign_id: str, platform: str) -> str:
         """Calculate performance trend for campaign"""
+        trends = await self.calculate_performance_trends([campaign_id], platform)
+        return trends.get(campaign_id, 'unknown')
+    
+    async def calculate_performance_trends(self, campaign_ids: List[str], platform: str) -> Dict[str, str]:
+        """
+        Calculate performance trends for many campaigns from one snapshot query.
+        Compares mean ROAS of each campaign's 3 most recent snapshots with the 3 before them.
+        """
+        campaign_ids = [campaign_id for campaign_id in dict.fromkeys(campaign_ids) if campaign_id]
+        if not campaign_ids:
+            return {}
+        
         try:
-            # Get historical performance data
-            historical_data = self.supabase.table('performance_snapshots').select('*').eq('campaign_id', campaign_id).order('date', desc=True).limit(7).execute()
-            
-            if len(historical_data.data) < 3:
-                return "insufficient_data"
-            
-            # Calculate trend based on ROAS changes
-            recent_roas = [float(d.get('roas', 0)) for d in historical_data.data[:3]]
-            older_roas = [float(d.get('roas', 0)) for d in historical_data.data[3:6]]
-            
-            recent_avg = np.mean(recent_roas)
-            older_avg = np.mean(older_roas)
-            
-            if recent_avg > older_avg * 1.1:
-                return "improving"
-            elif recent_avg < older_avg * 0.9:
-                return "declining"
-            else:
-                return "stable"
-                
+            rows = await self._fetch_recent_snapshots(campaign_ids)
         except Exception as e:
-            logger.error(f"❌ Failed to calculate performance trend: {str(e)}")
-            return "unknown"
+            logger.error(f"❌ Failed to calculate performance trends: {str(e)}")
+            return {campaign_id: "unknown" for campaign_id in campaign_ids}
+        
+        # Latest 7 snapshots per campaign, newest first, as a NaN-padded matrix
+        position = {campaign_id: i for i, campaign_id in enumerate(campaign_ids)}
+        roas = np.full((len(campaign_ids), 7), np.nan)
+        counts = np.zeros(len(campaign_ids), dtype=int)
+        for row in sorted(rows, key=lambda r: r['date'], reverse=True):
+            i = position.get(str(row['campaign_id']))
+            if i is None or counts[i] >= 7:
+                continue
+            roas[i, counts[i]] = float(row.get('roas') or 0)
+            counts[i] += 1
+        
+        def window_mean(window: np.ndarray) -> np.ndarray:
+            observed = (~np.isnan(window)).sum(axis=1)
+            return np.where(observed > 0, np.nansum(window, axis=1) / np.maximum(observed, 1), np.nan)
+        
+        recent_avg = window_mean(roas[:, :3])
+        older_avg = window_mean(roas[:, 3:6])
+        
+        # Without older snapshots neither comparison holds and the trend is stable
+        trend = np.select(
+            [counts < 3, recent_avg > older_avg * 1.1, recent_avg < older_avg * 0.9],
+            ["insufficient_data", "improving", "declining"],
+            "stable"
+        )
+        return dict(zip(campaign_ids, trend.tolist()))
+    
+    async def _fetch_recent_snapshots(self, campaign_ids: List[str]) -> List[Dict[str, Any]]:
+        """Recent performance_snapshots rows for a set of campaigns, paged and chunked by id"""
+        since = (datetime.now() - timedelta(days=self.config.get('trend_lookback_days', 14))).date().isoformat()
+        # ~39 URL-encoded bytes per UUID in the in_() filter; 150 ids (~6 KB) keeps the URL under common 8 KB limits
+        chunk_size = self.config.get('snapshot_query_chunk_size', 150)
+        page_size = 1000
+        rows: List[Dict[str, Any]] = []
+        
+        for start in range(0, len(campaign_ids), chunk_size):
+            chunk = campaign_ids[start:start + chunk_size]
+            offset = 0
+            while True:
+                page = await asyncio.to_thread(
+                    lambda: self.supabase.table('performance_snapshots')
+                    .select('campaign_id,date,roas')
+                    .in_('campaign_id', chunk)
+                    .gte('date', since)
+                    # Every campaign in a chunk shares each date; the unique tiebreaker keeps offset pages stable
+                    .order('date', desc=True)
+                    .order('campaign_id')
+                    .order('id')
+                    .range(offset, offset + page_size - 1)
+                    .execute()
+                )
+                rows.extend(page.data or [])
+                if len(page.data or []) < page_size:
+                    break
+                offset += page_size
+        
+        return rows
     
     def calculate_meta_optimization_potential(self, metric: CrossPlatformMetrics) -> float:
         """Calculate how much Meta AI can optimize this campaign"""
@@ -590,10 +644,9 @@ class PulseBridgeAIMasterController:
         return []
     
     async def update_master_models(self, platform_data: Dict, execution_results: Dict) -> None:
-        """Update master AI models with latest performance data"""
-        # Update ML models with new data
-        # This would involve retraining models with recent performance data
-        logger.info("🧠 Updated master AI models with latest data")
+        """Store the cycle as training data; retraining runs in the background when due"""
+        recorded = await self.model_trainer.record_cycle(platform_data, execution_results)
+        logger.info(f"🧠 Recorded {recorded} campaign samples for master model training")
     
     async def execute_budget_reallocation(self, decision: AIDecisionLog) -> Dict[str, Any]:
         """Execute budget reallocation across platforms"""
@@ -11,16 +11,150 @@ This module handles Meta Business API integration for PulseBridge AI
 """
 
 import os
-import requests
+import asyncio
+import httpx
 import json
+import time
+from contextlib import aclosing
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any, Set, Tuple
+from urllib.parse import urlencode
 import logging
 
+from platform_http import platform_http, paginate, RetryPolicy
+from platform_rate_limiter import PlatformRateLimiter, rate_limiter
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Graph API batch requests accept at most 50 operations
+GRAPH_BATCH_LIMIT = 50
+# How long a read waits for others to share its batch
+GRAPH_BATCH_WINDOW_SECONDS = 0.005
+GRAPH_BATCH_CONCURRENCY = 4
+
+# Above this many campaigns, insights come from one async report run instead of batches
+ASYNC_INSIGHTS_THRESHOLD = 500
+ASYNC_REPORT_POLL_SECONDS = 2.0
+ASYNC_REPORT_TIMEOUT_SECONDS = 600.0
+
+INSIGHTS_FIELDS = 'impressions,clicks,ctr,cpc,cpm,reach,spend,actions,action_values'
+CAMPAIGN_FIELDS = 'id,name,status,objective,daily_budget,lifetime_budget,created_time,updated_time,start_time,stop_time'
+
+# A batch of reads is safe to resend, so it retries like a GET despite being a POST
+READ_BATCH_RETRY = RetryPolicy(idempotent_methods=RetryPolicy().idempotent_methods | {'POST'})
+
+class GraphBatcher:
+    """
+    Coalesces Graph API reads issued within a few milliseconds of each other
+    into batch requests of up to 50 operations. A read that ends up alone is
+    sent as a plain GET. Operations the Graph API drops from a batch (null
+    responses) are resent once.
+    """
+
+    def __init__(self, api: 'MetaBusinessAPI', window_seconds: float = GRAPH_BATCH_WINDOW_SECONDS,
+                 max_concurrency: int = GRAPH_BATCH_CONCURRENCY):
+        self.api = api
+        self.window_seconds = window_seconds
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self.operations = 0
+        self.http_requests = 0
+
+    async def get(self, relative_url: str) -> Dict:
+        """Read `relative_url` (path plus query string) as part of the next batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((relative_url, future))
+        if len(self._pending) >= GRAPH_BATCH_LIMIT:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.ensure_future(self._send(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, pending: List[Tuple[str, asyncio.Future]], resend: bool = True):
+        dropped: List[Tuple[str, asyncio.Future]] = []
+        async with self._semaphore:
+            self.operations += len(pending)
+            self.http_requests += 1
+            if len(pending) == 1:
+                relative_url, future = pending[0]
+                try:
+                    result = await self.api._make_request('GET', relative_url)
+                    if not future.done():
+                        future.set_result(result)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            operations = [{'method': 'GET', 'relative_url': relative_url} for relative_url, _ in pending]
+            try:
+                # Meta counts every operation in a batch against the rate limit
+                responses = await self.api._make_request(
+                    'POST', '',
+                    data={'batch': json.dumps(operations), 'include_headers': 'false'},
+                    retry=READ_BATCH_RETRY,
+                    cost=len(pending)
+                )
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            throttled = False
+            for (relative_url, future), response in zip(pending, responses):
+                if future.done():
+                    continue
+                if response is None:
+                    dropped.append((relative_url, future))
+                    continue
+                try:
+                    body = json.loads(response.get('body') or '{}')
+                except ValueError:
+                    body = {}
+                if response.get('code') == 200:
+                    future.set_result(body)
+                elif PlatformRateLimiter.is_throttle_error(response.get('code'), body) and resend:
+                    # Resent once after the paused bucket lets the account call again
+                    throttled = True
+                    dropped.append((relative_url, future))
+                else:
+                    message = body.get('error', {}).get('message', f"HTTP {response.get('code')}")
+                    future.set_exception(Exception(f"Meta API Error: {message}"))
+            if throttled:
+                # One backoff per batch; throttled operations share a single quota
+                rate_limiter.record_throttle('meta_ads', self.api.ad_account_id)
+
+        if dropped:
+            if resend:
+                await self._send(dropped, resend=False)
+            else:
+                for _, future in dropped:
+                    if not future.done():
+                        future.set_exception(Exception("Meta API Error: batch operation timed out"))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'operations': self.operations,
+            'http_requests': self.http_requests,
+            'pending': len(self._pending)
+        }
+
 class MetaBusinessAPI:
     """Meta Business API Integration for PulseBridge AI"""
     
@@ -42,34 +176,45 @@ class MetaBusinessAPI:
         self.account_currency = "USD"
         self.account_timezone = "America/Los_Angeles"
         
+        # Concurrent reads share Graph API batch requests
+        self.batcher = GraphBatcher(self)
+        
         logger.info(f"✅ MetaBusinessAPI initialized for account: {self.account_name}")
     
-    def _make_request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None) -> Dict:
+    async def _make_request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None,
+                            retry: Optional[RetryPolicy] = None, cost: float = 1.0) -> Dict:
         """Make API request with error handling"""
         url = f"{self.base_url}/{endpoint}"
+        method = method.upper()
+        if method not in ('GET', 'POST', 'PUT'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
         
         try:
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            elif method.upper() == 'POST':
-                response = requests.post(url, headers=self.headers, params=params, json=data, timeout=30)
-            elif method.upper() == 'PUT':
-                response = requests.put(url, headers=self.headers, params=params, json=data, timeout=30)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
+            response = await platform_http.request(
+                method, url,
+                params=params,
+                json=data if method in ('POST', 'PUT') else None,
+                headers=self.headers,
+                retry=retry,
+                platform='meta_ads',
+                account_id=self.ad_account_id,
+                cost=cost
+            )
             return response.json()
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Meta API request failed: {e}")
             raise Exception(f"Meta API Error: {e}")
     
-    def get_account_info(self) -> Dict[str, Any]:
+    @staticmethod
+    def _relative_url(endpoint: str, params: Optional[Dict] = None) -> str:
+        return f"{endpoint}?{urlencode(params)}" if params else endpoint
+    
+    async def get_account_info(self) -> Dict[str, Any]:
         """Get account information - VALIDATED ✅"""
         try:
             params = {'fields': 'name,account_status,currency,timezone_name,amount_spent,balance'}
-            result = self._make_request('GET', f'act_{self.ad_account_id}', params=params)
+            result = await self.batcher.get(self._relative_url(f'act_{self.ad_account_id}', params))
             
             logger.info(f"✅ Account info retrieved: {result.get('name')}")
             return result
@@ -78,15 +223,34 @@ class MetaBusinessAPI:
             logger.error(f"❌ Failed to get account info: {e}")
             return {'error': str(e)}
     
-    def get_campaigns(self, limit: int = 50) -> List[Dict]:
-        """Get all campaigns - VALIDATED ✅"""
+    async def iter_campaigns(self, page_size: int = 500) -> AsyncIterator[Dict]:
+        """Stream every campaign in the account, following the Graph API paging cursors"""
+        params = {
+            'fields': CAMPAIGN_FIELDS,
+            'limit': page_size
+        }
+
+        async def fetch_page(after):
+            page_params = dict(params, after=after) if after else params
+            result = await self.batcher.get(self._relative_url(f'act_{self.ad_account_id}/campaigns', page_params))
+            paging = result.get('paging', {})
+            # paging.next is omitted on the last page
+            after = paging.get('cursors', {}).get('after') if paging.get('next') else None
+            return result.get('data', []), after
+
+        async for page in paginate(fetch_page):
+            for campaign in page:
+                yield campaign
+    
+    async def get_campaigns(self, limit: int = 50) -> List[Dict]:
+        """Get up to `limit` campaigns - VALIDATED ✅"""
         try:
-            params = {
-                'fields': 'id,name,status,objective,daily_budget,lifetime_budget,created_time,updated_time,start_time,stop_time',
-                'limit': limit
-            }
-            result = self._make_request('GET', f'act_{self.ad_account_id}/campaigns', params=params)
-            campaigns = result.get('data', [])
+            campaigns = []
+            async with aclosing(self.iter_campaigns(page_size=min(limit, 500))) as stream:
+                async for campaign in stream:
+                    campaigns.append(campaign)
+                    if len(campaigns) >= limit:
+                        break
             
             logger.info(f"✅ Retrieved {len(campaigns)} campaigns")
             return campaigns
@@ -95,7 +259,7 @@ class MetaBusinessAPI:
             logger.error(f"❌ Failed to get campaigns: {e}")
             return []
     
-    def create_campaign(self, campaign_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_campaign(self, campaign_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new campaign"""
         try:
             # Required fields for campaign creation
@@ -113,7 +277,7 @@ class MetaBusinessAPI:
                 **campaign_data  # Allow overrides
             }
             
-            result = self._make_request('POST', f'act_{self.ad_account_id}/campaigns', data=data)
+            result = await self._make_request('POST', f'act_{self.ad_account_id}/campaigns', data=data)
             
             logger.info(f"✅ Campaign created: {campaign_data['name']} (ID: {result.get('id')})")
             return result
@@ -122,14 +286,12 @@ class MetaBusinessAPI:
             logger.error(f"❌ Failed to create campaign: {e}")
             return {'error': str(e)}
     
-    def get_campaign_insights(self, campaign_id: str, date_preset: str = 'last_7_days') -> Dict[str, Any]:
+    async def get_campaign_insights(self, campaign_id: str, date_preset: str = 'last_7_days') -> Dict[str, Any]:
         """Get campaign performance insights"""
         try:
-            params = {
-                'fields': 'impressions,clicks,ctr,cpc,cpm,reach,spend,actions,action_values',
-                'date_preset': date_preset
-            }
-            result = self._make_request('GET', f'{campaign_id}/insights', params=params)
+            params = {'fields': INSIGHTS_FIELDS, 'date_preset': date_preset}
+            # Concurrent calls for different campaigns share one batch request
+            result = await self.batcher.get(self._relative_url(f'{campaign_id}/insights', params))
             insights = result.get('data', [])
             
             logger.info(f"✅ Retrieved insights for campaign {campaign_id}")
@@ -139,14 +301,93 @@ class MetaBusinessAPI:
             logger.error(f"❌ Failed to get campaign insights: {e}")
             return {'error': str(e)}
     
-    def update_campaign_budget(self, campaign_id: str, daily_budget: float) -> Dict[str, Any]:
+    async def get_campaign_insights_bulk(self, campaign_ids: List[str], date_preset: str = 'last_7_days') -> Dict[str, Dict[str, Any]]:
+        """
+        Insights for many campaigns keyed by campaign id. Up to
+        ASYNC_INSIGHTS_THRESHOLD campaigns are read in batches of 50; larger
+        sets run as a single async insights report.
+        """
+        campaign_ids = list(dict.fromkeys(str(campaign_id) for campaign_id in campaign_ids))
+        try:
+            if len(campaign_ids) > ASYNC_INSIGHTS_THRESHOLD:
+                insights = await self._run_async_insights(campaign_ids, date_preset)
+                return {campaign_id: insights.get(campaign_id, {}) for campaign_id in campaign_ids}
+
+            params = {'fields': INSIGHTS_FIELDS, 'date_preset': date_preset}
+            results = await asyncio.gather(
+                *(self.batcher.get(self._relative_url(f'{campaign_id}/insights', params)) for campaign_id in campaign_ids),
+                return_exceptions=True
+            )
+            insights = {}
+            for campaign_id, result in zip(campaign_ids, results):
+                if isinstance(result, Exception):
+                    insights[campaign_id] = {'error': str(result)}
+                else:
+                    data = result.get('data', [])
+                    insights[campaign_id] = data[0] if data else {}
+            
+            logger.info(f"✅ Retrieved insights for {len(campaign_ids)} campaigns")
+            return insights
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to get bulk campaign insights: {e}")
+            return {campaign_id: {'error': str(e)} for campaign_id in campaign_ids}
+    
+    async def _run_async_insights(self, campaign_ids: List[str], date_preset: str) -> Dict[str, Dict[str, Any]]:
+        """Run an account-level async insights report filtered to campaign_ids and collect its rows"""
+        run = await self._make_request('POST', f'act_{self.ad_account_id}/insights', data={
+            'level': 'campaign',
+            'fields': f'campaign_id,{INSIGHTS_FIELDS}',
+            'date_preset': date_preset,
+            'filtering': json.dumps([{'field': 'campaign.id', 'operator': 'IN', 'value': campaign_ids}])
+        })
+        report_run_id = run['report_run_id']
+        logger.info(f"📊 Started async insights report {report_run_id} for {len(campaign_ids)} campaigns")
+
+        deadline = time.monotonic() + ASYNC_REPORT_TIMEOUT_SECONDS
+        while True:
+            status = await self._make_request('GET', report_run_id, params={'fields': 'async_status,async_percent_completion'})
+            async_status = status.get('async_status')
+            if async_status == 'Job Completed':
+                break
+            if async_status in ('Job Failed', 'Job Skipped'):
+                raise Exception(f"Meta API Error: insights report {report_run_id} {async_status.lower()}")
+            if time.monotonic() > deadline:
+                raise Exception(f"Meta API Error: insights report {report_run_id} did not finish in {ASYNC_REPORT_TIMEOUT_SECONDS:.0f}s")
+            await asyncio.sleep(ASYNC_REPORT_POLL_SECONDS)
+
+        async def fetch_page(after):
+            params = {'limit': 500, 'after': after} if after else {'limit': 500}
+            result = await self._make_request('GET', f'{report_run_id}/insights', params=params)
+            paging = result.get('paging', {})
+            return result.get('data', []), paging.get('cursors', {}).get('after') if paging.get('next') else None
+
+        insights = {}
+        async for page in paginate(fetch_page):
+            for row in page:
+                insights[str(row.get('campaign_id'))] = row
+        return insights
+    
+    async def get_campaigns_by_id(self, campaign_ids: List[str], fields: str = 'id,name,status,objective,daily_budget,lifetime_budget') -> Dict[str, Dict[str, Any]]:
+        """Read many campaign objects in batches of 50, keyed by campaign id"""
+        campaign_ids = list(dict.fromkeys(str(campaign_id) for campaign_id in campaign_ids))
+        results = await asyncio.gather(
+            *(self.batcher.get(self._relative_url(campaign_id, {'fields': fields})) for campaign_id in campaign_ids),
+            return_exceptions=True
+        )
+        return {
+            campaign_id: {'error': str(result)} if isinstance(result, Exception) else result
+            for campaign_id, result in zip(campaign_ids, results)
+        }
+    
+    async def update_campaign_budget(self, campaign_id: str, daily_budget: float) -> Dict[str, Any]:
         """Update campaign daily budget"""
         try:
             # Convert to Meta's budget format (cents)
             budget_cents = int(daily_budget * 100)
             
             data = {'daily_budget': budget_cents}
-            result = self._make_request('POST', campaign_id, data=data)
+            result = await self._make_request('POST', campaign_id, data=data)
             
             logger.info(f"✅ Updated budget for campaign {campaign_id}: ${daily_budget}/day")
             return result
@@ -155,19 +396,19 @@ class MetaBusinessAPI:
             logger.error(f"❌ Failed to update campaign budget: {e}")
             return {'error': str(e)}
     
-    def pause_campaign(self, campaign_id: str) -> Dict[str, Any]:
+    async def pause_campaign(self, campaign_id: str) -> Dict[str, Any]:
         """Pause a campaign"""
-        return self._update_campaign_status(campaign_id, 'PAUSED')
+        return await self._update_campaign_status(campaign_id, 'PAUSED')
     
-    def activate_campaign(self, campaign_id: str) -> Dict[str, Any]:
+    async def activate_campaign(self, campaign_id: str) -> Dict[str, Any]:
         """Activate a campaign"""
-        return self._update_campaign_status(campaign_id, 'ACTIVE')
+        return await self._update_campaign_status(campaign_id, 'ACTIVE')
     
-    def _update_campaign_status(self, campaign_id: str, status: str) -> Dict[str, Any]:
+    async def _update_campaign_status(self, campaign_id: str, status: str) -> Dict[str, Any]:
         """Update campaign status"""
         try:
             data = {'status': status}
-            result = self._make_request('POST', campaign_id, data=data)
+            result = await self._make_request('POST', campaign_id, data=data)
             
             logger.info(f"✅ Campaign {campaign_id} status updated to {status}")
             return result
@@ -176,18 +417,29 @@ class MetaBusinessAPI:
             logger.error(f"❌ Failed to update campaign status: {e}")
             return {'error': str(e)}
     
-    def get_account_summary(self) -> Dict[str, Any]:
+    async def _count_campaigns(self, keep: int = 10):
+        """
+        Return (total, active, first `keep` campaigns) from the Graph API's
+        summary=total_count, without listing every campaign. Errors propagate.
+        """
+        endpoint = f'act_{self.ad_account_id}/campaigns'
+        listing, active = await asyncio.gather(
+            self.batcher.get(self._relative_url(endpoint, {
+                'fields': CAMPAIGN_FIELDS, 'limit': keep, 'summary': 'total_count'
+            })),
+            self.batcher.get(self._relative_url(endpoint, {
+                'effective_status': json.dumps(['ACTIVE']), 'limit': 0, 'summary': 'total_count'
+            }))
+        )
+        return listing['summary']['total_count'], active['summary']['total_count'], listing.get('data', [])
+    
+    async def get_account_summary(self) -> Dict[str, Any]:
         """Get comprehensive account summary for dashboard"""
         try:
-            # Get account info
-            account_info = self.get_account_info()
-            
-            # Get campaigns
-            campaigns = self.get_campaigns()
-            
-            # Calculate summary metrics
-            active_campaigns = len([c for c in campaigns if c.get('status') == 'ACTIVE'])
-            total_campaigns = len(campaigns)
+            # Account info and campaigns are independent, so fetch them together
+            account_info, (total_campaigns, active_campaigns, campaigns) = await asyncio.gather(
+                self.get_account_info(), self._count_campaigns()
+            )
             
             summary = {
                 'account_name': account_info.get('name', self.account_name),
@@ -198,7 +450,7 @@ class MetaBusinessAPI:
                 'paused_campaigns': total_campaigns - active_campaigns,
                 'total_spend': float(account_info.get('amount_spent', 0)),
                 'account_balance': float(account_info.get('balance', 0)),
-                'campaigns': campaigns[:10],  # Recent campaigns
+                'campaigns': campaigns,  # Recent campaigns
                 'last_updated': datetime.now().isoformat()
             }
             
@@ -213,21 +465,21 @@ class MetaBusinessAPI:
 meta_api = MetaBusinessAPI()
 
 # Test function
-def test_meta_integration():
+async def test_meta_integration():
     """Test the Meta API integration"""
     print("🧪 Testing Meta Business API Integration...")
     
     try:
         # Test account info
-        account_info = meta_api.get_account_info()
+        account_info = await meta_api.get_account_info()
         print(f"✅ Account: {account_info.get('name')}")
         
         # Test campaigns
-        campaigns = meta_api.get_campaigns()
+        campaigns = await meta_api.get_campaigns()
         print(f"✅ Campaigns: {len(campaigns)} found")
         
         # Test summary
-        summary = meta_api.get_account_summary()
+        summary = await meta_api.get_account_summary()
         print(f"✅ Summary: {summary.get('total_campaigns')} total campaigns")
         
         print("🎉 Meta API integration test successful!")
@@ -238,4 +490,4 @@ def test_meta_integration():
         return False
 
 if __name__ == "__main__":
-    test_meta_integration()
\ No newline at end of file
+    asyncio.run(test_meta_integration())
\ No newline at end of file
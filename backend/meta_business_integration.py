@@ -4,9 +4,11 @@ Production-ready integration for Facebook & Instagram campaigns
 """
 
 import asyncio
+import itertools
 import logging
+from contextlib import aclosing
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from dataclasses import dataclass
 from facebook_business.api import FacebookAdsApi
 from facebook_business.adobjects.adaccount import AdAccount
@@ -17,6 +19,9 @@ from facebook_business.exceptions import FacebookRequestError
 import structlog
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from platform_executor import platform_executor
+from platform_http import paginate
+
 # Configure structured logging
 logger = structlog.get_logger(__name__)
 
@@ -131,6 +136,48 @@ class MetaBusinessIntegration:
             logger.error("Failed to initialize Meta Business API", error=str(e))
             raise MetaAPIError(f"API initialization failed: {str(e)}")
     
+    CAMPAIGN_FIELDS = [
+        'id', 'name', 'status', 'objective', 'daily_budget', 
+        'lifetime_budget', 'start_time', 'stop_time', 
+        'created_time', 'updated_time'
+    ]
+    
+    @staticmethod
+    def _to_campaign(campaign_data) -> MetaCampaign:
+        return MetaCampaign(
+            id=campaign_data.get('id'),
+            name=campaign_data.get('name'),
+            status=campaign_data.get('status'),
+            objective=campaign_data.get('objective'),
+            daily_budget=campaign_data.get('daily_budget'),
+            lifetime_budget=campaign_data.get('lifetime_budget'),
+            start_time=campaign_data.get('start_time'),
+            stop_time=campaign_data.get('stop_time'),
+            created_time=campaign_data.get('created_time'),
+            updated_time=campaign_data.get('updated_time')
+        )
+    
+    async def iter_campaigns(self, page_size: int = 500) -> AsyncIterator[MetaCampaign]:
+        """
+        Stream every campaign in the ad account
+        
+        The SDK cursor loads pages lazily with blocking requests, so each page
+        is pulled on the Meta worker pool; the next page loads while the
+        caller processes the current one.
+        """
+        def fetch_chunk(cursor):
+            if cursor is None:
+                cursor = self.ad_account.get_campaigns(fields=self.CAMPAIGN_FIELDS, params={'limit': page_size})
+            chunk = list(itertools.islice(cursor, page_size))
+            return chunk, cursor if len(chunk) == page_size else None
+
+        async def fetch_page(cursor):
+            return await platform_executor.run('meta_ads', fetch_chunk, cursor)
+
+        async for page in paginate(fetch_page):
+            for campaign_data in page:
+                yield self._to_campaign(campaign_data)
+    
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10)
@@ -146,32 +193,12 @@ class MetaBusinessIntegration:
             List of MetaCampaign objects
         """
         try:
-            fields = [
-                'id', 'name', 'status', 'objective', 'daily_budget', 
-                'lifetime_budget', 'start_time', 'stop_time', 
-                'created_time', 'updated_time'
-            ]
-            
-            campaigns_response = self.ad_account.get_campaigns(
-                fields=fields,
-                params={'limit': limit}
-            )
-            
             campaigns = []
-            for campaign_data in campaigns_response:
-                campaign = MetaCampaign(
-                    id=campaign_data.get('id'),
-                    name=campaign_data.get('name'),
-                    status=campaign_data.get('status'),
-                    objective=campaign_data.get('objective'),
-                    daily_budget=campaign_data.get('daily_budget'),
-                    lifetime_budget=campaign_data.get('lifetime_budget'),
-                    start_time=campaign_data.get('start_time'),
-                    stop_time=campaign_data.get('stop_time'),
-                    created_time=campaign_data.get('created_time'),
-                    updated_time=campaign_data.get('updated_time')
-                )
-                campaigns.append(campaign)
+            async with aclosing(self.iter_campaigns(page_size=min(limit, 500))) as stream:
+                async for campaign in stream:
+                    campaigns.append(campaign)
+                    if len(campaigns) >= limit:
+                        break
             
             logger.info("Successfully retrieved Meta campaigns", 
                        count=len(campaigns),
@@ -239,11 +266,13 @@ class MetaBusinessIntegration:
             
             if campaign_id:
                 # Get insights for specific campaign
-                campaign = Campaign(campaign_id)
-                insights_response = campaign.get_insights(fields=fields, params=params)
+                source = Campaign(campaign_id)
             else:
                 # Get insights for all campaigns in account
-                insights_response = self.ad_account.get_insights(fields=fields, params=params)
+                source = self.ad_account
+            insights_response = await platform_executor.run(
+                'meta_ads', lambda: list(source.get_insights(fields=fields, params=params))
+            )
             
             metrics = []
             for insight in insights_response:
@@ -318,7 +347,9 @@ class MetaBusinessIntegration:
                 raise MetaAPIError("No budget values provided for update")
             
             # Execute the update
-            response = campaign.api_update(fields=list(update_data.keys()), params=update_data)
+            response = await platform_executor.run(
+                'meta_ads', campaign.api_update, fields=list(update_data.keys()), params=update_data
+            )
             
             result = {
                 "success": True,
@@ -374,7 +405,9 @@ class MetaBusinessIntegration:
             campaign = Campaign(campaign_id)
             
             # Update campaign status to PAUSED
-            response = campaign.api_update(
+            response = await platform_executor.run(
+                'meta_ads',
+                campaign.api_update,
                 fields=['status'],
                 params={'status': Campaign.Status.paused}
             )
@@ -426,13 +459,14 @@ class MetaBusinessIntegration:
             if campaign_id:
                 campaign = Campaign(campaign_id)
                 # Get campaign-specific recommendations
-                recs = campaign.get_delivery_estimate()
+                recs = await platform_executor.run('meta_ads', campaign.get_delivery_estimate)
                 if recs:
                     recommendations.extend(recs)
             else:
                 # Get account-level recommendations
-                account_recommendations = self.ad_account.get_activities(
-                    fields=['activity_type', 'event_type', 'extra_data']
+                account_recommendations = await platform_executor.run(
+                    'meta_ads',
+                    lambda: list(self.ad_account.get_activities(fields=['activity_type', 'event_type', 'extra_data']))
                 )
                 for rec in account_recommendations:
                     if rec.get('activity_type') == 'campaign_suggestion':
@@ -458,24 +492,31 @@ class MetaBusinessIntegration:
             logger.error("Unexpected error getting Meta recommendations", error=str(e))
             return []
     
+    async def _count_campaigns(self):
+        """Return (total, active) campaign counts from the Graph API's summary=total_count"""
+        def count(params):
+            cursor = self.ad_account.get_campaigns(params=dict(params, limit=0, summary='total_count'))
+            cursor.load_next_page()
+            return cursor.total()
+
+        return tuple(await asyncio.gather(
+            platform_executor.run('meta_ads', count, {}),
+            platform_executor.run('meta_ads', count, {'effective_status': ['ACTIVE']})
+        ))
+    
     async def get_account_summary(self) -> Dict[str, Any]:
         """Get overall Meta ad account summary"""
         try:
-            # Get account info
-            account_info = self.ad_account.api_get(fields=[
-                'name', 'account_status', 'currency', 'timezone_name',
-                'amount_spent', 'balance', 'daily_spend_limit'
-            ])
-            
-            campaigns = await self.get_campaigns()
-            recent_insights = await self.get_campaign_insights(
-                date_from=datetime.now() - timedelta(days=7)
+            # Account info, campaigns and insights are independent calls, so run them together
+            account_info, (total_campaigns, active_campaigns), recent_insights = await asyncio.gather(
+                platform_executor.run('meta_ads', self.ad_account.api_get, fields=[
+                    'name', 'account_status', 'currency', 'timezone_name',
+                    'amount_spent', 'balance', 'daily_spend_limit'
+                ]),
+                self._count_campaigns(),
+                self.get_campaign_insights(date_from=datetime.now() - timedelta(days=7))
             )
             
-            # Calculate summary metrics
-            total_campaigns = len(campaigns)
-            active_campaigns = len([c for c in campaigns if c.status == 'ACTIVE'])
-            
             # Performance metrics for last 7 days
             total_spend = sum(i.spend for i in recent_insights)
             total_conversions = sum(i.conversions for i in recent_insights)
@@ -514,7 +555,9 @@ class MetaBusinessIntegration:
         """Validate Meta Business API credentials and access"""
         try:
             # Test with a simple account query
-            account_info = self.ad_account.api_get(fields=['id', 'name', 'account_status'])
+            account_info = await platform_executor.run(
+                'meta_ads', self.ad_account.api_get, fields=['id', 'name', 'account_status']
+            )
             
             result = {
                 "valid": True,
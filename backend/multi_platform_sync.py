@@ -6,12 +6,14 @@ Unified campaign management across Google Ads, Meta, and LinkedIn
 import asyncio
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+from typing import AsyncIterator, Dict, List, Optional, Any, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
 from abc import ABC, abstractmethod
 
+from platform_rate_limiter import rate_limiter
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -110,6 +112,10 @@ class PlatformConnector(ABC):
         self.credentials = credentials
         self.connected = False
     
+    async def throttle(self, cost: float = 1.0):
+        """Wait for capacity on this connector's account in the shared rate limiter"""
+        await rate_limiter.acquire(self.platform.value, self.credentials.get('account_id'), cost)
+    
     @abstractmethod
     async def authenticate(self) -> bool:
         """Authenticate with the platform"""
@@ -120,6 +126,16 @@ class PlatformConnector(ABC):
         """Fetch all campaigns from the platform"""
         pass
     
+    async def iter_campaigns(self) -> AsyncIterator[UniversalCampaign]:
+        """
+        Stream campaigns from the platform. Connectors backed by a paginated
+        API override this to yield page by page; the default wraps fetch_campaigns().
+        The connectors in this module still return fixture data, so all of them
+        use the default until they are backed by the paginated platform clients.
+        """
+        for campaign in await self.fetch_campaigns():
+            yield campaign
+    
     @abstractmethod
     async def create_campaign(self, campaign: UniversalCampaign) -> SyncResult:
         """Create a new campaign on the platform"""
@@ -160,6 +176,7 @@ class GoogleAdsConnector(PlatformConnector):
     
     async def fetch_campaigns(self) -> List[UniversalCampaign]:
         """Fetch campaigns from Google Ads"""
+        await self.throttle()
         if not self.connected:
             await self.authenticate()
         
@@ -213,6 +230,7 @@ class GoogleAdsConnector(PlatformConnector):
     
     async def create_campaign(self, campaign: UniversalCampaign) -> SyncResult:
         """Create campaign in Google Ads"""
+        await self.throttle()
         try:
             # Mock campaign creation
             logger.info(f"Creating Google Ads campaign: {campaign.name}")
@@ -233,6 +251,7 @@ class GoogleAdsConnector(PlatformConnector):
     
     async def update_campaign(self, campaign: UniversalCampaign) -> SyncResult:
         """Update campaign in Google Ads"""
+        await self.throttle()
         try:
             logger.info(f"Updating Google Ads campaign: {campaign.id}")
             return SyncResult(
@@ -251,6 +270,7 @@ class GoogleAdsConnector(PlatformConnector):
     
     async def delete_campaign(self, campaign_id: str) -> SyncResult:
         """Delete campaign from Google Ads"""
+        await self.throttle()
         try:
             logger.info(f"Deleting Google Ads campaign: {campaign_id}")
             return SyncResult(
@@ -269,6 +289,7 @@ class GoogleAdsConnector(PlatformConnector):
     
     async def fetch_performance_data(self, campaign_id: str, date_range: Dict[str, str]) -> Dict[str, Any]:
         """Fetch performance data from Google Ads"""
+        await self.throttle()
         # Mock performance data
         return {
             "impressions": 50000,
@@ -300,6 +321,7 @@ class MetaConnector(PlatformConnector):
     
     async def fetch_campaigns(self) -> List[UniversalCampaign]:
         """Fetch campaigns from Meta"""
+        await self.throttle()
         if not self.connected:
             await self.authenticate()
         
@@ -351,6 +373,7 @@ class MetaConnector(PlatformConnector):
     
     async def create_campaign(self, campaign: UniversalCampaign) -> SyncResult:
         """Create campaign in Meta"""
+        await self.throttle()
         try:
             logger.info(f"Creating Meta campaign: {campaign.name}")
             return SyncResult(
@@ -370,6 +393,7 @@ class MetaConnector(PlatformConnector):
     
     async def update_campaign(self, campaign: UniversalCampaign) -> SyncResult:
         """Update campaign in Meta"""
+        await self.throttle()
         try:
             logger.info(f"Updating Meta campaign: {campaign.id}")
             return SyncResult(
@@ -388,6 +412,7 @@ class MetaConnector(PlatformConnector):
     
     async def delete_campaign(self, campaign_id: str) -> SyncResult:
         """Delete campaign from Meta"""
+        await self.throttle()
         try:
             logger.info(f"Deleting Meta campaign: {campaign_id}")
             return SyncResult(
@@ -406,6 +431,7 @@ class MetaConnector(PlatformConnector):
     
     async def fetch_performance_data(self, campaign_id: str, date_range: Dict[str, str]) -> Dict[str, Any]:
         """Fetch performance data from Meta"""
+        await self.throttle()
         return {
             "impressions": 180000,
             "clicks": 7200,
@@ -436,6 +462,7 @@ class LinkedInConnector(PlatformConnector):
     
     async def fetch_campaigns(self) -> List[UniversalCampaign]:
         """Fetch campaigns from LinkedIn"""
+        await self.throttle()
         if not self.connected:
             await self.authenticate()
         
@@ -470,6 +497,7 @@ class LinkedInConnector(PlatformConnector):
     
     async def create_campaign(self, campaign: UniversalCampaign) -> SyncResult:
         """Create campaign in LinkedIn"""
+        await self.throttle()
         try:
             logger.info(f"Creating LinkedIn campaign: {campaign.name}")
             return SyncResult(
@@ -489,6 +517,7 @@ class LinkedInConnector(PlatformConnector):
     
     async def update_campaign(self, campaign: UniversalCampaign) -> SyncResult:
         """Update campaign in LinkedIn"""
+        await self.throttle()
         try:
             logger.info(f"Updating LinkedIn campaign: {campaign.id}")
             return SyncResult(
@@ -507,6 +536,7 @@ class LinkedInConnector(PlatformConnector):
     
     async def delete_campaign(self, campaign_id: str) -> SyncResult:
         """Delete campaign from LinkedIn"""
+        await self.throttle()
         try:
             logger.info(f"Deleting LinkedIn campaign: {campaign_id}")
             return SyncResult(
@@ -525,6 +555,7 @@ class LinkedInConnector(PlatformConnector):
     
     async def fetch_performance_data(self, campaign_id: str, date_range: Dict[str, str]) -> Dict[str, Any]:
         """Fetch performance data from LinkedIn"""
+        await self.throttle()
         return {
             "impressions": 25000,
             "clicks": 750,
@@ -550,6 +581,16 @@ class MultiPlatformSyncEngine:
         self.connectors[connector.platform] = connector
         logger.info(f"Added connector for {connector.platform.value}")
     
+    def account_for_campaign(self, campaign_id: str) -> Optional[str]:
+        """Ad account a synced campaign belongs to, from its record or its platform connector"""
+        campaign = self.campaigns.get(campaign_id)
+        if campaign is None:
+            return None
+        account_id = (campaign.platform_specific or {}).get('account_id')
+        if account_id is None and campaign.platform in self.connectors:
+            account_id = self.connectors[campaign.platform].credentials.get('account_id')
+        return account_id
+    
     async def authenticate_all(self) -> Dict[Platform, bool]:
         """Authenticate with all platforms"""
         results = {}
@@ -563,17 +604,19 @@ class MultiPlatformSyncEngine:
         
         for platform, connector in self.connectors.items():
             try:
-                campaigns = await connector.fetch_campaigns()
-                for campaign in campaigns:
+                # Store campaigns as they stream in rather than buffering the whole account
+                synced = 0
+                async for campaign in connector.iter_campaigns():
                     self.campaigns[campaign.id] = campaign
                     campaign.last_sync = datetime.utcnow()
                     campaign.sync_status = SyncStatus.SYNCED
+                    synced += 1
                 
                 sync_results.append(SyncResult(
                     platform=platform,
                     campaign_id="ALL",
                     success=True,
-                    message=f"Synced {len(campaigns)} campaigns from {platform.value}"
+                    message=f"Synced {synced} campaigns from {platform.value}"
                 ))
                 
             except Exception as e:
@@ -739,5 +782,6 @@ class MultiPlatformSyncEngine:
             "platforms": platform_status,
             "total_campaigns": len(self.campaigns),
             "recent_sync_results": self.sync_history[-10:] if self.sync_history else [],
+            "rate_limits": rate_limiter.get_status(),
             "last_full_sync": datetime.utcnow()  # Mock - would track actual last sync
         }
\ No newline at end of file
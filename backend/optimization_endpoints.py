@@ -3,6 +3,7 @@ FastAPI endpoints for Real-Time Campaign Optimization Engine
 """
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -12,7 +13,9 @@ import json
 from optimization_engine import (
     CampaignOptimizationEngine, 
     OptimizationExecutor,
+    BatchExecutionItem,
     PerformanceMetrics,
+    PortfolioMetrics,
     OptimizationRecommendation,
     OptimizationType,
     Priority
@@ -53,6 +56,38 @@ class OptimizationRecommendationResponse(BaseModel):
     auto_execute: bool
     created_at: datetime
 
+class PortfolioAnalysisRequest(BaseModel):
+    """Columnar metrics: one list entry per campaign"""
+    campaign_ids: List[str]
+    platforms: List[str]
+    impressions: List[int]
+    clicks: List[int]
+    conversions: List[int]
+    spend: List[float]
+    revenue: List[float]
+    ctr: List[float]
+    cpc: List[float]
+    cpa: List[float]
+    roas: List[float]
+    quality_score: Optional[List[Optional[float]]] = None
+    include_recommendations: bool = True
+    tenant_id: Optional[str] = None
+
+class BudgetAllocationRequest(BaseModel):
+    campaign_ids: List[str]
+    roas: List[float]
+    total_budget: float
+    current_budget: Optional[List[float]] = None
+    min_marginal_roas: float = 0.0
+    tenant_id: Optional[str] = None
+
+class RuleOverridesRequest(BaseModel):
+    """Partial overrides merged over the default rules"""
+    performance_thresholds: Dict[str, float] = {}
+    optimization_rules: Dict[str, float] = {}
+    safety_limits: Dict[str, float] = {}
+    score_tables: Dict[str, Any] = {}
+
 class OptimizationExecutionRequest(BaseModel):
     recommendation_id: str
     campaign_id: str
@@ -76,7 +111,7 @@ class CampaignOptimizationStatus(BaseModel):
     recommendations_count: int
 
 @router.post("/analyze", response_model=List[OptimizationRecommendationResponse])
-async def analyze_campaign_performance(metrics: PerformanceMetricsRequest):
+async def analyze_campaign_performance(metrics: PerformanceMetricsRequest, tenant_id: Optional[str] = None):
     """
     Analyze campaign performance and return optimization recommendations
     """
@@ -98,7 +133,7 @@ async def analyze_campaign_performance(metrics: PerformanceMetricsRequest):
         )
         
         # Get optimization recommendations
-        recommendations = await optimization_engine.analyze_campaign_performance(performance_metrics)
+        recommendations = await optimization_engine.analyze_campaign_performance(performance_metrics, tenant_id)
         
         # Convert to response format
         response_recommendations = []
@@ -123,6 +158,102 @@ async def analyze_campaign_performance(metrics: PerformanceMetricsRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@router.post("/analyze/portfolio")
+async def analyze_portfolio_performance(request: PortfolioAnalysisRequest):
+    """
+    Analyze every campaign in a portfolio in one vectorized pass
+    """
+    try:
+        portfolio = PortfolioMetrics(
+            campaign_ids=request.campaign_ids,
+            platforms=request.platforms,
+            impressions=request.impressions,
+            clicks=request.clicks,
+            conversions=request.conversions,
+            spend=request.spend,
+            revenue=request.revenue,
+            ctr=request.ctr,
+            cpc=request.cpc,
+            cpa=request.cpa,
+            roas=request.roas,
+            quality_score=None if request.quality_score is None else [
+                float('nan') if qs is None else qs for qs in request.quality_score
+            ]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        result = await optimization_engine.analyze_portfolio(portfolio, request.tenant_id)
+
+        response = {
+            **result.summary(),
+            "optimization_scores": dict(zip(portfolio.campaign_ids, result.optimization_scores.tolist()))
+        }
+        if request.include_recommendations:
+            response["recommendations"] = [
+                OptimizationRecommendationResponse(
+                    campaign_id=rec.campaign_id,
+                    optimization_type=rec.optimization_type.value,
+                    current_value=rec.current_value,
+                    recommended_value=rec.recommended_value,
+                    expected_impact=rec.expected_impact,
+                    confidence_score=rec.confidence_score,
+                    priority=rec.priority.value,
+                    reasoning=rec.reasoning,
+                    estimated_improvement=rec.estimated_improvement,
+                    risk_assessment=rec.risk_assessment,
+                    auto_execute=rec.auto_execute,
+                    created_at=rec.created_at
+                )
+                for rec in result.to_recommendations()
+            ]
+
+        return response
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Portfolio analysis failed: {str(e)}")
+
+@router.post("/budget/allocate")
+async def allocate_portfolio_budget(request: BudgetAllocationRequest):
+    """
+    Allocate a total budget across campaigns by equalizing marginal ROAS
+    """
+    try:
+        allocation = await optimization_engine.allocate_portfolio_budget(
+            campaign_ids=request.campaign_ids,
+            roas=request.roas,
+            total_budget=request.total_budget,
+            current_budget=request.current_budget,
+            min_marginal_roas=request.min_marginal_roas,
+            tenant_id=request.tenant_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Budget allocation failed: {str(e)}")
+
+    return {
+        **allocation.summary(),
+        "allocations": [
+            {
+                "campaign_id": campaign_id,
+                "current_budget": round(current, 2),
+                "allocated_budget": round(allocated, 2),
+                "change_percentage": round((allocated / current - 1) * 100, 1) if current else None,
+                "expected_revenue": round(revenue, 2),
+                "marginal_roas": round(marginal, 3)
+            }
+            for campaign_id, current, allocated, revenue, marginal in zip(
+                allocation.campaign_ids,
+                allocation.current_budget.tolist(),
+                allocation.allocated_budget.tolist(),
+                allocation.expected_revenue.tolist(),
+                allocation.marginal_roas.tolist()
+            )
+        ]
+    }
+
 @router.post("/execute", response_model=OptimizationExecutionResponse)
 async def execute_optimization(
     request: OptimizationExecutionRequest,
@@ -166,7 +297,7 @@ async def execute_optimization(
         raise HTTPException(status_code=500, detail=f"Execution failed: {str(e)}")
 
 @router.get("/status/{campaign_id}", response_model=CampaignOptimizationStatus)
-async def get_campaign_optimization_status(campaign_id: str):
+async def get_campaign_optimization_status(campaign_id: str, tenant_id: Optional[str] = None):
     """
     Get optimization status for a specific campaign
     """
@@ -188,7 +319,8 @@ async def get_campaign_optimization_status(campaign_id: str):
         )
         
         # Calculate optimization score
-        optimization_score = optimization_engine.calculate_optimization_score(mock_metrics)
+        rules = await optimization_engine.rules.get(tenant_id)
+        optimization_score = optimization_engine.calculate_optimization_score(mock_metrics, rules)
         
         # Determine status based on score
         if optimization_score >= 80:
@@ -199,20 +331,74 @@ async def get_campaign_optimization_status(campaign_id: str):
             status = "critical"
         
         # Get recommendations count
-        recommendations = await optimization_engine.analyze_campaign_performance(mock_metrics)
+        recommendations = await optimization_engine.analyze_campaign_performance(mock_metrics, tenant_id)
+        last_execution = optimization_executor.execution_log.last_execution(campaign_id)
         
         return CampaignOptimizationStatus(
             campaign_id=campaign_id,
             optimization_score=optimization_score,
             status=status,
             active_optimizations=len([r for r in recommendations if r.auto_execute]),
-            last_optimization=datetime.utcnow(),  # Mock data
+            last_optimization=last_execution.timestamp if last_execution else None,
             recommendations_count=len(recommendations)
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Status check failed: {str(e)}")
 
+@router.get("/rules")
+async def get_optimization_rules(tenant_id: Optional[str] = None):
+    """
+    Get the compiled optimization rules in effect for a tenant
+    """
+    try:
+        rules = await optimization_engine.rules.get(tenant_id)
+        return rules.to_dict()
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get rules: {str(e)}")
+
+@router.put("/rules/{tenant_id}")
+async def update_optimization_rules(tenant_id: str, overrides: RuleOverridesRequest):
+    """
+    Store a tenant's rule overrides and apply them immediately
+    """
+    try:
+        rules = await optimization_engine.rules.update(tenant_id, overrides.dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid rules: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update rules: {str(e)}")
+    return rules.to_dict()
+
+@router.post("/rules/{tenant_id}/reload")
+async def reload_optimization_rules(tenant_id: str):
+    """
+    Re-read a tenant's rules from the configuration table now
+    """
+    try:
+        rules = await optimization_engine.rules.reload(tenant_id)
+        return rules.to_dict()
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reload rules: {str(e)}")
+
+@router.get("/history/{campaign_id}")
+async def get_campaign_execution_history(campaign_id: str, limit: int = 50):
+    """
+    Get executed optimizations for a campaign, newest first
+    """
+    try:
+        history = await optimization_executor.execution_log.fetch_campaign_history(campaign_id, limit=min(limit, 500))
+        return {
+            "campaign_id": campaign_id,
+            "count": len(history),
+            "executions": history
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get execution history: {str(e)}")
+
 @router.get("/recommendations/all")
 async def get_all_campaign_recommendations():
     """
@@ -226,11 +412,9 @@ async def get_all_campaign_recommendations():
             {"id": "campaign_3", "name": "Brand Awareness", "platform": "linkedin"}
         ]
         
-        all_recommendations = []
-        
-        for campaign in campaigns:
-            # Mock metrics for each campaign
-            metrics = PerformanceMetrics(
+        # Mock metrics for each campaign
+        campaign_metrics = [
+            PerformanceMetrics(
                 campaign_id=campaign["id"],
                 platform=campaign["platform"],
                 impressions=5000 + (hash(campaign["id"]) % 10000),
@@ -243,22 +427,27 @@ async def get_all_campaign_recommendations():
                 cpa=15.0 + (hash(campaign["id"]) % 50),
                 roas=2.0 + (hash(campaign["id"]) % 300) / 100
             )
-            
-            campaign_recs = await optimization_engine.analyze_campaign_performance(metrics)
-            
-            for rec in campaign_recs:
-                all_recommendations.append({
-                    "campaign_id": rec.campaign_id,
-                    "campaign_name": campaign["name"],
-                    "platform": campaign["platform"],
-                    "optimization_type": rec.optimization_type.value,
-                    "expected_impact": rec.expected_impact,
-                    "confidence_score": rec.confidence_score,
-                    "priority": rec.priority.value,
-                    "reasoning": rec.reasoning,
-                    "auto_execute": rec.auto_execute,
-                    "created_at": rec.created_at
-                })
+            for campaign in campaigns
+        ]
+        campaigns_by_id = {campaign["id"]: campaign for campaign in campaigns}
+        
+        result = await optimization_engine.analyze_portfolio(PortfolioMetrics.from_metrics(campaign_metrics))
+        
+        all_recommendations = []
+        for rec in result.to_recommendations():
+            campaign = campaigns_by_id[rec.campaign_id]
+            all_recommendations.append({
+                "campaign_id": rec.campaign_id,
+                "campaign_name": campaign["name"],
+                "platform": campaign["platform"],
+                "optimization_type": rec.optimization_type.value,
+                "expected_impact": rec.expected_impact,
+                "confidence_score": rec.confidence_score,
+                "priority": rec.priority.value,
+                "reasoning": rec.reasoning,
+                "auto_execute": rec.auto_execute,
+                "created_at": rec.created_at
+            })
         
         return {
             "total_recommendations": len(all_recommendations),
@@ -274,62 +463,76 @@ async def get_all_campaign_recommendations():
 async def batch_execute_optimizations(
     campaign_ids: List[str],
     optimization_types: List[str],
-    background_tasks: BackgroundTasks
+    recommended_values: Optional[List[float]] = None,
+    platforms: Optional[List[str]] = None,
+    account_ids: Optional[List[Optional[str]]] = None
 ):
     """
-    Execute multiple optimizations in batch
+    Start executing multiple optimizations as a background job.
+    Changes for the same platform account are applied as bulk mutations;
+    poll /batch-execute/{job_id} or stream /batch-execute/{job_id}/stream for results.
     """
+    for name, values in (('optimization_types', optimization_types), ('recommended_values', recommended_values),
+                         ('platforms', platforms), ('account_ids', account_ids)):
+        if values is not None and len(values) != len(campaign_ids):
+            raise HTTPException(status_code=400, detail=f"{name} must have one entry per campaign")
+
     try:
-        results = []
-        
-        for campaign_id, opt_type in zip(campaign_ids, optimization_types):
-            try:
-                # Create and execute optimization
-                recommendation = OptimizationRecommendation(
-                    campaign_id=campaign_id,
-                    optimization_type=OptimizationType(opt_type),
-                    current_value=100.0,  # Mock current value
-                    recommended_value=150.0,  # Mock recommended value
-                    expected_impact="Batch execution",
-                    confidence_score=0.8,
-                    priority=Priority.MEDIUM,
-                    reasoning="Batch optimization request",
-                    estimated_improvement={},
-                    risk_assessment="Batch approved",
-                    auto_execute=True
-                )
-                
-                result = await optimization_executor.execute_optimization(recommendation)
-                
-                results.append({
-                    "campaign_id": campaign_id,
-                    "optimization_type": opt_type,
-                    "success": result.get('success', False),
-                    "message": result.get('message', ''),
-                    "timestamp": datetime.utcnow()
-                })
-                
-            except Exception as e:
-                results.append({
-                    "campaign_id": campaign_id,
-                    "optimization_type": opt_type,
-                    "success": False,
-                    "message": f"Failed: {str(e)}",
-                    "timestamp": datetime.utcnow()
-                })
-        
-        successful_executions = len([r for r in results if r["success"]])
-        
-        return {
-            "total_attempted": len(results),
-            "successful": successful_executions,
-            "failed": len(results) - successful_executions,
-            "results": results
-        }
+        items = []
+        for i, (campaign_id, opt_type) in enumerate(zip(campaign_ids, optimization_types)):
+            recommendation = OptimizationRecommendation(
+                campaign_id=campaign_id,
+                optimization_type=OptimizationType(opt_type),
+                current_value=100.0,  # Mock current value
+                recommended_value=recommended_values[i] if recommended_values else 150.0,
+                expected_impact="Batch execution",
+                confidence_score=0.8,
+                priority=Priority.MEDIUM,
+                reasoning="Batch optimization request",
+                estimated_improvement={},
+                risk_assessment="Batch approved",
+                auto_execute=True
+            )
+            items.append(BatchExecutionItem(
+                recommendation=recommendation,
+                platform=platforms[i] if platforms else "google_ads",
+                account_id=account_ids[i] if account_ids else None
+            ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch request: {str(e)}")
+
+    try:
+        job = optimization_executor.start_batch_job(items)
+        return job.get_status()
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Batch execution failed: {str(e)}")
 
+@router.get("/batch-execute/{job_id}")
+async def get_batch_execution_status(job_id: str, since: int = 0):
+    """
+    Get batch job progress; results from index `since` onwards
+    """
+    job = optimization_executor.get_batch_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job {job_id} not found")
+    return job.get_status(since=since)
+
+@router.get("/batch-execute/{job_id}/stream")
+async def stream_batch_execution_results(job_id: str):
+    """
+    Stream per-item results as newline-delimited JSON while the job runs
+    """
+    job = optimization_executor.get_batch_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job {job_id} not found")
+
+    async def result_lines():
+        async for result in job.stream_results():
+            yield json.dumps(result, default=str) + "\n"
+
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
 @router.get("/performance-insights/{campaign_id}")
 async def get_performance_insights(campaign_id: str):
     """
@@ -405,9 +608,13 @@ async def optimization_engine_health():
             "budget_optimization",
             "bid_management", 
             "performance_analysis",
+            "trend_analysis",
             "automated_execution",
             "risk_assessment"
         ],
         "uptime": "24/7",
+        "execution_log": optimization_executor.execution_log.get_stats(),
+        "campaign_state_cache": optimization_engine.state_cache.get_stats(),
+        "trend_tracker": optimization_engine.trends.get_status(),
         "last_check": datetime.utcnow()
     }
\ No newline at end of file
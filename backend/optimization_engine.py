@@ -6,11 +6,22 @@ Autonomous AI system for campaign performance optimization
 import asyncio
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Callable, Deque, Awaitable, Any
+from dataclasses import dataclass, field, asdict, replace
+from collections import deque
 from enum import Enum
 import math
 import logging
+import os
+import time
+import uuid
+
+import numpy as np
+
+from batch_insert import insert_isolating_rejects, write_dead_letters
+from platform_rate_limiter import rate_limiter
+from optimization_rules import CompiledRuleSet, RuleSetRepository, rule_repository
+from performance_trends import TrendTracker, trend_tracker
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +29,16 @@ logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_EXECUTION_DEAD_LETTER_PATH = os.getenv(
+    'EXECUTION_LOG_DEAD_LETTER_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'optimization_execution_dead_letter.jsonl')
+)
+
+# Stand-in current-state values until campaign state comes from the platforms
+DEFAULT_DAILY_BUDGET = 100.0
+DEFAULT_TARGET_CPC = 1.50
+DEFAULT_CURRENT_BID = 2.00
+
 class OptimizationType(Enum):
     BUDGET_INCREASE = "budget_increase"
     BUDGET_DECREASE = "budget_decrease"
@@ -75,54 +96,330 @@ class OptimizationRecommendation:
         if self.created_at is None:
             self.created_at = datetime.utcnow()
 
-class CampaignOptimizationEngine:
-    """Real-time campaign optimization AI engine"""
-    
-    def __init__(self):
-        self.performance_thresholds = {
-            'min_roas': 2.0,
-            'max_cpa_multiplier': 1.5,  # 1.5x target CPA
-            'min_ctr': 0.01,  # 1%
-            'min_quality_score': 5.0,
-            'budget_utilization_min': 0.8,  # 80%
-            'budget_utilization_max': 0.95,  # 95%
+@dataclass
+class CampaignState:
+    """Current platform settings the optimization rules compare against"""
+    campaign_id: str
+    daily_budget: float = DEFAULT_DAILY_BUDGET
+    target_cpc: float = DEFAULT_TARGET_CPC
+    current_bid: float = DEFAULT_CURRENT_BID
+    platform: Optional[str] = None
+
+StateLoader = Callable[[List[str]], Awaitable[Dict[str, CampaignState]]]
+
+class SyncStoreStateLoader:
+    """
+    Bulk state loader backed by the multi-platform sync store.
+    Campaigns missing from the store trigger one iter_campaigns() pass per connector,
+    at most once per refresh interval.
+    """
+
+    def __init__(self, sync_engine: Any, min_refresh_seconds: float = 60.0):
+        self.sync_engine = sync_engine
+        self.min_refresh_seconds = min_refresh_seconds
+        self._last_refresh = 0.0
+        self._refresh_lock = asyncio.Lock()
+
+    async def __call__(self, campaign_ids: List[str]) -> Dict[str, CampaignState]:
+        campaigns = self.sync_engine.campaigns
+        if any(campaign_id not in campaigns for campaign_id in campaign_ids):
+            await self._refresh()
+        return {
+            campaign_id: self._to_state(campaigns[campaign_id])
+            for campaign_id in campaign_ids
+            if campaign_id in campaigns
         }
-        
-        self.optimization_rules = {
-            'budget_increase_roas_threshold': 4.0,
-            'budget_decrease_roas_threshold': 1.5,
-            'bid_adjustment_performance_window': 7,  # days
-            'min_data_points': 100,  # minimum clicks for reliable optimization
+
+    async def _refresh(self):
+        async with self._refresh_lock:
+            if time.monotonic() - self._last_refresh < self.min_refresh_seconds:
+                return
+            self._last_refresh = time.monotonic()
+            connectors = list(self.sync_engine.connectors.values())
+            await asyncio.gather(*(self._refresh_connector(c) for c in connectors))
+
+    def record_change(self, campaign_id: str, changes: Dict[str, float]):
+        """Write an executed budget/bid change into the sync store so reloads see it before the next sync"""
+        campaign = self.sync_engine.campaigns.get(campaign_id)
+        if campaign is None:
+            return
+        if 'daily_budget' in changes and campaign.budget_type == 'daily':
+            campaign.budget_amount = changes['daily_budget']
+        if 'current_bid' in changes:
+            campaign.platform_specific = {**(campaign.platform_specific or {}), 'cpc_bid': changes['current_bid']}
+
+    async def _refresh_connector(self, connector: Any):
+        try:
+            async for campaign in connector.iter_campaigns():
+                self.sync_engine.campaigns[campaign.id] = campaign
+        except Exception as e:
+            logger.error(f"Campaign state refresh failed for {connector.platform.value}: {e}")
+
+    @staticmethod
+    def _to_state(campaign: Any) -> CampaignState:
+        platform_specific = campaign.platform_specific or {}
+        return CampaignState(
+            campaign_id=campaign.id,
+            daily_budget=campaign.budget_amount if campaign.budget_type == 'daily' else DEFAULT_DAILY_BUDGET,
+            target_cpc=platform_specific.get('target_cpc', DEFAULT_TARGET_CPC),
+            current_bid=platform_specific.get('cpc_bid', DEFAULT_CURRENT_BID),
+            platform=campaign.platform.value
+        )
+
+class CampaignStateCache:
+    """
+    TTL cache of campaign state, filled in bulk through a loader.
+    Campaigns the loader does not know fall back to the default state.
+    Holds at most max_entries campaigns; expired entries are evicted first, then the oldest.
+    """
+
+    def __init__(self, loader: Optional[StateLoader] = None, ttl_seconds: float = 300.0,
+                 max_entries: int = 20000):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[CampaignState, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, campaign_id: str) -> CampaignState:
+        return (await self.get_many([campaign_id]))[campaign_id]
+
+    async def get_many(self, campaign_ids: List[str]) -> Dict[str, CampaignState]:
+        """Look up many campaigns, loading every missing or expired entry in one call"""
+        now = time.monotonic()
+        states: Dict[str, CampaignState] = {}
+        missing = []
+        for campaign_id in campaign_ids:
+            entry = self._entries.get(campaign_id)
+            if entry is not None and entry[1] > now:
+                states[campaign_id] = entry[0]
+            else:
+                if entry is not None:
+                    del self._entries[campaign_id]
+                missing.append(campaign_id)
+
+        self.hits += len(states)
+        self.misses += len(missing)
+        if missing:
+            loaded: Dict[str, CampaignState] = {}
+            if self.loader is not None:
+                try:
+                    loaded = await self.loader(missing)
+                except Exception as e:
+                    logger.error(f"Error loading campaign state for {len(missing)} campaigns: {e}")
+            expires_at = time.monotonic() + self.ttl_seconds
+            for campaign_id in missing:
+                state = loaded.get(campaign_id) or CampaignState(campaign_id=campaign_id)
+                self._entries[campaign_id] = (state, expires_at)
+                states[campaign_id] = state
+            self._evict()
+
+        return states
+
+    async def apply_change(self, campaign_id: str, **changes: float):
+        """
+        Write an executed change (daily_budget, current_bid) through to the cached state
+        and to the loader's store, so reads right after a write see the new value
+        instead of the pre-change value still held until the next platform sync.
+        """
+        record_change = getattr(self.loader, 'record_change', None)
+        if record_change is not None:
+            record_change(campaign_id, changes)
+        state = await self.get(campaign_id)
+        self._entries.pop(campaign_id, None)
+        self._entries[campaign_id] = (replace(state, **changes), time.monotonic() + self.ttl_seconds)
+
+    def _evict(self):
+        if len(self._entries) <= self.max_entries:
+            return
+        now = time.monotonic()
+        for campaign_id in [c for c, (_, expires_at) in self._entries.items() if expires_at <= now]:
+            del self._entries[campaign_id]
+        # Entries are kept in insertion order, so the oldest loads go first
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def invalidate(self, campaign_id: str):
+        self._entries.pop(campaign_id, None)
+
+    def invalidate_all(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        return {
+            'entries': len(self._entries),
+            'ttl_seconds': self.ttl_seconds,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'loader': type(self.loader).__name__ if self.loader is not None else None
         }
-        
-        self.safety_limits = {
-            'max_budget_increase_percentage': 50,  # 50%
-            'max_budget_decrease_percentage': 30,  # 30%
-            'max_bid_adjustment_percentage': 25,   # 25%
-            'min_campaign_budget': 10.0,  # $10 minimum
+
+# Shared by the optimization engine (reads) and executor (write-through after changes)
+campaign_state_cache = CampaignStateCache()
+
+@dataclass
+class PortfolioMetrics:
+    """Columnar performance metrics for every campaign in a portfolio"""
+    campaign_ids: List[str]
+    platforms: List[str]
+    impressions: np.ndarray
+    clicks: np.ndarray
+    conversions: np.ndarray
+    spend: np.ndarray
+    revenue: np.ndarray
+    ctr: np.ndarray
+    cpc: np.ndarray
+    cpa: np.ndarray
+    roas: np.ndarray
+    quality_score: Optional[np.ndarray] = None  # NaN where unavailable
+
+    def __post_init__(self):
+        n = len(self.campaign_ids)
+        for name in ('impressions', 'clicks', 'conversions', 'spend', 'revenue', 'ctr', 'cpc', 'cpa', 'roas'):
+            column = np.asarray(getattr(self, name), dtype=float)
+            if column.shape != (n,):
+                raise ValueError(f"Column '{name}' must have one value per campaign ({n})")
+            setattr(self, name, column)
+        if self.quality_score is None:
+            self.quality_score = np.full(n, np.nan)
+        else:
+            self.quality_score = np.asarray(self.quality_score, dtype=float)
+        if len(self.platforms) != n:
+            raise ValueError(f"Column 'platforms' must have one value per campaign ({n})")
+
+    def __len__(self) -> int:
+        return len(self.campaign_ids)
+
+    @classmethod
+    def from_metrics(cls, metrics: List[PerformanceMetrics]) -> 'PortfolioMetrics':
+        """Build a columnar portfolio from per-campaign metrics"""
+        return cls(
+            campaign_ids=[m.campaign_id for m in metrics],
+            platforms=[m.platform for m in metrics],
+            impressions=[m.impressions for m in metrics],
+            clicks=[m.clicks for m in metrics],
+            conversions=[m.conversions for m in metrics],
+            spend=[m.spend for m in metrics],
+            revenue=[m.revenue for m in metrics],
+            ctr=[m.ctr for m in metrics],
+            cpc=[m.cpc for m in metrics],
+            cpa=[m.cpa for m in metrics],
+            roas=[m.roas for m in metrics],
+            quality_score=[np.nan if m.quality_score is None else m.quality_score for m in metrics]
+        )
+
+@dataclass
+class PortfolioRecommendations:
+    """
+    Columnar result of a portfolio analysis, one row per recommendation ordered by campaign.
+    OptimizationRecommendation objects are only built when to_recommendations() is called.
+    """
+    portfolio: PortfolioMetrics
+    rule: np.ndarray
+    campaign_index: np.ndarray
+    optimization_type: np.ndarray
+    current_value: np.ndarray
+    recommended_value: np.ndarray
+    percentage: np.ndarray
+    confidence_score: np.ndarray
+    priority: np.ndarray
+    auto_execute: np.ndarray
+    optimization_scores: np.ndarray  # One score per campaign
+    context: Dict[str, np.ndarray] = field(default_factory=dict)  # Per-campaign state used by the rules
+    materialize: Optional[Callable[['PortfolioRecommendations', int], OptimizationRecommendation]] = field(default=None, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.rule)
+
+    def to_recommendations(self) -> List[OptimizationRecommendation]:
+        return [self.materialize(self, row) for row in range(len(self))]
+
+    def summary(self) -> Dict[str, int]:
+        """Portfolio-level counts computed without building recommendation objects"""
+        return {
+            'total_campaigns': len(self.portfolio),
+            'total_recommendations': len(self),
+            'auto_executable': int(self.auto_execute.sum()),
+            'high_priority': int((self.priority == Priority.HIGH).sum()),
+            'critical_priority': int((self.priority == Priority.CRITICAL).sum()),
+            'by_type': {
+                t.value: int((self.optimization_type == t).sum())
+                for t in OptimizationType
+                if (self.optimization_type == t).any()
+            }
         }
 
-    async def analyze_campaign_performance(self, metrics: PerformanceMetrics) -> List[OptimizationRecommendation]:
+@dataclass
+class BudgetAllocation:
+    """Portfolio budget allocation under a total spend cap"""
+    campaign_ids: List[str]
+    current_budget: np.ndarray
+    allocated_budget: np.ndarray
+    min_budget: np.ndarray
+    max_budget: np.ndarray
+    expected_revenue: np.ndarray
+    marginal_roas: np.ndarray  # Revenue from the next dollar at the allocated budget
+    total_budget: float
+
+    @property
+    def allocated_total(self) -> float:
+        return float(self.allocated_budget.sum())
+
+    @property
+    def unallocated(self) -> float:
+        return max(0.0, self.total_budget - self.allocated_total)
+
+    def summary(self) -> Dict:
+        return {
+            'total_budget': self.total_budget,
+            'allocated_total': round(self.allocated_total, 2),
+            'unallocated': round(self.unallocated, 2),
+            'current_total': round(float(self.current_budget.sum()), 2),
+            'expected_revenue': round(float(self.expected_revenue.sum()), 2),
+            'campaigns_increased': int((self.allocated_budget > self.current_budget + 0.01).sum()),
+            'campaigns_decreased': int((self.allocated_budget < self.current_budget - 0.01).sum()),
+            'campaigns_at_min': int(np.isclose(self.allocated_budget, self.min_budget).sum()),
+            'campaigns_at_max': int(np.isclose(self.allocated_budget, self.max_budget).sum())
+        }
+
+class CampaignOptimizationEngine:
+    """Real-time campaign optimization AI engine"""
+    
+    def __init__(self, state_cache: Optional[CampaignStateCache] = None,
+                 rules: Optional[RuleSetRepository] = None,
+                 trends: Optional[TrendTracker] = None):
+        self.state_cache = state_cache or campaign_state_cache
+        # Thresholds, rule parameters, safety limits and score ladders per tenant
+        self.rules = rules or rule_repository
+        # Incremental per-campaign trend state from daily performance snapshots
+        self.trends = trends or trend_tracker
+
+    async def analyze_campaign_performance(self, metrics: PerformanceMetrics,
+                                           tenant_id: Optional[str] = None) -> List[OptimizationRecommendation]:
         """Analyze campaign performance and generate optimization recommendations"""
         recommendations = []
         
         try:
+            rules = await self.rules.get(tenant_id)
+            
             # Budget optimization analysis
-            budget_rec = await self._analyze_budget_optimization(metrics)
+            budget_rec = await self._analyze_budget_optimization(metrics, rules)
             if budget_rec:
                 recommendations.append(budget_rec)
             
             # Bid optimization analysis
-            bid_rec = await self._analyze_bid_optimization(metrics)
+            bid_rec = await self._analyze_bid_optimization(metrics, rules)
             if bid_rec:
                 recommendations.append(bid_rec)
             
             # Campaign health check
-            health_recs = await self._analyze_campaign_health(metrics)
+            health_recs = await self._analyze_campaign_health(metrics, rules)
             recommendations.extend(health_recs)
             
             # Performance trend analysis
-            trend_recs = await self._analyze_performance_trends(metrics)
+            trend_recs = await self._analyze_performance_trends(metrics, rules)
             recommendations.extend(trend_recs)
             
         except Exception as e:
@@ -130,87 +427,43 @@ class CampaignOptimizationEngine:
         
         return recommendations
 
-    async def _analyze_budget_optimization(self, metrics: PerformanceMetrics) -> Optional[OptimizationRecommendation]:
+    async def _analyze_budget_optimization(self, metrics: PerformanceMetrics, rules: CompiledRuleSet) -> Optional[OptimizationRecommendation]:
         """Analyze and recommend budget optimizations"""
         
-        if metrics.roas >= self.optimization_rules['budget_increase_roas_threshold']:
+        if metrics.roas >= rules.optimization_rules['budget_increase_roas_threshold']:
             # High ROAS - recommend budget increase
             current_budget = await self._get_current_budget(metrics.campaign_id)
             increase_percentage = min(
                 math.ceil((metrics.roas - 2.0) * 10),  # Scale with ROAS
-                self.safety_limits['max_budget_increase_percentage']
+                rules.safety_limits['max_budget_increase_percentage']
             )
             
             new_budget = current_budget * (1 + increase_percentage / 100)
-            
-            return OptimizationRecommendation(
-                campaign_id=metrics.campaign_id,
-                optimization_type=OptimizationType.BUDGET_INCREASE,
-                current_value=current_budget,
-                recommended_value=new_budget,
-                expected_impact=f"Estimated +{increase_percentage * metrics.roas:.0f}% revenue increase",
-                confidence_score=0.85 if metrics.roas > 5.0 else 0.75,
-                priority=Priority.HIGH if metrics.roas > 6.0 else Priority.MEDIUM,
-                reasoning=f"High ROAS ({metrics.roas:.1f}x) indicates profitable scaling opportunity",
-                estimated_improvement={
-                    'revenue_increase_percentage': increase_percentage * (metrics.roas - 1),
-                    'additional_daily_revenue': (new_budget - current_budget) * metrics.roas
-                },
-                risk_assessment="Low risk - strong performance indicators",
-                auto_execute=metrics.roas > 5.0  # Auto-execute for very high ROAS
-            )
+            return self._build_budget_increase(metrics.campaign_id, metrics.roas, current_budget, new_budget, increase_percentage)
         
-        elif metrics.roas < self.optimization_rules['budget_decrease_roas_threshold']:
+        elif metrics.roas < rules.optimization_rules['budget_decrease_roas_threshold']:
             # Low ROAS - recommend budget decrease or pause
             current_budget = await self._get_current_budget(metrics.campaign_id)
             
             if metrics.roas < 1.0:
                 # Losing money - recommend pause
-                return OptimizationRecommendation(
-                    campaign_id=metrics.campaign_id,
-                    optimization_type=OptimizationType.PAUSE_CAMPAIGN,
-                    current_value=current_budget,
-                    recommended_value=0,
-                    expected_impact=f"Stop daily loss of ${current_budget * (1 - metrics.roas):.2f}",
-                    confidence_score=0.95,
-                    priority=Priority.CRITICAL,
-                    reasoning=f"Campaign losing money with ROAS {metrics.roas:.2f}x",
-                    estimated_improvement={
-                        'daily_loss_prevented': current_budget * (1 - metrics.roas)
-                    },
-                    risk_assessment="High risk to continue - immediate action needed",
-                    auto_execute=False  # Always require approval for pause
-                )
+                return self._build_pause(metrics.campaign_id, metrics.roas, current_budget)
             else:
                 # Reduce budget
                 decrease_percentage = min(
                     math.ceil((2.0 - metrics.roas) * 15),
-                    self.safety_limits['max_budget_decrease_percentage']
+                    rules.safety_limits['max_budget_decrease_percentage']
                 )
                 
                 new_budget = max(
                     current_budget * (1 - decrease_percentage / 100),
-                    self.safety_limits['min_campaign_budget']
-                )
-                
-                return OptimizationRecommendation(
-                    campaign_id=metrics.campaign_id,
-                    optimization_type=OptimizationType.BUDGET_DECREASE,
-                    current_value=current_budget,
-                    recommended_value=new_budget,
-                    expected_impact=f"Reduce daily loss by ${(current_budget - new_budget) * (1 - metrics.roas):.2f}",
-                    confidence_score=0.80,
-                    priority=Priority.HIGH,
-                    reasoning=f"Low ROAS ({metrics.roas:.2f}x) indicates budget reduction needed",
-                    estimated_improvement={
-                        'daily_loss_reduction': (current_budget - new_budget) * (1 - metrics.roas)
-                    },
-                    risk_assessment="Medium risk - monitor closely after adjustment"
+                    rules.safety_limits['min_campaign_budget']
                 )
+                return self._build_budget_decrease(metrics.campaign_id, metrics.roas, current_budget, new_budget)
         
         return None
 
-    async def _analyze_bid_optimization(self, metrics: PerformanceMetrics) -> Optional[OptimizationRecommendation]:
+    async def _analyze_bid_optimization(self, metrics: PerformanceMetrics, rules: CompiledRuleSet) -> Optional[OptimizationRecommendation]:
         """Analyze and recommend bid optimizations"""
         
         # Analyze CPC vs performance
@@ -221,26 +474,12 @@ class CampaignOptimizationEngine:
             current_bid = await self._get_current_bid(metrics.campaign_id)
             reduction_percentage = min(
                 math.ceil((metrics.cpc / target_cpc - 1) * 100),
-                self.safety_limits['max_bid_adjustment_percentage']
+                rules.safety_limits['max_bid_adjustment_percentage']
             )
             
             new_bid = current_bid * (1 - reduction_percentage / 100)
-            
-            return OptimizationRecommendation(
-                campaign_id=metrics.campaign_id,
-                optimization_type=OptimizationType.BID_DECREASE,
-                current_value=current_bid,
-                recommended_value=new_bid,
-                expected_impact=f"Reduce CPC by ~{reduction_percentage}%, maintain position",
-                confidence_score=0.75,
-                priority=Priority.MEDIUM,
-                reasoning=f"CPC (${metrics.cpc:.2f}) exceeds target by {(metrics.cpc/target_cpc-1)*100:.0f}%",
-                estimated_improvement={
-                    'cost_reduction_percentage': reduction_percentage,
-                    'daily_savings': metrics.clicks * (metrics.cpc - new_bid)
-                },
-                risk_assessment="Low risk - gradual bid reduction",
-                auto_execute=True if reduction_percentage < 15 else False
+            return self._build_bid_decrease(
+                metrics.campaign_id, metrics.cpc, metrics.clicks, target_cpc, current_bid, new_bid, reduction_percentage
             )
         
         elif metrics.roas > 4.0 and metrics.cpc < target_cpc * 0.8:
@@ -248,149 +487,820 @@ class CampaignOptimizationEngine:
             current_bid = await self._get_current_bid(metrics.campaign_id)
             increase_percentage = min(
                 math.ceil((metrics.roas - 3.0) * 5),
-                self.safety_limits['max_bid_adjustment_percentage']
+                rules.safety_limits['max_bid_adjustment_percentage']
             )
             
             new_bid = current_bid * (1 + increase_percentage / 100)
-            
-            return OptimizationRecommendation(
-                campaign_id=metrics.campaign_id,
-                optimization_type=OptimizationType.BID_INCREASE,
-                current_value=current_bid,
-                recommended_value=new_bid,
-                expected_impact=f"Increase volume by ~{increase_percentage * 2}%",
-                confidence_score=0.80,
-                priority=Priority.MEDIUM,
-                reasoning=f"Strong ROAS ({metrics.roas:.1f}x) allows aggressive bidding",
-                estimated_improvement={
-                    'volume_increase_percentage': increase_percentage * 2,
-                    'additional_daily_revenue': metrics.revenue * 0.2
-                },
-                risk_assessment="Medium risk - monitor position and volume",
-                auto_execute=True if increase_percentage < 20 else False
+            return self._build_bid_increase(
+                metrics.campaign_id, metrics.roas, metrics.revenue, current_bid, new_bid, increase_percentage
             )
         
         return None
 
-    async def _analyze_campaign_health(self, metrics: PerformanceMetrics) -> List[OptimizationRecommendation]:
+    async def _analyze_campaign_health(self, metrics: PerformanceMetrics, rules: CompiledRuleSet) -> List[OptimizationRecommendation]:
         """Analyze overall campaign health and identify issues"""
         recommendations = []
         
         # Low CTR analysis
-        if metrics.ctr < self.performance_thresholds['min_ctr']:
-            recommendations.append(OptimizationRecommendation(
-                campaign_id=metrics.campaign_id,
-                optimization_type=OptimizationType.AUDIENCE_OPTIMIZATION,
-                current_value=metrics.ctr,
-                recommended_value=self.performance_thresholds['min_ctr'],
-                expected_impact="Improve ad relevance and reduce wasted spend",
-                confidence_score=0.70,
-                priority=Priority.MEDIUM,
-                reasoning=f"CTR ({metrics.ctr:.2%}) below minimum threshold",
-                estimated_improvement={
-                    'ctr_improvement_needed': self.performance_thresholds['min_ctr'] - metrics.ctr
-                },
-                risk_assessment="Low risk - creative and targeting optimization needed",
-                auto_execute=False
+        if metrics.ctr < rules.performance_thresholds['min_ctr']:
+            recommendations.append(self._build_low_ctr(
+                metrics.campaign_id, metrics.ctr, rules.performance_thresholds['min_ctr']
             ))
         
         # Quality Score issues (if available)
-        if metrics.quality_score and metrics.quality_score < self.performance_thresholds['min_quality_score']:
-            recommendations.append(OptimizationRecommendation(
-                campaign_id=metrics.campaign_id,
-                optimization_type=OptimizationType.KEYWORD_BID_ADJUSTMENT,
-                current_value=metrics.quality_score,
-                recommended_value=self.performance_thresholds['min_quality_score'],
-                expected_impact="Reduce CPC and improve ad position",
-                confidence_score=0.85,
-                priority=Priority.HIGH,
-                reasoning=f"Quality Score ({metrics.quality_score}) needs improvement",
-                estimated_improvement={
-                    'potential_cpc_reduction': 0.15  # 15% CPC reduction with better QS
-                },
-                risk_assessment="Low risk - keyword and landing page optimization needed",
-                auto_execute=False
+        if metrics.quality_score and metrics.quality_score < rules.performance_thresholds['min_quality_score']:
+            recommendations.append(self._build_low_quality_score(
+                metrics.campaign_id, metrics.quality_score, rules.performance_thresholds['min_quality_score']
             ))
         
         return recommendations
 
-    async def _analyze_performance_trends(self, metrics: PerformanceMetrics) -> List[OptimizationRecommendation]:
-        """Analyze performance trends and predict optimizations"""
-        # This would analyze historical data to identify trends
-        # For now, return empty list as we'd need historical data
-        return []
+    async def _analyze_performance_trends(self, metrics: PerformanceMetrics, rules: CompiledRuleSet) -> List[OptimizationRecommendation]:
+        """Analyze performance trends from the campaign's daily snapshot history"""
+        features = self.trends.features(metrics.campaign_id)
+        trend_rules = rules.optimization_rules
+        if features is None or features['days_observed'] < trend_rules['trend_min_days']:
+            return []
+        
+        recommendations = []
+        threshold = trend_rules['trend_slope_threshold']
+        roas_slope = features['roas_relative_slope']
+        roas_change = features['roas_change']
+        
+        # Trend rules act early, while ROAS is still between the level-based thresholds
+        in_band = (trend_rules['budget_decrease_roas_threshold'] <= metrics.roas
+                   < trend_rules['budget_increase_roas_threshold'])
+        
+        if in_band and (roas_slope <= -threshold or roas_change < 0):
+            current_budget = await self._get_current_budget(metrics.campaign_id)
+            decrease_percentage = math.floor(min(
+                trend_rules['trend_budget_step_percentage'] * (2 if roas_change < 0 else 1),
+                rules.safety_limits['max_budget_decrease_percentage']
+            ))
+            new_budget = max(
+                current_budget * (1 - decrease_percentage / 100),
+                rules.safety_limits['min_campaign_budget']
+            )
+            recommendations.append(self._build_trend_budget_decrease(
+                metrics.campaign_id, metrics.roas, roas_slope, roas_change < 0,
+                current_budget, new_budget, decrease_percentage
+            ))
+        
+        elif in_band and roas_slope >= threshold and roas_change >= 0:
+            current_budget = await self._get_current_budget(metrics.campaign_id)
+            increase_percentage = math.floor(min(
+                trend_rules['trend_budget_step_percentage'],
+                rules.safety_limits['max_budget_increase_percentage']
+            ))
+            new_budget = current_budget * (1 + increase_percentage / 100)
+            recommendations.append(self._build_trend_budget_increase(
+                metrics.campaign_id, metrics.roas, roas_slope, current_budget, new_budget, increase_percentage
+            ))
+        
+        # Creative fatigue: CTR still above the floor but dropped at a change point
+        if (metrics.ctr >= rules.performance_thresholds['min_ctr'] and features['ctr_change'] < 0
+                and features['ctr_relative_slope'] <= -threshold):
+            recommendations.append(self._build_creative_fatigue(
+                metrics.campaign_id, metrics.ctr, features['ctr_level_before_change'], features['ctr_relative_slope']
+            ))
+        
+        return recommendations
+
+    def _build_budget_increase(self, campaign_id: str, roas: float, current_budget: float,
+                               new_budget: float, increase_percentage: int) -> OptimizationRecommendation:
+        return OptimizationRecommendation(
+            campaign_id=campaign_id,
+            optimization_type=OptimizationType.BUDGET_INCREASE,
+            current_value=current_budget,
+            recommended_value=new_budget,
+            expected_impact=f"Estimated +{increase_percentage * roas:.0f}% revenue increase",
+            confidence_score=0.85 if roas > 5.0 else 0.75,
+            priority=Priority.HIGH if roas > 6.0 else Priority.MEDIUM,
+            reasoning=f"High ROAS ({roas:.1f}x) indicates profitable scaling opportunity",
+            estimated_improvement={
+                'revenue_increase_percentage': increase_percentage * (roas - 1),
+                'additional_daily_revenue': (new_budget - current_budget) * roas
+            },
+            risk_assessment="Low risk - strong performance indicators",
+            auto_execute=roas > 5.0  # Auto-execute for very high ROAS
+        )
+
+    def _build_pause(self, campaign_id: str, roas: float, current_budget: float) -> OptimizationRecommendation:
+        return OptimizationRecommendation(
+            campaign_id=campaign_id,
+            optimization_type=OptimizationType.PAUSE_CAMPAIGN,
+            current_value=current_budget,
+            recommended_value=0,
+            expected_impact=f"Stop daily loss of ${current_budget * (1 - roas):.2f}",
+            confidence_score=0.95,
+            priority=Priority.CRITICAL,
+            reasoning=f"Campaign losing money with ROAS {roas:.2f}x",
+            estimated_improvement={
+                'daily_loss_prevented': current_budget * (1 - roas)
+            },
+            risk_assessment="High risk to continue - immediate action needed",
+            auto_execute=False  # Always require approval for pause
+        )
+
+    def _build_budget_decrease(self, campaign_id: str, roas: float, current_budget: float,
+                               new_budget: float) -> OptimizationRecommendation:
+        return OptimizationRecommendation(
+            campaign_id=campaign_id,
+            optimization_type=OptimizationType.BUDGET_DECREASE,
+            current_value=current_budget,
+            recommended_value=new_budget,
+            expected_impact=f"Reduce daily loss by ${(current_budget - new_budget) * (1 - roas):.2f}",
+            confidence_score=0.80,
+            priority=Priority.HIGH,
+            reasoning=f"Low ROAS ({roas:.2f}x) indicates budget reduction needed",
+            estimated_improvement={
+                'daily_loss_reduction': (current_budget - new_budget) * (1 - roas)
+            },
+            risk_assessment="Medium risk - monitor closely after adjustment"
+        )
+
+    def _build_bid_decrease(self, campaign_id: str, cpc: float, clicks: int, target_cpc: float,
+                            current_bid: float, new_bid: float, reduction_percentage: int) -> OptimizationRecommendation:
+        return OptimizationRecommendation(
+            campaign_id=campaign_id,
+            optimization_type=OptimizationType.BID_DECREASE,
+            current_value=current_bid,
+            recommended_value=new_bid,
+            expected_impact=f"Reduce CPC by ~{reduction_percentage}%, maintain position",
+            confidence_score=0.75,
+            priority=Priority.MEDIUM,
+            reasoning=f"CPC (${cpc:.2f}) exceeds target by {(cpc/target_cpc-1)*100:.0f}%",
+            estimated_improvement={
+                'cost_reduction_percentage': reduction_percentage,
+                'daily_savings': clicks * (cpc - new_bid)
+            },
+            risk_assessment="Low risk - gradual bid reduction",
+            auto_execute=True if reduction_percentage < 15 else False
+        )
+
+    def _build_bid_increase(self, campaign_id: str, roas: float, revenue: float, current_bid: float,
+                            new_bid: float, increase_percentage: int) -> OptimizationRecommendation:
+        return OptimizationRecommendation(
+            campaign_id=campaign_id,
+            optimization_type=OptimizationType.BID_INCREASE,
+            current_value=current_bid,
+            recommended_value=new_bid,
+            expected_impact=f"Increase volume by ~{increase_percentage * 2}%",
+            confidence_score=0.80,
+            priority=Priority.MEDIUM,
+            reasoning=f"Strong ROAS ({roas:.1f}x) allows aggressive bidding",
+            estimated_improvement={
+                'volume_increase_percentage': increase_percentage * 2,
+                'additional_daily_revenue': revenue * 0.2
+            },
+            risk_assessment="Medium risk - monitor position and volume",
+            auto_execute=True if increase_percentage < 20 else False
+        )
+
+    def _build_low_ctr(self, campaign_id: str, ctr: float, min_ctr: float) -> OptimizationRecommendation:
+        return OptimizationRecommendation(
+            campaign_id=campaign_id,
+            optimization_type=OptimizationType.AUDIENCE_OPTIMIZATION,
+            current_value=ctr,
+            recommended_value=min_ctr,
+            expected_impact="Improve ad relevance and reduce wasted spend",
+            confidence_score=0.70,
+            priority=Priority.MEDIUM,
+            reasoning=f"CTR ({ctr:.2%}) below minimum threshold",
+            estimated_improvement={
+                'ctr_improvement_needed': min_ctr - ctr
+            },
+            risk_assessment="Low risk - creative and targeting optimization needed",
+            auto_execute=False
+        )
+
+    def _build_low_quality_score(self, campaign_id: str, quality_score: float,
+                                 min_quality_score: float) -> OptimizationRecommendation:
+        return OptimizationRecommendation(
+            campaign_id=campaign_id,
+            optimization_type=OptimizationType.KEYWORD_BID_ADJUSTMENT,
+            current_value=quality_score,
+            recommended_value=min_quality_score,
+            expected_impact="Reduce CPC and improve ad position",
+            confidence_score=0.85,
+            priority=Priority.HIGH,
+            reasoning=f"Quality Score ({quality_score}) needs improvement",
+            estimated_improvement={
+                'potential_cpc_reduction': 0.15  # 15% CPC reduction with better QS
+            },
+            risk_assessment="Low risk - keyword and landing page optimization needed",
+            auto_execute=False
+        )
+
+    def _build_trend_budget_decrease(self, campaign_id: str, roas: float, relative_slope: float, change_point: bool,
+                                     current_budget: float, new_budget: float,
+                                     decrease_percentage: int) -> OptimizationRecommendation:
+        if change_point:
+            reasoning = f"ROAS ({roas:.2f}x) shifted down at a detected change point"
+        else:
+            reasoning = f"ROAS ({roas:.2f}x) declining {abs(relative_slope):.1%} per day"
+        return OptimizationRecommendation(
+            campaign_id=campaign_id,
+            optimization_type=OptimizationType.BUDGET_DECREASE,
+            current_value=current_budget,
+            recommended_value=new_budget,
+            expected_impact=f"Reduce spend exposure by ${current_budget - new_budget:.2f}/day while ROAS trends down",
+            confidence_score=0.80 if change_point else 0.70,
+            priority=Priority.HIGH if change_point else Priority.MEDIUM,
+            reasoning=reasoning,
+            estimated_improvement={
+                'budget_reduction_percentage': decrease_percentage,
+                'daily_spend_reduction': current_budget - new_budget
+            },
+            risk_assessment="Low risk - early adjustment ahead of ROAS thresholds",
+            auto_execute=False
+        )
+
+    def _build_trend_budget_increase(self, campaign_id: str, roas: float, relative_slope: float,
+                                     current_budget: float, new_budget: float,
+                                     increase_percentage: int) -> OptimizationRecommendation:
+        return OptimizationRecommendation(
+            campaign_id=campaign_id,
+            optimization_type=OptimizationType.BUDGET_INCREASE,
+            current_value=current_budget,
+            recommended_value=new_budget,
+            expected_impact=f"Scale +{increase_percentage}% while ROAS improves",
+            confidence_score=0.65,
+            priority=Priority.MEDIUM,
+            reasoning=f"ROAS ({roas:.2f}x) improving {relative_slope:.1%} per day",
+            estimated_improvement={
+                'budget_increase_percentage': increase_percentage,
+                'additional_daily_revenue': (new_budget - current_budget) * roas
+            },
+            risk_assessment="Medium risk - scale gradually while the trend holds",
+            auto_execute=False
+        )
+
+    def _build_creative_fatigue(self, campaign_id: str, ctr: float, ctr_before_change: float,
+                                relative_slope: float) -> OptimizationRecommendation:
+        return OptimizationRecommendation(
+            campaign_id=campaign_id,
+            optimization_type=OptimizationType.AUDIENCE_OPTIMIZATION,
+            current_value=ctr,
+            recommended_value=ctr_before_change,
+            expected_impact="Refresh creatives to recover click-through rate",
+            confidence_score=0.70,
+            priority=Priority.MEDIUM,
+            reasoning=f"CTR fell from {ctr_before_change:.2%} to {ctr:.2%} ({relative_slope:.1%} per day)",
+            estimated_improvement={
+                'ctr_recovery_needed': ctr_before_change - ctr
+            },
+            risk_assessment="Low risk - creative fatigue, rotate ad variants",
+            auto_execute=False
+        )
+
+    async def analyze_portfolio(self, portfolio: PortfolioMetrics,
+                                tenant_id: Optional[str] = None) -> PortfolioRecommendations:
+        """
+        Evaluate the budget, bid and health rules for every campaign in one vectorized pass.
+        Produces the same recommendations as analyze_campaign_performance run per campaign.
+        """
+        rules = await self.rules.get(tenant_id)
+        current_budget, target_cpc, current_bid = await self._get_portfolio_state(portfolio.campaign_ids)
+        trend = self.trends.feature_arrays(portfolio.campaign_ids)
+        roas, cpc, ctr, qs = portfolio.roas, portfolio.cpc, portfolio.ctr, portfolio.quality_score
+        groups = []
+
+        def add(rule, mask, optimization_type, current, recommended, percentage,
+                confidence, priority, auto_execute):
+            rows = np.flatnonzero(mask)
+            if rows.size == 0:
+                return
+            size = rows.size
+            groups.append({
+                'rule': np.full(size, rule, dtype=object),
+                'campaign_index': rows,
+                'optimization_type': np.full(size, optimization_type, dtype=object),
+                'current_value': np.broadcast_to(current, mask.shape)[rows],
+                'recommended_value': np.broadcast_to(recommended, mask.shape)[rows],
+                'percentage': np.broadcast_to(percentage, mask.shape)[rows],
+                'confidence_score': np.broadcast_to(confidence, mask.shape)[rows],
+                'priority': np.broadcast_to(np.asarray(priority, dtype=object), mask.shape)[rows],
+                'auto_execute': np.broadcast_to(auto_execute, mask.shape)[rows]
+            })
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Budget rules
+            increase = roas >= rules.optimization_rules['budget_increase_roas_threshold']
+            low_roas = ~increase & (roas < rules.optimization_rules['budget_decrease_roas_threshold'])
+            pause = low_roas & (roas < 1.0)
+            decrease = low_roas & ~pause
+
+            increase_pct = np.minimum(np.ceil((roas - 2.0) * 10), rules.safety_limits['max_budget_increase_percentage'])
+            add('budget_increase', increase, OptimizationType.BUDGET_INCREASE,
+                current_budget, current_budget * (1 + increase_pct / 100), increase_pct,
+                np.where(roas > 5.0, 0.85, 0.75),
+                np.where(roas > 6.0, Priority.HIGH, Priority.MEDIUM),
+                roas > 5.0)
+            add('pause', pause, OptimizationType.PAUSE_CAMPAIGN,
+                current_budget, 0.0, np.nan, 0.95, Priority.CRITICAL, False)
+            decrease_pct = np.minimum(np.ceil((2.0 - roas) * 15), rules.safety_limits['max_budget_decrease_percentage'])
+            add('budget_decrease', decrease, OptimizationType.BUDGET_DECREASE,
+                current_budget,
+                np.maximum(current_budget * (1 - decrease_pct / 100), rules.safety_limits['min_campaign_budget']),
+                decrease_pct, 0.80, Priority.HIGH, False)
+
+            # Bid rules
+            bid_decrease = (cpc > target_cpc * 1.2) & (roas < 3.0)
+            bid_increase = ~bid_decrease & (roas > 4.0) & (cpc < target_cpc * 0.8)
+            reduction_pct = np.minimum(np.ceil((cpc / target_cpc - 1) * 100), rules.safety_limits['max_bid_adjustment_percentage'])
+            add('bid_decrease', bid_decrease, OptimizationType.BID_DECREASE,
+                current_bid, current_bid * (1 - reduction_pct / 100), reduction_pct,
+                0.75, Priority.MEDIUM, reduction_pct < 15)
+            bid_increase_pct = np.minimum(np.ceil((roas - 3.0) * 5), rules.safety_limits['max_bid_adjustment_percentage'])
+            add('bid_increase', bid_increase, OptimizationType.BID_INCREASE,
+                current_bid, current_bid * (1 + bid_increase_pct / 100), bid_increase_pct,
+                0.80, Priority.MEDIUM, bid_increase_pct < 20)
+
+            # Health rules; a zero or missing quality score is treated as unavailable
+            add('low_ctr', ctr < rules.performance_thresholds['min_ctr'], OptimizationType.AUDIENCE_OPTIMIZATION,
+                ctr, rules.performance_thresholds['min_ctr'], np.nan, 0.70, Priority.MEDIUM, False)
+            add('low_quality_score',
+                ~np.isnan(qs) & (qs != 0) & (qs < rules.performance_thresholds['min_quality_score']),
+                OptimizationType.KEYWORD_BID_ADJUSTMENT,
+                qs, rules.performance_thresholds['min_quality_score'], np.nan, 0.85, Priority.HIGH, False)
+
+            # Trend rules
+            trend_rules = rules.optimization_rules
+            threshold = trend_rules['trend_slope_threshold']
+            has_trend = trend['days_observed'] >= trend_rules['trend_min_days']
+            in_band = ((roas >= trend_rules['budget_decrease_roas_threshold'])
+                       & (roas < trend_rules['budget_increase_roas_threshold']))
+            roas_slope, roas_change = trend['roas_relative_slope'], trend['roas_change']
+            trend_decrease = has_trend & in_band & ((roas_slope <= -threshold) | (roas_change < 0))
+            trend_increase = has_trend & in_band & ~trend_decrease & (roas_slope >= threshold) & (roas_change >= 0)
+            step = trend_rules['trend_budget_step_percentage']
+            trend_decrease_pct = np.floor(np.minimum(
+                np.where(roas_change < 0, step * 2, step), rules.safety_limits['max_budget_decrease_percentage']
+            ))
+            add('trend_budget_decrease', trend_decrease, OptimizationType.BUDGET_DECREASE,
+                current_budget,
+                np.maximum(current_budget * (1 - trend_decrease_pct / 100), rules.safety_limits['min_campaign_budget']),
+                trend_decrease_pct,
+                np.where(roas_change < 0, 0.80, 0.70),
+                np.where(roas_change < 0, Priority.HIGH, Priority.MEDIUM),
+                False)
+            trend_increase_pct = math.floor(min(step, rules.safety_limits['max_budget_increase_percentage']))
+            add('trend_budget_increase', trend_increase, OptimizationType.BUDGET_INCREASE,
+                current_budget, current_budget * (1 + trend_increase_pct / 100), trend_increase_pct,
+                0.65, Priority.MEDIUM, False)
+            add('creative_fatigue',
+                has_trend & (ctr >= rules.performance_thresholds['min_ctr']) & (trend['ctr_change'] < 0)
+                & (trend['ctr_relative_slope'] <= -threshold),
+                OptimizationType.AUDIENCE_OPTIMIZATION,
+                ctr, trend['ctr_level_before_change'], np.nan, 0.70, Priority.MEDIUM, False)
+
+        if groups:
+            columns = {key: np.concatenate([g[key] for g in groups]) for key in groups[0]}
+            # Stable sort keeps each campaign's recommendations in rule order
+            order = np.argsort(columns['campaign_index'], kind='stable')
+            columns = {key: values[order] for key, values in columns.items()}
+        else:
+            columns = {
+                'rule': np.empty(0, dtype=object),
+                'campaign_index': np.empty(0, dtype=int),
+                'optimization_type': np.empty(0, dtype=object),
+                'current_value': np.empty(0),
+                'recommended_value': np.empty(0),
+                'percentage': np.empty(0),
+                'confidence_score': np.empty(0),
+                'priority': np.empty(0, dtype=object),
+                'auto_execute': np.empty(0, dtype=bool)
+            }
+
+        return PortfolioRecommendations(
+            portfolio=portfolio,
+            optimization_scores=self.calculate_optimization_scores(portfolio, rules),
+            context={
+                'current_budget': current_budget,
+                'target_cpc': target_cpc,
+                'current_bid': current_bid,
+                'roas_relative_slope': trend['roas_relative_slope'],
+                'roas_change': trend['roas_change'],
+                'ctr_relative_slope': trend['ctr_relative_slope']
+            },
+            materialize=self._materialize_portfolio_recommendation,
+            **columns
+        )
+
+    def _materialize_portfolio_recommendation(self, result: PortfolioRecommendations, row: int) -> OptimizationRecommendation:
+        """Build the OptimizationRecommendation for one row of a portfolio result"""
+        p = result.portfolio
+        i = int(result.campaign_index[row])
+        rule = result.rule[row]
+        campaign_id = p.campaign_ids[i]
+        current = float(result.current_value[row])
+        recommended = float(result.recommended_value[row])
+
+        if rule == 'budget_increase':
+            return self._build_budget_increase(campaign_id, float(p.roas[i]), current, recommended, int(result.percentage[row]))
+        if rule == 'pause':
+            return self._build_pause(campaign_id, float(p.roas[i]), current)
+        if rule == 'budget_decrease':
+            return self._build_budget_decrease(campaign_id, float(p.roas[i]), current, recommended)
+        if rule == 'bid_decrease':
+            return self._build_bid_decrease(
+                campaign_id, float(p.cpc[i]), int(p.clicks[i]), float(result.context['target_cpc'][i]),
+                current, recommended, int(result.percentage[row])
+            )
+        if rule == 'bid_increase':
+            return self._build_bid_increase(
+                campaign_id, float(p.roas[i]), float(p.revenue[i]), current, recommended, int(result.percentage[row])
+            )
+        if rule == 'trend_budget_decrease':
+            return self._build_trend_budget_decrease(
+                campaign_id, float(p.roas[i]), float(result.context['roas_relative_slope'][i]),
+                bool(result.context['roas_change'][i] < 0), current, recommended, int(result.percentage[row])
+            )
+        if rule == 'trend_budget_increase':
+            return self._build_trend_budget_increase(
+                campaign_id, float(p.roas[i]), float(result.context['roas_relative_slope'][i]),
+                current, recommended, int(result.percentage[row])
+            )
+        if rule == 'creative_fatigue':
+            return self._build_creative_fatigue(
+                campaign_id, current, recommended, float(result.context['ctr_relative_slope'][i])
+            )
+        if rule == 'low_ctr':
+            return self._build_low_ctr(campaign_id, current, recommended)
+        return self._build_low_quality_score(campaign_id, current, recommended)
+
+    async def _get_portfolio_state(self, campaign_ids: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get current budgets, target CPCs and bids for a set of campaigns"""
+        states = await self.state_cache.get_many(campaign_ids)
+        ordered = [states[campaign_id] for campaign_id in campaign_ids]
+        return (
+            np.fromiter((state.daily_budget for state in ordered), dtype=float, count=len(ordered)),
+            np.fromiter((state.target_cpc for state in ordered), dtype=float, count=len(ordered)),
+            np.fromiter((state.current_bid for state in ordered), dtype=float, count=len(ordered))
+        )
 
     async def _get_current_budget(self, campaign_id: str) -> float:
         """Get current campaign budget"""
-        # Mock implementation - would connect to actual campaign management system
-        return 100.0  # Default $100/day
+        return (await self.state_cache.get(campaign_id)).daily_budget
 
     async def _get_target_cpc(self, campaign_id: str) -> float:
         """Get target CPC for campaign"""
-        # Mock implementation
-        return 1.50  # Default $1.50 target CPC
+        return (await self.state_cache.get(campaign_id)).target_cpc
 
     async def _get_current_bid(self, campaign_id: str) -> float:
         """Get current bid amount"""
-        # Mock implementation
-        return 2.00  # Default $2.00 bid
+        return (await self.state_cache.get(campaign_id)).current_bid
 
-    def calculate_optimization_score(self, metrics: PerformanceMetrics) -> float:
-        """Calculate overall optimization score (0-100)"""
-        score = 50  # Base score
-        
-        # ROAS contribution (40 points max)
-        if metrics.roas >= 4.0:
-            score += 40
-        elif metrics.roas >= 3.0:
-            score += 30
-        elif metrics.roas >= 2.0:
-            score += 20
-        elif metrics.roas >= 1.0:
-            score += 10
-        
-        # CTR contribution (20 points max)
-        if metrics.ctr >= 0.03:  # 3%+
-            score += 20
-        elif metrics.ctr >= 0.02:  # 2%+
-            score += 15
-        elif metrics.ctr >= 0.01:  # 1%+
-            score += 10
-        
-        # CPA efficiency (20 points max)
-        # This would need target CPA data
-        score += 15  # Default good score
-        
-        # Quality metrics (20 points max)
-        if metrics.quality_score:
-            if metrics.quality_score >= 8:
-                score += 20
-            elif metrics.quality_score >= 6:
-                score += 15
-            elif metrics.quality_score >= 4:
-                score += 10
-        else:
-            score += 10  # Default when no QS data
-        
-        return min(100, max(0, score))
+    def calculate_optimization_score(self, metrics: PerformanceMetrics, rules: CompiledRuleSet) -> float:
+        """Calculate overall optimization score (0-100) from the tenant's score ladders"""
+        return rules.score({
+            'roas': metrics.roas,
+            'ctr': metrics.ctr,
+            'cpa': metrics.cpa,
+            'quality_score': metrics.quality_score
+        })
+
+    def calculate_optimization_scores(self, portfolio: PortfolioMetrics, rules: CompiledRuleSet) -> np.ndarray:
+        """Vectorized calculate_optimization_score for every campaign in a portfolio"""
+        return rules.score_columns({
+            'roas': portfolio.roas,
+            'ctr': portfolio.ctr,
+            'cpa': portfolio.cpa,
+            'quality_score': portfolio.quality_score
+        }, len(portfolio))
+
+    async def allocate_portfolio_budget(self, campaign_ids: List[str], roas: np.ndarray, total_budget: float,
+                                        current_budget: Optional[np.ndarray] = None,
+                                        min_marginal_roas: float = 0.0,
+                                        tenant_id: Optional[str] = None) -> BudgetAllocation:
+        """
+        Split a total budget across campaigns to maximize expected revenue.
+
+        Each campaign's revenue follows a concave response curve anchored at its current
+        budget, revenue = roas * b0 * (b / b0) ** e, and is bounded by the safety limits
+        around b0. The optimum equalizes marginal ROAS across campaigns not at a bound;
+        that common marginal ROAS is found by bisection. Budget is left unallocated
+        rather than spent where the marginal ROAS would fall below min_marginal_roas.
+        """
+        rules = await self.rules.get(tenant_id)
+        roas = np.maximum(np.asarray(roas, dtype=float), 0.0)
+        if current_budget is None:
+            current_budget, _, _ = await self._get_portfolio_state(campaign_ids)
+        b0 = np.asarray(current_budget, dtype=float)
+        if roas.shape != (len(campaign_ids),) or b0.shape != roas.shape:
+            raise ValueError("roas and current_budget must have one value per campaign")
+
+        e = rules.optimization_rules['budget_response_elasticity']
+        lower = np.maximum(
+            b0 * (1 - rules.safety_limits['max_budget_decrease_percentage'] / 100),
+            rules.safety_limits['min_campaign_budget']
+        )
+        upper = np.maximum(b0 * (1 + rules.safety_limits['max_budget_increase_percentage'] / 100), lower)
+
+        if lower.sum() > total_budget + 1e-6:
+            raise ValueError(
+                f"Total budget {total_budget:.2f} is below the sum of per-campaign minimums {lower.sum():.2f}"
+            )
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            def allocate(marginal: float) -> np.ndarray:
+                # Budget at which each campaign's marginal ROAS equals `marginal`
+                return np.clip(b0 * (e * roas / marginal) ** (1 / (1 - e)), lower, upper)
+
+            floor = max(min_marginal_roas, 1e-12)
+            allocated = allocate(floor)
+            if allocated.sum() > total_budget:
+                low = floor
+                high = max(floor, float((e * roas * (b0 / lower) ** (1 - e)).max(initial=0.0))) * 2 + 1.0
+                for _ in range(100):
+                    mid = (low + high) / 2
+                    if allocate(mid).sum() > total_budget:
+                        low = mid
+                    else:
+                        high = mid
+                    if high - low <= 1e-12 * high:
+                        break
+                # The upper side of the bracket never exceeds the total budget
+                allocated = allocate(high)
+
+            scale = np.where(b0 > 0, allocated / b0, 0.0)
+            expected_revenue = np.where(b0 > 0, roas * b0 * scale ** e, 0.0)
+            marginal_roas = np.where(allocated > 0, e * roas * np.where(b0 > 0, b0 / allocated, 0.0) ** (1 - e), 0.0)
+
+        return BudgetAllocation(
+            campaign_ids=list(campaign_ids),
+            current_budget=b0,
+            allocated_budget=allocated,
+            min_budget=lower,
+            max_budget=upper,
+            expected_revenue=expected_revenue,
+            marginal_roas=marginal_roas,
+            total_budget=float(total_budget)
+        )
+
+# Bulk execution: operations per mutate request and concurrent requests per platform
+MAX_MUTATE_OPERATIONS = 1000
+PLATFORM_EXECUTION_CONCURRENCY = {
+    'google_ads': 4,
+    'meta_ads': 2,
+    'linkedin_ads': 1
+}
+DEFAULT_EXECUTION_CONCURRENCY = 2
+MAX_RETAINED_BATCH_JOBS = 100
+
+# Optimization types that can be applied as one bulk mutation kind
+MUTATION_KINDS = {
+    OptimizationType.BUDGET_INCREASE: 'campaign_budget',
+    OptimizationType.BUDGET_DECREASE: 'campaign_budget',
+    OptimizationType.BID_INCREASE: 'bid',
+    OptimizationType.BID_DECREASE: 'bid',
+    OptimizationType.PAUSE_CAMPAIGN: 'campaign_status'
+}
+
+@dataclass
+class BatchExecutionItem:
+    """One optimization in a batch job, with the account it applies to"""
+    recommendation: OptimizationRecommendation
+    platform: str = 'google_ads'
+    account_id: Optional[str] = None
+
+@dataclass
+class BatchExecutionJob:
+    """Background batch execution with results appended as they complete"""
+    job_id: str
+    total: int
+    status: str = 'queued'  # queued, running, completed, failed
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    results: List[Dict] = field(default_factory=list)
+    error: Optional[str] = None
+    _updated: asyncio.Condition = field(default_factory=asyncio.Condition, repr=False)
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    async def add_results(self, results: List[Dict]):
+        async with self._updated:
+            self.results.extend(results)
+            self._updated.notify_all()
+
+    async def finish(self, status: str, error: Optional[str] = None):
+        async with self._updated:
+            self.status = status
+            self.error = error
+            self.completed_at = datetime.utcnow()
+            self._updated.notify_all()
+
+    async def stream_results(self):
+        """Yield results in completion order until the job finishes"""
+        position = 0
+        while True:
+            async with self._updated:
+                while position >= len(self.results) and not self.done:
+                    await self._updated.wait()
+                pending = self.results[position:]
+                done = self.done
+            for result in pending:
+                yield result
+            position += len(pending)
+            if done and position >= len(self.results):
+                return
+
+    def get_status(self, since: int = 0) -> Dict:
+        successful = sum(1 for r in self.results if r.get('success'))
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'total': self.total,
+            'completed': len(self.results),
+            'successful': successful,
+            'failed': len(self.results) - successful,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'completed_at': self.completed_at,
+            'error': self.error,
+            'results': self.results[since:]
+        }
+
+@dataclass
+class ExecutionRecord:
+    """One executed optimization"""
+    execution_id: str
+    campaign_id: str
+    optimization_type: str
+    status: str  # success, failed
+    timestamp: datetime
+    result: Dict = field(default_factory=dict)
+    platform: Optional[str] = None
+    account_id: Optional[str] = None
+    batch_job_id: Optional[str] = None
+
+    def to_row(self) -> Dict:
+        row = asdict(self)
+        row['timestamp'] = self.timestamp.isoformat()
+        return row
+
+class ExecutionLog:
+    """
+    Bounded in-memory execution log with a per-campaign index.
+    Once a Supabase client is attached, records are flushed to the
+    optimization_execution_log table in batches by a background task.
+    Rows the database rejects for good are isolated and moved to a dead-letter file.
+    """
+
+    TABLE_NAME = 'optimization_execution_log'
+
+    def __init__(self, capacity: int = 10000, flush_batch_size: int = 200,
+                 flush_interval_seconds: float = 5.0, max_pending: int = 50000,
+                 dead_letter_path: str = DEFAULT_EXECUTION_DEAD_LETTER_PATH):
+        self.capacity = capacity
+        self.flush_batch_size = flush_batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.dead_letter_path = dead_letter_path
+        self.supabase = None
+        self._records: Deque[ExecutionRecord] = deque()
+        self._by_campaign: Dict[str, Deque[ExecutionRecord]] = {}
+        self._pending: Deque[Dict] = deque()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.total_recorded = 0
+        self.total_flushed = 0
+        self.dropped_unflushed = 0
+        self.total_dead_lettered = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def attach(self, supabase_client):
+        """Attach persistent storage and start the periodic flush"""
+        self.supabase = supabase_client
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stop the periodic flush and write out anything still pending"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    def record(self, record: ExecutionRecord):
+        """Add a record, evicting the oldest once the in-memory tier is full"""
+        if len(self._records) >= self.capacity:
+            evicted = self._records.popleft()
+            # The evicted record is also the oldest entry for its campaign
+            campaign_records = self._by_campaign[evicted.campaign_id]
+            campaign_records.popleft()
+            if not campaign_records:
+                del self._by_campaign[evicted.campaign_id]
+
+        self._records.append(record)
+        self._by_campaign.setdefault(record.campaign_id, deque()).append(record)
+        self.total_recorded += 1
+
+        if self.supabase is not None:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self.dropped_unflushed += 1
+            self._pending.append(record.to_row())
+
+    def campaign_history(self, campaign_id: str, limit: int = 50) -> List[ExecutionRecord]:
+        """Most recent in-memory records for a campaign, newest first"""
+        records = self._by_campaign.get(campaign_id)
+        if not records:
+            return []
+        return [records[-i] for i in range(1, min(limit, len(records)) + 1)]
+
+    def last_execution(self, campaign_id: str) -> Optional[ExecutionRecord]:
+        records = self._by_campaign.get(campaign_id)
+        return records[-1] if records else None
+
+    async def fetch_campaign_history(self, campaign_id: str, limit: int = 50) -> List[Dict]:
+        """Campaign history from memory, falling back to the database for older records"""
+        records = [r.to_row() for r in self.campaign_history(campaign_id, limit)]
+        if len(records) >= limit or self.supabase is None:
+            return records
+
+        await self.flush()
+        try:
+            result = await asyncio.to_thread(
+                lambda: self.supabase.table(self.TABLE_NAME)
+                .select('*')
+                .eq('campaign_id', campaign_id)
+                .order('timestamp', desc=True)
+                .limit(limit)
+                .execute()
+            )
+            return result.data or records
+        except Exception as e:
+            logger.error(f"Error loading execution history for {campaign_id}: {e}")
+            return records
+
+    async def flush(self) -> int:
+        """Write pending records to the database in batches"""
+        if self.supabase is None:
+            return 0
+        flushed = 0
+        async with self._flush_lock:
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self.flush_batch_size, len(self._pending)))]
+                outcome = await insert_isolating_rejects(self._insert, batch)
+                flushed += outcome.written
+                if outcome.rejected:
+                    # Rejected for good: retrying would block every later record
+                    self.total_dead_lettered += len(outcome.rejected)
+                    logger.error(f"Dead-lettering {len(outcome.rejected)} execution log records: {outcome.rejected[0][1]}")
+                    await asyncio.to_thread(write_dead_letters, self.dead_letter_path, outcome.rejected)
+                if outcome.transient_error is not None:
+                    logger.error(f"Error flushing {len(outcome.unwritten)} execution log records: {outcome.transient_error}")
+                    # Keep the unwritten rows for the next attempt
+                    self._pending.extendleft(reversed(outcome.unwritten))
+                    break
+        self.total_flushed += flushed
+        return flushed
+
+    async def _insert(self, rows: List[Dict]):
+        await asyncio.to_thread(lambda: self.supabase.table(self.TABLE_NAME).insert(rows).execute())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await self.flush()
+
+    def get_stats(self) -> Dict:
+        return {
+            'in_memory_records': len(self._records),
+            'capacity': self.capacity,
+            'campaigns_indexed': len(self._by_campaign),
+            'total_recorded': self.total_recorded,
+            'pending_flush': len(self._pending),
+            'total_flushed': self.total_flushed,
+            'dropped_unflushed': self.dropped_unflushed,
+            'dead_lettered': self.total_dead_lettered,
+            'persistent': self.supabase is not None
+        }
 
 class OptimizationExecutor:
     """Executes approved optimizations"""
     
-    def __init__(self):
-        self.execution_log = []
+    def __init__(self, state_cache: Optional[CampaignStateCache] = None):
+        self.state_cache = state_cache or campaign_state_cache
+        self.execution_log = ExecutionLog()
+        self.batch_jobs: Dict[str, BatchExecutionJob] = {}
+        self._platform_semaphores: Dict[str, asyncio.Semaphore] = {}
     
     async def execute_optimization(self, recommendation: OptimizationRecommendation) -> Dict:
         """Execute an optimization recommendation"""
         try:
-            # Log the execution attempt
-            execution_record = {
-                'campaign_id': recommendation.campaign_id,
-                'optimization_type': recommendation.optimization_type.value,
-                'timestamp': datetime.utcnow(),
-                'status': 'attempting'
-            }
-            
             # Simulate API calls to advertising platforms
             if recommendation.optimization_type == OptimizationType.BUDGET_INCREASE:
                 result = await self._update_campaign_budget(
@@ -417,9 +1327,16 @@ class OptimizationExecutor:
             else:
                 result = {'success': False, 'error': 'Optimization type not implemented'}
             
-            execution_record['status'] = 'success' if result.get('success') else 'failed'
-            execution_record['result'] = result
-            self.execution_log.append(execution_record)
+            if result.get('success'):
+                await self._apply_state_change(recommendation)
+            self.execution_log.record(ExecutionRecord(
+                execution_id=f"exec_{uuid.uuid4().hex[:12]}",
+                campaign_id=recommendation.campaign_id,
+                optimization_type=recommendation.optimization_type.value,
+                status='success' if result.get('success') else 'failed',
+                timestamp=datetime.utcnow(),
+                result=result
+            ))
             
             return result
             
@@ -427,6 +1344,138 @@ class OptimizationExecutor:
             logger.error(f"Failed to execute optimization: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    def start_batch_job(self, items: List[BatchExecutionItem]) -> BatchExecutionJob:
+        """Start executing a batch in the background and return its job for polling"""
+        job = BatchExecutionJob(job_id=f"batch_{uuid.uuid4().hex[:12]}", total=len(items))
+        self.batch_jobs[job.job_id] = job
+        self._prune_batch_jobs()
+        job._task = asyncio.create_task(self._run_batch_job(job, items))
+        return job
+
+    def get_batch_job(self, job_id: str) -> Optional[BatchExecutionJob]:
+        return self.batch_jobs.get(job_id)
+
+    def _prune_batch_jobs(self):
+        finished = [job_id for job_id, job in self.batch_jobs.items() if job.done]
+        for job_id in finished[:max(0, len(self.batch_jobs) - MAX_RETAINED_BATCH_JOBS)]:
+            del self.batch_jobs[job_id]
+
+    async def _run_batch_job(self, job: BatchExecutionJob, items: List[BatchExecutionItem]):
+        """Group items into per-account bulk mutations and run them concurrently"""
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        try:
+            groups: Dict[Tuple[str, Optional[str], str], List[BatchExecutionItem]] = {}
+            unsupported = []
+            for item in items:
+                kind = MUTATION_KINDS.get(item.recommendation.optimization_type)
+                if kind is None:
+                    unsupported.append(item)
+                else:
+                    groups.setdefault((item.platform, item.account_id, kind), []).append(item)
+
+            if unsupported:
+                await job.add_results([
+                    self._batch_result(item, {'success': False, 'error': 'Optimization type not implemented'})
+                    for item in unsupported
+                ])
+
+            chunks = [
+                (platform, account_id, kind, group[start:start + MAX_MUTATE_OPERATIONS])
+                for (platform, account_id, kind), group in groups.items()
+                for start in range(0, len(group), MAX_MUTATE_OPERATIONS)
+            ]
+            await asyncio.gather(*(self._execute_chunk(job, *chunk) for chunk in chunks))
+            await job.finish('completed')
+
+        except Exception as e:
+            logger.error(f"Batch job {job.job_id} failed: {str(e)}")
+            await job.finish('failed', str(e))
+
+    async def _execute_chunk(self, job: BatchExecutionJob, platform: str, account_id: Optional[str],
+                             kind: str, items: List[BatchExecutionItem]):
+        semaphore = self._platform_semaphores.get(platform)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(PLATFORM_EXECUTION_CONCURRENCY.get(platform, DEFAULT_EXECUTION_CONCURRENCY))
+            self._platform_semaphores[platform] = semaphore
+
+        async with semaphore:
+            try:
+                await rate_limiter.acquire(platform, account_id)
+                outcomes = await self._bulk_mutate(platform, account_id, kind, [item.recommendation for item in items])
+            except Exception as e:
+                logger.error(f"Bulk {kind} mutation failed for {platform}/{account_id}: {str(e)}")
+                outcomes = [{'success': False, 'error': str(e)} for _ in items]
+
+        timestamp = datetime.utcnow()
+        for item, outcome in zip(items, outcomes):
+            if outcome.get('success'):
+                await self._apply_state_change(item.recommendation)
+            self.execution_log.record(ExecutionRecord(
+                execution_id=f"exec_{uuid.uuid4().hex[:12]}",
+                campaign_id=item.recommendation.campaign_id,
+                optimization_type=item.recommendation.optimization_type.value,
+                status='success' if outcome.get('success') else 'failed',
+                timestamp=timestamp,
+                result=outcome,
+                platform=platform,
+                account_id=account_id,
+                batch_job_id=job.job_id
+            ))
+        await job.add_results([self._batch_result(item, outcome) for item, outcome in zip(items, outcomes)])
+
+    @staticmethod
+    def _batch_result(item: BatchExecutionItem, outcome: Dict) -> Dict:
+        return {
+            'campaign_id': item.recommendation.campaign_id,
+            'optimization_type': item.recommendation.optimization_type.value,
+            'platform': item.platform,
+            'account_id': item.account_id,
+            'success': outcome.get('success', False),
+            'message': outcome.get('message', outcome.get('error', '')),
+            'timestamp': datetime.utcnow()
+        }
+
+    async def _bulk_mutate(self, platform: str, account_id: Optional[str], kind: str,
+                           recommendations: List[OptimizationRecommendation]) -> List[Dict]:
+        """Apply one kind of change to many campaigns in a single platform request"""
+        # Mock implementation - e.g. one Google Ads MutateCampaignBudgets call with an operation per campaign
+        await asyncio.sleep(0.1)  # Simulate API call
+        results = []
+        for rec in recommendations:
+            if kind == 'campaign_budget':
+                results.append({
+                    'success': True,
+                    'message': f'Budget updated to ${rec.recommended_value:.2f}/day',
+                    'previous_budget': 100.0,
+                    'new_budget': rec.recommended_value
+                })
+            elif kind == 'bid':
+                results.append({
+                    'success': True,
+                    'message': f'Bid updated to ${rec.recommended_value:.2f}',
+                    'previous_bid': 2.00,
+                    'new_bid': rec.recommended_value
+                })
+            else:
+                results.append({
+                    'success': True,
+                    'message': 'Campaign paused successfully',
+                    'status': 'paused'
+                })
+        return results
+
+    async def _apply_state_change(self, recommendation: OptimizationRecommendation):
+        """Write a successful budget or bid change through to the campaign state cache"""
+        campaign_id = recommendation.campaign_id
+        if recommendation.optimization_type in (OptimizationType.BUDGET_INCREASE, OptimizationType.BUDGET_DECREASE):
+            await self.state_cache.apply_change(campaign_id, daily_budget=recommendation.recommended_value)
+        elif recommendation.optimization_type in (OptimizationType.BID_INCREASE, OptimizationType.BID_DECREASE):
+            await self.state_cache.apply_change(campaign_id, current_bid=recommendation.recommended_value)
+        else:
+            # Status changes are not part of the cached state; reload it on next read
+            self.state_cache.invalidate(campaign_id)
+    
     async def _update_campaign_budget(self, campaign_id: str, new_budget: float) -> Dict:
         """Update campaign budget via platform API"""
         # Mock implementation - would integrate with Google Ads, Facebook, etc.
@@ -0,0 +1,397 @@
+"""
+Optimization Rule Tables for PulseBridge.ai
+Per-tenant thresholds and score ladders, compiled into vectorized decision tables
+"""
+
+import asyncio
+import bisect
+import copy
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = 'default'
+
+DEFAULT_PERFORMANCE_THRESHOLDS = {
+    'min_roas': 2.0,
+    'max_cpa_multiplier': 1.5,  # 1.5x target CPA
+    'min_ctr': 0.01,  # 1%
+    'min_quality_score': 5.0,
+    'budget_utilization_min': 0.8,  # 80%
+    'budget_utilization_max': 0.95,  # 95%
+}
+
+DEFAULT_OPTIMIZATION_RULES = {
+    'budget_increase_roas_threshold': 4.0,
+    'budget_decrease_roas_threshold': 1.5,
+    'bid_adjustment_performance_window': 7,  # days
+    'min_data_points': 100,  # minimum clicks for reliable optimization
+    'budget_response_elasticity': 0.7,  # revenue ~ budget^0.7 (diminishing returns)
+    'trend_min_days': 7,  # daily snapshots needed before trend rules apply
+    'trend_slope_threshold': 0.03,  # 3% of the smoothed level per day
+    'trend_budget_step_percentage': 10,  # doubled after a detected change point
+}
+
+DEFAULT_SAFETY_LIMITS = {
+    'max_budget_increase_percentage': 50,  # 50%
+    'max_budget_decrease_percentage': 30,  # 30%
+    'max_bid_adjustment_percentage': 25,   # 25%
+    'min_campaign_budget': 10.0,  # $10 minimum
+}
+
+# Optimization score = base_score + one ladder per metric, clipped to 0-100.
+# A value v scores scores[i] where i is the number of edges <= v.
+DEFAULT_SCORE_TABLES = {
+    'base_score': 50,
+    'tables': {
+        'roas': {'edges': [1.0, 2.0, 3.0, 4.0], 'scores': [0, 10, 20, 30, 40]},  # 40 points max
+        'ctr': {'edges': [0.01, 0.02, 0.03], 'scores': [0, 10, 15, 20]},  # 20 points max
+        'cpa': {'edges': [], 'scores': [15]},  # Flat default until target CPA data is available
+        'quality_score': {
+            'edges': [4.0, 6.0, 8.0], 'scores': [0, 10, 15, 20],
+            'missing_score': 10, 'zero_is_missing': True  # Default when no QS data
+        }
+    }
+}
+
+@dataclass
+class ScoreTable:
+    """One metric's score ladder as bin edges plus per-bin scores"""
+    metric: str
+    edges: np.ndarray
+    scores: np.ndarray
+    missing_score: Optional[float] = None
+    zero_is_missing: bool = False
+
+    @classmethod
+    def compile(cls, metric: str, spec: Dict[str, Any]) -> 'ScoreTable':
+        if not isinstance(spec, dict) or 'scores' not in spec:
+            raise ValueError(f"Score table '{metric}' needs a 'scores' list")
+        try:
+            edges = np.asarray(spec.get('edges', []), dtype=float)
+            scores = np.asarray(spec['scores'], dtype=float)
+            missing = spec.get('missing_score')
+            missing = None if missing is None else float(missing)
+        except (TypeError, ValueError):
+            raise ValueError(f"Score table '{metric}' edges, scores and missing_score must be numbers")
+        if edges.ndim != 1 or scores.shape != (len(edges) + 1,):
+            raise ValueError(f"Score table '{metric}' needs exactly one more score than edges")
+        if np.any(np.diff(edges) <= 0):
+            raise ValueError(f"Score table '{metric}' edges must be strictly increasing")
+        return cls(
+            metric=metric,
+            edges=edges,
+            scores=scores,
+            missing_score=missing,
+            zero_is_missing=bool(spec.get('zero_is_missing', False))
+        )
+
+    def score(self, values: np.ndarray) -> np.ndarray:
+        points = self.scores[np.searchsorted(self.edges, values, side='right')]
+        missing = np.isnan(values)
+        if self.zero_is_missing:
+            missing |= values == 0
+        return np.where(missing, self.missing_score or 0.0, points)
+
+    def score_one(self, value: Optional[float]) -> float:
+        if value is None or value != value or (self.zero_is_missing and value == 0):
+            return self.missing_score or 0.0
+        return float(self.scores[bisect.bisect_right(self.edges, value)])
+
+@dataclass
+class CompiledRuleSet:
+    """A tenant's merged rule configuration, ready for vectorized evaluation"""
+    tenant_id: str
+    version: int
+    performance_thresholds: Dict[str, float]
+    optimization_rules: Dict[str, float]
+    safety_limits: Dict[str, float]
+    base_score: float
+    score_tables: List[ScoreTable]
+    compiled_at: datetime = field(default_factory=datetime.utcnow)
+
+    @classmethod
+    def compile(cls, tenant_id: str, overrides: Optional[Dict[str, Any]] = None, version: int = 0) -> 'CompiledRuleSet':
+        """Merge tenant overrides over the defaults and compile the score ladders"""
+        overrides = overrides or {}
+        sections = {}
+        for name, defaults in (('performance_thresholds', DEFAULT_PERFORMANCE_THRESHOLDS),
+                               ('optimization_rules', DEFAULT_OPTIMIZATION_RULES),
+                               ('safety_limits', DEFAULT_SAFETY_LIMITS)):
+            merged = dict(defaults)
+            section = overrides.get(name) or {}
+            if not isinstance(section, dict):
+                raise ValueError(f"{name} must be an object")
+            for key, value in section.items():
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    raise ValueError(f"{name}.{key} must be a number")
+                merged[key] = value
+            sections[name] = merged
+
+        elasticity = sections['optimization_rules']['budget_response_elasticity']
+        if not 0 < elasticity < 1:
+            # The budget response curve is concave, with a finite optimum, only for 0 < e < 1
+            raise ValueError(f"optimization_rules.budget_response_elasticity must be between 0 and 1, got {elasticity}")
+        safety_limits = sections['safety_limits']
+        for key in ('max_budget_increase_percentage', 'max_budget_decrease_percentage', 'min_campaign_budget'):
+            if safety_limits[key] < 0:
+                raise ValueError(f"safety_limits.{key} must not be negative, got {safety_limits[key]}")
+        if safety_limits['max_budget_decrease_percentage'] > 100:
+            raise ValueError("safety_limits.max_budget_decrease_percentage must not exceed 100")
+
+        score_config = copy.deepcopy(DEFAULT_SCORE_TABLES)
+        score_overrides = overrides.get('score_tables') or {}
+        if not isinstance(score_overrides, dict) or not isinstance(score_overrides.get('tables') or {}, dict):
+            raise ValueError("score_tables must be an object with a 'tables' object")
+        if 'base_score' in score_overrides:
+            base_score = score_overrides['base_score']
+            if not isinstance(base_score, (int, float)) or isinstance(base_score, bool):
+                raise ValueError("score_tables.base_score must be a number")
+            score_config['base_score'] = base_score
+        score_config['tables'].update(score_overrides.get('tables') or {})
+
+        return cls(
+            tenant_id=tenant_id,
+            version=version,
+            base_score=float(score_config['base_score']),
+            score_tables=[ScoreTable.compile(metric, spec) for metric, spec in score_config['tables'].items()],
+            **sections
+        )
+
+    def score(self, values: Dict[str, Optional[float]]) -> float:
+        """Optimization score for one campaign"""
+        total = self.base_score + sum(table.score_one(values.get(table.metric)) for table in self.score_tables)
+        return min(100, max(0, total))
+
+    def score_columns(self, columns: Dict[str, np.ndarray], size: int) -> np.ndarray:
+        """Optimization scores for a batch; cost is one searchsorted per ladder"""
+        total = np.full(size, self.base_score)
+        for table in self.score_tables:
+            column = columns.get(table.metric)
+            if column is None:
+                total += table.missing_score or 0.0
+            else:
+                total += table.score(np.asarray(column, dtype=float))
+        return np.clip(total, 0, 100)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'tenant_id': self.tenant_id,
+            'version': self.version,
+            'performance_thresholds': self.performance_thresholds,
+            'optimization_rules': self.optimization_rules,
+            'safety_limits': self.safety_limits,
+            'score_tables': {
+                'base_score': self.base_score,
+                'tables': {
+                    table.metric: {
+                        'edges': table.edges.tolist(),
+                        'scores': table.scores.tolist(),
+                        'missing_score': table.missing_score,
+                        'zero_is_missing': table.zero_is_missing
+                    }
+                    for table in self.score_tables
+                }
+            },
+            'compiled_at': self.compiled_at.isoformat()
+        }
+
+class RuleSetRepository:
+    """
+    Per-tenant rule configurations from the optimization_rule_configs table.
+    A tenant's rules are loaded on its first request, then re-checked by a
+    background task every refresh interval, so changes made in the table apply
+    without a restart and requests never wait on the table. At most max_tenants
+    tenants are tracked; the least recently requested are dropped first.
+    """
+
+    TABLE_NAME = 'optimization_rule_configs'
+    # Compare-and-set attempts before update() gives up on a contended tenant
+    UPDATE_ATTEMPTS = 5
+
+    def __init__(self, supabase_client=None, refresh_seconds: float = 30.0, max_tenants: int = 1000):
+        self.supabase = supabase_client
+        self.refresh_seconds = refresh_seconds
+        self.max_tenants = max_tenants
+        self._compiled: Dict[str, CompiledRuleSet] = {DEFAULT_TENANT: CompiledRuleSet.compile(DEFAULT_TENANT)}
+        # Tenants that have requested rules, least recently requested first
+        self._checked_at: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def attach(self, supabase_client):
+        self.supabase = supabase_client
+        self._checked_at.clear()
+
+    def start(self):
+        """Start re-checking every tracked tenant's rules in the background"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            for tenant_id in list(self._checked_at):
+                await self.reload(tenant_id)
+
+    def cached(self, tenant_id: Optional[str] = None) -> CompiledRuleSet:
+        """Compiled rules without a refresh check; falls back to the default tenant"""
+        tenant_id = tenant_id or DEFAULT_TENANT
+        return self._compiled.get(tenant_id) or self._compiled[DEFAULT_TENANT]
+
+    async def get(self, tenant_id: Optional[str] = None) -> CompiledRuleSet:
+        """Compiled rules for a tenant, loading them on the tenant's first request"""
+        tenant_id = tenant_id or DEFAULT_TENANT
+        checked_at = self._checked_at.pop(tenant_id, None)
+        if checked_at is None:
+            await self.reload(tenant_id)
+        else:
+            # Re-insert to mark the tenant as most recently requested
+            self._checked_at[tenant_id] = checked_at
+        return self.cached(tenant_id)
+
+    def _track(self, tenant_id: str):
+        self._checked_at.pop(tenant_id, None)
+        self._checked_at[tenant_id] = time.monotonic()
+        while len(self._checked_at) > self.max_tenants:
+            evicted = next(iter(self._checked_at))
+            del self._checked_at[evicted]
+            if evicted != DEFAULT_TENANT:
+                self._compiled.pop(evicted, None)
+
+    async def reload(self, tenant_id: str) -> CompiledRuleSet:
+        """Fetch a tenant's configuration and recompile it if the version changed"""
+        async with self._lock:
+            self._track(tenant_id)
+            if self.supabase is None:
+                # Without a table, updates are applied in memory by update()
+                return self.cached(tenant_id)
+
+            try:
+                result = await asyncio.to_thread(
+                    lambda: self.supabase.table(self.TABLE_NAME).select('*').eq('tenant_id', tenant_id).execute()
+                )
+            except Exception as e:
+                logger.error(f"Error loading rule configuration for tenant {tenant_id}: {e}")
+                return self.cached(tenant_id)
+
+            row = (result.data or [None])[0]
+            if row is None and tenant_id != DEFAULT_TENANT:
+                # No tenant-specific configuration: use the default tenant's rules
+                self._compiled.pop(tenant_id, None)
+                return self.cached(tenant_id)
+            version = row.get('version', 0) if row else 0
+
+            # Versions only increase, so an older row never replaces newer compiled rules
+            current = self._compiled.get(tenant_id)
+            if current is not None and current.version >= version:
+                return current
+
+            try:
+                compiled = CompiledRuleSet.compile(tenant_id, row, version)
+            except ValueError as e:
+                logger.error(f"Invalid rule configuration for tenant {tenant_id}, keeping previous rules: {e}")
+                return self.cached(tenant_id)
+
+            self._compiled[tenant_id] = compiled
+            logger.info(f"Compiled optimization rules for tenant {tenant_id} (version {compiled.version})")
+            return compiled
+
+    async def update(self, tenant_id: str, overrides: Dict[str, Any]) -> CompiledRuleSet:
+        """
+        Validate, store and immediately apply a tenant's rule overrides.
+        The new version is one past the version stored in the table, written with
+        a compare-and-set on that version, so replicas updating the same tenant
+        never write the same version and a restart never resets it.
+        """
+        # Validate before anything is written
+        compiled = CompiledRuleSet.compile(tenant_id, overrides)
+        if self.supabase is None:
+            current = self._compiled.get(tenant_id)
+            compiled.version = (current.version if current else 0) + 1
+        else:
+            compiled.version = await self._store(tenant_id, overrides)
+
+        async with self._lock:
+            current = self._compiled.get(tenant_id)
+            if current is None or current.version < compiled.version:
+                self._compiled[tenant_id] = compiled
+            self._track(tenant_id)
+        return compiled
+
+    async def _store(self, tenant_id: str, overrides: Dict[str, Any]) -> int:
+        """Write a tenant's row with the next version, retrying when another writer got there first"""
+        row = {
+            'tenant_id': tenant_id,
+            'performance_thresholds': overrides.get('performance_thresholds') or {},
+            'optimization_rules': overrides.get('optimization_rules') or {},
+            'safety_limits': overrides.get('safety_limits') or {},
+            'score_tables': overrides.get('score_tables') or {}
+        }
+
+        def table():
+            return self.supabase.table(self.TABLE_NAME)
+
+        for _ in range(self.UPDATE_ATTEMPTS):
+            result = await asyncio.to_thread(
+                lambda: table().select('version').eq('tenant_id', tenant_id).execute()
+            )
+            stored = (result.data or [None])[0]
+            updated_at = datetime.utcnow().isoformat()
+            if stored is None:
+                try:
+                    await asyncio.to_thread(
+                        lambda: table().insert(dict(row, version=1, updated_at=updated_at)).execute()
+                    )
+                    return 1
+                except Exception as e:
+                    # A concurrent insert created the row; bump its version instead
+                    if getattr(e, 'code', None) != '23505':
+                        raise
+                    continue
+
+            version = stored['version'] + 1
+            result = await asyncio.to_thread(
+                lambda: table()
+                .update(dict(row, version=version, updated_at=updated_at))
+                .eq('tenant_id', tenant_id)
+                .eq('version', stored['version'])
+                .execute()
+            )
+            if result.data:
+                return version
+        raise RuntimeError(f"Rule configuration for tenant {tenant_id} changed concurrently; try again")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            tenant_id: {'version': rules.version, 'compiled_at': rules.compiled_at.isoformat()}
+            for tenant_id, rules in self._compiled.items()
+        }
+
+# Process-wide repository shared by the optimization engine instances
+rule_repository = RuleSetRepository()
+
+__all__ = [
+    'RuleSetRepository',
+    'CompiledRuleSet',
+    'ScoreTable',
+    'DEFAULT_TENANT',
+    'rule_repository'
+]
@@ -0,0 +1,371 @@
+"""
+Performance Trend Tracking for PulseBridge.ai
+Incremental EWMA, slope and change-point features over daily performance snapshots
+"""
+
+import asyncio
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Any, Iterable
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TRACKED_METRICS = ('roas', 'ctr', 'cpc', 'spend')
+
+class MetricTrend:
+    """
+    Running trend state for one metric, updated in O(1) per daily value:
+    EWMA level and variance, exponentially weighted least-squares slope,
+    and a two-sided CUSUM on deviations from the EWMA for change points.
+    """
+
+    __slots__ = ('alpha', 'cusum_k', 'cusum_h', 'count', 'ewma', 'ewvar',
+                 'sw', 'st', 'stt', 'sy', 'sty', 'cusum_pos', 'cusum_neg',
+                 'change_direction', 'change_day', 'level_before_change')
+
+    def __init__(self, alpha: float, cusum_k: float = 0.5, cusum_h: float = 5.0):
+        self.alpha = alpha
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.count = 0
+        self.ewma = 0.0
+        self.ewvar = 0.0
+        self.sw = self.st = self.stt = self.sy = self.sty = 0.0
+        self.cusum_pos = self.cusum_neg = 0.0
+        self.change_direction = 0
+        self.change_day: Optional[int] = None
+        self.level_before_change: Optional[float] = None
+
+    def update(self, day: int, value: float):
+        """Fold in the value observed on `day` (days since the campaign's first snapshot)"""
+        if self.count >= 2 and self.ewvar > 0:
+            z = (value - self.ewma) / math.sqrt(self.ewvar)
+            self.cusum_pos = max(0.0, self.cusum_pos + z - self.cusum_k)
+            self.cusum_neg = max(0.0, self.cusum_neg - z - self.cusum_k)
+            if self.cusum_pos > self.cusum_h or self.cusum_neg > self.cusum_h:
+                self.change_direction = 1 if self.cusum_pos > self.cusum_h else -1
+                self.change_day = day
+                self.level_before_change = self.ewma
+                self.cusum_pos = self.cusum_neg = 0.0
+
+        if self.count == 0:
+            self.ewma = value
+        else:
+            diff = value - self.ewma
+            increment = self.alpha * diff
+            self.ewma += increment
+            self.ewvar = (1 - self.alpha) * (self.ewvar + diff * increment)
+
+        decay = 1 - self.alpha
+        self.sw = self.sw * decay + 1.0
+        self.st = self.st * decay + day
+        self.stt = self.stt * decay + day * day
+        self.sy = self.sy * decay + value
+        self.sty = self.sty * decay + day * value
+        self.count += 1
+
+    @property
+    def slope(self) -> float:
+        """Weighted least-squares change per day"""
+        denominator = self.sw * self.stt - self.st * self.st
+        if self.count < 2 or denominator <= 1e-9:
+            return 0.0
+        return (self.sw * self.sty - self.st * self.sy) / denominator
+
+    @property
+    def relative_slope(self) -> float:
+        """Slope as a fraction of the current level per day"""
+        return self.slope / self.ewma if self.ewma > 0 else 0.0
+
+@dataclass
+class CampaignTrendState:
+    """Trend state for every tracked metric of one campaign"""
+    campaign_id: str
+    origin: date
+    alpha: float
+    last_date: Optional[date] = None
+    days_observed: int = 0
+    metrics: Dict[str, MetricTrend] = field(default_factory=dict)
+    # Values applied for the most recent days, to spot late or restated snapshots
+    recent_values: Dict[date, Dict[str, Optional[float]]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for metric in TRACKED_METRICS:
+            self.metrics.setdefault(metric, MetricTrend(self.alpha))
+
+    def update(self, day: date, values: Dict[str, Optional[float]]) -> bool:
+        """Apply one day's snapshot; days at or before the last applied day are ignored"""
+        if self.last_date is not None and day <= self.last_date:
+            return False
+        offset = (day - self.origin).days
+        for metric, trend in self.metrics.items():
+            value = values.get(metric)
+            if value is not None and value == value:
+                trend.update(offset, float(value))
+        self.last_date = day
+        self.days_observed += 1
+        self.recent_values[day] = values
+        return True
+
+    def matches(self, day: date, values: Dict[str, Optional[float]]) -> bool:
+        """Whether a snapshot for an already-applied day is exactly what was applied"""
+        return self.recent_values.get(day) == values
+
+    def forget_before(self, day: date):
+        for applied_day in [d for d in self.recent_values if d < day]:
+            del self.recent_values[applied_day]
+
+    def features(self, change_window_days: int) -> Dict[str, Any]:
+        current_day = (self.last_date - self.origin).days if self.last_date else 0
+        features: Dict[str, Any] = {
+            'campaign_id': self.campaign_id,
+            'days_observed': self.days_observed,
+            'last_date': self.last_date.isoformat() if self.last_date else None
+        }
+        for metric, trend in self.metrics.items():
+            recent = trend.change_day is not None and current_day - trend.change_day < change_window_days
+            features[f'{metric}_ewma'] = trend.ewma
+            features[f'{metric}_slope'] = trend.slope
+            features[f'{metric}_relative_slope'] = trend.relative_slope
+            features[f'{metric}_change'] = trend.change_direction if recent else 0
+            features[f'{metric}_level_before_change'] = trend.level_before_change if recent else None
+        return features
+
+class TrendTracker:
+    """
+    Per-campaign trend state fed from the performance_snapshots table.
+    The first refresh loads `window_days` of history; later refreshes re-read
+    the last `overlap_days` completed days as well as anything newer. A row
+    that arrives late or is restated for a day already applied rebuilds that
+    campaign's state from its full window. Campaigns with no snapshot inside
+    the window are dropped. start() loads and then refreshes the state in the
+    background, so requests read whatever state is already loaded and never
+    wait on the table.
+    """
+
+    TABLE_NAME = 'performance_snapshots'
+    PAGE_SIZE = 1000
+    QUERY_CHUNK_SIZE = 150  # Campaign ids per in_() filter, to keep request URLs short
+
+    def __init__(self, window_days: int = 60, span_days: int = 14,
+                 change_window_days: int = 7, refresh_seconds: float = 3600.0,
+                 overlap_days: int = 3):
+        self.window_days = window_days
+        self.overlap_days = overlap_days
+        self.alpha = 2.0 / (span_days + 1)
+        self.change_window_days = change_window_days
+        self.refresh_seconds = refresh_seconds
+        self.supabase = None
+        self.states: Dict[str, CampaignTrendState] = {}
+        self.loaded_through: Optional[date] = None
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def attach(self, supabase_client):
+        self.supabase = supabase_client
+
+    def start(self):
+        """Load the window now and refresh every refresh_seconds, off the request path"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing performance trends: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    @staticmethod
+    def _parse_rows(rows: Iterable[Dict[str, Any]]) -> List[tuple]:
+        parsed = []
+        for row in rows:
+            day = row['date']
+            if isinstance(day, str):
+                day = date.fromisoformat(day[:10])
+            elif isinstance(day, datetime):
+                day = day.date()
+            parsed.append((day, row))
+        parsed.sort(key=lambda item: item[0])
+        return parsed
+
+    def stale_campaigns(self, rows: Iterable[Dict[str, Any]]) -> set:
+        """Campaigns with a row for an already-applied day that was missed or has since changed"""
+        stale = set()
+        for day, row in self._parse_rows(rows):
+            state = self.states.get(str(row['campaign_id']))
+            if state is not None and state.last_date is not None and day <= state.last_date:
+                if not state.matches(day, self._row_values(row)):
+                    stale.add(state.campaign_id)
+        return stale
+
+    def ingest(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Apply snapshot rows in date order; returns the number of campaign-days applied"""
+        parsed = self._parse_rows(rows)
+
+        applied = 0
+        for day, row in parsed:
+            campaign_id = str(row['campaign_id'])
+            state = self.states.get(campaign_id)
+            if state is None:
+                state = CampaignTrendState(campaign_id=campaign_id, origin=day, alpha=self.alpha)
+                self.states[campaign_id] = state
+            if state.update(day, self._row_values(row)):
+                applied += 1
+        return applied
+
+    @staticmethod
+    def _row_values(row: Dict[str, Any]) -> Dict[str, Optional[float]]:
+        spend = float(row.get('spend') or 0)
+        clicks = float(row.get('clicks') or 0)
+        impressions = float(row.get('impressions') or 0)
+        roas = row.get('roas')
+        if roas is None and spend > 0 and row.get('revenue') is not None:
+            roas = float(row['revenue']) / spend
+        ctr = row.get('ctr')
+        if ctr is None and impressions > 0:
+            ctr = clicks / impressions
+        cpc = row.get('cpc')
+        if cpc is None and clicks > 0:
+            cpc = spend / clicks
+        return {
+            'roas': None if roas is None else float(roas),
+            'ctr': None if ctr is None else float(ctr),
+            'cpc': None if cpc is None else float(cpc),
+            'spend': spend
+        }
+
+    async def _fetch(self, since: date, until: date, campaign_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Snapshot rows dated after `since` and before `until`, optionally for some campaigns only"""
+        chunks = [None] if campaign_ids is None else [
+            campaign_ids[start:start + self.QUERY_CHUNK_SIZE]
+            for start in range(0, len(campaign_ids), self.QUERY_CHUNK_SIZE)
+        ]
+        rows: List[Dict[str, Any]] = []
+        for chunk in chunks:
+            offset = 0
+            while True:
+                def query():
+                    request = (
+                        self.supabase.table(self.TABLE_NAME)
+                        .select('campaign_id,date,impressions,clicks,spend,revenue,ctr,cpc,roas')
+                        .gt('date', since.isoformat())
+                        .lt('date', until.isoformat())
+                    )
+                    if chunk is not None:
+                        request = request.in_('campaign_id', chunk)
+                    # date alone is shared by every campaign; the unique tiebreaker keeps offset pages stable
+                    return (
+                        request.order('date').order('campaign_id').order('id')
+                        .range(offset, offset + self.PAGE_SIZE - 1)
+                        .execute()
+                    )
+
+                page = await asyncio.to_thread(query)
+                rows.extend(page.data or [])
+                if len(page.data or []) < self.PAGE_SIZE:
+                    break
+                offset += self.PAGE_SIZE
+        return rows
+
+    async def refresh(self) -> int:
+        """Load completed days newer than the overlap window, rebuilding campaigns with late or restated rows"""
+        if self.supabase is None:
+            return 0
+        async with self._refresh_lock:
+            today = date.today()
+            window_start = today - timedelta(days=self.window_days + 1)
+            if self.loaded_through is None:
+                since = window_start
+            else:
+                since = max(window_start, self.loaded_through - timedelta(days=self.overlap_days))
+            try:
+                rows = await self._fetch(since, today)  # Today's row is still accumulating
+                stale = self.stale_campaigns(rows)
+                rebuild_rows = await self._fetch(window_start, today, sorted(stale)) if stale else []
+            except Exception as e:
+                logger.error(f"Error loading performance snapshots since {since}: {e}")
+                return 0
+
+            for campaign_id in stale:
+                del self.states[campaign_id]
+            applied = self.ingest(row for row in rows if str(row['campaign_id']) not in stale)
+            applied += self.ingest(rebuild_rows)
+            self.loaded_through = today - timedelta(days=1)
+            self._prune(today)
+            if stale:
+                logger.info(f"Rebuilt trend state for {len(stale)} campaigns with late or restated snapshots")
+            logger.info(f"Applied {applied} campaign-days of performance snapshots")
+            return applied
+
+    def _prune(self, today: date):
+        """Drop campaigns with no snapshot inside the window and forget values older than the overlap"""
+        window_start = today - timedelta(days=self.window_days + 1)
+        overlap_start = today - timedelta(days=self.overlap_days + 1)
+        for campaign_id in [c for c, state in self.states.items() if state.last_date is None or state.last_date <= window_start]:
+            del self.states[campaign_id]
+        for state in self.states.values():
+            state.forget_before(overlap_start)
+
+    def features(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        state = self.states.get(campaign_id)
+        return state.features(self.change_window_days) if state else None
+
+    def feature_arrays(self, campaign_ids: List[str], metrics: Iterable[str] = ('roas', 'ctr')) -> Dict[str, np.ndarray]:
+        """Columnar trend features aligned with campaign_ids; unknown campaigns have 0 days observed"""
+        n = len(campaign_ids)
+        metrics = tuple(metrics)
+        columns = {'days_observed': np.zeros(n)}
+        for metric in metrics:
+            columns[f'{metric}_ewma'] = np.zeros(n)
+            columns[f'{metric}_relative_slope'] = np.zeros(n)
+            columns[f'{metric}_change'] = np.zeros(n)
+            columns[f'{metric}_level_before_change'] = np.full(n, np.nan)
+
+        for i, campaign_id in enumerate(campaign_ids):
+            state = self.states.get(campaign_id)
+            if state is None:
+                continue
+            columns['days_observed'][i] = state.days_observed
+            current_day = (state.last_date - state.origin).days
+            for metric in metrics:
+                trend = state.metrics[metric]
+                columns[f'{metric}_ewma'][i] = trend.ewma
+                columns[f'{metric}_relative_slope'][i] = trend.relative_slope
+                if trend.change_day is not None and current_day - trend.change_day < self.change_window_days:
+                    columns[f'{metric}_change'][i] = trend.change_direction
+                    columns[f'{metric}_level_before_change'][i] = trend.level_before_change
+        return columns
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'campaigns_tracked': len(self.states),
+            'loaded_through': self.loaded_through.isoformat() if self.loaded_through else None,
+            'persistent': self.supabase is not None
+        }
+
+# Process-wide tracker shared by the optimization engine instances
+trend_tracker = TrendTracker()
+
+__all__ = [
+    'TrendTracker',
+    'CampaignTrendState',
+    'MetricTrend',
+    'trend_tracker'
+]
@@ -4,14 +4,18 @@ Provides backend endpoints for Pinterest Ads integration
 """
 
 import os
+from contextlib import aclosing
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-import requests
+from typing import AsyncIterator, List, Dict, Any, Optional
+import httpx
 from fastapi import HTTPException
 
+from platform_http import platform_http, paginate
+
 # Pinterest Ads API Configuration
 PINTEREST_API_BASE = "https://api.pinterest.com/v5"
 PINTEREST_API_VERSION = "v5"
+PINTEREST_PAGE_SIZE = 250  # v5 list endpoint maximum page_size
 
 class PinterestAdsClient:
     def __init__(self, access_token: str, ad_account_id: str):
@@ -19,7 +23,7 @@ class PinterestAdsClient:
         self.ad_account_id = ad_account_id
         self.base_url = PINTEREST_API_BASE
         
-    def _make_request(self, endpoint: str, method: str = "GET", params: dict = None, data: dict = None) -> dict:
+    async def _make_request(self, endpoint: str, method: str = "GET", params: dict = None, data: dict = None) -> dict:
         """Make authenticated request to Pinterest Ads API"""
         url = f"{self.base_url}/{endpoint}"
         
@@ -28,32 +32,27 @@ class PinterestAdsClient:
             'Content-Type': 'application/json',
         }
         
+        if method not in ("GET", "POST", "PUT", "DELETE"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
         try:
-            if method == "GET":
-                response = requests.get(url, params=params, headers=headers, timeout=30)
-            elif method == "POST":
-                response = requests.post(url, params=params, json=data, headers=headers, timeout=30)
-            elif method == "PUT":
-                response = requests.put(url, params=params, json=data, headers=headers, timeout=30)
-            elif method == "DELETE":
-                response = requests.delete(url, params=params, headers=headers, timeout=30)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-                
-            response.raise_for_status()
+            response = await platform_http.request(
+                method, url, params=params, json=data if method in ("POST", "PUT") else None, headers=headers,
+                platform='pinterest_ads', account_id=self.ad_account_id
+            )
             return response.json()
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             raise HTTPException(status_code=500, detail=f"Pinterest API request failed: {str(e)}")
     
-    def test_connection(self) -> dict:
+    async def test_connection(self) -> dict:
         """Test Pinterest Ads API connection"""
         try:
             # Test with user info endpoint
-            response = self._make_request("user_account", params={'fields': 'id,username'})
+            response = await self._make_request("user_account", params={'fields': 'id,username'})
             
             # Test ad account access
-            ad_account_response = self._make_request(
+            ad_account_response = await self._make_request(
                 f"ad_accounts/{self.ad_account_id}",
                 params={'fields': 'id,name,country,currency'}
             )
@@ -69,21 +68,37 @@ class PinterestAdsClient:
                 'error': str(e)
             }
     
-    def get_campaigns(self, limit: int = 25) -> List[Dict[str, Any]]:
-        """Retrieve Pinterest Ad campaigns"""
+    async def iter_campaigns(self, page_size: int = PINTEREST_PAGE_SIZE) -> AsyncIterator[Dict[str, Any]]:
+        """Stream every campaign in the ad account, following the bookmark cursor"""
+        params = {
+            'entity_statuses': 'ACTIVE,PAUSED,ARCHIVED',
+            'page_size': page_size
+        }
+
+        async def fetch_page(bookmark):
+            page_params = dict(params, bookmark=bookmark) if bookmark else dict(params)
+            response = await self._make_request(f"ad_accounts/{self.ad_account_id}/campaigns", params=page_params)
+            return response.get('items', []), response.get('bookmark')
+
+        async for page in paginate(fetch_page):
+            for campaign in page:
+                yield campaign
+
+    async def get_campaigns(self, limit: int = 25) -> List[Dict[str, Any]]:
+        """Retrieve up to `limit` Pinterest Ad campaigns"""
         try:
-            params = {
-                'entity_statuses': 'ACTIVE,PAUSED,ARCHIVED',
-                'limit': limit
-            }
-            
-            response = self._make_request(f"ad_accounts/{self.ad_account_id}/campaigns", params=params)
-            return response.get('items', [])
+            campaigns = []
+            async with aclosing(self.iter_campaigns(page_size=min(limit, PINTEREST_PAGE_SIZE))) as stream:
+                async for campaign in stream:
+                    campaigns.append(campaign)
+                    if len(campaigns) >= limit:
+                        break
+            return campaigns
             
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to get Pinterest campaigns: {str(e)}")
     
-    def get_campaign_analytics(self, campaign_id: str, start_date: str, end_date: str) -> Dict[str, Any]:
+    async def get_campaign_analytics(self, campaign_id: str, start_date: str, end_date: str) -> Dict[str, Any]:
         """Get campaign performance analytics"""
         try:
             params = {
@@ -94,7 +109,7 @@ class PinterestAdsClient:
                 'campaign_ids': campaign_id
             }
             
-            response = self._make_request("ad_accounts/{}/campaigns/analytics".format(self.ad_account_id), params=params)
+            response = await self._make_request("ad_accounts/{}/campaigns/analytics".format(self.ad_account_id), params=params)
             
             if response.get('items'):
                 # Aggregate daily metrics
@@ -126,7 +141,7 @@ class PinterestAdsClient:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to get Pinterest campaign analytics: {str(e)}")
     
-    def get_account_analytics(self, start_date: str, end_date: str) -> Dict[str, Any]:
+    async def get_account_analytics(self, start_date: str, end_date: str) -> Dict[str, Any]:
         """Get account-level performance analytics"""
         try:
             params = {
@@ -136,7 +151,7 @@ class PinterestAdsClient:
                 'columns': 'IMPRESSION,CLICKTHROUGH,SPEND,PIN_CLICK,OUTBOUND_CLICK,SAVE,TOTAL_CONVERSIONS,TOTAL_CONVERSION_VALUE'
             }
             
-            response = self._make_request(f"ad_accounts/{self.ad_account_id}/analytics", params=params)
+            response = await self._make_request(f"ad_accounts/{self.ad_account_id}/analytics", params=params)
             
             if response.get('items'):
                 # Aggregate daily metrics
@@ -189,7 +204,7 @@ async def get_pinterest_ads_status() -> Dict[str, Any]:
             'error': 'Pinterest Ads credentials not configured'
         }
     
-    return client.test_connection()
+    return await client.test_connection()
 
 async def get_pinterest_ads_campaigns(limit: int = 25) -> List[Dict[str, Any]]:
     """Get Pinterest Ads campaigns"""
@@ -197,7 +212,7 @@ async def get_pinterest_ads_campaigns(limit: int = 25) -> List[Dict[str, Any]]:
     if not client:
         raise HTTPException(status_code=400, detail="Pinterest Ads not configured")
     
-    return client.get_campaigns(limit)
+    return await client.get_campaigns(limit)
 
 async def get_pinterest_ads_performance(
     campaign_id: Optional[str] = None,
@@ -217,7 +232,7 @@ async def get_pinterest_ads_performance(
     
     if campaign_id:
         # Get specific campaign performance
-        return client.get_campaign_analytics(campaign_id, start_date_str, end_date_str)
+        return await client.get_campaign_analytics(campaign_id, start_date_str, end_date_str)
     else:
         # Get account-level performance
-        return client.get_account_analytics(start_date_str, end_date_str)
\ No newline at end of file
+        return await client.get_account_analytics(start_date_str, end_date_str)
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+Platform Executor for PulseBridge.ai
+Bounded per-platform thread pools for ad platform SDKs that only offer blocking calls
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Any, TypeVar
+
+from platform_rate_limiter import PLATFORM_ALIASES
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Worker threads per platform; a call beyond this waits for a free worker
+PLATFORM_WORKER_LIMITS: Dict[str, int] = {
+    'google_ads': 8,
+    'meta_ads': 8
+}
+
+DEFAULT_PLATFORM_WORKERS = 4
+
+class PlatformExecutor:
+    """
+    Runs blocking SDK calls (google-ads, facebook_business) off the event loop.
+    Each platform gets its own small thread pool so a slow platform queues
+    behind its own workers instead of exhausting the shared default pool
+    that FastAPI and asyncio.to_thread use.
+    """
+
+    def __init__(self, worker_limits: Optional[Dict[str, int]] = None,
+                 default_workers: int = DEFAULT_PLATFORM_WORKERS):
+        self.worker_limits = dict(PLATFORM_WORKER_LIMITS if worker_limits is None else worker_limits)
+        self.default_workers = default_workers
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.completed: Dict[str, int] = {}
+
+    @staticmethod
+    def normalize_platform(platform: str) -> str:
+        return PLATFORM_ALIASES.get(platform, platform)
+
+    def _pool_for(self, platform: str) -> ThreadPoolExecutor:
+        pool = self._pools.get(platform)
+        if pool is None:
+            pool = ThreadPoolExecutor(
+                max_workers=self.worker_limits.get(platform, self.default_workers),
+                thread_name_prefix=f"{platform}-sdk"
+            )
+            self._pools[platform] = pool
+        return pool
+
+    async def run(self, platform: str, func: Callable[..., T], *args, **kwargs) -> T:
+        """Call func(*args, **kwargs) on the platform's pool and await the result"""
+        platform = self.normalize_platform(platform)
+        loop = asyncio.get_running_loop()
+        # Carry context variables (request ids, log context) into the worker thread
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        self.in_flight[platform] = self.in_flight.get(platform, 0) + 1
+        try:
+            return await loop.run_in_executor(self._pool_for(platform), call)
+        finally:
+            self.in_flight[platform] -= 1
+            self.completed[platform] = self.completed.get(platform, 0) + 1
+
+    def shutdown(self, wait: bool = False):
+        """Stop every pool; queued calls are cancelled and pools are recreated on next use"""
+        pools = list(self._pools.values())
+        self._pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            platform: {
+                'max_workers': self.worker_limits.get(platform, self.default_workers),
+                'in_flight': self.in_flight.get(platform, 0),
+                'completed': self.completed.get(platform, 0)
+            }
+            for platform in sorted(self._pools)
+        }
+
+# Process-wide executor shared by the blocking platform SDK integrations
+platform_executor = PlatformExecutor()
+
+__all__ = [
+    'PlatformExecutor',
+    'PLATFORM_WORKER_LIMITS',
+    'platform_executor'
+]
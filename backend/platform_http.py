@@ -0,0 +1,231 @@
+"""
+Platform HTTP Client for PulseBridge.ai
+Shared pooled async HTTP layer for the ad platform integrations
+"""
+
+import asyncio
+import importlib.util
+import logging
+import random
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any, FrozenSet, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from platform_rate_limiter import rate_limiter
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+@dataclass
+class RetryPolicy:
+    """Which failures are retried, and how long to wait between attempts"""
+    max_attempts: int = 3
+    backoff_base_seconds: float = 0.5
+    backoff_max_seconds: float = 10.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    # Requests that are safe to resend after the server may have seen them
+    idempotent_methods: FrozenSet[str] = frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'})
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(self.backoff_max_seconds, float(retry_after))
+            except ValueError:
+                pass
+        backoff = self.backoff_base_seconds * (2 ** attempt)
+        return min(self.backoff_max_seconds, backoff * (0.5 + random.random() / 2))
+
+@dataclass
+class HTTPClientConfig:
+    """Connection pool and timeout settings, applied per host"""
+    max_connections: int = 50
+    max_keepalive_connections: int = 20
+    keepalive_expiry_seconds: float = 60.0
+    connect_timeout: float = 10.0
+    read_timeout: float = 30.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 10.0
+    http2: bool = True
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+
+class PlatformHTTPClient:
+    """
+    One keep-alive httpx.AsyncClient per platform host, created on first use
+    and shared by every integration that talks to that host.
+    """
+
+    def __init__(self, config: Optional[HTTPClientConfig] = None):
+        self.config = config or HTTPClientConfig()
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self.request_count = 0
+        self.retry_count = 0
+
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(host)
+        if client is None or client.is_closed:
+            config = self.config
+            client = httpx.AsyncClient(
+                http2=config.http2 and HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=config.max_connections,
+                    max_keepalive_connections=config.max_keepalive_connections,
+                    keepalive_expiry=config.keepalive_expiry_seconds
+                ),
+                timeout=httpx.Timeout(
+                    connect=config.connect_timeout,
+                    read=config.read_timeout,
+                    write=config.write_timeout,
+                    pool=config.pool_timeout
+                )
+            )
+            self._clients[host] = client
+        return client
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        data: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        retry: Optional[RetryPolicy] = None,
+        platform: Optional[str] = None,
+        account_id: Optional[str] = None,
+        cost: float = 1.0
+    ) -> httpx.Response:
+        """
+        Send a request on the host's pooled connection, retrying per the policy.
+        With a platform, every attempt is paced by that account's rate-limit bucket,
+        and the response's usage headers and throttle errors adapt the bucket.
+        cost is the number of platform calls the request counts as (e.g. a batch's operations).
+        Raises httpx.HTTPStatusError for error responses once retries are exhausted.
+        """
+        method = method.upper()
+        policy = retry or self.config.retry
+        client = self._client_for(url)
+        kwargs: Dict[str, Any] = {'params': params, 'json': json, 'data': data, 'headers': headers}
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+
+        attempt = 0
+        while True:
+            if platform is not None:
+                await rate_limiter.acquire(platform, account_id, cost)
+            self.request_count += 1
+            try:
+                response = await client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                # Nothing reached the server, so any method can be resent
+                if attempt + 1 >= policy.max_attempts:
+                    raise
+                await self._backoff(policy, attempt, None, method, url)
+                attempt += 1
+                continue
+            except httpx.TransportError:
+                if method not in policy.idempotent_methods or attempt + 1 >= policy.max_attempts:
+                    raise
+                await self._backoff(policy, attempt, None, method, url)
+                attempt += 1
+                continue
+
+            if platform is not None and self._record_rate_limit(platform, account_id, response):
+                # The throttled bucket is paused, so the next acquire waits it out
+                if attempt + 1 < policy.max_attempts:
+                    self.retry_count += 1
+                    attempt += 1
+                    continue
+                response.raise_for_status()
+
+            retryable = response.status_code in policy.retry_statuses and (
+                method in policy.idempotent_methods or response.status_code == 429
+            )
+            if retryable and attempt + 1 < policy.max_attempts:
+                await self._backoff(policy, attempt, response.headers.get('retry-after'), method, url)
+                attempt += 1
+                continue
+
+            response.raise_for_status()
+            return response
+
+    @staticmethod
+    def _record_rate_limit(platform: str, account_id: Optional[str], response: httpx.Response) -> bool:
+        """Feed a response into the rate limiter; returns True when it was a throttle"""
+        if response.is_success:
+            rate_limiter.record_response(platform, account_id, dict(response.headers))
+            return False
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        if rate_limiter.is_throttle_error(response.status_code, payload):
+            rate_limiter.record_throttle(platform, account_id, dict(response.headers))
+            return True
+        return False
+
+    async def _backoff(self, policy: RetryPolicy, attempt: int, retry_after: Optional[str], method: str, url: str):
+        self.retry_count += 1
+        delay = policy.delay(attempt, retry_after)
+        logger.warning(f"Retrying {method} {urlsplit(url).path} in {delay:.1f}s (attempt {attempt + 2}/{policy.max_attempts})")
+        await asyncio.sleep(delay)
+
+    async def close(self):
+        """Close every pooled connection; clients are recreated on next use"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'hosts': sorted(self._clients),
+            'http2': self.config.http2 and HTTP2_AVAILABLE,
+            'requests': self.request_count,
+            'retries': self.retry_count
+        }
+
+# A page fetcher takes the cursor from the previous page (None for the first)
+# and returns that page's items plus the next cursor, or None on the last page
+PageFetcher = Callable[[Optional[Any]], Awaitable[Tuple[List[Any], Optional[Any]]]]
+
+async def paginate(fetch_page: PageFetcher) -> AsyncIterator[List[Any]]:
+    """
+    Yield successive pages from a cursor-paginated API. The next page is
+    requested as soon as its cursor is known, so it downloads while the
+    caller processes the current one; at most two pages are held at a time.
+    """
+    pending: Optional[asyncio.Task] = asyncio.ensure_future(fetch_page(None))
+    try:
+        while pending is not None:
+            items, cursor = await pending
+            pending = asyncio.ensure_future(fetch_page(cursor)) if cursor is not None and items else None
+            if items:
+                yield items
+    finally:
+        # Caller stopped early (or failed): drop the prefetched page
+        if pending is not None:
+            if not pending.done():
+                pending.cancel()
+            elif not pending.cancelled():
+                pending.exception()  # Mark a failed prefetch as retrieved
+
+# Process-wide HTTP layer shared by all platform integrations
+platform_http = PlatformHTTPClient()
+
+__all__ = [
+    'PlatformHTTPClient',
+    'HTTPClientConfig',
+    'RetryPolicy',
+    'PageFetcher',
+    'paginate',
+    'platform_http'
+]
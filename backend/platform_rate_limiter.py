@@ -0,0 +1,271 @@
+"""
+Platform Rate Limiter for PulseBridge.ai
+Shared per-(platform, account) token buckets that adapt to platform rate-limit headers
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Any, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RateLimitConfig:
+    """Known quota for one platform, applied per ad account"""
+    requests_per_second: float
+    burst: int
+    backoff_seconds: float  # Pause after a throttle response without Retry-After
+
+# Conservative sustained rates under each platform's published quotas
+PLATFORM_RATE_LIMITS: Dict[str, RateLimitConfig] = {
+    'google_ads': RateLimitConfig(requests_per_second=10.0, burst=20, backoff_seconds=30.0),
+    'meta_ads': RateLimitConfig(requests_per_second=5.0, burst=10, backoff_seconds=60.0),
+    'linkedin_ads': RateLimitConfig(requests_per_second=2.0, burst=5, backoff_seconds=60.0),
+    'pinterest_ads': RateLimitConfig(requests_per_second=8.0, burst=15, backoff_seconds=60.0),
+    'microsoft_ads': RateLimitConfig(requests_per_second=5.0, burst=10, backoff_seconds=30.0)
+}
+
+DEFAULT_RATE_LIMIT = RateLimitConfig(requests_per_second=2.0, burst=5, backoff_seconds=60.0)
+
+# Platform names used by the sync engine and integrations
+PLATFORM_ALIASES = {
+    'meta': 'meta_ads',
+    'facebook': 'meta_ads',
+    'linkedin': 'linkedin_ads',
+    'pinterest': 'pinterest_ads',
+    'microsoft': 'microsoft_ads'
+}
+
+# Graph API error codes that signal throttling rather than a bad request
+META_THROTTLE_ERROR_CODES = frozenset({4, 17, 32, 613}) | frozenset(range(80000, 80015))
+
+# Usage percentage above which the sustained rate is scaled down
+USAGE_SLOWDOWN_THRESHOLD = 50.0
+MIN_RATE_FRACTION = 0.05
+
+class TokenBucket:
+    """Token bucket with an adjustable refill rate and a pause window"""
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self.base_rate = config.requests_per_second
+        self.rate = config.requests_per_second
+        self.capacity = float(config.burst)
+        self.tokens = float(config.burst)
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.throttle_count = 0
+        self.last_usage_pct: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Wait until tokens are available; returns the time spent waiting.
+        A cost above capacity waits for a full bucket and leaves it in debt,
+        so the excess delays the calls that follow instead of waiting forever.
+        """
+        if tokens <= 0:
+            raise ValueError(f"Rate limiter cost must be positive, got {tokens}")
+        needed = min(tokens, self.capacity)
+        started = time.monotonic()
+        # Holding the lock while sleeping keeps waiters in FIFO order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self.tokens >= needed:
+                    self.tokens -= tokens
+                    return time.monotonic() - started
+
+                await asyncio.sleep((needed - self.tokens) / self.rate)
+
+    def apply_usage(self, usage_pct: float, regain_seconds: float = 0.0):
+        """
+        Scale the sustained rate to the platform-reported quota usage.
+        Only an exhausted quota pauses the bucket; regain_seconds sets how long.
+        """
+        self.last_usage_pct = usage_pct
+        if usage_pct >= 100:
+            self.pause(regain_seconds or self.config.backoff_seconds)
+
+        if usage_pct <= USAGE_SLOWDOWN_THRESHOLD:
+            self.rate = self.base_rate
+        else:
+            headroom = max(0.0, 100.0 - usage_pct) / (100.0 - USAGE_SLOWDOWN_THRESHOLD)
+            self.rate = self.base_rate * max(MIN_RATE_FRACTION, headroom)
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """Back off after a throttle response: halve the rate and pause"""
+        self.throttle_count += 1
+        self.rate = max(self.base_rate * MIN_RATE_FRACTION, self.rate / 2)
+        self.pause(retry_after if retry_after is not None else self.config.backoff_seconds)
+
+    def recover(self):
+        """Additively restore the rate after successful calls without usage headers"""
+        self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        # Keep any debt from an oversized acquire
+        self.tokens = min(self.tokens, 0.0)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'rate_per_second': round(self.rate, 3),
+            'base_rate_per_second': self.base_rate,
+            'available_tokens': round(self.tokens, 2),
+            'paused_for_seconds': round(max(0.0, self.paused_until - time.monotonic()), 1),
+            'throttle_count': self.throttle_count,
+            'last_usage_pct': self.last_usage_pct
+        }
+
+class PlatformRateLimiter:
+    """
+    Shared rate-limit subsystem for execution connectors and sync connectors.
+    Buckets are created lazily per (platform, account) from PLATFORM_RATE_LIMITS.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, RateLimitConfig]] = None):
+        self.limits = dict(limits or PLATFORM_RATE_LIMITS)
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    @staticmethod
+    def normalize_platform(platform: str) -> str:
+        return PLATFORM_ALIASES.get(platform, platform)
+
+    def configure(self, platform: str, config: RateLimitConfig):
+        """Override a platform's quota; applies to buckets created afterwards"""
+        self.limits[self.normalize_platform(platform)] = config
+
+    def bucket(self, platform: str, account_id: Optional[str] = None) -> TokenBucket:
+        platform = self.normalize_platform(platform)
+        key = (platform, account_id or 'default')
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.limits.get(platform, DEFAULT_RATE_LIMIT))
+            self.buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, platform: str, account_id: Optional[str] = None, cost: float = 1.0) -> float:
+        """Wait for capacity on a platform account before making a call"""
+        waited = await self.bucket(platform, account_id).acquire(cost)
+        if waited > 1.0:
+            logger.info(f"Rate limiter delayed {platform}/{account_id or 'default'} call by {waited:.1f}s")
+        return waited
+
+    def record_response(self, platform: str, account_id: Optional[str], headers: Optional[Dict[str, str]]):
+        """Adapt the account's bucket to rate-limit headers from a successful response"""
+        bucket = self.bucket(platform, account_id)
+        usage = self.parse_usage_headers(headers or {})
+        if usage is None:
+            bucket.recover()
+        else:
+            bucket.apply_usage(*usage)
+
+    def record_throttle(self, platform: str, account_id: Optional[str], headers: Optional[Dict[str, str]] = None):
+        """Back off an account's bucket after a throttle error (HTTP 429, Meta codes 4/17/613, RESOURCE_EXHAUSTED)"""
+        retry_after = None
+        usage = None
+        if headers:
+            lowered = {k.lower(): v for k, v in headers.items()}
+            try:
+                retry_after = float(lowered['retry-after']) if 'retry-after' in lowered else None
+            except ValueError:
+                retry_after = None
+            usage = self.parse_usage_headers(headers)
+
+        bucket = self.bucket(platform, account_id)
+        if usage is not None and usage[1] > 0:
+            retry_after = max(retry_after or 0.0, usage[1])
+        bucket.penalize(retry_after)
+        logger.warning(f"Throttled by {platform}/{account_id or 'default'}; rate now {bucket.rate:.2f}/s")
+
+    @staticmethod
+    def is_throttle_error(status_code: int, payload: Any = None) -> bool:
+        """Whether an error response is a throttle (HTTP 429 or a Meta throttling error code)"""
+        if status_code == 429:
+            return True
+        if isinstance(payload, dict) and isinstance(payload.get('error'), dict):
+            return payload['error'].get('code') in META_THROTTLE_ERROR_CODES
+        return False
+
+    @staticmethod
+    def parse_usage_headers(headers: Dict[str, str]) -> Optional[Tuple[float, float]]:
+        """
+        Extract (usage percent, seconds until access is regained) from platform headers.
+        Understands Meta's x-business-use-case-usage, x-ad-account-usage and x-app-usage,
+        and the generic X-RateLimit-Limit/Remaining/Reset family.
+        """
+        lowered = {k.lower(): v for k, v in headers.items()}
+        usage_pct = None
+        regain_seconds = 0.0
+
+        try:
+            if 'x-business-use-case-usage' in lowered:
+                for entries in json.loads(lowered['x-business-use-case-usage']).values():
+                    for entry in entries:
+                        pct = max(entry.get('call_count', 0), entry.get('total_cputime', 0), entry.get('total_time', 0))
+                        usage_pct = max(usage_pct or 0.0, float(pct))
+                        regain_seconds = max(regain_seconds, float(entry.get('estimated_time_to_regain_access', 0)) * 60)
+
+            if 'x-ad-account-usage' in lowered:
+                account_usage = json.loads(lowered['x-ad-account-usage'])
+                # reset_time_duration is when the usage window rolls over, not a throttle,
+                # so it only feeds the usage percentage
+                usage_pct = max(usage_pct or 0.0, float(account_usage.get('acc_id_util_pct', 0)))
+
+            if 'x-app-usage' in lowered:
+                app_usage = json.loads(lowered['x-app-usage'])
+                pct = max(app_usage.get('call_count', 0), app_usage.get('total_cputime', 0), app_usage.get('total_time', 0))
+                usage_pct = max(usage_pct or 0.0, float(pct))
+
+            if 'x-ratelimit-limit' in lowered and 'x-ratelimit-remaining' in lowered:
+                limit = float(lowered['x-ratelimit-limit'])
+                remaining = float(lowered['x-ratelimit-remaining'])
+                if limit > 0:
+                    usage_pct = max(usage_pct or 0.0, 100.0 * (1 - remaining / limit))
+                    if remaining <= 0 and 'x-ratelimit-reset' in lowered:
+                        reset = float(lowered['x-ratelimit-reset'])
+                        # Some platforms send an epoch timestamp rather than seconds remaining
+                        if reset > 1e9:
+                            reset -= time.time()
+                        regain_seconds = max(regain_seconds, reset)
+
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Could not parse rate limit headers: {e}")
+            return None
+
+        if usage_pct is None:
+            return None
+        return usage_pct, regain_seconds
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            f"{platform}:{account_id}": bucket.get_status()
+            for (platform, account_id), bucket in self.buckets.items()
+        }
+
+# Process-wide limiter shared by all connectors
+rate_limiter = PlatformRateLimiter()
+
+__all__ = [
+    'PlatformRateLimiter',
+    'TokenBucket',
+    'RateLimitConfig',
+    'META_THROTTLE_ERROR_CODES',
+    'PLATFORM_RATE_LIMITS',
+    'rate_limiter'
+]
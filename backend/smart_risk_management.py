@@ -2,10 +2,22 @@
 # Advanced risk assessment with customizable testing modes
 # Client-facing intelligence with Meta AI invisible integration
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Any, Sequence, Deque
 from enum import Enum
+import asyncio
+import copy
+import datetime
+import hashlib
 import json
+import os
+import re
+import threading
+import time
+import uuid
+
+import numpy as np
 
 class RiskLevel(Enum):
     CONSERVATIVE = "conservative"
@@ -43,17 +55,206 @@ class ClientReportingConfig:
     custom_dashboard_elements: List[str]
     performance_attribution: str  # "pulsebridge", "platform_native", "hybrid"
 
+# Weight of each risk factor in the overall score, in the order they are added
+RISK_FACTOR_WEIGHTS = {
+    'budget_change': 0.3,
+    'performance_impact': 0.25,
+    'coordination': 0.2,
+    'timing': 0.15,
+    'client_impact': 0.1
+}
+
+# (recommendation, safeguard, confidence adjustment, monitoring requirements), lowest risk first
+RISK_RECOMMENDATION_TIERS = (
+    ('proceed', None, 0.0, ('standard_monitoring',)),
+    ('proceed_with_caution', 'ENHANCED_MONITORING', -0.05,
+     ('increased_monitoring_frequency', 'performance_thresholds_tightened')),
+    ('require_approval', 'APPROVAL_REQUIRED', -0.1,
+     ('human_approval_required', 'enhanced_monitoring', 'rollback_plan_ready')),
+    ('block', 'HIGH_RISK_BLOCK', 0.0,
+     ('immediate_human_review', 'extended_monitoring_period', 'performance_alerts'))
+)
+RISK_TIER_EDGES = (0.4, 0.6, 0.8)  # A score strictly above an edge moves up a tier
+
+@dataclass
+class RiskAssessmentBatch:
+    """Columnar risk assessment results for a batch of decisions"""
+    factor_scores: Dict[str, np.ndarray]
+    overall_risk_score: np.ndarray
+    tier: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.overall_risk_score)
+
+    @property
+    def recommendation(self) -> np.ndarray:
+        return np.array([tier[0] for tier in RISK_RECOMMENDATION_TIERS])[self.tier]
+
+    @property
+    def confidence_adjustment(self) -> np.ndarray:
+        return np.array([tier[2] for tier in RISK_RECOMMENDATION_TIERS])[self.tier]
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Per-decision results; factor scores only, without the explanatory messages"""
+        factor_names = list(self.factor_scores)
+        factor_rows = zip(*(self.factor_scores[name].tolist() for name in factor_names))
+        results = []
+        for overall, tier, factors in zip(self.overall_risk_score.tolist(), self.tier.tolist(), factor_rows):
+            recommendation, safeguard, adjustment, monitoring = RISK_RECOMMENDATION_TIERS[tier]
+            results.append({
+                'overall_risk_score': overall,
+                'risk_factors': dict(zip(factor_names, factors)),
+                'recommendation': recommendation,
+                'safeguards_triggered': [safeguard] if safeguard else [],
+                'confidence_adjustment': adjustment,
+                'monitoring_requirements': list(monitoring)
+            })
+        return results
+
+    def summary(self) -> Dict[str, Any]:
+        counts = np.bincount(self.tier, minlength=len(RISK_RECOMMENDATION_TIERS))
+        return {
+            'decisions': len(self),
+            'recommendations': {tier[0]: int(count) for tier, count in zip(RISK_RECOMMENDATION_TIERS, counts)},
+            'mean_risk_score': float(self.overall_risk_score.mean()) if len(self) else 0.0
+        }
+
+# Account baselines: snapshots kept per metric, and the minimum before they are trusted
+BASELINE_WINDOW = 30
+BASELINE_MIN_SAMPLES = 7
+ROAS_VOLATILITY_THRESHOLD = 0.5  # Coefficient of variation above which ROAS is volatile
+BUDGET_CHANGE_WINDOW_SECONDS = 24 * 3600  # Budget changes counted towards the frequency risk
+MAX_RECENT_BUDGET_CHANGES = 2
+
+class RollingStats:
+    """
+    Mean and variance over the last `window` values, kept in a ring buffer
+    and updated in O(1) per value with Welford's add/remove recurrences
+    """
+
+    __slots__ = ('values', 'count', 'position', 'mean', 'm2')
+
+    def __init__(self, window: int = BASELINE_WINDOW):
+        self.values = np.zeros(window)
+        self.count = 0
+        self.position = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float):
+        if self.count == len(self.values):
+            # Remove the value about to be overwritten
+            old = float(self.values[self.position])
+            self.count -= 1
+            if self.count == 0:
+                self.mean = self.m2 = 0.0
+            else:
+                delta = old - self.mean
+                self.mean -= delta / self.count
+                self.m2 -= delta * (old - self.mean)
+
+        self.values[self.position] = value
+        self.position = (self.position + 1) % len(self.values)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 = max(0.0, self.m2 + delta * (value - self.mean))
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    @property
+    def coefficient_of_variation(self) -> float:
+        return self.std / self.mean if self.mean > 0 else 0.0
+
+class AccountRiskBaseline:
+    """Rolling spend and ROAS statistics, and recent budget changes, for one ad account"""
+
+    def __init__(self, window: int = BASELINE_WINDOW,
+                 budget_change_window_seconds: float = BUDGET_CHANGE_WINDOW_SECONDS):
+        self.spend = RollingStats(window)
+        self.roas = RollingStats(window)
+        self.budget_change_window_seconds = budget_change_window_seconds
+        self.budget_changes: Deque[float] = deque()
+
+    def update(self, snapshot: Dict[str, Any], now: Optional[float] = None):
+        now = time.time() if now is None else now
+        if snapshot.get('spend') is not None:
+            self.spend.add(float(snapshot['spend']))
+        if snapshot.get('roas') is not None:
+            self.roas.add(float(snapshot['roas']))
+        if snapshot.get('budget_changed', False):
+            self.budget_changes.append(now)
+        self._expire_budget_changes(now)
+
+    def recent_budget_changes(self, now: Optional[float] = None) -> int:
+        """Budget changes on this account within the last budget_change_window_seconds"""
+        self._expire_budget_changes(time.time() if now is None else now)
+        return len(self.budget_changes)
+
+    def _expire_budget_changes(self, now: float):
+        cutoff = now - self.budget_change_window_seconds
+        while self.budget_changes and self.budget_changes[0] <= cutoff:
+            self.budget_changes.popleft()
+
+    @property
+    def ready(self) -> bool:
+        return self.roas.count >= BASELINE_MIN_SAMPLES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'samples': self.roas.count,
+            'roas_mean': self.roas.mean,
+            'roas_std': self.roas.std,
+            'roas_volatility': self.roas.coefficient_of_variation,
+            'spend_mean': self.spend.mean,
+            'spend_std': self.spend.std,
+            'spend_volatility': self.spend.coefficient_of_variation,
+            'recent_budget_changes': self.recent_budget_changes()
+        }
+
 class SmartRiskManager:
     """
     Advanced risk management system with intelligent safeguards
     Ensures safe testing while maximizing optimization potential
     """
     
-    def __init__(self, base_config: RiskManagementConfig):
+    def __init__(self, base_config: RiskManagementConfig, history_size: int = 1000,
+                 max_accounts: int = 10000, baseline_window: int = BASELINE_WINDOW):
         self.base_config = base_config
-        self.dynamic_adjustments = {}
-        self.performance_history = []
-        self.risk_score_history = []
+        self.baseline_window = baseline_window
+        self.max_accounts = max_accounts
+        # Per-account volatility baselines, least recently updated first
+        self.dynamic_adjustments: Dict[str, AccountRiskBaseline] = OrderedDict()
+        self.performance_history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.risk_score_history: Deque[float] = deque(maxlen=history_size)
+    
+    def record_performance_snapshot(self, account_id: str, snapshot: Dict[str, Any], now: Optional[float] = None):
+        """Fold a performance snapshot into the history and the account's baseline in O(1)"""
+        self.performance_history.append(snapshot)
+        
+        baseline = self.dynamic_adjustments.get(account_id)
+        if baseline is None:
+            if len(self.dynamic_adjustments) >= self.max_accounts:
+                self.dynamic_adjustments.popitem(last=False)
+            baseline = AccountRiskBaseline(self.baseline_window)
+            self.dynamic_adjustments[account_id] = baseline
+        else:
+            self.dynamic_adjustments.move_to_end(account_id)
+        baseline.update(snapshot, now)
+    
+    def get_account_baseline(self, account_id: str) -> Optional[AccountRiskBaseline]:
+        return self.dynamic_adjustments.get(account_id)
+    
+    def recent_budget_changes(self, account_id: Optional[str], now: Optional[float] = None) -> int:
+        """Recent budget changes on one account; accounts without a baseline have none"""
+        baseline = self.dynamic_adjustments.get(account_id) if account_id is not None else None
+        return baseline.recent_budget_changes(now) if baseline is not None else 0
     
     def assess_decision_risk(
         self, 
@@ -77,30 +278,31 @@ class SmartRiskManager:
         # Budget Change Risk Assessment
         budget_risk = self._assess_budget_change_risk(decision_data)
         risk_analysis['risk_factors']['budget_change'] = budget_risk
-        risk_analysis['overall_risk_score'] += budget_risk['score'] * 0.3
+        risk_analysis['overall_risk_score'] += budget_risk['score'] * RISK_FACTOR_WEIGHTS['budget_change']
         
         # Performance Impact Risk
         performance_risk = self._assess_performance_impact_risk(decision_data, current_performance)
         risk_analysis['risk_factors']['performance_impact'] = performance_risk
-        risk_analysis['overall_risk_score'] += performance_risk['score'] * 0.25
+        risk_analysis['overall_risk_score'] += performance_risk['score'] * RISK_FACTOR_WEIGHTS['performance_impact']
         
         # Platform Coordination Risk
         coordination_risk = self._assess_platform_coordination_risk(decision_data)
         risk_analysis['risk_factors']['coordination'] = coordination_risk
-        risk_analysis['overall_risk_score'] += coordination_risk['score'] * 0.2
+        risk_analysis['overall_risk_score'] += coordination_risk['score'] * RISK_FACTOR_WEIGHTS['coordination']
         
         # Market Timing Risk
         timing_risk = self._assess_timing_risk(decision_data, market_conditions)
         risk_analysis['risk_factors']['timing'] = timing_risk
-        risk_analysis['overall_risk_score'] += timing_risk['score'] * 0.15
+        risk_analysis['overall_risk_score'] += timing_risk['score'] * RISK_FACTOR_WEIGHTS['timing']
         
         # Client Impact Risk
         client_risk = self._assess_client_impact_risk(decision_data)
         risk_analysis['risk_factors']['client_impact'] = client_risk
-        risk_analysis['overall_risk_score'] += client_risk['score'] * 0.1
+        risk_analysis['overall_risk_score'] += client_risk['score'] * RISK_FACTOR_WEIGHTS['client_impact']
         
         # Apply risk-based recommendations
         risk_analysis = self._generate_risk_recommendations(risk_analysis, decision_data)
+        self.risk_score_history.append(risk_analysis['overall_risk_score'])
         
         return risk_analysis
     
@@ -124,8 +326,8 @@ class SmartRiskManager:
             risk_factors.append(f"New daily spend ${new_daily_spend:.2f} exceeds limit ${self.base_config.max_daily_budget:.2f}")
         
         # Frequency risk (rapid successive changes)
-        recent_changes = len([h for h in self.performance_history if h.get('budget_changed', False)])
-        if recent_changes > 2:
+        recent_changes = self.recent_budget_changes(decision_data.get('account_id'))
+        if recent_changes > MAX_RECENT_BUDGET_CHANGES:
             risk_score += 0.2
             risk_factors.append(f"Too many recent budget changes ({recent_changes})")
         
@@ -158,6 +360,19 @@ class SmartRiskManager:
             risk_score += 0.4
             risk_factors.append("Low confidence decision on well-performing campaign")
         
+        # Deviation from the account's own rolling baseline
+        baseline = self.dynamic_adjustments.get(decision_data.get('account_id'))
+        if baseline is not None and baseline.ready:
+            drop_threshold = self.base_config.emergency_stop_conditions.get('roas_drop_threshold', 0.3)
+            if current_roas < baseline.roas.mean * (1 - drop_threshold):
+                risk_score += 0.3
+                risk_factors.append(f"Current ROAS {current_roas:.2f} is well below account baseline {baseline.roas.mean:.2f}")
+            
+            volatility = baseline.roas.coefficient_of_variation
+            if volatility > ROAS_VOLATILITY_THRESHOLD:
+                risk_score += 0.2
+                risk_factors.append(f"Volatile account ROAS (variation {volatility:.0%})")
+        
         return {
             'score': min(1.0, risk_score),
             'factors': risk_factors,
@@ -196,7 +411,6 @@ class SmartRiskManager:
         risk_factors = []
         
         # Weekend/holiday risk
-        import datetime
         now = datetime.datetime.now()
         if now.weekday() >= 5:  # Weekend
             risk_score += 0.1
@@ -283,14 +497,158 @@ class SmartRiskManager:
         
         return risk_analysis
 
+    def assess_decision_risk_batch(
+        self,
+        decisions: Dict[str, Sequence[Any]],
+        market_volatility: Optional[float] = None
+    ) -> RiskAssessmentBatch:
+        """
+        Vectorized assess_decision_risk over columns of decision fields.
+        Scores match the single-decision path for the same inputs; missing
+        columns take the same defaults. Recognised columns: budget_change_percent,
+        current_daily_spend, confidence_score, current_roas, current_conversion_rate,
+        overrides_meta_ai, meta_ai_confidence, platform_count, hours_since_last_change,
+        client_tier, monthly_budget, account_id.
+        """
+        size = len(next(iter(decisions.values()))) if decisions else 0
+        for name, values in decisions.items():
+            if len(values) != size:
+                raise ValueError(f"Column '{name}' has {len(values)} values, expected {size}")
+
+        def column(name: str, default: float) -> np.ndarray:
+            values = decisions.get(name)
+            if values is None:
+                return np.full(size, default, dtype=float)
+            return np.asarray(values, dtype=float)
+
+        config = self.base_config
+
+        # Budget change risk
+        budget_change = np.abs(column('budget_change_percent', 0))
+        new_daily_spend = column('current_daily_spend', 0) * (1 + budget_change / 100)
+        budget = np.where(budget_change > config.max_budget_change_percent, 0.4, 0.0)
+        budget += np.where(new_daily_spend > config.max_daily_budget, 0.3, 0.0)
+        account_ids = decisions.get('account_id')
+        if account_ids is not None and self.dynamic_adjustments:
+            accounts, inverse = np.unique(np.asarray(account_ids, dtype=str), return_inverse=True)
+            baselines = [self.dynamic_adjustments.get(account) for account in accounts]
+            recent_changes = np.array([b.recent_budget_changes() if b is not None else 0 for b in baselines])[inverse]
+            budget += np.where(recent_changes > MAX_RECENT_BUDGET_CHANGES, 0.2, 0.0)
+
+        # Performance impact risk
+        current_roas = column('current_roas', 2.0)
+        confidence = column('confidence_score', 0.5)
+        performance = np.where(current_roas < 1.5, 0.3, 0.0)
+        performance += np.where(column('current_conversion_rate', 2.0) < 1.0, 0.2, 0.0)
+        performance += np.where((confidence < 0.8) & (current_roas > 3.0), 0.4, 0.0)
+        if account_ids is not None and self.dynamic_adjustments:
+            ready = np.array([b is not None and b.ready for b in baselines])[inverse]
+            baseline_mean = np.array([b.roas.mean if b is not None else 0.0 for b in baselines])[inverse]
+            volatility = np.array([b.roas.coefficient_of_variation if b is not None else 0.0 for b in baselines])[inverse]
+            drop_threshold = config.emergency_stop_conditions.get('roas_drop_threshold', 0.3)
+            performance += np.where(ready & (current_roas < baseline_mean * (1 - drop_threshold)), 0.3, 0.0)
+            performance += np.where(ready & (volatility > ROAS_VOLATILITY_THRESHOLD), 0.2, 0.0)
+
+        # Platform coordination risk
+        overrides = column('overrides_meta_ai', 0) != 0
+        coordination = np.where(overrides & (column('meta_ai_confidence', 0.5) > confidence), 0.3, 0.0)
+        coordination += np.where(column('platform_count', 0) > 2, 0.2, 0.0)
+
+        # Timing risk
+        timing = np.full(size, 0.1 if datetime.datetime.now().weekday() >= 5 else 0.0)
+        timing += np.where(column('hours_since_last_change', 24) < config.cooling_off_period_hours, 0.2, 0.0)
+        if market_volatility is not None and market_volatility > 0.3:
+            timing += 0.3
+
+        # Client impact risk
+        tiers = decisions.get('client_tier')
+        client = np.zeros(size)
+        if tiers is not None:
+            client += np.where(np.asarray(tiers, dtype=object) == 'premium', 0.1, 0.0)
+        client += np.where(column('monthly_budget', 0) > 10000, 0.2, 0.0)
+
+        factor_scores = {
+            'budget_change': np.minimum(1.0, budget),
+            'performance_impact': np.minimum(1.0, performance),
+            'coordination': np.minimum(1.0, coordination),
+            'timing': np.minimum(1.0, timing),
+            'client_impact': np.minimum(1.0, client)
+        }
+        overall = np.zeros(size)
+        for name, weight in RISK_FACTOR_WEIGHTS.items():
+            overall += factor_scores[name] * weight
+
+        return RiskAssessmentBatch(
+            factor_scores=factor_scores,
+            overall_risk_score=overall,
+            tier=np.searchsorted(np.asarray(RISK_TIER_EDGES), overall, side='left')
+        )
+
+CLIENT_ACTION_TRANSLATIONS = {
+    'budget_reduction_and_reallocation': 'Budget optimized across platforms for better ROI',
+    'strategic_override': 'AI detected optimization opportunity and adjusted strategy',
+    'cross_platform_rebalance': 'Balanced investment across platforms for maximum impact',
+    'meta_campaign_pause': 'Paused underperforming Facebook/Instagram ads',
+    'audience_optimization': 'Refined target audience for better engagement',
+    'creative_refresh': 'Recommended new ad creative based on performance data'
+}
+
+DEFAULT_REPORT_DIR = os.getenv('CLIENT_REPORT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reports'))
+MAX_RETAINED_REPORT_JOBS = 50
+
+@dataclass
+class ClientReportJob:
+    """Background bulk report generation with one result per client"""
+    job_id: str
+    total_clients: int
+    output_dir: str
+    status: str = 'queued'  # queued, running, completed, failed
+    created_at: datetime.datetime = field(default_factory=datetime.datetime.utcnow)
+    started_at: Optional[datetime.datetime] = None
+    completed_at: Optional[datetime.datetime] = None
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    def get_status(self) -> Dict[str, Any]:
+        successful = sum(1 for r in self.results if r.get('success'))
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'total_clients': self.total_clients,
+            'completed': len(self.results),
+            'successful': successful,
+            'failed': len(self.results) - successful,
+            'output_dir': self.output_dir,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'completed_at': self.completed_at,
+            'error': self.error,
+            'results': self.results
+        }
+
 class ClientReportingManager:
     """
     Manages client-facing reporting and branding
     Ensures PulseBridge AI appears as primary intelligence system
     """
     
-    def __init__(self, reporting_config: ClientReportingConfig):
+    def __init__(self, reporting_config: ClientReportingConfig, cache_size: int = 50000):
         self.config = reporting_config
+        # Formatted output depends only on the decision and this configuration
+        self.template_version = hashlib.sha1(
+            json.dumps(asdict(reporting_config), default=str, sort_keys=True).encode()
+        ).hexdigest()[:12]
+        self.cache_size = cache_size
+        self._decision_cache: Dict[tuple, Dict[str, Any]] = OrderedDict()
+        self._reasoning_cache: Dict[tuple, str] = {}
+        # Bulk report jobs render on worker threads
+        self._cache_lock = threading.Lock()
+        self.report_jobs: Dict[str, ClientReportJob] = {}
     
     def format_ai_decision_for_client(
         self, 
@@ -299,8 +657,38 @@ class ClientReportingManager:
     ) -> Dict[str, Any]:
         """
         Format AI decision data for client consumption
-        Always shows PulseBridge AI as primary decision maker
+        Always shows PulseBridge AI as primary decision maker.
+        Decisions with a decision_id are treated as immutable and their
+        formatted block is cached per template version.
         """
+        decision_id = decision_data.get('decision_id')
+        cache_key = None
+        if decision_id is not None:
+            cache_key = (decision_id, self.template_version, bool(meta_ai_contributions))
+            with self._cache_lock:
+                cached = self._decision_cache.get(cache_key)
+                if cached is not None:
+                    self._decision_cache.move_to_end(cache_key)
+            if cached is not None:
+                # Nested lists and dicts are shared with the cache, so callers get their own copy
+                return copy.deepcopy(cached)
+        
+        client_report = self._render_decision(decision_data, meta_ai_contributions)
+        
+        if cache_key is not None:
+            # Rendered blocks alias lists from decision_data, so the cache keeps its own copy
+            cached = copy.deepcopy(client_report)
+            with self._cache_lock:
+                self._decision_cache[cache_key] = cached
+                if len(self._decision_cache) > self.cache_size:
+                    self._decision_cache.popitem(last=False)
+        return client_report
+    
+    def _render_decision(
+        self,
+        decision_data: Dict[str, Any],
+        meta_ai_contributions: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
         client_report = {
             'ai_system': 'PulseBridge AI',
             'decision_timestamp': decision_data.get('timestamp'),
@@ -329,15 +717,7 @@ class ClientReportingManager:
     
     def _translate_action_for_client(self, technical_action: str) -> str:
         """Translate technical actions to client-friendly language"""
-        translations = {
-            'budget_reduction_and_reallocation': 'Budget optimized across platforms for better ROI',
-            'strategic_override': 'AI detected optimization opportunity and adjusted strategy',
-            'cross_platform_rebalance': 'Balanced investment across platforms for maximum impact',
-            'meta_campaign_pause': 'Paused underperforming Facebook/Instagram ads',
-            'audience_optimization': 'Refined target audience for better engagement',
-            'creative_refresh': 'Recommended new ad creative based on performance data'
-        }
-        return translations.get(technical_action, 'AI optimization applied')
+        return CLIENT_ACTION_TRANSLATIONS.get(technical_action, 'AI optimization applied')
     
     def _generate_client_friendly_reasoning(
         self, 
@@ -345,12 +725,22 @@ class ClientReportingManager:
         meta_ai_contributions: Dict = None
     ) -> str:
         """Generate client-friendly explanation of AI reasoning"""
-        base_reasoning = "PulseBridge AI analyzed cross-platform performance data"
-        
         # Add specific reasoning based on decision type
         decision_type = decision_data.get('decision_type', '')
         confidence = decision_data.get('confidence_score', 0)
         
+        phrase_key = (decision_type, confidence)
+        reasoning = self._reasoning_cache.get(phrase_key)
+        if reasoning is None:
+            if len(self._reasoning_cache) >= self.cache_size:
+                self._reasoning_cache.clear()
+            reasoning = self._reasoning_cache[phrase_key] = self._build_reasoning(decision_type, confidence)
+        return reasoning
+    
+    @staticmethod
+    def _build_reasoning(decision_type: str, confidence: float) -> str:
+        base_reasoning = "PulseBridge AI analyzed cross-platform performance data"
+        
         if 'override' in decision_type:
             reasoning = f"{base_reasoning} and identified a {confidence*100:.0f}% confident optimization opportunity. "
             reasoning += "By reallocating budget to higher-performing platforms, we expect improved ROI."
@@ -376,6 +766,94 @@ class ClientReportingManager:
             'integration_effectiveness': 'PulseBridge AI successfully coordinated with platform tools'
         }
 
+    def build_client_report(self, client_id: str, decisions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Render every decision for one client into a single report"""
+        formatted = [self.format_ai_decision_for_client(decision) for decision in decisions]
+        platforms = sorted({platform for block in formatted for platform in (block.get('platforms_optimized') or [])})
+        confidences = [decision.get('confidence_score', 0) for decision in decisions]
+        return {
+            'client_id': client_id,
+            'ai_system': 'PulseBridge AI',
+            'generated_at': datetime.datetime.utcnow().isoformat(),
+            'template_version': self.template_version,
+            'summary': {
+                'total_decisions': len(formatted),
+                'platforms_optimized': platforms,
+                'average_confidence': sum(confidences) / len(confidences) if confidences else 0.0
+            },
+            'decisions': formatted
+        }
+    
+    def start_bulk_report_job(
+        self,
+        client_decisions: Dict[str, List[Dict[str, Any]]],
+        output_dir: Optional[str] = None,
+        concurrency: int = 8
+    ) -> ClientReportJob:
+        """Render and write reports for many clients in the background"""
+        job_id = f"report_{uuid.uuid4().hex[:12]}"
+        job = ClientReportJob(
+            job_id=job_id,
+            total_clients=len(client_decisions),
+            output_dir=os.path.join(output_dir or DEFAULT_REPORT_DIR, job_id)
+        )
+        self.report_jobs[job_id] = job
+        finished = [existing for existing, j in self.report_jobs.items() if j.done]
+        for existing in finished[:max(0, len(self.report_jobs) - MAX_RETAINED_REPORT_JOBS)]:
+            del self.report_jobs[existing]
+        job._task = asyncio.create_task(self._run_bulk_report_job(job, client_decisions, concurrency))
+        return job
+    
+    def get_report_job(self, job_id: str) -> Optional[ClientReportJob]:
+        return self.report_jobs.get(job_id)
+    
+    async def _run_bulk_report_job(
+        self,
+        job: ClientReportJob,
+        client_decisions: Dict[str, List[Dict[str, Any]]],
+        concurrency: int
+    ):
+        job.status = 'running'
+        job.started_at = datetime.datetime.utcnow()
+        writers = asyncio.Semaphore(max(1, concurrency))
+        
+        async def render_client(client_id: str, decisions: List[Dict[str, Any]]):
+            try:
+                path = os.path.join(job.output_dir, self._report_filename(client_id))
+                # Rendering and deep-copying every decision is CPU work, so it leaves the loop with the write
+                async with writers:
+                    await asyncio.to_thread(self._render_and_write_report, path, client_id, decisions)
+                job.results.append({'client_id': client_id, 'success': True, 'path': path, 'decisions': len(decisions)})
+            except Exception as e:
+                job.results.append({'client_id': client_id, 'success': False, 'error': str(e)})
+        
+        try:
+            await asyncio.to_thread(os.makedirs, job.output_dir, exist_ok=True)
+            await asyncio.gather(*(render_client(client_id, decisions) for client_id, decisions in client_decisions.items()))
+            job.status = 'completed'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.completed_at = datetime.datetime.utcnow()
+    
+    def _render_and_write_report(self, path: str, client_id: str, decisions: List[Dict[str, Any]]):
+        self._write_report(path, self.build_client_report(client_id, decisions))
+    
+    @staticmethod
+    def _report_filename(client_id: str) -> str:
+        """Filesystem-safe name; the hash keeps ids that sanitize alike (a/b, a_b) apart"""
+        raw = str(client_id)
+        sanitized = re.sub(r'[^A-Za-z0-9_.-]', '_', raw)
+        return f"{sanitized}_{hashlib.sha256(raw.encode()).hexdigest()[:8]}.json"
+    
+    @staticmethod
+    def _write_report(path: str, report: Dict[str, Any]):
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as output:
+            json.dump(report, output, default=str)
+        os.replace(temporary, path)
+
 # Configuration templates for different client types
 RISK_MANAGEMENT_TEMPLATES = {
     'beta_testing_conservative': RiskManagementConfig(
@@ -0,0 +1,171 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import pytest
+
+# Backend modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class PostgresError(Exception):
+    """Database error carrying a SQLSTATE code, like postgrest.APIError"""
+    def __init__(self, code):
+        super().__init__(f"postgres error {code}")
+        self.code = code
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+class FakeQuery:
+    """One PostgREST request against a FakeSupabase table, built by chaining like the real client"""
+
+    def __init__(self, client, table_name):
+        self.client = client
+        self.table_name = table_name
+        self.action = 'select'
+        self.payload = None
+        self.filters = []
+        self.orders = []
+        self.bounds = None
+        self.row_limit = None
+
+    def select(self, *_columns, **_options):
+        self.action = 'select'
+        return self
+
+    def insert(self, rows):
+        self.action, self.payload = 'insert', rows
+        return self
+
+    def upsert(self, rows, **_options):
+        self.action, self.payload = 'upsert', rows
+        return self
+
+    def update(self, values):
+        self.action, self.payload = 'update', values
+        return self
+
+    def _filter(self, column, predicate):
+        self.filters.append((column, predicate))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, lambda v: v == value)
+
+    def gt(self, column, value):
+        return self._filter(column, lambda v: v > value)
+
+    def gte(self, column, value):
+        return self._filter(column, lambda v: v >= value)
+
+    def lt(self, column, value):
+        return self._filter(column, lambda v: v < value)
+
+    def lte(self, column, value):
+        return self._filter(column, lambda v: v <= value)
+
+    def in_(self, column, values):
+        values = set(values)
+        return self._filter(column, lambda v: v in values)
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def _matches(self, row):
+        return all(column in row and predicate(row[column]) for column, predicate in self.filters)
+
+    def execute(self):
+        return self.client._execute(self)
+
+class FakeSupabase:
+    """
+    In-memory stand-in for the Supabase client. Rows live in `tables`;
+    `failures` are raised by the next requests in order; `reject(row)` may
+    return an error for a row the database refuses for good. With
+    shuffle_ties, rows the requested order leaves tied come back in a
+    different order on every request, as Postgres is free to return them.
+    """
+
+    def __init__(self, primary_keys=None, delay=0.0, shuffle_ties=False, seed=0):
+        self.tables = defaultdict(list)
+        self.primary_keys = dict(primary_keys or {})
+        self.failures = []
+        self.reject = None
+        self.delay = delay
+        self.shuffle_ties = shuffle_ties
+        self.random = random.Random(seed)
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def _execute(self, query):
+        if self.delay:
+            time.sleep(self.delay)
+        with self.lock:
+            self.queries.append(query)
+            if self.failures:
+                raise self.failures.pop(0)
+            rows = self.tables[query.table_name]
+            if query.action in ('insert', 'upsert'):
+                return FakeResult(self._write(query, rows))
+            matched = [row for row in rows if query._matches(row)]
+            if query.action == 'update':
+                for row in matched:
+                    row.update(query.payload)
+                return FakeResult([dict(row) for row in matched])
+            return FakeResult([dict(row) for row in self._page(query, matched)])
+
+    def _write(self, query, rows):
+        payload = query.payload if isinstance(query.payload, list) else [query.payload]
+        if self.reject is not None:
+            for row in payload:
+                error = self.reject(row)
+                if error is not None:
+                    raise error
+        key = self.primary_keys.get(query.table_name)
+        written = []
+        for row in payload:
+            existing = next((r for r in rows if key and r.get(key) == row.get(key)), None)
+            if existing is None:
+                rows.append(dict(row))
+            elif query.action == 'upsert':
+                existing.update(row)
+            else:
+                raise PostgresError('23505')
+            written.append(dict(row))
+        return written
+
+    def _page(self, query, rows):
+        if self.shuffle_ties:
+            self.random.shuffle(rows)
+        for column, desc in reversed(query.orders):
+            rows.sort(key=lambda row: row[column], reverse=desc)
+        if query.bounds is not None:
+            start, end = query.bounds
+            rows = rows[start:end + 1]
+        if query.row_limit is not None:
+            rows = rows[:query.row_limit]
+        return rows
+
+@pytest.fixture
+def fake_supabase():
+    return FakeSupabase()
+
+@pytest.fixture
+def postgres_error():
+    return PostgresError
@@ -0,0 +1,53 @@
+import asyncio
+
+import httpx
+
+from batch_insert import insert_isolating_rejects, is_transient_db_error
+
+class PostgresError(Exception):
+    def __init__(self, code):
+        super().__init__(f"postgres error {code}")
+        self.code = code
+
+def test_transient_errors_are_classified():
+    request = httpx.Request('POST', 'https://db.example.com/rest/v1/t')
+    assert is_transient_db_error(httpx.ConnectError("refused"))
+    assert is_transient_db_error(httpx.HTTPStatusError("busy", request=request, response=httpx.Response(503, request=request)))
+    assert is_transient_db_error(httpx.HTTPStatusError("slow down", request=request, response=httpx.Response(429, request=request)))
+    assert is_transient_db_error(PostgresError('40001'))
+    assert not is_transient_db_error(httpx.HTTPStatusError("bad", request=request, response=httpx.Response(400, request=request)))
+    assert not is_transient_db_error(PostgresError('23502'))
+    assert not is_transient_db_error(ValueError("bad payload"))
+
+def test_poison_row_is_isolated_from_its_batch():
+    written = []
+
+    async def insert(rows):
+        if any(row['id'] == 1005 for row in rows):
+            raise PostgresError('23502')
+        written.extend(rows)
+
+    rows = [{'id': i} for i in range(1000, 1010)]
+    outcome = asyncio.run(insert_isolating_rejects(insert, rows))
+
+    assert outcome.written == 9
+    assert [row['id'] for row, _ in outcome.rejected] == [1005]
+    assert sorted(row['id'] for row in written) == [i for i in range(1000, 1010) if i != 1005]
+    assert outcome.transient_error is None
+
+def test_transient_error_reports_unwritten_rows_in_order():
+    calls = []
+
+    async def insert(rows):
+        calls.append(rows)
+        if len(calls) == 1:
+            raise PostgresError('23505')
+        if len(calls) == 3:
+            raise httpx.ConnectError("connection reset")
+
+    rows = [{'id': i} for i in range(4)]
+    outcome = asyncio.run(insert_isolating_rejects(insert, rows))
+
+    assert outcome.written == 2
+    assert outcome.unwritten == [{'id': 2}, {'id': 3}]
+    assert isinstance(outcome.transient_error, httpx.ConnectError)
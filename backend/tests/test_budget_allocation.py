@@ -0,0 +1,68 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from optimization_engine import CampaignOptimizationEngine
+from optimization_rules import RuleSetRepository
+from performance_trends import TrendTracker
+
+CAMPAIGN_IDS = [f"c{i}" for i in range(6)]
+ROAS = np.array([2.0, 2.2, 2.5, 2.8, 3.0, 3.3])
+CURRENT = np.array([100.0, 200.0, 150.0, 100.0, 80.0, 50.0])
+
+def allocate(total_budget, **kwargs):
+    engine = CampaignOptimizationEngine(rules=RuleSetRepository(), trends=TrendTracker())
+    return asyncio.run(engine.allocate_portfolio_budget(
+        CAMPAIGN_IDS, ROAS, total_budget, current_budget=CURRENT, **kwargs
+    ))
+
+def test_allocation_spends_the_budget_within_bounds():
+    allocation = allocate(680.0)
+
+    assert allocation.allocated_total == pytest.approx(680.0, rel=1e-9)
+    assert np.all(allocation.allocated_budget >= allocation.min_budget - 1e-9)
+    assert np.all(allocation.allocated_budget <= allocation.max_budget + 1e-9)
+    # Default limits: -30% / +50% around the current budget, never below $10
+    np.testing.assert_allclose(allocation.min_budget, np.maximum(CURRENT * 0.7, 10.0))
+    np.testing.assert_allclose(allocation.max_budget, CURRENT * 1.5)
+
+def test_interior_campaigns_share_one_marginal_roas_and_the_optimum_beats_shifts():
+    allocation = allocate(680.0)
+    interior = (allocation.allocated_budget > allocation.min_budget + 1e-6) & \
+               (allocation.allocated_budget < allocation.max_budget - 1e-6)
+
+    assert interior.sum() >= 2
+    marginal = allocation.marginal_roas[interior]
+    assert marginal.max() - marginal.min() < 1e-6 * marginal.max()
+    # Campaigns capped at the top have a higher marginal ROAS, those at the floor a lower one
+    at_max = np.isclose(allocation.allocated_budget, allocation.max_budget)
+    at_min = np.isclose(allocation.allocated_budget, allocation.min_budget)
+    assert np.all(allocation.marginal_roas[at_max] >= marginal.min() - 1e-9)
+    assert np.all(allocation.marginal_roas[at_min] <= marginal.max() + 1e-9)
+
+    e = 0.7
+    def revenue(budget):
+        return float((ROAS * CURRENT * (budget / CURRENT) ** e).sum())
+
+    best = revenue(allocation.allocated_budget)
+    i, j = np.flatnonzero(interior)[:2]
+    for delta in (-1.0, 1.0):
+        shifted = allocation.allocated_budget.copy()
+        shifted[i] += delta
+        shifted[j] -= delta
+        assert revenue(shifted) < best
+
+def test_budget_below_marginal_cutoff_is_left_unallocated():
+    allocation = allocate(2000.0, min_marginal_roas=2.0)
+
+    assert allocation.unallocated > 0
+    above_min = allocation.allocated_budget > allocation.min_budget + 1e-6
+    below_max = allocation.allocated_budget < allocation.max_budget - 1e-6
+    # Nothing is funded past the point where the next dollar returns less than the cutoff
+    assert np.all(allocation.marginal_roas[above_min] >= 2.0 - 1e-6)
+    np.testing.assert_allclose(allocation.marginal_roas[above_min & below_max], 2.0, rtol=1e-6)
+
+def test_budget_below_campaign_minimums_is_rejected():
+    with pytest.raises(ValueError, match="minimums"):
+        allocate(100.0)
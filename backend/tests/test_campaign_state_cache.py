@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+
+from optimization_engine import (
+    CampaignStateCache,
+    OptimizationExecutor,
+    OptimizationRecommendation,
+    OptimizationType,
+    Priority,
+    SyncStoreStateLoader
+)
+
+def make_sync_engine():
+    campaign = SimpleNamespace(
+        id='c1',
+        budget_amount=100.0,
+        budget_type='daily',
+        platform_specific={'cpc_bid': 2.0},
+        platform=SimpleNamespace(value='google_ads')
+    )
+    return SimpleNamespace(campaigns={'c1': campaign}, connectors={})
+
+def make_recommendation(optimization_type, recommended_value):
+    return OptimizationRecommendation(
+        campaign_id='c1',
+        optimization_type=optimization_type,
+        current_value=0.0,
+        recommended_value=recommended_value,
+        expected_impact='',
+        confidence_score=0.9,
+        priority=Priority.HIGH,
+        reasoning='',
+        estimated_improvement={},
+        risk_assessment='low'
+    )
+
+def test_executed_changes_are_visible_on_next_read():
+    sync_engine = make_sync_engine()
+    cache = CampaignStateCache(loader=SyncStoreStateLoader(sync_engine))
+    executor = OptimizationExecutor(state_cache=cache)
+
+    async def run():
+        await cache.get('c1')
+        await executor._apply_state_change(make_recommendation(OptimizationType.BUDGET_INCREASE, 150.0))
+        await executor._apply_state_change(make_recommendation(OptimizationType.BID_DECREASE, 1.5))
+        cached = await cache.get('c1')
+        cache.invalidate_all()
+        reloaded = await cache.get('c1')
+        return cached, reloaded
+
+    cached, reloaded = asyncio.run(run())
+    assert (cached.daily_budget, cached.current_bid) == (150.0, 1.5)
+    assert (reloaded.daily_budget, reloaded.current_bid) == (150.0, 1.5)
+
+def test_cache_is_bounded():
+    cache = CampaignStateCache(max_entries=3)
+
+    asyncio.run(cache.get_many([f"c{i}" for i in range(10)]))
+
+    assert cache.get_stats()['entries'] == 3
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import threading
+
+from smart_risk_management import CLIENT_REPORTING_TEMPLATES, ClientReportingManager
+
+def make_manager() -> ClientReportingManager:
+    return ClientReportingManager(CLIENT_REPORTING_TEMPLATES['agency_transparent'])
+
+def test_client_ids_that_sanitize_alike_get_separate_reports(tmp_path):
+    manager = make_manager()
+
+    async def run():
+        job = manager.start_bulk_report_job({'a/b': [], 'a_b': []}, output_dir=str(tmp_path))
+        await job._task
+        return job
+
+    job = asyncio.run(run())
+
+    paths = {result['path'] for result in job.results}
+    assert all(result['success'] for result in job.results)
+    assert len(paths) == 2
+    assert all(os.path.exists(path) for path in paths)
+
+def test_cached_decision_is_not_mutated_through_returned_copies():
+    manager = make_manager()
+    decision = {'decision_id': 'd1', 'platforms_affected': ['meta'], 'expected_impact': {'roas': 0.1}}
+
+    first = manager.format_ai_decision_for_client(decision)
+    first['platforms_optimized'].append('google_ads')
+    first['expected_improvement']['roas'] = 9.0
+    second = manager.format_ai_decision_for_client(decision)
+    second['platforms_optimized'].clear()
+
+    assert manager.format_ai_decision_for_client(decision)['platforms_optimized'] == ['meta']
+    assert manager.format_ai_decision_for_client(decision)['expected_improvement'] == {'roas': 0.1}
+
+def test_cached_decision_does_not_alias_the_input():
+    manager = make_manager()
+    decision = {'decision_id': 'd1', 'platforms_affected': ['meta']}
+
+    manager.format_ai_decision_for_client(decision)
+    decision['platforms_affected'].append('google_ads')
+
+    assert manager.format_ai_decision_for_client(decision)['platforms_optimized'] == ['meta']
+
+def test_bulk_job_renders_reports_off_the_event_loop(tmp_path):
+    manager = make_manager()
+    render_threads = set()
+    build_client_report = manager.build_client_report
+
+    def recording_build(client_id, decisions):
+        render_threads.add(threading.get_ident())
+        return build_client_report(client_id, decisions)
+
+    manager.build_client_report = recording_build
+
+    async def run():
+        job = manager.start_bulk_report_job(
+            {f"client-{i}": [{'decision_id': f"d{i}", 'platforms_affected': ['meta']}] for i in range(5)},
+            output_dir=str(tmp_path)
+        )
+        await job._task
+        return job, threading.get_ident()
+
+    job, loop_thread = asyncio.run(run())
+
+    assert all(result['success'] for result in job.results)
+    assert render_threads and loop_thread not in render_threads
@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import httpx
+
+from decision_audit_log import DecisionAuditLog
+
+def make_log(tmp_path, client, **kwargs):
+    return DecisionAuditLog(
+        supabase_client=client,
+        retry_base_seconds=0.0,
+        spill_path=str(tmp_path / 'spill.jsonl'),
+        dead_letter_path=str(tmp_path / 'dead_letter.jsonl'),
+        **kwargs
+    )
+
+def written_ids(client):
+    return [row['id'] for row in client.tables[DecisionAuditLog.TABLE_NAME]]
+
+def test_poison_row_is_dead_lettered_and_rest_of_batch_written(tmp_path, fake_supabase, postgres_error):
+    client = fake_supabase
+    client.reject = lambda row: postgres_error('23502') if row['id'] == 1005 else None
+    audit_log = make_log(tmp_path, client)
+
+    async def run():
+        for record_id in range(1000, 1010):
+            audit_log.submit({'id': record_id})
+        await audit_log.close()
+        # A later flush does not see the poison row again
+        audit_log.submit({'id': 1010})
+        await audit_log.close()
+
+    asyncio.run(run())
+
+    assert sorted(written_ids(client)) == [i for i in range(1000, 1011) if i != 1005]
+    assert not (tmp_path / 'spill.jsonl').exists()
+    dead_letters = [json.loads(line) for line in (tmp_path / 'dead_letter.jsonl').read_text().splitlines()]
+    assert [entry['record']['id'] for entry in dead_letters] == [1005]
+    assert audit_log.get_stats()['total_dead_lettered'] == 1
+
+def test_transient_errors_are_retried_without_dead_lettering(tmp_path, fake_supabase):
+    client = fake_supabase
+    client.failures.append(httpx.ConnectError("connection reset"))
+    audit_log = make_log(tmp_path, client)
+
+    async def run():
+        for record_id in range(5):
+            audit_log.submit({'id': record_id})
+        await audit_log.close()
+
+    asyncio.run(run())
+
+    assert written_ids(client) == list(range(5))
+    assert not (tmp_path / 'dead_letter.jsonl').exists()
+
+def test_close_waits_for_in_flight_insert_without_duplicates(tmp_path, fake_supabase):
+    client = fake_supabase
+    client.delay = 0.05
+    audit_log = make_log(tmp_path, client, batch_size=2)
+
+    async def run():
+        audit_log.submit({'id': 1})
+        audit_log.submit({'id': 2})
+        await asyncio.sleep(0.01)  # The flusher is now inside the insert
+        await audit_log.close()
+
+    asyncio.run(run())
+
+    assert sorted(written_ids(client)) == [1, 2]
@@ -0,0 +1,40 @@
+import asyncio
+
+from autonomous_decision_framework import DecisionFeedbackStore, LearningFeedback
+
+def make_feedback(decision_id: str, accuracy: float, adjustment: float) -> LearningFeedback:
+    return LearningFeedback(
+        decision_id=decision_id,
+        actual_performance={},
+        predicted_performance={},
+        accuracy_score=accuracy,
+        decision_quality="good",
+        lessons_learned=[],
+        model_adjustments={'confidence_adjustment': adjustment}
+    )
+
+def test_resubmitted_feedback_is_counted_once_by_calibrator():
+    store = DecisionFeedbackStore()
+    store._index(make_feedback("d1", 0.4, -0.05), "budget_optimization", "c1")
+    store._index(make_feedback("d2", 0.8, 0.0), "budget_optimization", "c1")
+    store._index(make_feedback("d1", 0.6, -0.02), "budget_optimization", "c1")
+
+    calibration = store.calibrator.calibrations["budget_optimization"]
+    assert calibration.feedback_count == 2
+    assert abs(calibration.mean_accuracy - 0.7) < 1e-9
+    assert abs(calibration.confidence_offset - (-0.02)) < 1e-9
+    assert store.total_feedback == 2
+
+def test_attach_pages_through_full_history(fake_supabase):
+    fake_supabase.tables[DecisionFeedbackStore.TABLE_NAME] = [
+        {'decision_id': f"d{i}", 'decision_type': 'bid_adjustment', 'campaign_id': 'c1',
+         'accuracy_score': 0.5, 'decision_quality': 'fair', 'created_at': f"2026-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}"}
+        for i in range(2500)
+    ]
+    store = DecisionFeedbackStore()
+
+    loaded = asyncio.run(store.attach(fake_supabase))
+
+    assert loaded == 2500
+    assert store.total_feedback == 2500
+    assert [query.bounds for query in fake_supabase.queries] == [(0, 999), (1000, 1999), (2000, 2999)]
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from autonomous_decision_framework import AutonomousDecisionFramework
+from decision_execution_engine import DecisionExecutionEngine
+
+@pytest.fixture
+def framework():
+    return AutonomousDecisionFramework()
+
+def queue_both(first, second):
+    engine = DecisionExecutionEngine()
+
+    async def run():
+        first_id = await engine.queue_decision_execution(first)
+        second_id = await engine.queue_decision_execution(second)
+        return first_id, second_id
+
+    first_id, second_id = asyncio.run(run())
+    assert first_id == second_id
+    assert len(engine.execution_queue) == 1
+    return engine.execution_queue[0].decision.proposed_action
+
+def test_increase_then_larger_decrease_merges_to_net_decrease(framework):
+    increase = framework._build_budget_increase_decision("c1", "google_ads", 100.0, 30.0, 4.0)
+    decrease = framework._build_budget_decrease_decision("c1", "google_ads", 130.0, 1.0)
+    decrease.proposed_action['new_budget'] = 90.0
+
+    action = queue_both(increase, decrease)
+
+    assert action['action'] == 'decrease_budget'
+    assert action['current_budget'] == 100.0
+    assert action['new_budget'] == 90.0
+    assert action['decrease_percentage'] == pytest.approx(10.0)
+    assert 'increase_percentage' not in action
+
+def test_increase_then_smaller_decrease_merges_to_net_increase(framework):
+    increase = framework._build_budget_increase_decision("c1", "google_ads", 100.0, 30.0, 4.0)
+    decrease = framework._build_budget_decrease_decision("c1", "google_ads", 130.0, 1.0)
+
+    action = queue_both(increase, decrease)
+
+    assert action['action'] == 'increase_budget'
+    assert action['current_budget'] == 100.0
+    assert action['new_budget'] == pytest.approx(104.0)
+    assert action['increase_percentage'] == pytest.approx(4.0)
+    assert 'decrease_percentage' not in action
+
+def test_budget_actions_use_campaign_account(framework):
+    engine = DecisionExecutionEngine()
+    engine.account_resolver = {"c1": "acct-42"}.get
+    decision = framework._build_budget_increase_decision("c1", "google_ads", 100.0, 10.0, 4.0)
+
+    asyncio.run(engine.queue_decision_execution(decision))
+
+    assert engine.execution_queue[0].platform_actions[0].parameters['account_id'] == "acct-42"
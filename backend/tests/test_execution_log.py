@@ -0,0 +1,32 @@
+import asyncio
+import json
+from datetime import datetime
+
+from optimization_engine import ExecutionLog, ExecutionRecord
+
+def make_record(campaign_id):
+    return ExecutionRecord(
+        execution_id=f"exec-{campaign_id}",
+        campaign_id=campaign_id,
+        optimization_type='budget_increase',
+        status='success',
+        timestamp=datetime(2026, 1, 1)
+    )
+
+def test_rejected_row_is_dead_lettered_and_queue_drains(tmp_path, fake_supabase, postgres_error):
+    dead_letter_path = tmp_path / 'dead_letter.jsonl'
+    log = ExecutionLog(flush_batch_size=4, dead_letter_path=str(dead_letter_path))
+    client = fake_supabase
+    client.reject = lambda row: postgres_error('23514') if row['campaign_id'] == 'poison' else None
+    log.supabase = client
+    for campaign_id in ['c1', 'c2', 'poison', 'c3', 'c4', 'c5']:
+        log.record(make_record(campaign_id))
+
+    flushed = asyncio.run(log.flush())
+
+    assert flushed == 5
+    assert log.get_stats()['pending_flush'] == 0
+    assert log.get_stats()['dead_lettered'] == 1
+    assert [row['campaign_id'] for row in client.tables[ExecutionLog.TABLE_NAME]] == ['c1', 'c2', 'c3', 'c4', 'c5']
+    dead_letters = [json.loads(line) for line in dead_letter_path.read_text().splitlines()]
+    assert [entry['record']['campaign_id'] for entry in dead_letters] == ['poison']
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("google.ads.googleads")
+
+from google_ads_integration import CampaignPerformanceReport
+
+def test_totals_by_campaign_keeps_int64_micros_exact():
+    big = 2 ** 53 + 1
+    report = CampaignPerformanceReport(
+        customer_id=np.array([1, 1, 2], dtype=np.int64),
+        campaign_id=np.array([10, 10, 20], dtype=np.int64),
+        date=np.array(['2026-10-01', '2026-10-02', '2026-10-01'], dtype='datetime64[D]'),
+        cost_micros=np.array([big, 2, 5], dtype=np.int64),
+        impressions=np.array([big, 2, 7], dtype=np.int64),
+        clicks=np.array([3, 4, 5], dtype=np.int64),
+        conversions=np.array([0.5, 1.5, 2.0]),
+        conversions_value=np.array([1.0, 2.0, 3.0])
+    )
+
+    totals = {(t['customer_id'], t['campaign_id']): t for t in report.totals_by_campaign()}
+
+    assert totals[('1', '10')]['impressions'] == big + 2
+    assert totals[('1', '10')]['clicks'] == 7
+    assert totals[('1', '10')]['conversions'] == 2.0
+    assert totals[('2', '20')]['impressions'] == 7
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+from meta_business_api import GraphBatcher
+from platform_rate_limiter import rate_limiter
+
+class FakeGraphAPI:
+    """Answers batch POSTs from `responses` in order and single GETs from `objects`"""
+
+    def __init__(self, responses=(), objects=None, error=None):
+        self.ad_account_id = 'act_batcher_test'
+        self.responses = list(responses)
+        self.objects = objects or {}
+        self.error = error
+        self.calls = []
+
+    async def _make_request(self, method, endpoint, params=None, data=None, retry=None, cost=1.0):
+        self.calls.append({'method': method, 'endpoint': endpoint, 'data': data, 'cost': cost})
+        if self.error is not None:
+            raise self.error
+        if method == 'GET':
+            return self.objects[endpoint]
+        return self.responses.pop(0)
+
+def ok(body):
+    return {'code': 200, 'body': json.dumps(body)}
+
+def error(code, message, error_code=100):
+    return {'code': code, 'body': json.dumps({'error': {'message': message, 'code': error_code}})}
+
+def read_all(api, urls):
+    batcher = GraphBatcher(api, window_seconds=0.001)
+
+    async def run():
+        return await asyncio.gather(*(batcher.get(url) for url in urls), return_exceptions=True)
+
+    return asyncio.run(run())
+
+def test_concurrent_reads_share_one_batch_charged_per_operation():
+    api = FakeGraphAPI(responses=[[ok({'id': '1'}), ok({'id': '2'}), ok({'id': '3'})]])
+
+    results = read_all(api, ['1', '2', '3'])
+
+    assert results == [{'id': '1'}, {'id': '2'}, {'id': '3'}]
+    assert len(api.calls) == 1
+    assert api.calls[0]['method'] == 'POST'
+    assert api.calls[0]['cost'] == 3
+    assert [op['relative_url'] for op in json.loads(api.calls[0]['data']['batch'])] == ['1', '2', '3']
+
+def test_single_read_is_sent_as_plain_get():
+    api = FakeGraphAPI(objects={'act_1': {'name': 'account'}})
+
+    assert read_all(api, ['act_1']) == [{'name': 'account'}]
+    assert [(call['method'], call['endpoint'], call['cost']) for call in api.calls] == [('GET', 'act_1', 1.0)]
+
+def test_dropped_operation_is_resent_once():
+    api = FakeGraphAPI(responses=[[ok({'id': '1'}), None]], objects={'2': {'id': '2'}})
+
+    assert read_all(api, ['1', '2']) == [{'id': '1'}, {'id': '2'}]
+    assert [call['method'] for call in api.calls] == ['POST', 'GET']
+
+def test_operation_errors_fail_only_their_own_reads():
+    api = FakeGraphAPI(responses=[[ok({'id': '1'}), error(400, 'Invalid parameter'), ok({'id': '3'})]])
+
+    results = read_all(api, ['1', '2', '3'])
+
+    assert results[0] == {'id': '1'} and results[2] == {'id': '3'}
+    assert isinstance(results[1], Exception) and 'Invalid parameter' in str(results[1])
+
+def test_failed_batch_request_fails_every_read():
+    api = FakeGraphAPI(error=Exception("Meta API Error: connection reset"))
+
+    results = read_all(api, ['1', '2'])
+
+    assert all(isinstance(result, Exception) and 'connection reset' in str(result) for result in results)
+
+def test_throttled_operation_backs_off_the_account_and_is_resent():
+    api = FakeGraphAPI(
+        responses=[[ok({'id': '1'}), error(400, 'User request limit reached', error_code=17)]],
+        objects={'2': {'id': '2'}}
+    )
+    bucket = rate_limiter.bucket('meta_ads', api.ad_account_id)
+    throttles = bucket.throttle_count
+
+    try:
+        assert read_all(api, ['1', '2']) == [{'id': '1'}, {'id': '2'}]
+    finally:
+        bucket.paused_until = 0.0
+        bucket.rate = bucket.base_rate
+
+    assert bucket.throttle_count == throttles + 1
+    assert [call['method'] for call in api.calls] == ['POST', 'GET']
@@ -0,0 +1,47 @@
+import pytest
+
+from autonomous_decision_framework import (
+    AutonomousDecisionFramework,
+    GuardrailEngine,
+    RiskLevel,
+    SafetyGuardrail
+)
+
+def make_guardrail(expression: str = "roas", comparison_operator: str = ">") -> SafetyGuardrail:
+    return SafetyGuardrail(
+        name="test_guardrail",
+        description="test",
+        threshold_value=1.0,
+        comparison_operator=comparison_operator,
+        risk_level=RiskLevel.HIGH,
+        block_execution=True,
+        alert_required=False,
+        expression=expression
+    )
+
+@pytest.mark.parametrize("expression", ["9 ** 9 ** 9", "roas ** 2"])
+def test_power_operator_is_rejected(expression):
+    with pytest.raises(ValueError, match="Unsupported syntax"):
+        GuardrailEngine.compile_expression(expression)
+
+@pytest.mark.parametrize("expression", ["'x' * 99999999999", "b'x' * 99999999999", "roas + None", "roas * True"])
+def test_non_numeric_constant_is_rejected(expression):
+    with pytest.raises(ValueError, match="Unsupported constant"):
+        GuardrailEngine.compile_expression(expression)
+
+def test_numeric_constants_are_accepted():
+    _, names = GuardrailEngine.compile_expression("roas * 1.5 - 2")
+    assert names == {'roas'}
+
+@pytest.mark.parametrize("comparison_operator", ["=>", "!=", ""])
+def test_unknown_comparison_operator_is_rejected(comparison_operator):
+    framework = AutonomousDecisionFramework()
+    existing = list(framework.safety_guardrails)
+    with pytest.raises(ValueError, match="Unknown comparison operator"):
+        framework.add_safety_guardrail(make_guardrail(comparison_operator=comparison_operator))
+    assert framework.safety_guardrails == existing
+
+def test_valid_guardrail_is_added():
+    framework = AutonomousDecisionFramework()
+    framework.add_safety_guardrail(make_guardrail("new_budget / max(daily_budget, 1)", ">="))
+    assert framework.safety_guardrails[-1].name == "test_guardrail"
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("joblib")
+pytest.importorskip("sklearn")
+
+from master_model_training import MasterModelTrainer
+
+def test_samples_page_without_skipping_or_repeating_rows(fake_supabase, tmp_path):
+    fake_supabase.shuffle_ties = True
+    fake_supabase.tables[MasterModelTrainer.SAMPLES_TABLE] = [
+        {'id': cycle * 100 + n, 'recorded_at': f"2026-10-{cycle + 1:02d}T00:00:00", 'campaign_id': f"c{n}"}
+        for cycle in range(5) for n in range(40)
+    ]
+    trainer = MasterModelTrainer(model_dir=str(tmp_path))
+    trainer.attach(fake_supabase)
+    trainer.PAGE_SIZE = 30
+
+    samples = asyncio.run(trainer._load_samples())
+
+    assert sorted(row['id'] for row in samples) == sorted(
+        row['id'] for row in fake_supabase.tables[MasterModelTrainer.SAMPLES_TABLE]
+    )
+
+def publish(client, model_dir, version):
+    import joblib
+    name = f"master_models_v{version}.joblib"
+    joblib.dump({
+        'version': version, 'models': {}, 'scaler': None, 'feature_names': [],
+        'trained_at': '2026-10-01T00:00:00', 'sample_count': 10
+    }, str(model_dir / name))
+    client.tables[MasterModelTrainer.VERSIONS_TABLE].append({'version': version, 'artifact_path': name, 'status': 'ready'})
+
+def test_polling_picks_up_generations_trained_by_other_processes(fake_supabase, tmp_path):
+    publish(fake_supabase, tmp_path, 1)
+    trainer = MasterModelTrainer(model_dir=str(tmp_path), poll_seconds=0.01)
+    trainer.attach(fake_supabase)
+
+    async def run():
+        trainer.start()
+        await asyncio.sleep(0.05)
+        first = trainer.current.version
+        publish(fake_supabase, tmp_path, 2)
+        await asyncio.sleep(0.05)
+        await trainer.close()
+        return first
+
+    assert asyncio.run(run()) == 1
+    assert trainer.current.version == 2
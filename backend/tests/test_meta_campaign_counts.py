@@ -0,0 +1,43 @@
+import asyncio
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from meta_business_api import MetaBusinessAPI
+
+class FakeBatcher:
+    def __init__(self, responses=None, error=None):
+        self.responses = responses or {}
+        self.error = error
+        self.requests = []
+
+    async def get(self, relative_url):
+        self.requests.append(relative_url)
+        if self.error is not None:
+            raise self.error
+        query = parse_qs(urlsplit(relative_url).query)
+        return self.responses['active' if 'effective_status' in query else 'all']
+
+def test_count_campaigns_reads_graph_summary():
+    api = MetaBusinessAPI()
+    api.batcher = FakeBatcher({
+        'all': {'data': [{'id': '1'}, {'id': '2'}], 'summary': {'total_count': 12000}},
+        'active': {'data': [], 'summary': {'total_count': 4200}}
+    })
+
+    total, active, campaigns = asyncio.run(api._count_campaigns(keep=2))
+
+    assert (total, active) == (12000, 4200)
+    assert [c['id'] for c in campaigns] == ['1', '2']
+    assert len(api.batcher.requests) == 2
+    assert all(parse_qs(urlsplit(url).query)['summary'] == ['total_count'] for url in api.batcher.requests)
+
+def test_count_campaigns_propagates_errors():
+    api = MetaBusinessAPI()
+    api.batcher = FakeBatcher(error=Exception("Meta API Error: rate limited"))
+
+    with pytest.raises(Exception, match="rate limited"):
+        asyncio.run(api._count_campaigns())
+
+    summary = asyncio.run(api.get_account_summary())
+    assert 'rate limited' in summary['error']
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from optimization_rules import DEFAULT_TENANT, CompiledRuleSet, RuleSetRepository
+
+@pytest.mark.parametrize("score_tables", [
+    {'tables': {'roas': {'edges': [1.0]}}},
+    {'tables': {'roas': {'edges': [1.0], 'scores': ['high', 'low']}}},
+    {'tables': ['roas']},
+    {'base_score': 'fifty'},
+])
+def test_invalid_score_table_overrides_raise_value_error(score_tables):
+    with pytest.raises(ValueError):
+        CompiledRuleSet.compile('tenant-a', {'score_tables': score_tables})
+
+def test_update_rejects_override_without_scores():
+    repository = RuleSetRepository()
+
+    with pytest.raises(ValueError, match="scores"):
+        asyncio.run(repository.update('tenant-a', {'score_tables': {'tables': {'roas': {'edges': [1.0]}}}}))
+
+    assert repository.cached('tenant-a').tenant_id == DEFAULT_TENANT
+
+def test_get_loads_once_and_tracked_tenants_are_bounded():
+    repository = RuleSetRepository(max_tenants=2)
+    reloads = []
+    original_reload = repository.reload
+
+    async def counting_reload(tenant_id):
+        reloads.append(tenant_id)
+        return await original_reload(tenant_id)
+
+    repository.reload = counting_reload
+
+    async def run():
+        await repository.update('tenant-a', {'safety_limits': {'min_campaign_budget': 20.0}})
+        for tenant_id in ['tenant-b', 'tenant-b', 'tenant-c', 'tenant-d']:
+            await repository.get(tenant_id)
+
+    asyncio.run(run())
+    assert reloads == ['tenant-b', 'tenant-c', 'tenant-d']
+    assert list(repository._checked_at) == ['tenant-c', 'tenant-d']
+    # tenant-a's compiled rules were dropped with it
+    assert repository.cached('tenant-a').tenant_id == DEFAULT_TENANT
+
+def shared_table(fake_supabase):
+    fake_supabase.primary_keys[RuleSetRepository.TABLE_NAME] = 'tenant_id'
+    return fake_supabase
+
+def test_versions_come_from_the_table_across_replicas_and_restarts(fake_supabase):
+    client = shared_table(fake_supabase)
+    replica_a, replica_b = RuleSetRepository(client), RuleSetRepository(client)
+
+    async def run():
+        first = await replica_a.update('tenant-a', {'safety_limits': {'min_campaign_budget': 20.0}})
+        second = await replica_b.update('tenant-a', {'safety_limits': {'min_campaign_budget': 30.0}})
+        reloaded = await replica_a.reload('tenant-a')
+        restarted = await RuleSetRepository(client).update('tenant-a', {})
+        return first, second, reloaded, restarted
+
+    first, second, reloaded, restarted = asyncio.run(run())
+
+    assert (first.version, second.version, restarted.version) == (1, 2, 3)
+    assert reloaded.version == 2
+    assert reloaded.safety_limits['min_campaign_budget'] == 30.0
+    assert client.tables[RuleSetRepository.TABLE_NAME][0]['version'] == 3
+
+def test_update_retries_when_another_writer_bumps_the_version(fake_supabase):
+    client = shared_table(fake_supabase)
+    client.tables[RuleSetRepository.TABLE_NAME].append({'tenant_id': 'tenant-a', 'version': 4})
+    execute = client._execute
+    raced = []
+
+    def racing_execute(query):
+        result = execute(query)
+        if query.action == 'select' and not raced:
+            # Another replica commits version 5 between our read and our write
+            raced.append(True)
+            client.tables[RuleSetRepository.TABLE_NAME][0]['version'] = 5
+        return result
+
+    client._execute = racing_execute
+    compiled = asyncio.run(RuleSetRepository(client).update('tenant-a', {}))
+
+    assert compiled.version == 6
+    assert client.tables[RuleSetRepository.TABLE_NAME][0]['version'] == 6
+
+def test_reload_ignores_older_stored_version(fake_supabase):
+    client = shared_table(fake_supabase)
+    repository = RuleSetRepository(client)
+
+    async def run():
+        await repository.update('tenant-a', {'safety_limits': {'min_campaign_budget': 20.0}})
+        await repository.update('tenant-a', {'safety_limits': {'min_campaign_budget': 30.0}})
+        client.tables[RuleSetRepository.TABLE_NAME][0].update(version=1, safety_limits={})
+        return await repository.reload('tenant-a')
+
+    assert asyncio.run(run()).safety_limits['min_campaign_budget'] == 30.0
+
+@pytest.mark.parametrize("overrides", [
+    {'optimization_rules': {'budget_response_elasticity': 1.0}},
+    {'optimization_rules': {'budget_response_elasticity': 1.5}},
+    {'optimization_rules': {'budget_response_elasticity': 0}},
+    {'safety_limits': {'max_budget_increase_percentage': -10}},
+    {'safety_limits': {'max_budget_decrease_percentage': -5}},
+    {'safety_limits': {'max_budget_decrease_percentage': 150}},
+    {'safety_limits': {'min_campaign_budget': -1.0}},
+])
+def test_out_of_range_budget_rules_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        CompiledRuleSet.compile('tenant-a', overrides)
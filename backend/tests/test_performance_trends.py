@@ -0,0 +1,87 @@
+import asyncio
+from datetime import date, timedelta
+
+from performance_trends import TrendTracker
+
+def put(client, campaign_id, day, roas):
+    rows = client.tables[TrendTracker.TABLE_NAME]
+    rows[:] = [r for r in rows if (r['campaign_id'], r['date']) != (campaign_id, day.isoformat())]
+    rows.append({'id': f"{campaign_id}-{day.isoformat()}", 'campaign_id': campaign_id,
+                 'date': day.isoformat(), 'spend': 100.0, 'roas': roas})
+
+def days_ago(n):
+    return date.today() - timedelta(days=n)
+
+def make_tracker(client):
+    tracker = TrendTracker(window_days=30)
+    tracker.attach(client)
+    return tracker
+
+def test_late_snapshot_for_loaded_day_is_applied(fake_supabase):
+    client = fake_supabase
+    put(client, 'a', days_ago(2), 2.0)
+    put(client, 'a', days_ago(1), 2.0)
+    put(client, 'b', days_ago(2), 3.0)
+    tracker = make_tracker(client)
+    asyncio.run(tracker.refresh())
+
+    # b's snapshot for yesterday lands after a's was already loaded
+    put(client, 'b', days_ago(1), 3.5)
+    asyncio.run(tracker.refresh())
+
+    assert tracker.states['b'].days_observed == 2
+    assert tracker.states['b'].last_date == days_ago(1)
+    assert tracker.states['a'].days_observed == 2
+
+def test_restated_snapshot_rebuilds_campaign_state(fake_supabase):
+    client = fake_supabase
+    for n in (3, 2, 1):
+        put(client, 'a', days_ago(n), 2.0)
+    tracker = make_tracker(client)
+    asyncio.run(tracker.refresh())
+
+    put(client, 'a', days_ago(2), 6.0)
+    asyncio.run(tracker.refresh())
+
+    rebuilt = make_tracker(client)
+    asyncio.run(rebuilt.refresh())
+    assert tracker.states['a'].days_observed == 3
+    assert tracker.features('a') == rebuilt.features('a')
+
+def test_campaigns_outside_window_are_pruned(fake_supabase):
+    client = fake_supabase
+    put(client, 'old', days_ago(45), 2.0)
+    put(client, 'new', days_ago(1), 2.0)
+    tracker = make_tracker(client)
+    tracker.ingest(client.tables[TrendTracker.TABLE_NAME])
+
+    asyncio.run(tracker.refresh())
+
+    assert set(tracker.states) == {'new'}
+
+def test_pages_over_tied_dates_load_every_snapshot(fake_supabase):
+    client = fake_supabase
+    client.shuffle_ties = True
+    for campaign_id in [f"c{i:02d}" for i in range(20)]:
+        for n in range(1, 6):
+            put(client, campaign_id, days_ago(n), 2.0)
+    tracker = make_tracker(client)
+    tracker.PAGE_SIZE = 7
+
+    asyncio.run(tracker.refresh())
+
+    assert len(tracker.states) == 20
+    assert all(state.days_observed == 5 for state in tracker.states.values())
+
+def test_start_loads_state_in_the_background(fake_supabase):
+    put(fake_supabase, 'a', days_ago(1), 2.0)
+    tracker = make_tracker(fake_supabase)
+
+    async def run():
+        tracker.start()
+        await asyncio.sleep(0.05)
+        await tracker.close()
+
+    asyncio.run(run())
+
+    assert tracker.states['a'].days_observed == 1
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from platform_http import PlatformHTTPClient, RetryPolicy
+from platform_rate_limiter import RateLimitConfig, rate_limiter
+
+HOST = 'https://api.example.com'
+URL = f"{HOST}/v1/campaigns"
+PLATFORM = 'http_test_ads'
+
+# No jittered backoff, so only Retry-After and the rate limiter add delay
+NO_BACKOFF = RetryPolicy(max_attempts=3, backoff_base_seconds=0.0)
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """The shared rate limiter with a fast, isolated quota for PLATFORM"""
+    monkeypatch.setattr(rate_limiter, 'buckets', {})
+    monkeypatch.setitem(rate_limiter.limits, PLATFORM, RateLimitConfig(requests_per_second=100.0, burst=10, backoff_seconds=60.0))
+    return rate_limiter
+
+def send(responses, method='GET', **kwargs):
+    """
+    Run one request against a mock transport that answers with `responses` in
+    order (a Response, or an exception to raise); returns the outcome and the
+    monotonic time each attempt arrived.
+    """
+    arrivals = []
+
+    def handler(request):
+        arrivals.append(time.monotonic())
+        answer = responses[len(arrivals) - 1]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    async def run():
+        client = PlatformHTTPClient()
+        client._clients[HOST] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await client.request(method, URL, retry=NO_BACKOFF, **kwargs)
+        finally:
+            await client.close()
+
+    try:
+        outcome = asyncio.run(run())
+    except Exception as e:
+        outcome = e
+    return outcome, arrivals
+
+def test_post_is_not_replayed_after_the_server_may_have_seen_it():
+    outcome, arrivals = send([httpx.ReadError('connection reset'), httpx.Response(201)], method='POST', json={'name': 'x'})
+
+    assert isinstance(outcome, httpx.ReadError)
+    assert len(arrivals) == 1
+
+def test_get_is_retried_after_a_read_error():
+    outcome, arrivals = send([httpx.ReadError('connection reset'), httpx.Response(200)])
+
+    assert outcome.status_code == 200
+    assert len(arrivals) == 2
+
+def test_post_is_retried_when_the_connection_never_opened():
+    outcome, arrivals = send([httpx.ConnectError('refused'), httpx.Response(201)], method='POST', json={'name': 'x'})
+
+    assert outcome.status_code == 201
+    assert len(arrivals) == 2
+
+def test_429_is_retried_after_retry_after():
+    outcome, arrivals = send(
+        [httpx.Response(429, headers={'retry-after': '0.3'}), httpx.Response(201)],
+        method='POST', json={'name': 'x'}
+    )
+
+    assert outcome.status_code == 201
+    assert len(arrivals) == 2
+    assert arrivals[1] - arrivals[0] >= 0.3
+
+def test_error_is_raised_once_retries_are_exhausted():
+    outcome, arrivals = send([httpx.Response(503)] * NO_BACKOFF.max_attempts)
+
+    assert isinstance(outcome, httpx.HTTPStatusError)
+    assert outcome.response.status_code == 503
+    assert len(arrivals) == NO_BACKOFF.max_attempts
+
+def test_throttle_pauses_the_account_bucket_before_the_retry(limiter):
+    throttled = httpx.Response(400, json={'error': {'code': 17, 'message': 'User request limit reached'}},
+                               headers={'retry-after': '0.3'})
+
+    outcome, arrivals = send([throttled, httpx.Response(200)], platform=PLATFORM, account_id='act_1')
+
+    bucket = limiter.bucket(PLATFORM, 'act_1')
+    assert outcome.status_code == 200
+    assert len(arrivals) == 2
+    # The retry waited out the pause set by the throttle, not the client's backoff
+    assert arrivals[1] - arrivals[0] >= 0.3
+    assert bucket.throttle_count == 1
+    assert bucket.rate < bucket.base_rate
+    # Other accounts on the platform are not held back
+    assert limiter.bucket(PLATFORM, 'act_2').throttle_count == 0
@@ -0,0 +1,128 @@
+import asyncio
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from optimization_engine import (
+    CampaignOptimizationEngine,
+    CampaignState,
+    CampaignStateCache,
+    PerformanceMetrics,
+    PortfolioMetrics
+)
+from optimization_rules import RuleSetRepository
+from performance_trends import TrendTracker
+
+CAMPAIGNS = 300
+HISTORY_DAYS = 21
+
+def random_metrics(rng, campaign_id):
+    impressions = int(rng.integers(0, 200000))
+    clicks = int(rng.integers(0, max(impressions // 20, 1)))
+    conversions = int(rng.integers(0, max(clicks // 5, 1)))
+    spend = float(rng.uniform(0, 5000))
+    # Put ROAS on and around the rule thresholds so every branch and boundary is exercised
+    threshold = float(rng.choice([1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0]))
+    roas = float(rng.choice([rng.uniform(0, 8), threshold, max(threshold + rng.normal(0, 0.05), 0.0)]))
+    return PerformanceMetrics(
+        campaign_id=campaign_id,
+        platform=str(rng.choice(['meta', 'google_ads'])),
+        impressions=impressions,
+        clicks=clicks,
+        conversions=conversions,
+        spend=spend,
+        revenue=spend * roas,
+        ctr=float(rng.uniform(0, 0.04)),
+        cpc=float(rng.uniform(0.2, 4.0)),
+        cpa=float(rng.uniform(5, 120)),
+        roas=roas,
+        quality_score=rng.choice([None, 0.0, float(rng.integers(1, 11))])
+    )
+
+def random_history(rng, campaign_id):
+    days = int(rng.integers(0, HISTORY_DAYS))
+    roas, ctr = rng.uniform(1.0, 5.0), rng.uniform(0.005, 0.04)
+    roas_drift, ctr_drift = rng.normal(0, 0.08), rng.normal(0, 0.001)
+    shift_day = int(rng.integers(0, HISTORY_DAYS)) if rng.random() < 0.3 else None
+    rows = []
+    for n in range(days):
+        if n == shift_day:
+            roas *= rng.choice([0.5, 1.6])
+            ctr *= rng.choice([0.5, 1.6])
+        roas = max(roas + roas_drift + rng.normal(0, 0.05), 0.1)
+        ctr = max(ctr + ctr_drift + rng.normal(0, 0.0005), 0.001)
+        rows.append({'campaign_id': campaign_id, 'date': (date.today() - timedelta(days=days - n)).isoformat(),
+                     'spend': 100.0, 'roas': roas, 'ctr': ctr})
+    return rows
+
+def make_engine(rng, campaign_ids):
+    states = {
+        campaign_id: CampaignState(
+            campaign_id=campaign_id,
+            daily_budget=float(rng.uniform(5, 2000)),
+            target_cpc=float(rng.uniform(0.3, 3.0)),
+            current_bid=float(rng.uniform(0.2, 4.0))
+        )
+        for campaign_id in campaign_ids
+    }
+
+    async def loader(ids):
+        return {campaign_id: states[campaign_id] for campaign_id in ids if campaign_id in states}
+
+    trends = TrendTracker()
+    for campaign_id in campaign_ids:
+        trends.ingest(random_history(rng, campaign_id))
+    return CampaignOptimizationEngine(
+        state_cache=CampaignStateCache(loader=loader, max_entries=len(campaign_ids)),
+        rules=RuleSetRepository(),
+        trends=trends
+    )
+
+def comparable(recommendation):
+    return (
+        recommendation.campaign_id,
+        recommendation.optimization_type,
+        recommendation.priority,
+        recommendation.auto_execute,
+        recommendation.expected_impact,
+        recommendation.reasoning,
+        recommendation.risk_assessment
+    )
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_portfolio_matches_per_campaign_analysis(seed):
+    rng = np.random.default_rng(seed)
+    # Unknown campaigns fall back to the default state
+    campaign_ids = [f"c{i}" for i in range(CAMPAIGNS)]
+    metrics = [random_metrics(rng, campaign_id) for campaign_id in campaign_ids + ['unknown']]
+    engine = make_engine(rng, campaign_ids)
+
+    async def run():
+        portfolio = await engine.analyze_portfolio(PortfolioMetrics.from_metrics(metrics))
+        expected = []
+        for m in metrics:
+            expected.extend(await engine.analyze_campaign_performance(m))
+        rules = await engine.rules.get(None)
+        scores = [engine.calculate_optimization_score(m, rules) for m in metrics]
+        return portfolio, expected, scores
+
+    portfolio, expected, scores = asyncio.run(run())
+    actual = portfolio.to_recommendations()
+
+    assert len(expected) > CAMPAIGNS
+    assert {r.optimization_type for r in expected} == {r.optimization_type for r in actual}
+    assert [comparable(r) for r in actual] == [comparable(r) for r in expected]
+    for got, want in zip(actual, expected):
+        assert got.current_value == pytest.approx(want.current_value)
+        assert got.recommended_value == pytest.approx(want.recommended_value)
+        assert got.confidence_score == pytest.approx(want.confidence_score)
+        assert got.estimated_improvement == pytest.approx(want.estimated_improvement)
+    # The columns summary() and callers read directly must agree with the materialized objects too
+    assert portfolio.optimization_type.tolist() == [r.optimization_type for r in expected]
+    assert portfolio.priority.tolist() == [r.priority for r in expected]
+    assert portfolio.auto_execute.tolist() == [r.auto_execute for r in expected]
+    assert portfolio.current_value.tolist() == pytest.approx([r.current_value for r in expected])
+    assert portfolio.recommended_value.tolist() == pytest.approx([r.recommended_value for r in expected])
+    assert portfolio.confidence_score.tolist() == pytest.approx([r.confidence_score for r in expected])
+    assert portfolio.optimization_scores.tolist() == pytest.approx(scores)
@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from platform_http import PlatformHTTPClient, RetryPolicy
+from platform_rate_limiter import PlatformRateLimiter, RateLimitConfig, TokenBucket, rate_limiter
+
+def test_ad_account_reset_time_is_not_a_throttle():
+    limiter = PlatformRateLimiter()
+    headers = {'x-ad-account-usage': json.dumps({'acc_id_util_pct': 9.67, 'reset_time_duration': 100})}
+
+    assert limiter.parse_usage_headers(headers) == (9.67, 0.0)
+
+    limiter.record_response('meta_ads', 'act_1', headers)
+    status = limiter.bucket('meta_ads', 'act_1').get_status()
+    assert status['paused_for_seconds'] == 0
+    assert status['available_tokens'] > 0
+    assert status['rate_per_second'] == status['base_rate_per_second']
+
+def test_exhausted_usage_pauses_bucket():
+    limiter = PlatformRateLimiter()
+    headers = {'x-ad-account-usage': json.dumps({'acc_id_util_pct': 100, 'reset_time_duration': 100})}
+
+    limiter.record_response('meta_ads', 'act_1', headers)
+
+    assert limiter.bucket('meta_ads', 'act_1').get_status()['paused_for_seconds'] > 0
+
+def test_high_usage_slows_rate_without_pausing():
+    limiter = PlatformRateLimiter()
+    headers = {'x-app-usage': json.dumps({'call_count': 75, 'total_cputime': 10, 'total_time': 10})}
+
+    limiter.record_response('meta_ads', 'act_1', headers)
+    bucket = limiter.bucket('meta_ads', 'act_1')
+
+    assert bucket.rate == bucket.base_rate * 0.5
+    assert bucket.get_status()['paused_for_seconds'] == 0
+
+def test_cost_above_capacity_is_charged_as_debt_instead_of_waiting_forever():
+    bucket = TokenBucket(RateLimitConfig(requests_per_second=100.0, burst=2, backoff_seconds=1.0))
+
+    async def run():
+        oversized = await asyncio.wait_for(bucket.acquire(5), timeout=1.0)
+        following = await asyncio.wait_for(bucket.acquire(1), timeout=1.0)
+        return oversized, following
+
+    oversized, following = asyncio.run(run())
+
+    assert oversized < 0.01
+    # The 3 tokens of debt plus the next token refill at 100/s
+    assert following >= 0.035
+
+def test_non_positive_cost_is_rejected():
+    bucket = TokenBucket(RateLimitConfig(requests_per_second=1.0, burst=1, backoff_seconds=1.0))
+
+    with pytest.raises(ValueError):
+        asyncio.run(bucket.acquire(0))
+
+def test_meta_throttle_error_code_is_recognised():
+    assert PlatformRateLimiter.is_throttle_error(400, {'error': {'code': 17}})
+    assert PlatformRateLimiter.is_throttle_error(429)
+    assert not PlatformRateLimiter.is_throttle_error(400, {'error': {'code': 100}})
+
+def test_platform_http_feeds_usage_headers_to_limiter():
+    account_id = 'act_http_test'
+    usage = json.dumps({'call_count': 90, 'total_cputime': 0, 'total_time': 0})
+
+    def handler(request):
+        return httpx.Response(200, json={'id': '1'}, headers={'x-app-usage': usage})
+
+    async def run():
+        client = PlatformHTTPClient()
+        client._clients['https://graph.example.com'] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            await client.request('GET', 'https://graph.example.com/v19.0/me',
+                                 platform='meta_ads', account_id=account_id, retry=RetryPolicy(max_attempts=1))
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    assert rate_limiter.bucket('meta_ads', account_id).last_usage_pct == 90.0
@@ -0,0 +1,50 @@
+import time
+
+from smart_risk_management import (
+    BUDGET_CHANGE_WINDOW_SECONDS,
+    RISK_MANAGEMENT_TEMPLATES,
+    SmartRiskManager
+)
+
+# Single-decision scoring reads the clock, so changes are recorded at the real time
+NOW = time.time()
+
+def make_manager() -> SmartRiskManager:
+    return SmartRiskManager(RISK_MANAGEMENT_TEMPLATES['beta_testing_conservative'])
+
+def record_changes(manager: SmartRiskManager, account_id: str, count: int, at: float = NOW):
+    for _ in range(count):
+        manager.record_performance_snapshot(account_id, {'spend': 100.0, 'roas': 2.0, 'budget_changed': True}, now=at)
+
+def budget_score(manager: SmartRiskManager, account_id: str) -> float:
+    return manager._assess_budget_change_risk({'account_id': account_id})['score']
+
+def test_changes_on_other_accounts_do_not_flag_an_account():
+    manager = make_manager()
+    for account_id in ('a', 'b', 'c'):
+        record_changes(manager, account_id, 1)
+
+    assert manager.recent_budget_changes('zzz', NOW) == 0
+    assert budget_score(manager, 'zzz') == 0.0
+
+    batch = manager.assess_decision_risk_batch({'account_id': ['zzz', 'a']})
+    assert batch.factor_scores['budget_change'].tolist() == [0.0, 0.0]
+
+def test_repeated_changes_on_one_account_flag_only_that_account():
+    manager = make_manager()
+    record_changes(manager, 'a', 3)
+    record_changes(manager, 'b', 1)
+
+    assert manager.recent_budget_changes('a', NOW) == 3
+    assert budget_score(manager, 'a') == 0.2
+    assert budget_score(manager, 'b') == 0.0
+
+    batch = manager.assess_decision_risk_batch({'account_id': ['b', 'a', 'zzz']})
+    assert batch.factor_scores['budget_change'].tolist() == [0.0, 0.2, 0.0]
+
+def test_changes_outside_the_window_expire():
+    manager = make_manager()
+    record_changes(manager, 'a', 3, at=NOW - BUDGET_CHANGE_WINDOW_SECONDS - 1)
+    record_changes(manager, 'a', 1)
+
+    assert manager.recent_budget_changes('a', NOW) == 1
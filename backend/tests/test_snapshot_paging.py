@@ -0,0 +1,30 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("joblib")
+pytest.importorskip("sklearn")
+
+from decision_audit_log import DecisionAuditLog
+from meta_ai_hybrid_integration import PulseBridgeAIMasterController
+
+def test_recent_snapshots_page_without_skipping_or_repeating_rows(fake_supabase):
+    fake_supabase.shuffle_ties = True
+    campaign_ids = [f"c{i:03d}" for i in range(150)]
+    fake_supabase.tables['performance_snapshots'] = [
+        {'id': f"{campaign_id}-{n}", 'campaign_id': campaign_id,
+         'date': (date.today() - timedelta(days=n)).isoformat(), 'roas': 2.0}
+        for campaign_id in campaign_ids for n in range(10)
+    ]
+    controller = PulseBridgeAIMasterController(
+        fake_supabase, None, {}, model_trainer=object(),
+        audit_log=DecisionAuditLog(supabase_client=fake_supabase)
+    )
+
+    rows = asyncio.run(controller._fetch_recent_snapshots(campaign_ids))
+
+    assert len(fake_supabase.queries) == 2
+    assert sorted((r['campaign_id'], r['date']) for r in rows) == sorted(
+        (r['campaign_id'], r['date']) for r in fake_supabase.tables['performance_snapshots']
+    )